@@ -9,14 +9,23 @@ from telegram.ext import (
 )
 
 from src.config.bot_config import BotConfig
-from src.database.manager import DatabaseManager
+from src.database.backend import create_database_manager
 from multi_crypto_payments import MultiCryptoPaymentProcessor
 from src.notifications import NotificationManager
 from src.error_logger import TelegramErrorLogger
 from src.forwarding import MessageForwarder
 from src.filters import MessageFilter
-from commands import user_commands as user, admin_commands as admin, forwarding_commands as fwd_cmds, suggestion_commands as suggestions, subscription_commands as subs, admin_slot_commands as admin_slots
+from commands import user_commands as user, forwarding_commands as fwd_cmds, suggestion_commands as suggestions, subscription_commands as subs
 from src.ui_manager import initialize_ui_manager
+from src.callback_router import CallbackRouter, CallbackData
+from src.monitoring.metrics import start_metrics_server_from_env
+from src.monitoring.health_probe import get_health_probe, database_check
+from src.monitoring.logging_setup import setup_logging
+from src.utils.lazy_imports import LazyHandlers
+
+# Admin-only handler modules are imported on their first use, not at startup
+admin = LazyHandlers('commands.admin_commands')
+admin_slots = LazyHandlers('commands.admin_slot_commands')
 
 # --- Global logger setup ---
 LOGGER = logging.getLogger(__name__)
@@ -39,6 +48,15 @@ async def post_init(application: Application):
         ('admin_slots', 'Admin ad slots'), ('admin_slot_stats', 'Admin slot statistics'),
     ])
     LOGGER.info("Custom bot commands have been set.")
+    db = application.bot_data['db']
+    if db.backend != 'sqlite':
+        # The PostgreSQL pool needs the running event loop
+        await db.initialize()
+    # Expose /metrics, /livez and /readyz on BOT_METRICS_PORT or METRICS_PORT
+    probe = get_health_probe()
+    probe.add_check('database', database_check(db))
+    probe.set_ready('bot', True)
+    application.bot_data['metrics_server'] = await start_metrics_server_from_env('bot')
     # Database will be initialized after components are added to bot_data
 
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE):
@@ -57,11 +75,7 @@ if __name__ == '__main__':
     os.makedirs("data", exist_ok=True)
     os.makedirs("logs", exist_ok=True)
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[logging.FileHandler("logs/bot.log"), logging.StreamHandler()]
-    )
+    setup_logging("logs/bot.log")
     logging.getLogger("httpx").setLevel(logging.WARNING)
 
     # Fixed startup - let the bot handle its own event loop
@@ -77,7 +91,7 @@ if __name__ == '__main__':
         
         # Initialize components (synchronously)
         config = BotConfig.load_from_env()
-        db = DatabaseManager("bot_database.db", LOGGER)
+        db = create_database_manager(LOGGER, "bot_database.db")
         notifier = NotificationManager(app.bot, LOGGER)
         payments = MultiCryptoPaymentProcessor(config, db, LOGGER)
         message_filter = MessageFilter(LOGGER)
@@ -93,8 +107,9 @@ if __name__ == '__main__':
             'error_logger': TelegramErrorLogger(config.admin_ids[0] if config.admin_ids else 0, app.bot, LOGGER)
         })
         
-        # Initialize database tables
-        db.initialize_sync()
+        # Initialize database tables (PostgreSQL is initialized in post_init)
+        if db.backend == 'sqlite':
+            db.initialize_sync()
         LOGGER.info("Components initialized successfully")
 
         # Add handlers
@@ -157,130 +172,106 @@ if __name__ == '__main__':
             "revenue": admin.revenue_stats, "payments": admin.pending_payments, "health": admin.health_stats,
             "test_admin": admin.test_admin, "add_group": admin.add_group, "list_groups": admin.list_groups,
             "admin_stats": admin.admin_stats, "admin_warnings": admin.admin_warnings, "admin_suggestions": admin.admin_suggestions,
-            "broadcast": admin.broadcast,
+            "broadcast": admin.broadcast, "traces": admin.posting_traces,
             # Admin slot commands
             "admin_slots": admin_slots.admin_slots, "admin_slot_stats": admin_slots.admin_slot_stats
         }
         for command, handler in command_handlers.items():
             app.add_handler(CommandHandler(command, handler))
 
-        # Wrapper function for admin callback to extract action and parts
-        async def admin_callback_wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
-            """Wrapper to extract action and parts from callback data for admin handler."""
-            query = update.callback_query
-            if not query or not query.data:
-                return
-            
-            data = query.data
-            if data.startswith("cmd:"):
-                parts = data.split(":")
-                action = parts[1] if len(parts) > 1 else ""
-                await admin.handle_admin_callback(update, context, action, parts)
-            else:
-                # Handle other admin callbacks that start with admin:
-                parts = data.split(":")
-                action = parts[1] if len(parts) > 1 else ""
-                await admin.handle_admin_callback(update, context, action, parts)
+        # Single callback dispatcher: callback_data is parsed once and routed
+        # through dict/trie lookups instead of one regex handler per pattern.
+        router = CallbackRouter(LOGGER)
+
+        async def admin_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, data: CallbackData):
+            """Pass the parsed action and parts to the admin handler."""
+            await admin.handle_admin_callback(update, context, data.action, data.parts)
 
-        # Wrapper function for user command callbacks (cmd:*)
-        async def user_cmd_callback_wrapper(update: Update, context: ContextTypes.DEFAULT_TYPE):
-            """Wrapper for user command callbacks starting with cmd:"""
+        async def unknown_cmd_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, data: CallbackData):
+            """Answer cmd:* callbacks that have no registered command."""
             query = update.callback_query
-            if not query or not query.data:
-                return
-            
-            data = query.data
-            if data.startswith("cmd:"):
-                # Check if this is an admin command and route accordingly
-                command = data.split(":")[1] if len(data.split(":")) > 1 else ""
-                
-                # List of admin commands that should be routed to admin handler
-                admin_commands = [
-                    "admin_menu", "list_users", "admin_stats", "system_check", 
-                    "posting_status", "failed_groups", "paused_slots", "revenue_stats",
-                    "worker_status", "system_status", "list_groups",
-                    "admin_ads_analysis", "admin_warnings", "admin_suggestions"
-                ]
-                
-                # User commands that should be routed to user handler
-                user_commands = ["start", "analytics", "referral", "subscribe", "my_ads", "help", "suggestions"]
-                
-                if command in admin_commands:
-                    # Route to admin callback handler
-                    await admin_callback_wrapper(update, context)
-                elif command == "admin_slots":
-                    # Route to admin slot callback handler
-                    await admin_slots.handle_admin_slot_callback(update, context)
-                elif command in user_commands:
-                    # Route to user callback handler
-                    await user.handle_command_callback(update, context)
-                else:
-                    # Unknown command
-                    LOGGER.warning(f"Unknown command: {command}")
-                    await query.answer("❌ Unknown command")
-                    await query.edit_message_text("❌ Unknown command")
-            else:
-                # This shouldn't happen but handle gracefully
-                await query.answer("❌ Invalid command")
-                await query.edit_message_text("❌ Invalid command")
+            LOGGER.warning(f"Unknown command: {data.action}")
+            await query.answer("❌ Unknown command")
+            await query.edit_message_text("❌ Unknown command")
 
-        callback_handlers = {
-            # User command callbacks (cmd:*)
-            '^cmd:': user_cmd_callback_wrapper,
+        # User command callbacks (cmd:*), split between admin and user handlers
+        admin_cmd_actions = [
+            "admin_menu", "list_users", "admin_stats", "system_check",
+            "posting_status", "failed_groups", "paused_slots", "revenue_stats",
+            "worker_status", "system_status", "list_groups",
+            "admin_ads_analysis", "admin_warnings", "admin_suggestions"
+        ]
+        user_cmd_actions = ["start", "analytics", "referral", "subscribe", "my_ads", "help", "suggestions"]
+        for action in admin_cmd_actions:
+            router.action('cmd', action, admin_callback, with_data=True)
+        for action in user_cmd_actions:
+            router.action('cmd', action, user.handle_command_callback)
+        router.action('cmd', 'admin_slots', admin_slots.handle_admin_slot_callback)
+        router.namespace('cmd', unknown_cmd_callback, with_data=True)
+
+        namespace_routes = {
             # Subscription flow callbacks
-            '^subscribe:': user.handle_subscription_callback,
-            '^crypto:': user.handle_subscription_callback,
-            '^check_payment:': user.handle_subscription_callback,
-            '^cancel_payment:': user.handle_subscription_callback,
-            '^copy_address:': user.handle_subscription_callback,
-            '^compare_plans$': user.handle_subscription_callback,
-            '^back_to_plans$': user.handle_subscription_callback,
+            'subscribe': user.handle_subscription_callback,
+            'crypto': user.handle_subscription_callback,
+            'check_payment': user.handle_subscription_callback,
+            'cancel_payment': user.handle_subscription_callback,
+            'copy_address': user.handle_subscription_callback,
+            'slot_analytics': user.handle_subscription_callback,
             # Ad slot management callbacks (non-conversation)
-            '^manage_slot:': user.handle_ad_slot_callback,
-            '^toggle_ad:': user.handle_ad_slot_callback,
-            '^back_to_slots$': user.handle_ad_slot_callback,
-            '^slot_analytics:': user.handle_subscription_callback,
+            'manage_slot': user.handle_ad_slot_callback,
+            'toggle_ad': user.handle_ad_slot_callback,
+        }
+        for namespace, handler in namespace_routes.items():
+            router.namespace(namespace, handler)
+        # Admin callbacks (admin:*)
+        router.namespace('admin', admin_callback, with_data=True)
+
+        exact_routes = {
+            'compare_plans': user.handle_subscription_callback,
+            'back_to_plans': user.handle_subscription_callback,
+            'back_to_slots': user.handle_ad_slot_callback,
             # Legacy subscription handlers (cleanup needed)
-            '^start_subscribe$': user.subscribe, '^start_help$': user.help_command,
-            '^subscribe_': user.subscribe, '^settings_status$': user.status,
-            '^settings_destinations$': fwd_cmds.list_destinations, r'^remove_dest_': fwd_cmds.handle_remove_destination_callback,
-            '^add_destination_shortcut$': fwd_cmds.add_destination_command, '^cancel_action$': user.cancel_conversation,
-            # Admin callbacks
-            '^admin:': admin_callback_wrapper,
+            'start_subscribe': user.subscribe, 'start_help': user.help_command,
+            'settings_status': user.status, 'settings_destinations': fwd_cmds.list_destinations,
+            'add_destination_shortcut': fwd_cmds.add_destination_command, 'cancel_action': user.cancel_conversation,
             # Suggestion callbacks
-            '^submit_suggestion$': suggestions.start_suggestion_input,
-            '^my_suggestions$': suggestions.show_user_suggestions,
-            '^suggestion_stats$': suggestions.show_suggestion_stats,
-            '^cancel_suggestions$': suggestions.cancel_suggestions,
-            '^suggestions_menu$': suggestions.show_suggestions_menu,
-            # Admin slot callbacks
-            '^admin_slot': admin_slots.handle_admin_slot_callback,
-            '^admin_toggle_slot:': admin_slots.handle_admin_slot_callback,
-            '^admin_set_content:': admin_slots.handle_admin_slot_callback,
-            '^admin_set_destinations:': admin_slots.handle_admin_slot_callback,
-            '^admin_post_slot:': admin_slots.handle_admin_slot_callback,
-            '^admin_delete_slot:': admin_slots.handle_admin_slot_callback,
-            '^admin_slot_analytics:': admin_slots.handle_admin_slot_callback,
-            '^admin_quick_post': admin_slots.handle_admin_slot_callback,
-            '^admin_quick_post_send': admin_slots.handle_admin_slot_callback,
-            '^admin_quick_post_template': admin_slots.handle_admin_slot_callback,
-            '^admin_slots': admin_slots.handle_admin_slot_callback,
-            '^admin_slots_refresh': admin_slots.handle_admin_slot_callback,
-            '^admin_category:': admin_slots.handle_admin_slot_callback,
-            '^admin_toggle_dest:': admin_slots.handle_admin_slot_callback,
-            '^admin_select_category:': admin_slots.handle_admin_slot_callback,
-            '^admin_clear_category:': admin_slots.handle_admin_slot_callback,
-            '^admin_select_all:': admin_slots.handle_admin_slot_callback,
-            '^admin_clear_all:': admin_slots.handle_admin_slot_callback,
-            '^admin_save_destinations:': admin_slots.handle_admin_slot_callback,
-            '^admin_slot_stats': admin_slots.handle_admin_slot_callback,
-            '^admin_clear_all_content': admin_slots.handle_admin_slot_callback,
-            '^admin_clear_all_destinations': admin_slots.handle_admin_slot_callback,
-            '^admin_purge_all_slots': admin_slots.handle_admin_slot_callback,
-            '^admin_confirm_purge_all_slots': admin_slots.handle_admin_slot_callback
+            'submit_suggestion': suggestions.start_suggestion_input,
+            'my_suggestions': suggestions.show_user_suggestions,
+            'suggestion_stats': suggestions.show_suggestion_stats,
+            'cancel_suggestions': suggestions.cancel_suggestions,
+            'suggestions_menu': suggestions.show_suggestions_menu,
+        }
+        for data, handler in exact_routes.items():
+            router.exact(data, handler)
+
+        prefix_routes = {
+            'subscribe_': user.subscribe,
+            'remove_dest_': fwd_cmds.handle_remove_destination_callback,
+            # Admin slot callbacks (admin_slot*, admin_slots*, admin_quick_post* included)
+            'admin_slot': admin_slots.handle_admin_slot_callback,
+            'admin_quick_post': admin_slots.handle_admin_slot_callback,
+            'admin_toggle_slot:': admin_slots.handle_admin_slot_callback,
+            'admin_set_content:': admin_slots.handle_admin_slot_callback,
+            'admin_set_destinations:': admin_slots.handle_admin_slot_callback,
+            'admin_post_slot:': admin_slots.handle_admin_slot_callback,
+            'admin_delete_slot:': admin_slots.handle_admin_slot_callback,
+            'admin_category:': admin_slots.handle_admin_slot_callback,
+            'admin_toggle_dest:': admin_slots.handle_admin_slot_callback,
+            'admin_select_category:': admin_slots.handle_admin_slot_callback,
+            'admin_clear_category:': admin_slots.handle_admin_slot_callback,
+            'admin_select_all:': admin_slots.handle_admin_slot_callback,
+            'admin_clear_all:': admin_slots.handle_admin_slot_callback,
+            'admin_clear_all_content': admin_slots.handle_admin_slot_callback,
+            'admin_clear_all_destinations': admin_slots.handle_admin_slot_callback,
+            'admin_save_destinations:': admin_slots.handle_admin_slot_callback,
+            'admin_purge_all_slots': admin_slots.handle_admin_slot_callback,
+            'admin_confirm_purge_all_slots': admin_slots.handle_admin_slot_callback
         }
-        for pattern, handler in callback_handlers.items():
-            app.add_handler(CallbackQueryHandler(handler, pattern=pattern))
+        for prefix, handler in prefix_routes.items():
+            router.prefix(prefix, handler)
+
+        app.bot_data['callback_router'] = router
+        app.add_handler(CallbackQueryHandler(router.dispatch, pattern=router.matches))
 
         app.add_handler(MessageHandler(filters.UpdateType.EDITED_MESSAGE, forwarder.handle_edited_message))
         
@@ -292,10 +283,16 @@ if __name__ == '__main__':
         # Run the bot - let it handle its own event loop
         LOGGER.info("Bot is starting...")
         LOGGER.info("✅ Background payment monitoring is handled by separate payment_monitor.py process")
-        app.run_polling(
-            drop_pending_updates=True,
-            allowed_updates=["message", "callback_query", "edited_message"]
-        )
+        allowed_updates = ["message", "callback_query", "edited_message"]
+        if config.use_webhook:
+            from src.webhook_server import run_webhook
+            LOGGER.info("🌐 Running in webhook mode")
+            run_webhook(app, config, LOGGER, allowed_updates)
+        else:
+            app.run_polling(
+                drop_pending_updates=True,
+                allowed_updates=allowed_updates
+            )
         
     except (KeyboardInterrupt, SystemExit):
         LOGGER.info("Bot stopped.")
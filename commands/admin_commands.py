@@ -1,12 +1,14 @@
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 import re
-import sqlite3
+import os
 from typing import Dict, List, Set, Optional
 import asyncio
 import logging
 from datetime import datetime
 
+from src.database import worker_health
+
 logger = logging.getLogger(__name__)
 
 async def broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE):
@@ -53,7 +55,7 @@ async def send_admin_message(update: Update, text: str, reply_markup=None, parse
 
 # Import suggestions system if available
 try:
-    from commands.suggestion_commands import suggestion_manager
+    from commands.suggestion_commands import run_suggestion_query
     SUGGESTIONS_AVAILABLE = True
 except ImportError:
     SUGGESTIONS_AVAILABLE = False
@@ -119,29 +121,22 @@ async def handle_admin_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if not parsed:
                 await send_admin_message(update, "❌ Could not parse any categories or chats.")
                 return
-            total_added = 0
-            total_skipped = 0
-            duplicate_skips = 0
-            # Track already-added group_ids to avoid reassigning category for duplicates
-            seen_group_ids: Set[str] = set()
-            for category, usernames in parsed.items():
-                for uname in usernames:
-                    gid = f"@{uname}" if not uname.startswith('@') else uname
-                    if gid in seen_group_ids:
-                        duplicate_skips += 1
-                        continue
-                    ok = await db.add_managed_group(gid, uname, category)
-                    if ok:
-                        total_added += 1
-                        seen_group_ids.add(gid)
-                    else:
-                        total_skipped += 1
+            rows = [
+                {'group_id': uname if uname.startswith('@') else f"@{uname}", 'group_name': uname, 'category': category}
+                for category, usernames in parsed.items()
+                for uname in sorted(usernames)
+            ]
+            result = await db.bulk_upsert_managed_groups(rows)
+            if result['errors']:
+                await send_admin_message(update, "❌ Bulk import failed, no groups were saved.")
+                return
             await send_admin_message(update, 
                 f"✅ Bulk import complete.\n"
                 f"• Categories: {len(parsed)}\n"
-                f"• Groups added: {total_added}\n"
-                f"• Duplicates skipped: {duplicate_skips}\n"
-                f"• Errors: {total_skipped}"
+                f"• Groups added: {result['added']}\n"
+                f"• Groups updated: {result['updated']}\n"
+                f"• Already up to date: {result['unchanged']}\n"
+                f"• Skipped: {result['skipped']} ({result['duplicates']} duplicates, {result['invalid']} invalid)"
             )
             return
 
@@ -156,17 +151,15 @@ async def handle_admin_text(update: Update, context: ContextTypes.DEFAULT_TYPE):
             if not tokens:
                 await send_admin_message(update, "❌ No chats provided.")
                 return
-            added = 0
-            errors = 0
-            for token in tokens:
-                gid = _parse_id_or_username(token)
-                # Use the token also as name if none; admin can rename later
-                ok = await db.add_managed_group(gid, gid, category)
-                if ok:
-                    added += 1
-                else:
-                    errors += 1
-            await send_admin_message(update, f"➕ Added {added} chats to category '{category}'.{' Errors: ' + str(errors) if errors else ''}")
+            # Use the token also as name; admin can rename later
+            result = await db.bulk_upsert_managed_groups([
+                {'group_id': _parse_id_or_username(token), 'category': category} for token in tokens
+            ])
+            if result['errors']:
+                await send_admin_message(update, "❌ Failed to add chats.")
+                return
+            added = result['added'] + result['updated']
+            await send_admin_message(update, f"➕ Added {added} chats to category '{category}'.{' Skipped: ' + str(result['skipped']) if result['skipped'] else ''}")
             return
 
         # Admin slot content setting
@@ -904,9 +897,7 @@ async def list_groups(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if cat_counts:
             lines = ["📚 Categories (tap to view groups):\n"]
             rows = []
-            for cc in cat_counts:
-                cat = cc['category']
-                cnt = cc['count']
+            for cat, cnt in cat_counts.items():
                 rows.append([InlineKeyboardButton(f"{cat.title()} ({cnt})", callback_data=f"admin:list_cat:{cat}")])
             rows.append([InlineKeyboardButton("🔐 Admin All (virtual)", callback_data="admin:show_admin_all")])
             rows.append([InlineKeyboardButton("➕ Add Chats to Category", callback_data="admin:add_to_category_menu")])
@@ -1712,47 +1703,12 @@ async def revenue_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await send_admin_message(update, "❌ Database not available.")
             return
         
-        # Get all completed payments from the database
-        conn = sqlite3.connect(db.db_path, timeout=30)
-        conn.execute("PRAGMA busy_timeout=30000;")
-        cursor = conn.cursor()
-        
-        # Get total revenue and payment counts
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as total_payments,
-                SUM(amount) as total_revenue,
-                COUNT(CASE WHEN status = 'completed' THEN 1 END) as completed_payments,
-                COUNT(CASE WHEN status = 'pending' THEN 1 END) as pending_payments,
-                COUNT(CASE WHEN status = 'cancelled' THEN 1 END) as cancelled_payments
-            FROM payments
-        ''')
-        stats = cursor.fetchone()
-        
-        # Get revenue by crypto type
-        cursor.execute('''
-            SELECT 
-                crypto_type,
-                COUNT(*) as count,
-                SUM(amount) as revenue
-            FROM payments 
-            WHERE status = 'completed'
-            GROUP BY crypto_type
-        ''')
-        crypto_stats = cursor.fetchall()
-        
-        # Get recent payments (last 7 days)
-        cursor.execute('''
-            SELECT 
-                COUNT(*) as recent_count,
-                SUM(amount) as recent_revenue
-            FROM payments 
-            WHERE status = 'completed' 
-            AND created_at >= datetime('now', '-7 days')
-        ''')
-        recent_stats = cursor.fetchone()
-        
-        conn.close()
+        # Get payment statistics (either backend)
+        payment_stats = await db.get_revenue_stats()
+        stats = (payment_stats['total_payments'], payment_stats['total_revenue'], payment_stats['completed_payments'],
+                 payment_stats['pending_payments'], payment_stats['cancelled_payments'])
+        recent_stats = (payment_stats['recent_count'], payment_stats['recent_revenue'])
+        crypto_stats = payment_stats['crypto_breakdown']
         
         # Build the statistics message
         text = "💰 **Revenue Statistics:**\n\n"
@@ -1846,79 +1802,49 @@ async def worker_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
         if not db:
             await send_admin_message(update, "❌ Database not available.")
             return
-        workers = await db.get_all_workers()
-        if not workers:
+        # One precomputed health row per worker (updated as posts complete)
+        snapshots = await db.get_worker_health_snapshots()
+        if not snapshots:
             await send_admin_message(update, "🤖 No workers found.")
             return
+        summary = worker_health.summarize(snapshots)
         
-        # Show summary first
         lines = ["🤖 **Worker Status Summary**\n"]
-        total_hourly_posts = 0
-        total_daily_posts = 0
-        total_safety_score = 0
-        available_workers = 0
+        lines.append(f"📊 **Overview:**")
+        lines.append(f"• Total Workers: {summary['total_workers']}")
+        lines.append(f"• Healthy: {summary['healthy']} | Warning: {summary['warning']} | Critical: {summary['critical']}")
+        lines.append(f"• Banned: {summary['banned']} | Overloaded: {summary['overloaded']}")
+        lines.append(f"• Total Hourly Posts: {summary['posts_this_hour']}")
+        lines.append(f"• Total Daily Posts: {summary['posts_today']}")
+        lines.append(f"• Avg Health Score: {summary['avg_health_score']:.1f}")
+        lines.append(f"• Avg Error Rate: {summary['avg_error_rate'] * 100:.1f}%")
+        
+        # Add workload information
+        due_slots = await db.get_active_ads_to_send()
+        user_slots = [slot for slot in due_slots if slot.get('slot_type') == 'user']
+        admin_slots = [slot for slot in due_slots if slot.get('slot_type') == 'admin']
+        
+        lines.append("")
+        lines.append(f"📋 **Current Workload:**")
+        lines.append(f"• User ads pending: {len(user_slots)}")
+        lines.append(f"• Admin ads pending: {len(admin_slots)}")
+        lines.append(f"• Total workload: {len(due_slots)}")
+        
+        # Show top 10 workers only to avoid message length issues
+        lines.append("")
+        lines.append(f"🔝 **Top 10 Workers (by usage):**")
+        status_icons = {'healthy': "✅", 'warning': "⚠️", 'critical': "❌"}
+        by_usage = sorted(snapshots, key=lambda row: row['posts_this_hour'] + row['posts_today'], reverse=True)
+        for i, row in enumerate(by_usage[:10]):
+            lines.append(
+                f"{i+1}. Worker {row['worker_id']} {status_icons.get(row['status'], '❔')} | "
+                f"H:{row['posts_this_hour']} D:{row['posts_today']} | Health:{row['health_score']} "
+                f"Err:{row['error_rate'] * 100:.0f}%"
+            )
+        
+        if len(snapshots) > 10:
+            lines.append(f"... and {len(snapshots) - 10} more workers")
         
-        # Calculate totals
-        for worker in workers:
-            usage = await db.get_worker_usage(worker['worker_id']) or {}
-            hourly_posts = usage.get('hourly_posts', 0)
-            daily_posts = usage.get('daily_posts', 0)
-            safety_score = usage.get('safety_score', 100.0)
-            total_hourly_posts += hourly_posts
-            total_daily_posts += daily_posts
-            total_safety_score += safety_score
-            if usage.get('is_available', True):
-                available_workers += 1
-        
-        if workers:
-            avg_safety = total_safety_score / len(workers)
-            lines.append(f"📊 **Overview:**")
-            lines.append(f"• Total Workers: {len(workers)}")
-            lines.append(f"• Available: {available_workers}")
-            lines.append(f"• Total Hourly Posts: {total_hourly_posts}")
-            lines.append(f"• Total Daily Posts: {total_daily_posts}")
-            lines.append(f"• Avg Safety Score: {avg_safety:.1f}")
-            
-            # Add workload information
-            due_slots = await db.get_active_ads_to_send()
-            user_slots = [slot for slot in due_slots if slot.get('slot_type') == 'user']
-            admin_slots = [slot for slot in due_slots if slot.get('slot_type') == 'admin']
-            
-            lines.append("")
-            lines.append(f"📋 **Current Workload:**")
-            lines.append(f"• User ads pending: {len(user_slots)}")
-            lines.append(f"• Admin ads pending: {len(admin_slots)}")
-            lines.append(f"• Total workload: {len(due_slots)}")
-            
-            # Show top 10 workers only to avoid message length issues
-            lines.append("")
-            lines.append(f"🔝 **Top 10 Workers (by usage):**")
-            
-            # Get worker usage data and sort by usage
-            worker_data = []
-            for worker in workers:
-                usage = await db.get_worker_usage(worker['worker_id']) or {}
-                hourly_posts = usage.get('hourly_posts', 0)
-                daily_posts = usage.get('daily_posts', 0)
-                safety_score = usage.get('safety_score', 100.0)
-                status = "✅" if usage.get('is_available', True) else "❌"
-                worker_data.append({
-                    'id': worker['worker_id'],
-                    'hourly': hourly_posts,
-                    'daily': daily_posts,
-                    'safety': safety_score,
-                    'status': status,
-                    'total_usage': hourly_posts + daily_posts
-                })
-            
-            # Sort by total usage and show top 10
-            worker_data.sort(key=lambda x: x['total_usage'], reverse=True)
-            for i, worker in enumerate(worker_data[:10]):
-                lines.append(f"{i+1}. Worker {worker['id']} {worker['status']} | H:{worker['hourly']} D:{worker['daily']} | Safety:{worker['safety']:.1f}")
-            
-            if len(workers) > 10:
-                lines.append(f"... and {len(workers) - 10} more workers")
-            
         await send_admin_message(update, "\n".join(lines), parse_mode='Markdown')
         
     except Exception as e:
@@ -1997,7 +1923,7 @@ async def worker_capacity_check(update: Update, context: ContextTypes.DEFAULT_TY
             await send_admin_message(update, "❌ Database not available.")
             return
         available_workers = await db.get_available_workers()
-        all_workers = await db.get_all_workers()
+        health = worker_health.summarize(await db.get_worker_health_snapshots())
         due_slots = await db.get_active_ads_to_send()
         
         # Separate user and admin slots
@@ -2009,7 +1935,9 @@ async def worker_capacity_check(update: Update, context: ContextTypes.DEFAULT_TY
         load_ratio = (pending_ads / num_available) if num_available else 0
 
         text = "📊 Capacity Check:\n\n"
-        text += f"Workers: {num_available}/{len(all_workers)} available\n"
+        text += f"Workers: {num_available}/{health['total_workers']} available\n"
+        text += f"Health: {health['healthy']} healthy, {health['warning']} warning, {health['critical']} critical\n"
+        text += f"Posts this hour: {health['posts_this_hour']} ({health['overloaded']} workers over 90% of limit)\n"
         text += f"**Total Pending Ads: {pending_ads}**\n"
         text += f"  • User ads: {len(user_slots)}\n"
         text += f"  • Admin ads: {len(admin_slots)}\n"
@@ -2475,12 +2403,20 @@ async def health_stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
                 percentage = (category['count'] / health_summary['total_destinations']) * 100
                 text += f"• {category['category']}: {category['count']} ({percentage:.1f}%)\n"
             text += "\n"
-        
+
         if problematic:
             text += "🚨 **Top Problematic Destinations:**\n"
             for dest in problematic[:5]:
                 text += f"• `{dest['destination_id']}`: {dest['success_rate']:.1f}% success rate\n"
-        
+            text += "\n"
+
+        if hasattr(db, 'get_cache_stats'):
+            cache_stats = db.get_cache_stats()
+            text += "⚡ **Lookup Cache:**\n"
+            text += f"• Entries: {cache_stats['size']}/{cache_stats['max_entries']}\n"
+            text += f"• Hits: {cache_stats['hits']} | Misses: {cache_stats['misses']}\n"
+            text += f"• Hit rate: {cache_stats['hit_rate'] * 100:.1f}%\n"
+
         await send_admin_message(update, text, parse_mode='Markdown')
         
     except Exception as e:
@@ -2559,6 +2495,58 @@ async def posting_activity(update: Update, context: ContextTypes.DEFAULT_TYPE):
         logger.error(f"Error getting posting activity: {e}")
         await send_admin_message(update, f"❌ Error getting posting activity: {str(e)}")
 
+async def posting_traces(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Show the per-stage breakdown of recent posting cycles.
+
+    Usage: /traces [n] shows the n-th most recent cycle (default 1),
+    /traces json sends the exported trace file.
+    """
+    if not await check_admin(update, context):
+        await send_admin_message(update, "❌ Admin access required.")
+        return
+
+    try:
+        from src.monitoring.tracing import format_trace_tree, load_traces, summarize_trace, tracer
+
+        export_path = tracer.export_path
+        if context.args and context.args[0].lower() == 'json':
+            if not export_path or not os.path.exists(export_path):
+                await send_admin_message(update, "❌ No trace export found yet.")
+                return
+            with open(export_path, 'rb') as f:
+                await update.effective_message.reply_document(f, filename=os.path.basename(export_path))
+            return
+
+        # Traces are recorded by the scheduler process and read back from its export
+        exported = await asyncio.to_thread(load_traces, export_path) if export_path else []
+        traces = [t for t in exported if t.get('name') == 'posting_cycle']
+        if not traces:
+            traces = tracer.get_traces('posting_cycle')
+        if not traces:
+            await send_admin_message(update, "📭 No posting cycle traces recorded yet.")
+            return
+
+        index = int(context.args[0]) if context.args and context.args[0].isdigit() else 1
+        index = min(max(index, 1), len(traces))
+        trace = traces[-index]
+
+        text = f"🧭 Posting cycle #{trace['trace_id']} ({index}/{len(traces)})\n"
+        text += f"Started: {trace['started_at'][:19]}\n"
+        text += f"Duration: {(trace['duration_ms'] or 0) / 1000:.2f}s, spans: {len(trace['spans'])}"
+        if trace.get('dropped_spans'):
+            text += f" (+{trace['dropped_spans']} dropped)"
+        text += "\n\nStage (count) total / self:\n"
+        for row in summarize_trace(trace)[:12]:
+            text += f"• {row['name']} ({row['count']}) {row['total_ms'] / 1000:.2f}s / {row['self_ms'] / 1000:.2f}s\n"
+        text += f"\n{format_trace_tree(trace, max_depth=3, max_children=5)}"
+
+        # Telegram message limit
+        await send_admin_message(update, text[:4000])
+
+    except Exception as e:
+        logger.error(f"Error getting posting traces: {e}")
+        await send_admin_message(update, f"❌ Error getting posting traces: {str(e)}")
+
 async def system_status(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show comprehensive system status."""
     if not await check_admin(update, context):
@@ -2630,7 +2618,7 @@ async def admin_suggestions(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     try:
-        suggestions = suggestion_manager.get_all_suggestions(limit=20)
+        suggestions = await run_suggestion_query(lambda manager: manager.get_all_suggestions(limit=20))
         
         if not suggestions:
             await send_admin_message(update, "📋 No suggestions found.")
@@ -2698,44 +2686,31 @@ async def worker_distribution(update: Update, context: ContextTypes.DEFAULT_TYPE
             await send_admin_message(update, "❌ Database not available.")
             return
         
-        # Get worker distribution
-        conn = sqlite3.connect(db.db_path)
-        cursor = conn.cursor()
-        
-        # Count slots per worker
-        cursor.execute('''
-            SELECT assigned_worker_id, COUNT(*) as slot_count, 
-                   COUNT(CASE WHEN is_active = 1 THEN 1 END) as active_slots
-            FROM ad_slots 
-            GROUP BY assigned_worker_id
-            ORDER BY assigned_worker_id
-        ''')
-        
-        distribution = cursor.fetchall()
+        # Slots each worker posted for in the last 24 hours
+        distribution = await db.get_worker_posting_stats(24)
         
         # Get total workers available
-        available_workers = await db._get_available_worker_count()
+        available_workers = len(await db.get_all_workers())
         
-        text = f"🤖 **Worker Distribution**\n\n"
+        text = f"🤖 **Worker Distribution (24h)**\n\n"
         text += f"📊 **Available Workers:** {available_workers}\n"
         text += f"📈 **Workers with Slots:** {len(distribution)}\n\n"
         
         total_slots = 0
-        total_active = 0
+        total_posts = 0
         
-        for worker_id, slot_count, active_slots in distribution:
-            text += f"🤖 **Worker {worker_id}:** {slot_count} slots ({active_slots} active)\n"
-            total_slots += slot_count
-            total_active += active_slots
+        for row in distribution:
+            text += f"🤖 **Worker {row['worker_id']}:** {row['slot_count']} slots ({row['total_posts']} posts)\n"
+            total_slots += row['slot_count']
+            total_posts += row['total_posts']
         
-        text += f"\n📊 **Totals:** {total_slots} slots ({total_active} active)\n"
+        text += f"\n📊 **Totals:** {total_slots} slot assignments ({total_posts} posts)\n"
         
         # Check if distribution is balanced
         if len(distribution) < available_workers:
             text += f"\n⚠️ **Warning:** Only {len(distribution)} workers have slots assigned.\n"
             text += f"Use /redistribute_workers to distribute across all {available_workers} workers."
         
-        conn.close()
         await send_admin_message(update, text, parse_mode='Markdown')
         
     except Exception as e:
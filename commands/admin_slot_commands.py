@@ -7,11 +7,124 @@ Handles admin-specific ad slots for promotional content
 import logging
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Any, Dict, List
 import json
 
+from src.database.group_index import ManagedGroupIndex
+from src.menu_registry import content_version, menu_registry
+
 logger = logging.getLogger(__name__)
 
+# context.user_data key of the admin's unsaved destination selection
+ADMIN_DESTINATION_DRAFT = 'admin_destination_draft'
+
+
+@dataclass
+class DestinationDraft:
+    """Unsaved destination selection for one admin slot.
+
+    ``selected`` and ``saved`` are bitsets over ``index`` positions. Picker
+    taps only change ``selected``; admin_save_destinations writes it once.
+    Saved destinations that are not managed groups are kept in ``extra``
+    and saved back unchanged unless the admin clears all destinations.
+    """
+    slot_number: int
+    index: ManagedGroupIndex
+    selected: int
+    saved: int
+    extra: List[Dict[str, Any]] = field(default_factory=list)
+    keep_extra: bool = True
+
+    @property
+    def selected_count(self) -> int:
+        return self.selected.bit_count() + (len(self.extra) if self.keep_extra else 0)
+
+    @property
+    def dirty(self) -> bool:
+        return self.selected != self.saved or (bool(self.extra) and not self.keep_extra)
+
+    def destinations(self) -> List[Dict[str, Any]]:
+        """Destination rows for update_admin_slot_destinations."""
+        destinations = [
+            {
+                'destination_id': key,
+                'destination_name': group['group_name'],
+                'destination_type': 'group'
+            }
+            for key, group in zip(self.index.keys_for(self.selected), self.index.groups_for(self.selected))
+        ]
+        if self.keep_extra:
+            destinations.extend(self.extra)
+        return destinations
+
+# Static admin slot menus/keyboard rows, built once at import
+ADMIN_SLOTS_FOOTER_ROWS = [
+    [
+        InlineKeyboardButton("📝 Quick Post", callback_data="admin_quick_post"),
+        InlineKeyboardButton("📊 Slot Stats", callback_data="admin_slot_stats")
+    ],
+    [
+        InlineKeyboardButton("🧹 Clear All Content", callback_data="admin_clear_all_content"),
+        InlineKeyboardButton("🗑️ Clear All Destinations", callback_data="admin_clear_all_destinations")
+    ],
+    [
+        InlineKeyboardButton("💥 Purge All Slots", callback_data="admin_purge_all_slots"),
+        InlineKeyboardButton("🔄 Refresh", callback_data="admin_slots_refresh")
+    ],
+    [
+        InlineKeyboardButton("🔙 Back to Admin Menu", callback_data="cmd:admin_menu")
+    ]
+]
+
+menu_registry.register_static(
+    'admin_slots.quick_post',
+    "📤 **Quick Admin Post**\n\n"
+    "This will post your message to all managed groups.\n\n"
+    "**Features:**\n"
+    "• Instant posting to all groups\n"
+    "• No scheduling required\n"
+    "• Perfect for announcements\n\n"
+    "Send your message now to post it immediately!",
+    [
+        [
+            InlineKeyboardButton("📝 Send Message", callback_data="admin_quick_post_send"),
+            InlineKeyboardButton("📋 Use Template", callback_data="admin_quick_post_template")
+        ],
+        [
+            InlineKeyboardButton("🔙 Back to Slots", callback_data="admin_slots")
+        ]
+    ]
+)
+
+
+def _render_admin_slots_menu(admin_slots):
+    """Render the admin slots overview for the given slots."""
+    message_text = "🎯 **Admin Ad Slots**\n\n"
+    message_text += f"**Total Slots:** {len(admin_slots)} (Unlimited)\n"
+    message_text += "**Purpose:** Promotional content and announcements\n\n"
+    message_text += "Select a slot to manage:"
+    
+    keyboard = []
+    
+    # Create slot buttons (5 per row)
+    for i in range(0, len(admin_slots), 5):
+        row = []
+        for j in range(5):
+            if i + j < len(admin_slots):
+                slot = admin_slots[i + j]
+                slot_number = slot['slot_number']
+                status = "✅" if slot['is_active'] else "⏸️"
+                row.append(InlineKeyboardButton(
+                    f"{status} {slot_number}", 
+                    callback_data=f"admin_slot:{slot_number}"
+                ))
+        keyboard.append(row)
+    
+    keyboard.extend(ADMIN_SLOTS_FOOTER_ROWS)
+    return menu_registry.render(message_text, keyboard)
+
 def get_display_category(category: str) -> str:
     """Convert database category to display category with emoji."""
     category_mapping = {
@@ -117,51 +230,18 @@ async def admin_slots(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await db.create_admin_ad_slots()
             admin_slots = await db.get_admin_ad_slots()
         
-        message_text = "🎯 **Admin Ad Slots**\n\n"
-        message_text += f"**Total Slots:** {len(admin_slots)} (Unlimited)\n"
-        message_text += "**Purpose:** Promotional content and announcements\n\n"
-        message_text += "Select a slot to manage:"
-        
-        keyboard = []
-        
-        # Create slot buttons (5 per row)
-        for i in range(0, len(admin_slots), 5):
-            row = []
-            for j in range(5):
-                if i + j < len(admin_slots):
-                    slot = admin_slots[i + j]
-                    slot_number = slot['slot_number']
-                    status = "✅" if slot['is_active'] else "⏸️"
-                    row.append(InlineKeyboardButton(
-                        f"{status} {slot_number}", 
-                        callback_data=f"admin_slot:{slot_number}"
-                    ))
-            keyboard.append(row)
-        
-        # Add management buttons
-        keyboard.append([
-            InlineKeyboardButton("📝 Quick Post", callback_data="admin_quick_post"),
-            InlineKeyboardButton("📊 Slot Stats", callback_data="admin_slot_stats")
-        ])
-        keyboard.append([
-            InlineKeyboardButton("🧹 Clear All Content", callback_data="admin_clear_all_content"),
-            InlineKeyboardButton("🗑️ Clear All Destinations", callback_data="admin_clear_all_destinations")
-        ])
-        keyboard.append([
-            InlineKeyboardButton("💥 Purge All Slots", callback_data="admin_purge_all_slots"),
-            InlineKeyboardButton("🔄 Refresh", callback_data="admin_slots_refresh")
-        ])
-        keyboard.append([
-            InlineKeyboardButton("🔙 Back to Admin Menu", callback_data="cmd:admin_menu")
-        ])
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        # Rebuilt only when a slot's number or active flag changes
+        menu = menu_registry.dynamic(
+            'admin_slots.overview', 'admin',
+            content_version([(slot['slot_number'], bool(slot['is_active'])) for slot in admin_slots]),
+            lambda: _render_admin_slots_menu(admin_slots)
+        )
         
         # Handle both command and callback query calls
         if update.callback_query:
-            await update.callback_query.edit_message_text(message_text, reply_markup=reply_markup, parse_mode='Markdown')
+            await menu_registry.edit(update.callback_query, menu)
         else:
-            await update.message.reply_text(message_text, reply_markup=reply_markup, parse_mode='Markdown')
+            await menu_registry.reply(update.message, menu)
         
     except Exception as e:
         logger.error(f"Error in admin_slots: {e}")
@@ -251,28 +331,7 @@ async def admin_quick_post(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
         
     try:
-        message_text = (
-            "📤 **Quick Admin Post**\n\n"
-            "This will post your message to all managed groups.\n\n"
-            "**Features:**\n"
-            "• Instant posting to all groups\n"
-            "• No scheduling required\n"
-            "• Perfect for announcements\n\n"
-            "Send your message now to post it immediately!"
-        )
-        
-        keyboard = [
-            [
-                InlineKeyboardButton("📝 Send Message", callback_data="admin_quick_post_send"),
-                InlineKeyboardButton("📋 Use Template", callback_data="admin_quick_post_template")
-            ],
-            [
-                InlineKeyboardButton("🔙 Back to Slots", callback_data="admin_slots")
-            ]
-        ]
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        await update.callback_query.edit_message_text(message_text, reply_markup=reply_markup, parse_mode='Markdown')
+        await menu_registry.edit(update.callback_query, menu_registry.static('admin_slots.quick_post'))
         
     except Exception as e:
         logger.error(f"Error in admin_quick_post: {e}")
@@ -457,6 +516,26 @@ async def admin_set_slot_content(update: Update, context: ContextTypes.DEFAULT_T
         logger.error(f"Error in admin_set_slot_content: {e}")
         await update.callback_query.answer("❌ Error setting up content input")
 
+async def _get_destination_draft(context: ContextTypes.DEFAULT_TYPE, slot_number: int) -> DestinationDraft:
+    """Get the admin's draft for slot_number, seeding it from the database once."""
+    db = context.bot_data['db']
+    index = await db.get_managed_group_index()
+    draft = context.user_data.get(ADMIN_DESTINATION_DRAFT)
+    
+    if draft is None or draft.slot_number != slot_number:
+        current = await db.get_admin_slot_destinations(slot_number)
+        saved = index.mask_for(dest['destination_id'] for dest in current)
+        extra = [dest for dest in current if dest['destination_id'] not in index.positions]
+        draft = DestinationDraft(slot_number, index, saved, saved, extra)
+        context.user_data[ADMIN_DESTINATION_DRAFT] = draft
+    elif draft.index is not index:
+        # Managed groups changed since the draft was started
+        draft.selected = index.remap(draft.selected, draft.index)
+        draft.saved = index.remap(draft.saved, draft.index)
+        draft.index = index
+    
+    return draft
+
 async def admin_set_slot_destinations(update: Update, context: ContextTypes.DEFAULT_TYPE, slot_number: int):
     """Set destinations for an admin slot."""
     if not await check_admin(update, context):
@@ -464,57 +543,45 @@ async def admin_set_slot_destinations(update: Update, context: ContextTypes.DEFA
         return
         
     try:
-        db = context.bot_data['db']
+        draft = await _get_destination_draft(context, slot_number)
+        index = draft.index
         
-        # Get all managed groups
-        all_groups = await db.get_managed_groups()
-        
-        if not all_groups:
+        if not len(index):
             await update.callback_query.answer("❌ No managed groups available")
             return
         
-        # Get current destinations for this slot
-        slot = await db.get_admin_ad_slot(slot_number)
-        current_destinations = await db.get_admin_slot_destinations(slot['id']) if slot else []
-        current_dest_ids = {dest['destination_id'] for dest in current_destinations}
-        
-        # Organize groups by their actual database categories
-        categories = {}
-        for group in all_groups:
-            category = group.get('category', 'other')
-            display_category = get_display_category(category)
-            
-            if display_category not in categories:
-                categories[display_category] = []
-            categories[display_category].append(group)
-        
         # Add timestamp to avoid "message not modified" errors
-        from datetime import datetime
         current_time = datetime.now().strftime("%H:%M:%S")
         
+        # Selected/total per category, with the display name used in callbacks
+        categories = [
+            (get_display_category(category), (draft.selected & mask).bit_count(), mask.bit_count())
+            for category, mask in index.category_masks.items()
+        ]
+        
         message_text = f"🎯 **Choose Posting Destinations for Admin Slot {slot_number}**\n\n"
         message_text += f"📢 **What this does:** Select which groups this admin slot will post to when activated.\n\n"
-        message_text += f"**Currently Selected:** {len(current_destinations)} groups\n"
-        message_text += f"**Available Groups:** {len(all_groups)} total groups in your database\n\n"
+        message_text += f"**Currently Selected:** {draft.selected_count} groups\n"
+        message_text += f"**Available Groups:** {len(index)} total groups in your database\n\n"
         message_text += "**📁 Groups by Category:**\n"
         
-        for category, groups in categories.items():
-            selected_count = sum(1 for group in groups if (group['group_id'] or group['group_name']) in current_dest_ids)
-            message_text += f"• {category}: {selected_count}/{len(groups)} selected\n"
+        for category, selected_count, total in categories:
+            message_text += f"• {category}: {selected_count}/{total} selected\n"
         
         message_text += f"\n**👆 Tap a category below to select/deselect groups for posting:**\n"
+        if draft.dirty:
+            message_text += "✏️ *Unsaved changes - tap Save Changes to apply*\n"
         message_text += f"⏰ *Updated: {current_time}*"
         
         keyboard = []
         
         # Create category selection buttons (2 per row)
-        for i, (category, groups) in enumerate(categories.items()):
+        for i, (category, selected_count, total) in enumerate(categories):
             if i % 2 == 0:
                 row = []
             
-            selected_count = sum(1 for group in groups if (group['group_id'] or group['group_name']) in current_dest_ids)
             row.append(InlineKeyboardButton(
-                f"📁 {category} ({selected_count}/{len(groups)})", 
+                f"📁 {category} ({selected_count}/{total})", 
                 callback_data=f"admin_category:{slot_number}:{category}"
             ))
             
@@ -545,53 +612,38 @@ async def admin_category_view(update: Update, context: ContextTypes.DEFAULT_TYPE
         return
         
     try:
-        db = context.bot_data['db']
-        
-        # Get all managed groups
-        all_groups = await db.get_managed_groups()
-        
-        # Get current destinations for this slot
-        slot = await db.get_admin_ad_slot(slot_number)
-        current_destinations = await db.get_admin_slot_destinations(slot['id']) if slot else []
-        current_dest_ids = {dest['destination_id'] for dest in current_destinations}
-        
-        # Filter groups by category
-        category_groups = []
-        for group in all_groups:
-            group_category = group.get('category', 'other')
-            target_category = get_database_category(category)
-            
-            if group_category == target_category:
-                category_groups.append(group)
+        draft = await _get_destination_draft(context, slot_number)
+        index = draft.index
+        category_mask = index.category_mask(get_database_category(category))
+        category_positions = index.positions_in(category_mask)
         
-        selected_count = sum(1 for group in category_groups if (group['group_id'] or group['group_name']) in current_dest_ids)
+        selected_count = (draft.selected & category_mask).bit_count()
         
         # Add timestamp to avoid "message not modified" errors
-        from datetime import datetime
         current_time = datetime.now().strftime("%H:%M:%S")
         
         message_text = f"📁 **{category}** - Admin Slot {slot_number}\n\n"
         message_text += f"📢 **Posting Destinations:** Choose which groups in this category will receive your admin slot content.\n\n"
-        message_text += f"**Selected:** {selected_count}/{len(category_groups)} groups\n\n"
+        message_text += f"**Selected:** {selected_count}/{len(category_positions)} groups\n\n"
         message_text += "**👆 Tap groups below to add/remove them as posting destinations:**\n"
+        if draft.dirty:
+            message_text += "✏️ *Unsaved changes - tap Save Changes to apply*\n"
         message_text += f"⏰ *Updated: {current_time}*"
         
         keyboard = []
         
         # Create group selection buttons (2 per row)
-        for i in range(0, len(category_groups), 2):
+        for i in range(0, len(category_positions), 2):
             row = []
-            for j in range(2):
-                if i + j < len(category_groups):
-                    group = category_groups[i + j]
-                    group_id = group['group_id'] or group['group_name']
-                    is_selected = group_id in current_dest_ids
-                    status = "✅" if is_selected else "⬜"
-                    display_name = group['group_name'][:20] + "..." if len(group['group_name']) > 20 else group['group_name']
-                    row.append(InlineKeyboardButton(
-                        f"{status} {display_name}", 
-                        callback_data=f"admin_toggle_dest:{slot_number}:{group_id}"
-                    ))
+            for position in category_positions[i:i + 2]:
+                group = index.groups[position]
+                group_id = index.keys[position]
+                status = "✅" if draft.selected >> position & 1 else "⬜"
+                display_name = group['group_name'][:20] + "..." if len(group['group_name']) > 20 else group['group_name']
+                row.append(InlineKeyboardButton(
+                    f"{status} {display_name}", 
+                    callback_data=f"admin_toggle_dest:{slot_number}:{group_id}"
+                ))
             keyboard.append(row)
         
         # Add category management buttons
@@ -612,109 +664,46 @@ async def admin_category_view(update: Update, context: ContextTypes.DEFAULT_TYPE
         await update.callback_query.answer("❌ Error loading category view")
 
 async def admin_toggle_destination(update: Update, context: ContextTypes.DEFAULT_TYPE, slot_number: int, group_id: str):
-    """Toggle a destination for an admin slot."""
+    """Toggle a destination in the admin's draft selection for a slot."""
     if not await check_admin(update, context):
         await update.callback_query.answer("❌ Admin access required.")
         return
         
     try:
-        db = context.bot_data['db']
+        draft = await _get_destination_draft(context, slot_number)
+        position = draft.index.positions.get(group_id)
         
-        # Get current destinations for this slot
-        slot = await db.get_admin_ad_slot(slot_number)
-        if not slot:
-            await update.callback_query.answer("❌ Slot not found")
+        if position is None:
+            await update.callback_query.answer("❌ Group not found")
             return
         
-        current_destinations = await db.get_admin_slot_destinations(slot['id'])
-        current_dest_ids = {dest['destination_id'] for dest in current_destinations}
-        
-        # Toggle the destination
-        if group_id in current_dest_ids:
-            # Remove destination
-            success = await db.remove_admin_slot_destination(slot['id'], group_id)
-            if success:
-                await update.callback_query.answer("❌ Destination removed")
-            else:
-                await update.callback_query.answer("❌ Failed to remove destination")
-        else:
-            # Add destination
-            # Get group info
-            all_groups = await db.get_managed_groups()
-            group_info = next((g for g in all_groups if (g['group_id'] or g['group_name']) == group_id), None)
-            
-            if group_info:
-                destination_data = {
-                    'destination_id': group_id,
-                    'destination_name': group_info['group_name'],
-                    'destination_type': 'group'
-                }
-                success = await db.add_admin_slot_destination(slot['id'], destination_data)
-                if success:
-                    await update.callback_query.answer("✅ Destination added")
-                else:
-                    await update.callback_query.answer("❌ Failed to add destination")
-            else:
-                await update.callback_query.answer("❌ Group not found")
-        
-        # Refresh the current view
-        # Determine if we're in category view or main destinations view
-        message_text = update.callback_query.message.text
-        if "📁" in message_text and "Admin Slot" in message_text:
-            # We're in category view, extract category
-            lines = message_text.split('\n')
-            for line in lines:
-                if line.startswith("📁 **") and "** - Admin Slot" in line:
-                    category = line.split("📁 **")[1].split("** - Admin Slot")[0]
-                    await admin_category_view(update, context, slot_number, category)
-                    break
+        # Toggle the destination in the draft only; saved on admin_save_destinations
+        draft.selected ^= 1 << position
+        if draft.selected >> position & 1:
+            await update.callback_query.answer("✅ Destination added")
         else:
-            # We're in main destinations view
-            await admin_set_slot_destinations(update, context, slot_number)
+            await update.callback_query.answer("❌ Destination removed")
+        
+        # Refresh the category view the group was toggled from
+        category = draft.index.groups[position].get('category') or 'other'
+        await admin_category_view(update, context, slot_number, get_display_category(category))
         
     except Exception as e:
         logger.error(f"Error in admin_toggle_destination: {e}")
         await update.callback_query.answer("❌ Error toggling destination")
 
 async def admin_select_category(update: Update, context: ContextTypes.DEFAULT_TYPE, slot_number: int, category: str):
-    """Select all groups in a category for an admin slot."""
+    """Select all groups in a category in the admin's draft selection."""
     if not await check_admin(update, context):
         await update.callback_query.answer("❌ Admin access required.")
         return
         
     try:
-        db = context.bot_data['db']
-        
-        # Get all managed groups
-        all_groups = await db.get_managed_groups()
+        draft = await _get_destination_draft(context, slot_number)
+        category_mask = draft.index.category_mask(get_database_category(category))
         
-        # Get current destinations for this slot
-        slot = await db.get_admin_ad_slot(slot_number)
-        if not slot:
-            await update.callback_query.answer("❌ Slot not found")
-            return
-        
-        # Filter groups by category
-        category_groups = []
-        for group in all_groups:
-            group_category = group.get('category', 'other')
-            target_category = get_database_category(category)
-            
-            if group_category == target_category:
-                category_groups.append(group)
-        
-        # Add all groups in category
-        added_count = 0
-        for group in category_groups:
-            group_id = group['group_id'] or group['group_name']
-            destination_data = {
-                'destination_id': group_id,
-                'destination_name': group['group_name'],
-                'destination_type': 'group'
-            }
-            success = await db.add_admin_slot_destination(slot['id'], destination_data)
-            if success:
-                added_count += 1
+        added_count = (category_mask & ~draft.selected).bit_count()
+        draft.selected |= category_mask
         
         await update.callback_query.answer(f"✅ Added {added_count} groups from {category}")
         
@@ -726,39 +715,17 @@ async def admin_select_category(update: Update, context: ContextTypes.DEFAULT_TY
         await update.callback_query.answer("❌ Error selecting category")
 
 async def admin_clear_category(update: Update, context: ContextTypes.DEFAULT_TYPE, slot_number: int, category: str):
-    """Clear all groups in a category for an admin slot."""
+    """Clear all groups in a category in the admin's draft selection."""
     if not await check_admin(update, context):
         await update.callback_query.answer("❌ Admin access required.")
         return
         
     try:
-        db = context.bot_data['db']
+        draft = await _get_destination_draft(context, slot_number)
+        category_mask = draft.index.category_mask(get_database_category(category))
         
-        # Get all managed groups
-        all_groups = await db.get_managed_groups()
-        
-        # Get current destinations for this slot
-        slot = await db.get_admin_ad_slot(slot_number)
-        if not slot:
-            await update.callback_query.answer("❌ Slot not found")
-            return
-        
-        # Filter groups by category
-        category_groups = []
-        for group in all_groups:
-            group_category = group.get('category', 'other')
-            target_category = get_database_category(category)
-            
-            if group_category == target_category:
-                category_groups.append(group)
-        
-        # Remove all groups in category
-        removed_count = 0
-        for group in category_groups:
-            group_id = group['group_id'] or group['group_name']
-            success = await db.remove_admin_slot_destination(slot['id'], group_id)
-            if success:
-                removed_count += 1
+        removed_count = (category_mask & draft.selected).bit_count()
+        draft.selected &= ~category_mask
         
         await update.callback_query.answer(f"❌ Removed {removed_count} groups from {category}")
         
@@ -770,35 +737,16 @@ async def admin_clear_category(update: Update, context: ContextTypes.DEFAULT_TYP
         await update.callback_query.answer("❌ Error clearing category")
 
 async def admin_select_all_destinations(update: Update, context: ContextTypes.DEFAULT_TYPE, slot_number: int):
-    """Select all destinations for an admin slot."""
+    """Select all managed groups in the admin's draft selection."""
     if not await check_admin(update, context):
         await update.callback_query.answer("❌ Admin access required.")
         return
         
     try:
-        db = context.bot_data['db']
+        draft = await _get_destination_draft(context, slot_number)
         
-        # Get all managed groups
-        all_groups = await db.get_managed_groups()
-        
-        # Get current destinations for this slot
-        slot = await db.get_admin_ad_slot(slot_number)
-        if not slot:
-            await update.callback_query.answer("❌ Slot not found")
-            return
-        
-        # Add all groups
-        added_count = 0
-        for group in all_groups:
-            group_id = group['group_id'] or group['group_name']
-            destination_data = {
-                'destination_id': group_id,
-                'destination_name': group['group_name'],
-                'destination_type': 'group'
-            }
-            success = await db.add_admin_slot_destination(slot['id'], destination_data)
-            if success:
-                added_count += 1
+        added_count = (draft.index.all_mask & ~draft.selected).bit_count()
+        draft.selected = draft.index.all_mask
         
         await update.callback_query.answer(f"✅ Added {added_count} groups")
         
@@ -810,27 +758,18 @@ async def admin_select_all_destinations(update: Update, context: ContextTypes.DE
         await update.callback_query.answer("❌ Error selecting all destinations")
 
 async def admin_clear_all_destinations(update: Update, context: ContextTypes.DEFAULT_TYPE, slot_number: int):
-    """Clear all destinations for an admin slot."""
+    """Clear all destinations in the admin's draft selection."""
     if not await check_admin(update, context):
         await update.callback_query.answer("❌ Admin access required.")
         return
         
     try:
-        db = context.bot_data['db']
-        
-        # Get current destinations for this slot
-        slot = await db.get_admin_ad_slot(slot_number)
-        if not slot:
-            await update.callback_query.answer("❌ Slot not found")
-            return
+        draft = await _get_destination_draft(context, slot_number)
         
-        # Clear all destinations
-        success = await db.clear_admin_slot_destinations(slot['id'])
+        draft.selected = 0
+        draft.keep_extra = False
         
-        if success:
-            await update.callback_query.answer("❌ All destinations cleared")
-        else:
-            await update.callback_query.answer("❌ Failed to clear destinations")
+        await update.callback_query.answer("❌ All destinations cleared")
         
         # Refresh the destinations view
         await admin_set_slot_destinations(update, context, slot_number)
@@ -840,12 +779,22 @@ async def admin_clear_all_destinations(update: Update, context: ContextTypes.DEF
         await update.callback_query.answer("❌ Error clearing all destinations")
 
 async def admin_save_destinations(update: Update, context: ContextTypes.DEFAULT_TYPE, slot_number: int):
-    """Save destination changes for an admin slot."""
+    """Save the admin's draft destination selection for an admin slot."""
     if not await check_admin(update, context):
         await update.callback_query.answer("❌ Admin access required.")
         return
         
     try:
+        draft = context.user_data.get(ADMIN_DESTINATION_DRAFT)
+        
+        if draft is not None and draft.slot_number == slot_number and draft.dirty:
+            db = context.bot_data['db']
+            success = await db.update_admin_slot_destinations(slot_number, draft.destinations())
+            if not success:
+                await update.callback_query.answer("❌ Failed to save destinations")
+                return
+        
+        context.user_data.pop(ADMIN_DESTINATION_DRAFT, None)
         await update.callback_query.answer("✅ Destinations saved successfully!")
         
         # Go back to slot detail view
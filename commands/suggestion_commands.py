@@ -1,24 +1,26 @@
 #!/usr/bin/env python3
 """
 Suggestion Commands Module
-Handles user suggestions with proper state management and JSON storage
+Handles user suggestions with proper state management and SQLite storage
 
 Features:
 - InlineKeyboardButton and InlineKeyboardMarkup for suggestions button
 - CallbackQueryHandler for button clicks
 - ConversationHandler for text collection
 - MessageHandler with Filters.TEXT for suggestion input
-- JSON file operations with proper file locking
+- Indexed SQLite storage (one-time import of the legacy suggestions.json)
 - User ID, username, and chat ID capture
 - Timestamp formatting with datetime
 - Input validation (length limits, spam prevention)
 """
 
+import asyncio
 import json
 import logging
-import threading
+import os
+import sqlite3
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Callable, Optional, TypeVar
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
     ContextTypes, 
@@ -28,15 +30,18 @@ from telegram.ext import (
     CommandHandler,
     filters
 )
+from src.config.bot_config import BotConfig
 
 logger = logging.getLogger(__name__)
 
 # Conversation states
 WAITING_FOR_SUGGESTION = 1
 
-# File paths
-SUGGESTIONS_FILE = "suggestions.json"
-SUGGESTIONS_LOCK = threading.Lock()
+# File paths (the suggestions table lives in the bot database, DATABASE_PATH)
+SUGGESTIONS_FILE = "suggestions.json"  # legacy store, imported once
+
+# Meta key recording that the legacy JSON file has been imported
+LEGACY_IMPORT_KEY = "legacy_json_imported"
 
 # Configuration
 MAX_SUGGESTION_LENGTH = 1000
@@ -45,136 +50,212 @@ MAX_SUGGESTIONS_PER_USER = 5
 SUGGESTION_COOLDOWN_HOURS = 24
 
 class SuggestionManager:
-    """Manages suggestion storage and retrieval with thread-safe operations."""
+    """Manages suggestion storage and retrieval in an indexed SQLite table."""
     
-    def __init__(self, file_path: str = SUGGESTIONS_FILE):
-        self.file_path = file_path
-        self._ensure_file_exists()
+    def __init__(self, db_path: str, legacy_json_path: Optional[str] = SUGGESTIONS_FILE):
+        self.db_path = db_path
+        self._ensure_schema()
+        if legacy_json_path and os.path.exists(legacy_json_path) and not self._legacy_imported():
+            if self.import_from_json(legacy_json_path) is not None:
+                self._mark_legacy_imported(legacy_json_path)
     
-    def _ensure_file_exists(self):
-        """Ensure the suggestions file exists with proper structure."""
-        with SUGGESTIONS_LOCK:
-            try:
-                with open(self.file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-            except (FileNotFoundError, json.JSONDecodeError):
-                data = {
-                    "suggestions": [],
-                    "user_suggestions": {},
-                    "metadata": {
-                        "total_suggestions": 0,
-                        "last_updated": datetime.now().isoformat()
-                    }
-                }
-                self._save_data(data)
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
     
-    def _save_data(self, data: Dict[str, Any]):
-        """Save data to JSON file with proper error handling."""
+    def _ensure_schema(self):
+        """Create the suggestions table and its indexes."""
+        conn = self._connect()
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except Exception as e:
-            logger.error(f"Error saving suggestions data: {e}")
-            raise
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS suggestions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    username TEXT,
+                    chat_id INTEGER,
+                    suggestion TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending'
+                )
+            ''')
+            conn.execute('CREATE INDEX IF NOT EXISTS idx_suggestions_user_timestamp ON suggestions(user_id, timestamp)')
+            conn.execute('''
+                CREATE TABLE IF NOT EXISTS suggestions_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )
+            ''')
+            conn.commit()
+        finally:
+            conn.close()
     
-    def _load_data(self) -> Dict[str, Any]:
-        """Load data from JSON file with proper error handling."""
+    def _legacy_imported(self) -> bool:
+        conn = self._connect()
         try:
-            with open(self.file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception as e:
-            logger.error(f"Error loading suggestions data: {e}")
-            return {
-                "suggestions": [],
-                "user_suggestions": {},
-                "metadata": {
-                    "total_suggestions": 0,
-                    "last_updated": datetime.now().isoformat()
-                }
-            }
+            row = conn.execute('SELECT 1 FROM suggestions_meta WHERE key = ?', (LEGACY_IMPORT_KEY,)).fetchone()
+            return row is not None
+        finally:
+            conn.close()
+    
+    def _mark_legacy_imported(self, file_path: str):
+        """Record the import so suggestions deleted later are not imported again."""
+        conn = self._connect()
+        try:
+            conn.execute(
+                'INSERT OR REPLACE INTO suggestions_meta (key, value) VALUES (?, ?)',
+                (LEGACY_IMPORT_KEY, f"{os.path.abspath(file_path)} at {datetime.now().isoformat()}")
+            )
+            conn.commit()
+        finally:
+            conn.close()
+    
+    def import_from_json(self, file_path: str) -> Optional[int]:
+        """Import suggestions from the legacy JSON file (safe to run repeatedly).
+        
+        Args:
+            file_path: Path to the old suggestions.json
+        
+        Returns:
+            Number of suggestions imported, or None if the file could not be read
+        """
+        try:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logger.warning(f"Skipping suggestions import from {file_path}: {e}")
+            return None
+        
+        rows = [
+            (s["id"], s["user_id"], s.get("username"), s.get("chat_id"), s["suggestion"],
+             s["timestamp"], s.get("status", "pending"))
+            for s in data.get("suggestions", [])
+        ]
+        if not rows:
+            return 0
+        
+        conn = self._connect()
+        try:
+            before = conn.total_changes
+            conn.executemany('''
+                INSERT OR IGNORE INTO suggestions (id, user_id, username, chat_id, suggestion, timestamp, status)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', rows)
+            conn.commit()
+            imported = conn.total_changes - before
+        finally:
+            conn.close()
+        
+        if imported:
+            logger.info(f"Imported {imported} suggestions from {file_path}")
+        return imported
     
     def add_suggestion(self, user_id: int, username: str, chat_id: int, suggestion_text: str) -> bool:
         """Add a new suggestion with proper validation and storage."""
-        with SUGGESTIONS_LOCK:
-            data = self._load_data()
-            
-            # Validate suggestion length
-            if len(suggestion_text) < MIN_SUGGESTION_LENGTH:
-                raise ValueError(f"Suggestion too short. Minimum {MIN_SUGGESTION_LENGTH} characters required.")
-            
-            if len(suggestion_text) > MAX_SUGGESTION_LENGTH:
-                raise ValueError(f"Suggestion too long. Maximum {MAX_SUGGESTION_LENGTH} characters allowed.")
+        # Validate suggestion length
+        if len(suggestion_text) < MIN_SUGGESTION_LENGTH:
+            raise ValueError(f"Suggestion too short. Minimum {MIN_SUGGESTION_LENGTH} characters required.")
+        
+        if len(suggestion_text) > MAX_SUGGESTION_LENGTH:
+            raise ValueError(f"Suggestion too long. Maximum {MAX_SUGGESTION_LENGTH} characters allowed.")
+        
+        conn = self._connect()
+        try:
+            # Limit and cooldown check + insert in one write transaction
+            conn.execute('BEGIN IMMEDIATE')
+            row = conn.execute(
+                'SELECT COUNT(*) AS total, MAX(timestamp) AS last_timestamp FROM suggestions WHERE user_id = ?',
+                (user_id,)
+            ).fetchone()
             
             # Check user suggestion limit
-            user_suggestions = data["user_suggestions"].get(str(user_id), [])
-            if len(user_suggestions) >= MAX_SUGGESTIONS_PER_USER:
+            if row["total"] >= MAX_SUGGESTIONS_PER_USER:
                 raise ValueError(f"You have reached the maximum limit of {MAX_SUGGESTIONS_PER_USER} suggestions.")
             
             # Check cooldown
             current_time = datetime.now()
-            if user_suggestions:
-                last_suggestion_time = datetime.fromisoformat(user_suggestions[-1]["timestamp"])
+            if row["last_timestamp"]:
+                last_suggestion_time = datetime.fromisoformat(row["last_timestamp"])
                 time_diff = current_time - last_suggestion_time
                 if time_diff.total_seconds() < SUGGESTION_COOLDOWN_HOURS * 3600:
                     hours_remaining = SUGGESTION_COOLDOWN_HOURS - (time_diff.total_seconds() / 3600)
                     raise ValueError(f"Please wait {hours_remaining:.1f} hours before submitting another suggestion.")
             
-            # Create suggestion object
-            suggestion = {
-                "id": data["metadata"]["total_suggestions"] + 1,
-                "user_id": user_id,
-                "username": username,
-                "chat_id": chat_id,
-                "suggestion": suggestion_text,
-                "timestamp": current_time.isoformat(),
-                "status": "pending"
-            }
-            
-            # Add to suggestions list
-            data["suggestions"].append(suggestion)
-            
-            # Update user suggestions
-            if str(user_id) not in data["user_suggestions"]:
-                data["user_suggestions"][str(user_id)] = []
-            data["user_suggestions"][str(user_id)].append(suggestion)
-            
-            # Update metadata
-            data["metadata"]["total_suggestions"] += 1
-            data["metadata"]["last_updated"] = current_time.isoformat()
-            
-            # Save data
-            self._save_data(data)
-            
-            logger.info(f"Suggestion added by user {user_id} ({username})")
-            return True
+            conn.execute('''
+                INSERT INTO suggestions (user_id, username, chat_id, suggestion, timestamp, status)
+                VALUES (?, ?, ?, ?, ?, 'pending')
+            ''', (user_id, username, chat_id, suggestion_text, current_time.isoformat()))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+        
+        logger.info(f"Suggestion added by user {user_id} ({username})")
+        return True
     
     def get_user_suggestions(self, user_id: int) -> list:
         """Get all suggestions by a specific user."""
-        with SUGGESTIONS_LOCK:
-            data = self._load_data()
-            return data["user_suggestions"].get(str(user_id), [])
+        conn = self._connect()
+        try:
+            rows = conn.execute(
+                'SELECT * FROM suggestions WHERE user_id = ? ORDER BY timestamp, id', (user_id,)
+            ).fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
     
     def get_all_suggestions(self, limit: Optional[int] = None) -> list:
-        """Get all suggestions with optional limit."""
-        with SUGGESTIONS_LOCK:
-            data = self._load_data()
-            suggestions = data["suggestions"]
+        """Get all suggestions (oldest first) with optional limit on the most recent."""
+        conn = self._connect()
+        try:
             if limit:
-                suggestions = suggestions[-limit:]
-            return suggestions
+                rows = conn.execute('SELECT * FROM suggestions ORDER BY id DESC LIMIT ?', (limit,)).fetchall()
+                rows.reverse()
+            else:
+                rows = conn.execute('SELECT * FROM suggestions ORDER BY id').fetchall()
+            return [dict(row) for row in rows]
+        finally:
+            conn.close()
     
     def get_suggestion_stats(self) -> Dict[str, Any]:
         """Get suggestion statistics."""
-        with SUGGESTIONS_LOCK:
-            data = self._load_data()
+        conn = self._connect()
+        try:
+            row = conn.execute('''
+                SELECT COUNT(*) AS total_suggestions,
+                       COUNT(DISTINCT user_id) AS unique_users,
+                       MAX(timestamp) AS last_updated
+                FROM suggestions
+            ''').fetchone()
             return {
-                "total_suggestions": data["metadata"]["total_suggestions"],
-                "unique_users": len(data["user_suggestions"]),
-                "last_updated": data["metadata"]["last_updated"]
+                "total_suggestions": row["total_suggestions"],
+                "unique_users": row["unique_users"],
+                "last_updated": row["last_updated"] or datetime.now().isoformat()
             }
+        finally:
+            conn.close()
+
+# Global suggestion manager instance, created on first use
+_suggestion_manager: Optional[SuggestionManager] = None
 
-# Global suggestion manager instance
-suggestion_manager = SuggestionManager()
+def get_suggestion_manager() -> SuggestionManager:
+    """Get the global SuggestionManager, stored in the bot database (DATABASE_PATH)."""
+    global _suggestion_manager
+    if _suggestion_manager is None:
+        _suggestion_manager = SuggestionManager(BotConfig.load_from_env().db_path)
+    return _suggestion_manager
+
+T = TypeVar('T')
+
+async def run_suggestion_query(query: Callable[[SuggestionManager], T]) -> T:
+    """Run query(manager) in a worker thread.
+    
+    SuggestionManager uses blocking sqlite3 calls (BEGIN IMMEDIATE waits up
+    to 30 s for the write lock), so handlers never call it on the event loop.
+    """
+    return await asyncio.to_thread(lambda: query(get_suggestion_manager()))
 
 async def show_suggestions_menu(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show the suggestions menu with inline keyboard."""
@@ -280,12 +361,12 @@ async def handle_suggestion_text(update: Update, context: ContextTypes.DEFAULT_T
             return WAITING_FOR_SUGGESTION
         
         # Add suggestion to storage
-        success = suggestion_manager.add_suggestion(
+        success = await run_suggestion_query(lambda manager: manager.add_suggestion(
             user_id=user.id,
             username=user.username or user.first_name,
             chat_id=message.chat_id,
             suggestion_text=suggestion_text
-        )
+        ))
         
         if success:
             # Success message
@@ -333,7 +414,7 @@ async def show_user_suggestions(update: Update, context: ContextTypes.DEFAULT_TY
     user = query.from_user
     
     try:
-        suggestions = suggestion_manager.get_user_suggestions(user.id)
+        suggestions = await run_suggestion_query(lambda manager: manager.get_user_suggestions(user.id))
         
         if not suggestions:
             keyboard = [
@@ -394,7 +475,7 @@ async def show_suggestion_stats(update: Update, context: ContextTypes.DEFAULT_TY
     query = update.callback_query
     
     try:
-        stats = suggestion_manager.get_suggestion_stats()
+        stats = await run_suggestion_query(lambda manager: manager.get_suggestion_stats())
         last_updated = datetime.fromisoformat(stats["last_updated"]).strftime("%Y-%m-%d %H:%M")
         
         text = (
@@ -467,7 +548,7 @@ async def admin_suggestions(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     try:
-        suggestions = suggestion_manager.get_all_suggestions(limit=20)
+        suggestions = await run_suggestion_query(lambda manager: manager.get_all_suggestions(limit=20))
         
         if not suggestions:
             await update.message.reply_text("📋 No suggestions found.")
@@ -525,4 +606,4 @@ def get_suggestion_handlers():
     ]
 
 # Export the suggestion manager for external use
-__all__ = ['SuggestionManager', 'suggestion_manager', 'get_suggestion_handlers']
+__all__ = ['SuggestionManager', 'get_suggestion_manager', 'run_suggestion_query', 'get_suggestion_handlers']
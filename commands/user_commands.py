@@ -5,6 +5,9 @@ from datetime import datetime, timedelta
 import secrets
 from typing import List
 
+from src.menu_registry import content_version, menu_registry
+from src.utils.media_cache import get_media_cache
+
 logger = logging.getLogger(__name__)
 
 # --- Define states for our conversations ---
@@ -12,6 +15,124 @@ SETTING_AD_CONTENT = 0
 SETTING_AD_SCHEDULE = 1
 SETTING_AD_DESTINATIONS = 2
 
+# --- Static keyboards and menus (built once at import) ---
+
+menu_registry.register_keyboard('user.start', [
+    [
+        InlineKeyboardButton("📊 Analytics", callback_data="cmd:analytics"),
+        InlineKeyboardButton("🎯 My Ads", callback_data="cmd:my_ads")
+    ],
+    [
+        InlineKeyboardButton("💎 Subscribe", callback_data="cmd:subscribe"),
+        InlineKeyboardButton("🎁 Referral", callback_data="cmd:referral")
+    ],
+    [
+        InlineKeyboardButton("💡 Suggestions", callback_data="cmd:suggestions"),
+        InlineKeyboardButton("❓ Help", callback_data="cmd:help")
+    ]
+])
+
+menu_registry.register_keyboard('user.main', [
+    [InlineKeyboardButton("📊 Analytics", callback_data="cmd:analytics")],
+    [InlineKeyboardButton("🎁 Referral Program", callback_data="cmd:referral")],
+    [InlineKeyboardButton("💎 Subscribe", callback_data="cmd:subscribe")],
+    [InlineKeyboardButton("📋 My Ads", callback_data="cmd:my_ads")],
+    [InlineKeyboardButton("💡 Suggestions", callback_data="cmd:suggestions")],
+    [InlineKeyboardButton("❓ Help", callback_data="cmd:help")]
+])
+
+menu_registry.register_keyboard('user.plans', [
+    [
+        InlineKeyboardButton("🥉 Basic - $15", callback_data="subscribe:basic"),
+        InlineKeyboardButton("🥈 Pro - $45", callback_data="subscribe:pro")
+    ],
+    [
+        InlineKeyboardButton("🥇 Enterprise - $75", callback_data="subscribe:enterprise")
+    ],
+    [
+        InlineKeyboardButton("📊 Compare Plans", callback_data="compare_plans"),
+        InlineKeyboardButton("❓ Help", callback_data="help")
+    ]
+])
+
+menu_registry.register_static(
+    'user.help',
+    "📚 Available Commands:\n\n"
+    "/start - Welcome message with buttons\n"
+    "/my_ads - Manage your ad campaigns\n"
+    "/analytics - View your ad performance\n"
+    "/referral - Get your referral code\n"
+    "/subscribe - View subscription plans\n"
+    "/help - Show this help message",
+    [
+        [InlineKeyboardButton("📊 Analytics", callback_data="cmd:analytics")],
+        [InlineKeyboardButton("🎁 Referral Program", callback_data="cmd:referral")],
+        [InlineKeyboardButton("💎 Subscribe", callback_data="cmd:subscribe")],
+        [InlineKeyboardButton("📋 My Ads", callback_data="cmd:my_ads")],
+        [InlineKeyboardButton("⬅️ Back to Main Menu", callback_data="cmd:start")]
+    ],
+    parse_mode=None
+)
+
+menu_registry.register_static(
+    'user.compare_plans',
+    "📊 **Plan Comparison**\n\n"
+    "🥉 **Basic Plan - $15/month**\n"
+    "• 1 ad slot\n"
+    "• 10 destinations per slot\n"
+    "• Basic analytics\n"
+    "• Email support\n"
+    "• Standard posting\n\n"
+    "🥈 **Pro Plan - $45/month**\n"
+    "• 3 ad slots\n"
+    "• 10 destinations per slot\n"
+    "• Advanced analytics\n"
+    "• Priority support\n"
+    "• Custom scheduling\n"
+    "• Ban protection\n\n"
+    "🥇 **Enterprise Plan - $75/month**\n"
+    "• 5 ad slots\n"
+    "• 10 destinations per slot\n"
+    "• Full analytics suite\n"
+    "• 24/7 support\n"
+    "• Auto-renewal\n"
+    "• Premium features\n\n"
+    "💡 *All plans include 30-day duration and multi-crypto payment support*",
+    [
+        [InlineKeyboardButton("💎 Subscribe Now", callback_data="cmd:subscribe")],
+        [InlineKeyboardButton("🔙 Back to Plans", callback_data="cmd:subscribe")]
+    ]
+)
+
+SUBSCRIPTION_PLANS_TEXT = (
+    "**📢 What You Get:**\n"
+    "✅ **Automated posting** to multiple Telegram groups\n"
+    "✅ **Custom scheduling** (post every 1-24 hours)\n"
+    "✅ **Multi-group management** (post to many groups at once)\n"
+    "✅ **Content management** (text, photos, videos)\n"
+    "✅ **Real-time analytics** and performance tracking\n\n"
+    "**💎 Choose your plan:**\n\n"
+    "**🥉 Basic Plan - $15/month**\n"
+    "• **1 advertising campaign** (ad slot)\n"
+    "• **Post to up to 10 groups** per campaign\n"
+    "• **Perfect for:** Small businesses, personal promotion\n\n"
+    "**🥈 Pro Plan - $45/month**\n"
+    "• **3 advertising campaigns** (ad slots)\n"
+    "• **Post to up to 30 groups total** (10 per campaign)\n"
+    "• **Perfect for:** Growing businesses, multiple products\n\n"
+    "**🥇 Enterprise Plan - $75/month**\n"
+    "• **5 advertising campaigns** (ad slots)\n"
+    "• **Post to up to 50 groups total** (10 per campaign)\n"
+    "• **Perfect for:** Large businesses, agencies, marketers\n\n"
+    "**⏰ All plans include:**\n"
+    "• 30-day subscription period\n"
+    "• Multi-cryptocurrency payment support\n"
+    "• 24/7 automated posting\n"
+    "• Professional customer support\n\n"
+    "**📈 Example:** With Basic plan, you can create 1 campaign to automatically post your business ads to 10 different Telegram groups every 2 hours!\n\n"
+    "Select a plan to proceed with payment:"
+)
+
 # --- Basic Commands ---
 
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -87,22 +208,7 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         
         welcome_text += "Use the buttons below to get started:"
         
-        # Create keyboard
-        keyboard = [
-            [
-                InlineKeyboardButton("📊 Analytics", callback_data="cmd:analytics"),
-                InlineKeyboardButton("🎯 My Ads", callback_data="cmd:my_ads")
-            ],
-            [
-                InlineKeyboardButton("💎 Subscribe", callback_data="cmd:subscribe"),
-                InlineKeyboardButton("🎁 Referral", callback_data="cmd:referral")
-            ],
-            [
-                InlineKeyboardButton("💡 Suggestions", callback_data="cmd:suggestions"),
-                InlineKeyboardButton("❓ Help", callback_data="cmd:help")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
+        reply_markup = menu_registry.keyboard('user.start')
         
         await update.message.reply_text(welcome_text, reply_markup=reply_markup, parse_mode='Markdown')
         logger.info(f"User {user.id} started the bot successfully")
@@ -670,12 +776,15 @@ async def send_payment_qr_code(query, crypto_type: str, payment_request: dict) -
         # Convert to bytes
         buffer = BytesIO()
         img.save(buffer, format='PNG')
-        buffer.seek(0)
         
-        # Send QR code
-        await query.message.reply_photo(
-            photo=buffer,
-            caption=f"📱 QR Code for {crypto_type} Payment\n\nScan with your {crypto_type} wallet app"
+        # Send QR code (a QR shown again is sent by file_id instead of re-uploaded)
+        await get_media_cache().send(
+            'bot', buffer.getvalue(),
+            send=lambda photo: query.message.reply_photo(
+                photo=photo,
+                caption=f"📱 QR Code for {crypto_type} Payment\n\nScan with your {crypto_type} wallet app"
+            ),
+            reference_of=lambda message: message.photo[-1].file_id if message and message.photo else None,
         )
         
         return True
@@ -1414,10 +1523,9 @@ async def my_ads_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
         reply_markup = InlineKeyboardMarkup(keyboard)
 
         if update.callback_query:
-            await update.callback_query.edit_message_text(
-                message_text, 
-                reply_markup=reply_markup, 
-                parse_mode='Markdown'
+            await menu_registry.edit(
+                update.callback_query,
+                menu_registry.render(message_text, reply_markup=reply_markup)
             )
         else:
             await update.message.reply_text(
@@ -1785,8 +1893,8 @@ async def set_destinations_start(update: Update, context: ContextTypes.DEFAULT_T
 
     # Get available categories from managed groups
     db = context.bot_data['db']
-    all_groups = await db.get_managed_groups()
-    categories = list(set([group['category'] for group in all_groups]))
+    category_counts = await db.get_managed_group_category_counts()
+    categories = list(category_counts)
     
     if not categories:
         await query.edit_message_text(
@@ -1807,8 +1915,7 @@ async def set_destinations_start(update: Update, context: ContextTypes.DEFAULT_T
     keyboard = []
     row = []
     for category in sorted(categories):
-        category_groups = [g for g in all_groups if g['category'] == category]
-        label = f"{emoji_map.get(category, '📋')} {category.title()} ({len(category_groups)})"
+        label = f"{emoji_map.get(category, '📋')} {category.title()} ({category_counts[category]})"
         row.append(InlineKeyboardButton(label, callback_data=f"select_category:{slot_id}:{category}"))
         if len(row) == 2:
             keyboard.append(row)
@@ -1947,29 +2054,10 @@ async def analytics_command_callback(update: Update, context: ContextTypes.DEFAU
         failed_posts = 0
         
         if slot_ids:
-            # Query ad_posts table for this user's slots
-            import sqlite3
-            try:
-                conn = sqlite3.connect(db.db_path)
-                cursor = conn.cursor()
-                
-                # Get total posts for user's slots
-                cursor.execute(f'''
-                    SELECT COUNT(*), SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END), 
-                           SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END)
-                    FROM ad_posts 
-                    WHERE slot_id IN ({','.join(['?']*len(slot_ids))})
-                ''', slot_ids)
-                
-                result = cursor.fetchone()
-                if result:
-                    total_posts = result[0] or 0
-                    successful_posts = result[1] or 0
-                    failed_posts = result[2] or 0
-                
-                conn.close()
-            except Exception as e:
-                logger.error(f"Error getting posting stats: {e}")
+            post_stats = await db.get_slot_post_stats(slot_ids)
+            total_posts = post_stats['total']
+            successful_posts = post_stats['successful']
+            failed_posts = post_stats['failed']
         
         # Calculate success rate
         success_rate = 0
@@ -2060,21 +2148,6 @@ async def subscribe_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     # Get current subscription status
     subscription = await db.get_user_subscription(user_id)
     
-    # Create enhanced subscription plans keyboard
-    keyboard = [
-        [
-            InlineKeyboardButton("🥉 Basic - $15", callback_data="subscribe:basic"),
-            InlineKeyboardButton("🥈 Pro - $45", callback_data="subscribe:pro")
-        ],
-        [
-            InlineKeyboardButton("🥇 Enterprise - $75", callback_data="subscribe:enterprise")
-        ],
-        [
-            InlineKeyboardButton("📊 Compare Plans", callback_data="compare_plans"),
-            InlineKeyboardButton("❓ Help", callback_data="help")
-        ]
-    ]
-    
     if subscription and subscription['is_active']:
         # Handle expires date formatting
         expires_value = subscription['expires']
@@ -2091,64 +2164,21 @@ async def subscribe_callback(update: Update, context: ContextTypes.DEFAULT_TYPE)
     else:
         status_text = "❌ **No active subscription**"
     
-    message_text = (
-        f"🚀 **AutoFarming Pro - Automated Telegram Advertising**\n\n"
-        f"{status_text}\n\n"
-        "**📢 What You Get:**\n"
-        "✅ **Automated posting** to multiple Telegram groups\n"
-        "✅ **Custom scheduling** (post every 1-24 hours)\n"
-        "✅ **Multi-group management** (post to many groups at once)\n"
-        "✅ **Content management** (text, photos, videos)\n"
-        "✅ **Real-time analytics** and performance tracking\n\n"
-        "**💎 Choose your plan:**\n\n"
-        "**🥉 Basic Plan - $15/month**\n"
-        "• **1 advertising campaign** (ad slot)\n"
-        "• **Post to up to 10 groups** per campaign\n"
-        "• **Perfect for:** Small businesses, personal promotion\n\n"
-        "**🥈 Pro Plan - $45/month**\n"
-        "• **3 advertising campaigns** (ad slots)\n"
-        "• **Post to up to 30 groups total** (10 per campaign)\n"
-        "• **Perfect for:** Growing businesses, multiple products\n\n"
-        "**🥇 Enterprise Plan - $75/month**\n"
-        "• **5 advertising campaigns** (ad slots)\n"
-        "• **Post to up to 50 groups total** (10 per campaign)\n"
-        "• **Perfect for:** Large businesses, agencies, marketers\n\n"
-        "**⏰ All plans include:**\n"
-        "• 30-day subscription period\n"
-        "• Multi-cryptocurrency payment support\n"
-        "• 24/7 automated posting\n"
-        "• Professional customer support\n\n"
-        "**📈 Example:** With Basic plan, you can create 1 campaign to automatically post your business ads to 10 different Telegram groups every 2 hours!\n\n"
-        "Select a plan to proceed with payment:"
+    # Only the status line is per-user; rebuild when the subscription changes
+    menu = menu_registry.dynamic(
+        'user.subscribe', user_id, content_version(status_text),
+        lambda: menu_registry.render(
+            f"🚀 **AutoFarming Pro - Automated Telegram Advertising**\n\n"
+            f"{status_text}\n\n" + SUBSCRIPTION_PLANS_TEXT,
+            reply_markup=menu_registry.keyboard('user.plans')
+        )
     )
-    
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    await query.edit_message_text(message_text, reply_markup=reply_markup, parse_mode='Markdown')
+    await menu_registry.edit(query, menu)
 
 async def help_command_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Shows help information (callback version)."""
     query = update.callback_query
-    help_text = (
-        "📚 Available Commands:\n\n"
-        "/start - Welcome message with buttons\n"
-        "/my_ads - Manage your ad campaigns\n"
-        "/analytics - View your ad performance\n"
-        "/referral - Get your referral code\n"
-        "/subscribe - View subscription plans\n"
-        "/help - Show this help message"
-    )
-    
-    # Create inline keyboard for quick access
-    keyboard = [
-        [InlineKeyboardButton("📊 Analytics", callback_data="cmd:analytics")],
-        [InlineKeyboardButton("🎁 Referral Program", callback_data="cmd:referral")],
-        [InlineKeyboardButton("💎 Subscribe", callback_data="cmd:subscribe")],
-        [InlineKeyboardButton("📋 My Ads", callback_data="cmd:my_ads")],
-        [InlineKeyboardButton("⬅️ Back to Main Menu", callback_data="cmd:start")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(help_text, reply_markup=reply_markup)
+    await menu_registry.edit(query, menu_registry.static('user.help'))
 
 async def start_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show main menu (callback version)."""
@@ -2160,56 +2190,15 @@ async def start_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         "Choose an option below to get started:"
     )
     
-    # Create inline keyboard with main commands
-    keyboard = [
-        [InlineKeyboardButton("📊 Analytics", callback_data="cmd:analytics")],
-        [InlineKeyboardButton("🎁 Referral Program", callback_data="cmd:referral")],
-        [InlineKeyboardButton("💎 Subscribe", callback_data="cmd:subscribe")],
-        [InlineKeyboardButton("📋 My Ads", callback_data="cmd:my_ads")],
-        [InlineKeyboardButton("💡 Suggestions", callback_data="cmd:suggestions")],
-        [InlineKeyboardButton("❓ Help", callback_data="cmd:help")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(welcome_text, reply_markup=reply_markup)
+    menu = menu_registry.render(welcome_text, reply_markup=menu_registry.keyboard('user.main'), parse_mode=None)
+    await menu_registry.edit(query, menu)
 
 async def compare_plans_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show detailed plan comparison."""
     query = update.callback_query
     await query.answer()
     
-    comparison_text = (
-        "📊 **Plan Comparison**\n\n"
-        "🥉 **Basic Plan - $15/month**\n"
-        "• 1 ad slot\n"
-        "• 10 destinations per slot\n"
-        "• Basic analytics\n"
-        "• Email support\n"
-        "• Standard posting\n\n"
-        "🥈 **Pro Plan - $45/month**\n"
-        "• 3 ad slots\n"
-        "• 10 destinations per slot\n"
-        "• Advanced analytics\n"
-        "• Priority support\n"
-        "• Custom scheduling\n"
-        "• Ban protection\n\n"
-        "🥇 **Enterprise Plan - $75/month**\n"
-        "• 5 ad slots\n"
-        "• 10 destinations per slot\n"
-        "• Full analytics suite\n"
-        "• 24/7 support\n"
-        "• Auto-renewal\n"
-        "• Premium features\n\n"
-        "💡 *All plans include 30-day duration and multi-crypto payment support*"
-    )
-    
-    keyboard = [
-        [InlineKeyboardButton("💎 Subscribe Now", callback_data="cmd:subscribe")],
-        [InlineKeyboardButton("🔙 Back to Plans", callback_data="cmd:subscribe")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await query.edit_message_text(comparison_text, reply_markup=reply_markup, parse_mode='Markdown')
+    await menu_registry.edit(query, menu_registry.static('user.compare_plans'))
 
 async def slot_analytics_callback(update: Update, context: ContextTypes.DEFAULT_TYPE, slot_id: str):
     """Show analytics for a specific ad slot."""
@@ -2,16 +2,26 @@ import asyncio
 import logging
 import os
 import uuid
-import aiohttp
 import json
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 from decimal import Decimal
 from dotenv import load_dotenv
 
+from src.monitoring.metrics import metrics, timed
+from src.utils.lazy_imports import lazy_module
+
+# Loaded on the first payment API call instead of at bot startup
+aiohttp = lazy_module('aiohttp')
+
 # Load environment variables
 load_dotenv("config/.env")
 
+# Latency of payment creation/verification steps, labelled by method name
+PAYMENT_OPERATION_SECONDS = metrics.histogram(
+    'payment_operation_seconds', 'MultiCryptoPaymentProcessor operation latency', ['method']
+)
+
 class MultiCryptoPaymentProcessor:
     """Multi-cryptocurrency payment processor supporting BTC, ETH, USDT, USDC, TON."""
     
@@ -147,6 +157,7 @@ class MultiCryptoPaymentProcessor:
             self.background_task = None
             self.logger.info("✅ Background payment monitoring stopped")
 
+    @timed(PAYMENT_OPERATION_SECONDS)
     async def create_payment_request(self, user_id: int, tier: str, crypto_type: str) -> Dict[str, Any]:
         """Create a new payment request for the specified cryptocurrency."""
         try:
@@ -205,6 +216,7 @@ class MultiCryptoPaymentProcessor:
             self.logger.error(f"Error creating payment request: {e}")
             return {'success': False, 'error': str(e)}
 
+    @timed(PAYMENT_OPERATION_SECONDS)
     async def verify_payment_on_blockchain(self, payment_id: str) -> bool:
         """Verify if a payment has been received on the blockchain and activate subscription with comprehensive error handling."""
         # FIX: Add global verification lock to prevent race conditions
@@ -481,6 +493,7 @@ class MultiCryptoPaymentProcessor:
             self.logger.error(f"Error creating direct payment: {e}")
             raise
 
+    @timed(PAYMENT_OPERATION_SECONDS)
     async def _get_crypto_price(self, crypto_type: str) -> Optional[float]:
         """Get current cryptocurrency price in USD with multiple API fallbacks."""
         try:
@@ -539,6 +552,7 @@ class MultiCryptoPaymentProcessor:
             }
             return fallback_prices.get(crypto_type)
 
+    @timed(PAYMENT_OPERATION_SECONDS)
     async def _verify_direct_payment(self, payment: Dict[str, Any]) -> bool:
         """Verify direct payment for all supported cryptocurrencies."""
         try:
@@ -638,6 +652,7 @@ class MultiCryptoPaymentProcessor:
             return False
 
 
+    @timed(PAYMENT_OPERATION_SECONDS)
     async def _verify_btc_payment_fallback(self, payment: Dict[str, Any], required_amount: float, required_conf: int) -> bool:
         """Automatic BTC payment verification using multiple APIs."""
         try:
@@ -744,6 +759,7 @@ class MultiCryptoPaymentProcessor:
             self.logger.error(f"Error checking payment match: {e}")
             return False
 
+    @timed(PAYMENT_OPERATION_SECONDS)
     async def _activate_subscription_for_payment(self, payment: Dict[str, Any]) -> bool:
         """Activate subscription for a verified payment with proper error handling and transaction safety."""
         payment_id = payment.get('payment_id')
@@ -977,6 +993,7 @@ class MultiCryptoPaymentProcessor:
                 self.logger.error(f"Error in background payment verification: {e}")
                 await asyncio.sleep(60)  # Wait 1 minute on error
 
+    @timed(PAYMENT_OPERATION_SECONDS)
     async def _verify_eth_payment(self, payment: Dict[str, Any], required_amount: float, required_conf: int) -> bool:
         """Verify Ethereum payment using amount + time window."""
         try:
@@ -1098,6 +1115,7 @@ class MultiCryptoPaymentProcessor:
             self.logger.error(f"Error verifying ETH payment: {e}")
             return False
 
+    @timed(PAYMENT_OPERATION_SECONDS)
     async def _verify_erc20_payment(self, payment: Dict[str, Any], required_amount: float, required_conf: int) -> bool:
         """Verify ERC-20 token payment (USDT, USDC)."""
         try:
@@ -1238,6 +1256,7 @@ class MultiCryptoPaymentProcessor:
             self.logger.error(f"Error verifying ERC-20 payment: {e}")
             return False
       
+    @timed(PAYMENT_OPERATION_SECONDS)
     async def _verify_ltc_payment(self, payment: Dict[str, Any], required_amount: float, required_conf: int) -> bool:
         """Verify Litecoin payment using amount + time window."""
         try:
@@ -1335,6 +1354,7 @@ class MultiCryptoPaymentProcessor:
             self.logger.error(f"Error verifying LTC payment: {e}")
             return False
 
+    @timed(PAYMENT_OPERATION_SECONDS)
     async def _verify_sol_payment(self, payment: Dict[str, Any], required_amount: float, required_conf: int) -> bool:
         """Verify Solana payment with memo-based attribution."""
         try:
@@ -1754,6 +1774,7 @@ class MultiCryptoPaymentProcessor:
             return False
 
 
+    @timed(PAYMENT_OPERATION_SECONDS)
     async def _verify_ton_payment_improved(self, payment: Dict[str, Any], required_amount: float, required_conf: int) -> bool:
         """Improved TON payment verification with better API handling."""
         try:
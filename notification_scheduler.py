@@ -105,12 +105,22 @@ class NotificationScheduler:
             self.logger.error(f"Error checking expiring subscriptions: {e}")
             
     async def _check_expired_subscriptions(self):
-        """Check for expired subscriptions and send daily notifications."""
+        """Sweep expired subscriptions and deliver queued expiry notifications."""
         try:
-            expired_users = await self._get_expired_subscriptions()
+            sweep = await self.db.sweep_expired_subscriptions()
+            if sweep['expired_users']:
+                self.logger.info(
+                    f"Expired {sweep['expired_users']} subscriptions, "
+                    f"queued {sweep['notifications_queued']} notifications"
+                )
+            
+            pending = await self.db.get_pending_notifications('subscription_expired')
+            delivered = []
+            for notification in pending:
+                if await self._send_expired_notification(notification['user_id']):
+                    delivered.append(notification['id'])
             
-            for user in expired_users:
-                await self._send_expired_notification(user['user_id'])
+            await self.db.mark_notifications_sent(delivered)
                 
         except Exception as e:
             self.logger.error(f"Error checking expired subscriptions: {e}")
@@ -189,34 +199,6 @@ class NotificationScheduler:
             self.logger.error(f"Error getting today's expiring subscriptions: {e}")
             return []
             
-    async def _get_expired_subscriptions(self) -> List[Dict[str, Any]]:
-        """Get users with expired subscriptions."""
-        try:
-            query = '''
-                SELECT DISTINCT u.user_id, u.username, u.first_name, u.subscription_tier, u.subscription_expires
-                FROM users u
-                WHERE u.subscription_expires < ?
-                AND u.subscription_tier IS NOT NULL
-                AND (u.last_notification_date IS NULL OR 
-                     u.last_notification_date < ?)
-            '''
-            
-            now = datetime.now()
-            notification_threshold = now - timedelta(days=1)  # Don't notify more than once per day for expired
-            
-            async with self.db._lock:
-                conn = self.db._get_connection()
-                cursor = conn.cursor()
-                cursor.execute(query, (now, notification_threshold))
-                users = [dict(zip([col[0] for col in cursor.description], row)) for row in cursor.fetchall()]
-                conn.close()
-                
-            return users
-            
-        except Exception as e:
-            self.logger.error(f"Error getting expired subscriptions: {e}")
-            return []
-            
     async def _send_expiry_notification(self, user_id: int, days_left: int):
         """Send subscription expiry notification to user."""
         try:
@@ -253,7 +235,7 @@ class NotificationScheduler:
         except Exception as e:
             self.logger.error(f"Error sending expiry notification to user {user_id}: {e}")
             
-    async def _send_expired_notification(self, user_id: int):
+    async def _send_expired_notification(self, user_id: int) -> bool:
         """Send expired subscription notification to user."""
         try:
             message = (
@@ -269,13 +251,12 @@ class NotificationScheduler:
             # Send the notification
             await self._send_message(user_id, message)
             
-            # Update notification timestamp
-            await self._update_notification_timestamp(user_id)
-            
             self.logger.info(f"Sent expired notification to user {user_id}")
+            return True
             
         except Exception as e:
             self.logger.error(f"Error sending expired notification to user {user_id}: {e}")
+            return False
             
     async def _send_message(self, user_id: int, message: str):
         """Send a message to a user safely."""
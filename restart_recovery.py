@@ -16,7 +16,6 @@ import logging
 from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
 from src.database.manager import DatabaseManager
-import sqlite3
 
 logger = logging.getLogger(__name__)
 
@@ -74,9 +73,17 @@ class RestartRecovery:
             # Get all active ad slots
             active_slots = await self.db.get_active_ads_to_send()
             
+            # Latest successful post per slot, aggregated by the database
+            last_success = {
+                (row['slot_id'], row['slot_type']): row['last_posted_at']
+                for row in await self.db.get_last_successful_posts()
+            }
+            
+            current_time = datetime.now()
             reconstructed_slots = []
             skipped_slots = []
             updated_slots = []
+            pending_updates = {'user': [], 'admin': []}
             
             for slot in active_slots:
                 slot_id = slot.get('id')
@@ -85,13 +92,14 @@ class RestartRecovery:
                 last_sent_at = slot.get('last_sent_at')
                 
                 # Calculate when this slot should post next
-                next_post_time = await self._calculate_next_post_time(
-                    slot_id, slot_type, interval_minutes, last_sent_at
+                next_post_time = self._calculate_next_post_time(
+                    slot_id, interval_minutes, last_sent_at,
+                    last_success.get((slot_id, slot_type)), current_time
                 )
                 
                 if next_post_time is None:
                     # Slot is due for posting, don't update timestamp
-                    logger.info(f"Slot {slot_id}: Due for posting, skipping timestamp update")
+                    logger.debug(f"Slot {slot_id}: Due for posting, skipping timestamp update")
                     skipped_slots.append({
                         'slot_id': slot_id,
                         'slot_type': slot_type,
@@ -99,23 +107,22 @@ class RestartRecovery:
                         'next_post_time': None
                     })
                     continue
-                elif next_post_time:
-                    # Only update if the slot is not due yet
-                    success = await self._update_slot_timestamp(slot_id, slot_type, next_post_time)
-                    
-                    if success:
-                        updated_slots.append({
-                            'slot_id': slot_id,
-                            'slot_type': slot_type,
-                            'old_timestamp': last_sent_at,
-                            'new_timestamp': next_post_time,
-                            'recovery_method': 'timestamp_reconstruction'
-                        })
-                        reconstructed_slots.append(slot_id)
-                    else:
-                        logger.warning(f"Failed to update timestamp for slot {slot_id}")
-                else:
-                    logger.warning(f"Could not calculate next post time for slot {slot_id}")
+                
+                pending_updates['admin' if slot_type == 'admin' else 'user'].append((next_post_time, slot_id))
+                updated_slots.append({
+                    'slot_id': slot_id,
+                    'slot_type': slot_type,
+                    'old_timestamp': last_sent_at,
+                    'new_timestamp': next_post_time,
+                    'recovery_method': 'timestamp_reconstruction'
+                })
+            
+            # Only update slots that are not due yet, all in one transaction
+            if await self.db.set_slot_last_sent_times(pending_updates):
+                logger.info(f"✅ Updated timestamps for {len(pending_updates['user'])} user and {len(pending_updates['admin'])} admin slots")
+                reconstructed_slots = [slot['slot_id'] for slot in updated_slots]
+            else:
+                updated_slots = []
             
             logger.info(f"🕐 Reconstructed {len(reconstructed_slots)} slots, updated {len(updated_slots)} in database, skipped {len(skipped_slots)}")
             
@@ -130,67 +137,40 @@ class RestartRecovery:
             logger.error(f"Error reconstructing timestamps: {e}")
             return {'error': str(e)}
     
-    async def _calculate_next_post_time(self, slot_id: int, slot_type: str, 
-                                      interval_minutes: int, last_sent_at: str) -> Optional[str]:
-        """Calculate when a slot should post next based on history and restart recovery."""
+    def _calculate_next_post_time(self, slot_id: int, interval_minutes: int, last_sent_at: Optional[str],
+                                  last_success_at: Optional[str], current_time: datetime) -> Optional[str]:
+        """Calculate when a slot should post next, or None if it is due now."""
         try:
-            current_time = datetime.now()
-            
             # If we have a last_sent_at timestamp, use it as the base
             if last_sent_at:
                 try:
                     last_sent_time = datetime.fromisoformat(last_sent_at.replace('Z', '+00:00'))
                     
                     # Calculate how much time has passed since last sent
-                    time_since_last = current_time - last_sent_time
-                    minutes_since_last = time_since_last.total_seconds() / 60
+                    minutes_since_last = (current_time - last_sent_time).total_seconds() / 60
                     
                     # If enough time has passed (more than interval), don't update timestamp
                     # Let the scheduler post it naturally
                     if minutes_since_last >= interval_minutes:
-                        logger.info(f"Slot {slot_id}: {minutes_since_last:.1f} minutes since last post, due for posting - skipping timestamp update")
-                        return None  # Don't update timestamp, let scheduler post it
-                    else:
-                        # Calculate when it should post next
-                        minutes_until_next = interval_minutes - minutes_since_last
-                        next_time = last_sent_time + timedelta(minutes=interval_minutes)
-                        logger.info(f"Slot {slot_id}: Will post in {minutes_until_next:.1f} minutes at {next_time}")
-                        return next_time.strftime('%Y-%m-%d %H:%M:%S')
+                        return None
+                    next_time = last_sent_time + timedelta(minutes=interval_minutes)
+                    return next_time.strftime('%Y-%m-%d %H:%M:%S')
                         
                 except Exception as e:
                     logger.warning(f"Error parsing last_sent_at for slot {slot_id}: {e}")
             
-            # Fallback: Get recent posting history for this slot
-            history = await self.db.get_posting_history(limit=10)
-            
-            if not history:
-                # No history available, use current time + interval
-                next_time = current_time + timedelta(minutes=interval_minutes)
-                logger.info(f"Slot {slot_id}: No history, will post in {interval_minutes} minutes")
-                return next_time.strftime('%Y-%m-%d %H:%M:%S')
-            
-            # Find the most recent successful post
-            recent_posts = [h for h in history if h['success']]
-            
-            if not recent_posts:
-                # No successful posts, use current time + interval
+            # Fallback: latest successful post for this slot from posting_history
+            if not last_success_at:
                 next_time = current_time + timedelta(minutes=interval_minutes)
-                logger.info(f"Slot {slot_id}: No successful posts in history, will post in {interval_minutes} minutes")
+                logger.debug(f"Slot {slot_id}: No successful posts in history, will post in {interval_minutes} minutes")
                 return next_time.strftime('%Y-%m-%d %H:%M:%S')
             
-            # Get the most recent post time
-            latest_post = max(recent_posts, key=lambda x: x['posted_at'])
-            latest_time = datetime.fromisoformat(latest_post['posted_at'].replace('Z', '+00:00'))
-            
-            # Calculate next post time
+            latest_time = datetime.fromisoformat(str(last_success_at).replace('Z', '+00:00'))
             next_time = latest_time + timedelta(minutes=interval_minutes)
             
             # If next time is in the past, use current time + interval
             if next_time < current_time:
                 next_time = current_time + timedelta(minutes=interval_minutes)
-                logger.info(f"Slot {slot_id}: Next time was in past, will post in {interval_minutes} minutes")
-            else:
-                logger.info(f"Slot {slot_id}: Will post at {next_time} based on history")
             
             return next_time.strftime('%Y-%m-%d %H:%M:%S')
             
@@ -198,147 +178,75 @@ class RestartRecovery:
             logger.error(f"Error calculating next post time for slot {slot_id}: {e}")
             return None
     
-    async def _update_slot_timestamp(self, slot_id: int, slot_type: str, timestamp: str) -> bool:
-        """Update the last_sent_at timestamp for a slot in the database."""
-        try:
-            if slot_type == 'admin':
-                # Update admin slot timestamp
-                conn = sqlite3.connect(self.db.db_path, timeout=15)
-                conn.execute("PRAGMA busy_timeout=15000;")
-                cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE admin_ad_slots 
-                    SET last_sent_at = ?
-                    WHERE id = ?
-                ''', (timestamp, slot_id))
-                conn.commit()
-                conn.close()
-            else:
-                # Update user slot timestamp
-                conn = sqlite3.connect(self.db.db_path, timeout=15)
-                conn.execute("PRAGMA busy_timeout=15000;")
-                cursor = conn.cursor()
-                cursor.execute('''
-                    UPDATE ad_slots 
-                    SET last_sent_at = ?
-                    WHERE id = ?
-                ''', (timestamp, slot_id))
-                conn.commit()
-                conn.close()
-            
-            logger.info(f"✅ Updated {slot_type} slot {slot_id} timestamp to {timestamp}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Error updating slot {slot_id} timestamp: {e}")
-            return False
-    
     async def _recover_ban_status(self) -> Dict[str, Any]:
         """Recover and validate worker ban status."""
         logger.info("🚫 Recovering worker ban status...")
         
         try:
-            # Get all active bans
-            active_bans = await self.db.get_worker_bans(active_only=True)
-            
-            recovered_bans = []
-            expired_bans = []
+            # Expire bans whose estimated unban time has passed, in one transaction
+            expired_bans = await self.db.expire_worker_bans()
             
-            for ban in active_bans:
-                banned_at = datetime.fromisoformat(ban['banned_at'].replace('Z', '+00:00'))
-                estimated_unban = ban.get('estimated_unban_time')
-                
-                # Check if ban has expired
-                if estimated_unban:
-                    try:
-                        unban_time = datetime.fromisoformat(estimated_unban.replace('Z', '+00:00'))
-                        if datetime.now() > unban_time:
-                            # Ban has expired, clear it
-                            await self.db.clear_worker_ban(ban['worker_id'], ban['destination_id'])
-                            expired_bans.append({
-                                'worker_id': ban['worker_id'],
-                                'destination_id': ban['destination_id'],
-                                'ban_type': ban['ban_type'],
-                                'expired_at': unban_time.strftime('%Y-%m-%d %H:%M:%S')
-                            })
-                            continue
-                    except Exception as e:
-                        logger.warning(f"Error parsing unban time for ban {ban['id']}: {e}")
-                
-                # Ban is still active
-                recovered_bans.append({
+            recovered_bans = [
+                {
                     'worker_id': ban['worker_id'],
                     'destination_id': ban['destination_id'],
                     'ban_type': ban['ban_type'],
                     'banned_at': ban['banned_at'],
-                    'estimated_unban': estimated_unban,
+                    'estimated_unban': ban['estimated_unban_time'],
                     'recovery_method': 'ban_status_recovery'
-                })
+                }
+                for ban in await self.db.get_active_worker_bans()
+            ]
             
             logger.info(f"🚫 Recovered {len(recovered_bans)} active bans, cleared {len(expired_bans)} expired bans")
             
             return {
                 'recovered_bans': recovered_bans,
                 'expired_bans': expired_bans,
-                'total_processed': len(active_bans)
+                'total_processed': len(recovered_bans) + len(expired_bans)
             }
             
         except Exception as e:
             logger.error(f"Error recovering ban status: {e}")
             return {'error': str(e)}
     
-    async def _analyze_posting_history(self) -> Dict[str, Any]:
+    async def _analyze_posting_history(self, hours: int = 24) -> Dict[str, Any]:
         """Analyze posting history for recovery insights."""
         logger.info("📊 Analyzing posting history for recovery...")
         
         try:
-            # Get recent posting activity
-            recent_activity = await self.db.get_recent_posting_activity(hours=24)
-            
-            # Analyze posting patterns
-            history = await self.db.get_posting_history(limit=100)
+            # Per-worker stats, grouped by the database
+            rows = await self.db.get_worker_posting_stats(hours)
             
-            # Group by worker
             worker_stats = {}
-            for record in history:
-                worker_id = record['worker_id']
-                if worker_id not in worker_stats:
-                    worker_stats[worker_id] = {
-                        'total_posts': 0,
-                        'successful_posts': 0,
-                        'failed_posts': 0,
-                        'ban_detections': 0,
-                        'last_activity': None
-                    }
-                
-                worker_stats[worker_id]['total_posts'] += 1
-                if record['success']:
-                    worker_stats[worker_id]['successful_posts'] += 1
-                else:
-                    worker_stats[worker_id]['failed_posts'] += 1
-                
-                if record['ban_detected']:
-                    worker_stats[worker_id]['ban_detections'] += 1
-                
-                # Track last activity
-                post_time = datetime.fromisoformat(record['posted_at'].replace('Z', '+00:00'))
-                if (worker_stats[worker_id]['last_activity'] is None or 
-                    post_time > worker_stats[worker_id]['last_activity']):
-                    worker_stats[worker_id]['last_activity'] = post_time
+            for row in rows:
+                total = row['total_posts']
+                successful = row['successful_posts'] or 0
+                worker_stats[row['worker_id']] = {
+                    'total_posts': total,
+                    'successful_posts': successful,
+                    'failed_posts': total - successful,
+                    'ban_detections': row['ban_detections'] or 0,
+                    'last_activity': row['last_activity'],
+                    'success_rate': (successful / total) * 100 if total else 0
+                }
             
-            # Calculate success rates
-            for worker_id, stats in worker_stats.items():
-                if stats['total_posts'] > 0:
-                    stats['success_rate'] = (stats['successful_posts'] / stats['total_posts']) * 100
-                else:
-                    stats['success_rate'] = 0
+            total_posts = sum(stats['total_posts'] for stats in worker_stats.values())
+            successful_posts = sum(stats['successful_posts'] for stats in worker_stats.values())
+            recent_activity = {
+                'hours': hours,
+                'total_posts': total_posts,
+                'successful_posts': successful_posts,
+                'failed_posts': total_posts - successful_posts,
+                'ban_detections': sum(stats['ban_detections'] for stats in worker_stats.values())
+            }
             
-            logger.info(f"📊 Analyzed {len(history)} posting records for {len(worker_stats)} workers")
+            logger.info(f"📊 Analyzed {total_posts} posting records for {len(worker_stats)} workers")
             
             return {
                 'recent_activity': recent_activity,
                 'worker_stats': worker_stats,
-                'total_records_analyzed': len(history)
+                'total_records_analyzed': total_posts
             }
             
         except Exception as e:
@@ -350,79 +258,63 @@ class RestartRecovery:
         logger.info("🏥 Assessing worker health...")
         
         try:
-            # Get all workers with their ban status
-            all_bans = await self.db.get_worker_bans(active_only=True)
-            
-            # Group bans by worker
-            worker_bans = {}
-            for ban in all_bans:
-                worker_id = ban['worker_id']
-                if worker_id not in worker_bans:
-                    worker_bans[worker_id] = []
-                worker_bans[worker_id].append(ban)
-            
-            # Assess each worker's health
-            worker_health = {}
-            for worker_id, bans in worker_bans.items():
-                health_score = 100  # Start with perfect health
-                
-                # Deduct points for bans
-                health_score -= len(bans) * 20  # 20 points per ban
-                
-                # Check ban types
-                ban_types = [ban['ban_type'] for ban in bans]
-                if 'permission_denied' in ban_types:
-                    health_score -= 30  # Severe penalty for permission denied
-                if 'rate_limit' in ban_types:
-                    health_score -= 15  # Moderate penalty for rate limits
-                
-                # Ensure health score doesn't go below 0
-                health_score = max(0, health_score)
-                
-                worker_health[worker_id] = {
-                    'health_score': health_score,
-                    'ban_count': len(bans),
-                    'ban_types': ban_types,
-                    'status': 'healthy' if health_score >= 70 else 'warning' if health_score >= 40 else 'critical'
+            # Scores are maintained per posting outcome in worker_health_snapshot
+            rows = await self.db.get_worker_health_snapshots()
+            
+            health_by_worker = {
+                row['worker_id']: {
+                    'health_score': row['health_score'],
+                    'ban_count': row['active_bans'],
+                    'ban_types': row['ban_types'].split(',') if row['ban_types'] else [],
+                    'error_rate': row['error_rate'],
+                    'utilization': row['utilization'],
+                    'last_error': row['last_error'],
+                    'status': row['status']
                 }
+                for row in rows
+            }
             
-            logger.info(f"🏥 Assessed health for {len(worker_health)} workers")
+            logger.info(f"🏥 Assessed health for {len(health_by_worker)} workers")
             
             return {
-                'worker_health': worker_health,
-                'total_workers_assessed': len(worker_health)
+                'worker_health': health_by_worker,
+                'total_workers_assessed': len(health_by_worker)
             }
             
         except Exception as e:
             logger.error(f"Error assessing worker health: {e}")
             return {'error': str(e)}
     
-    async def _validate_destination_health(self) -> Dict[str, Any]:
+    async def _validate_destination_health(self, worst_limit: int = 20) -> Dict[str, Any]:
         """Validate destination health after restart."""
         logger.info("🎯 Validating destination health...")
         
         try:
-            # Get destination health summary
-            health_summary = await self.db.get_destination_health_summary()
+            overview = await self.db.get_destination_health_overview(worst_limit)
+            health_summary = {
+                'total_destinations': overview['total_destinations'],
+                'average_success_rate': overview['average_success_rate'],
+                'critical_destinations': overview['critical_destinations'],
+                'warning_destinations': overview['warning_destinations']
+            }
             
             # Get problematic destinations
             problematic = await self.db.get_problematic_destinations(min_failures=2)
             
-            # Validate each destination
+            # Validate the worst destinations
             destination_validation = {}
-            for dest in health_summary.get('worst_destinations', []):
-                dest_id = dest['destination_id']
-                health_data = await self.db.get_destination_health(dest_id)
+            for row in overview['worst_destinations']:
+                health_data = {'success_rate': row['success_rate'], 'total_attempts': row['total_attempts']}
                 
                 validation_status = 'healthy'
-                if health_data['success_rate'] < 30:
+                if row['success_rate'] < 30:
                     validation_status = 'critical'
-                elif health_data['success_rate'] < 60:
+                elif row['success_rate'] < 60:
                     validation_status = 'warning'
                 
-                destination_validation[dest_id] = {
-                    'success_rate': health_data['success_rate'],
-                    'total_attempts': health_data['total_attempts'],
+                destination_validation[row['destination_id']] = {
+                    'success_rate': row['success_rate'],
+                    'total_attempts': row['total_attempts'],
                     'validation_status': validation_status,
                     'recommendation': self._get_destination_recommendation(health_data)
                 }
@@ -18,20 +18,17 @@ sys.path.append(str(Path(__file__).parent.parent))
 load_dotenv('config/.env')
 
 from src.config.bot_config import BotConfig
-from src.database.manager import DatabaseManager
+from src.database.backend import create_database_manager
 from scheduler.core.scheduler import AutomatedScheduler
 from scheduler.config.scheduler_config import SchedulerConfig
 from scheduler.config.worker_config import WorkerConfig
+from src.monitoring.metrics import start_metrics_server_from_env
+from src.monitoring.health_probe import get_health_probe, database_check
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('scheduler.log'),
-        logging.StreamHandler()
-    ]
-)
+from src.monitoring.logging_setup import setup_logging
+
+# Configure logging (JSON lines to scheduler.log via a background listener)
+setup_logging('scheduler.log')
 
 logger = logging.getLogger(__name__)
 
@@ -45,9 +42,15 @@ async def main():
         scheduler_config = SchedulerConfig()
         worker_config = WorkerConfig()
         
+        # Expose /metrics, /livez and /readyz on SCHEDULER_METRICS_PORT (default METRICS_PORT + 1)
+        probe = get_health_probe()
+        probe.set_ready('scheduler', False)
+        await start_metrics_server_from_env('scheduler')
+        
         # Initialize database
-        db = DatabaseManager(config.db_path, logger)
+        db = create_database_manager(logging.getLogger('src.database.manager'), config.db_path)
         await db.initialize()
+        probe.add_check('database', database_check(db))
         
         # Load worker credentials
         workers = worker_config.load_workers_from_env()
@@ -58,6 +61,7 @@ async def main():
         # Initialize scheduler
         scheduler = AutomatedScheduler(db, scheduler_config)
         await scheduler.initialize()
+        probe.add_check('scheduler', lambda: scheduler.is_running)
         
         # Start scheduler
         await scheduler.start()
@@ -6,30 +6,31 @@ Detects and handles various types of bans and restrictions
 
 import logging
 from typing import Dict, Any, Optional
-from telethon.errors import (
-    FloodWaitError, UserPrivacyRestrictedError, ChatWriteForbiddenError,
-    ChannelPrivateError, UserBannedInChannelError, UserNotParticipantError
-)
+from src.utils.lazy_imports import lazy_module
 
 logger = logging.getLogger(__name__)
 
+# Resolved on the first detect_ban_type() call
+telethon_errors = lazy_module('telethon.errors')
+
 class BanDetector:
     """Detects and handles various ban scenarios."""
     
     def __init__(self):
+        # Telethon exception class names, looked up lazily
         self.ban_types = {
-            'flood_wait': FloodWaitError,
-            'privacy_restricted': UserPrivacyRestrictedError,
-            'write_forbidden': ChatWriteForbiddenError,
-            'channel_private': ChannelPrivateError,
-            'user_banned': UserBannedInChannelError,
-            'not_participant': UserNotParticipantError
+            'flood_wait': 'FloodWaitError',
+            'privacy_restricted': 'UserPrivacyRestrictedError',
+            'write_forbidden': 'ChatWriteForbiddenError',
+            'channel_private': 'ChannelPrivateError',
+            'user_banned': 'UserBannedInChannelError',
+            'not_participant': 'UserNotParticipantError'
         }
         
     def detect_ban_type(self, exception) -> Optional[str]:
         """Detect the type of ban from exception."""
-        for ban_type, exception_class in self.ban_types.items():
-            if isinstance(exception, exception_class):
+        for ban_type, exception_name in self.ban_types.items():
+            if isinstance(exception, getattr(telethon_errors, exception_name)):
                 return ban_type
         return None
         
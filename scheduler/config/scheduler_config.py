@@ -26,6 +26,10 @@ class SchedulerConfig:
     max_groups_per_ad: int = 10         # Max groups to post to per ad
     auto_join_groups: bool = True       # Auto-join groups if not member
     
+    # Worker bootstrap
+    worker_connect_concurrency: int = 5     # Workers connecting at the same time
+    worker_connect_timeout_seconds: int = 10  # Per-worker connection timeout
+    
     # Error handling
     max_retries_per_post: int = 3       # Max retries for failed posts
     retry_delay_minutes: int = 5        # Delay between retries
@@ -47,6 +51,8 @@ def load_scheduler_config() -> SchedulerConfig:
         max_uses_per_worker_per_hour=int(os.getenv('SCHEDULER_MAX_WORKER_USES', '10')),
         max_groups_per_ad=int(os.getenv('SCHEDULER_MAX_GROUPS_PER_AD', '10')),
         auto_join_groups=os.getenv('SCHEDULER_AUTO_JOIN_GROUPS', 'true').lower() == 'true',
+        worker_connect_concurrency=int(os.getenv('SCHEDULER_WORKER_CONNECT_CONCURRENCY', '5')),
+        worker_connect_timeout_seconds=int(os.getenv('SCHEDULER_WORKER_CONNECT_TIMEOUT', '10')),
         max_retries_per_post=int(os.getenv('SCHEDULER_MAX_RETRIES', '3')),
         retry_delay_minutes=int(os.getenv('SCHEDULER_RETRY_DELAY', '5')),
         enable_performance_tracking=os.getenv('SCHEDULER_PERFORMANCE_TRACKING', 'true').lower() == 'true',
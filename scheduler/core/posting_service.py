@@ -15,9 +15,13 @@ from ..anti_ban.delays import DelayManager
 from ..anti_ban.content_rotation import ContentRotator
 from ..anti_ban.ban_detection import BanDetector
 from ..monitoring.performance_monitor import PerformanceMonitor
+from ..monitoring.performance_tracker import DUE_SLOTS, POSTING_TASKS, track_stage
+from src.monitoring.tracing import tracer
+from src.services.posting_pipeline import (
+    Assignment, CycleReport, PostingPipeline, PostResult, database_destinations, database_due_slots
+)
 from restart_recovery import RestartRecovery
 import random
-import sqlite3
 
 import time
 logger = logging.getLogger(__name__)
@@ -47,6 +51,18 @@ class PostingService:
         self.global_join_count_today = 0
         self.recovery_performed = False
         
+        # Shared posting pipeline; this service supplies worker assignment and sending
+        self._available_workers: List[Dict[str, Any]] = []
+        self._worker_index = 0
+        self.pipeline = PostingPipeline(
+            source=database_due_slots(self.database),
+            destinations=database_destinations(self.database),
+            assign=self._assign_workers,
+            send=self._post_single_destination_parallel,
+            mark_posted=lambda slot: self._mark_slot_as_posted(slot['id'], slot.get('slot_type', 'user')),
+            stage=track_stage,
+        )
+        
         # Ensure required tables exist
         asyncio.create_task(self._ensure_tables())
         
@@ -72,8 +88,8 @@ class PostingService:
             # Log recovery summary
             summary = recovery_results.get('recovery_summary', {})
             if summary:
-                logger.info(f"✅ Recovery completed with status: {summary.get('overall_status', 'unknown')}")
-                logger.info(f"📊 Components recovered: {len(summary.get('components_recovered', []))}")
+                logger.info("✅ Recovery completed with status: %s", summary.get('overall_status', 'unknown'))
+                logger.info("📊 Components recovered: %s", len(summary.get('components_recovered', [])))
                 
                 if summary.get('warnings'):
                     for warning in summary['warnings']:
@@ -81,7 +97,7 @@ class PostingService:
                 
                 if summary.get('recommendations'):
                     for rec in summary['recommendations']:
-                        logger.info(f"💡 Recovery recommendation: {rec}")
+                        logger.info("💡 Recovery recommendation: %s", rec)
             
             return recovery_results
             
@@ -96,10 +112,9 @@ class PostingService:
     async def post_ads(self, ad_slots: List[Dict]) -> Dict[str, Any]:
         """Post ads to their destinations using ALL available workers simultaneously.
 
-        Improvements implemented:
-        - Parallel posting using all available workers
-        - Each destination gets assigned to the best available worker
-        - Multiple workers post simultaneously for maximum efficiency
+        Runs one cycle of the shared posting pipeline (src.services.posting_pipeline):
+        - Each destination gets assigned to the next worker under its limits
+        - All assignments are posted in parallel
         - Automatic restart recovery on first run
         """
         # Perform restart recovery on first run
@@ -109,297 +124,162 @@ class PostingService:
             if 'error' in recovery_results:
                 logger.warning(f"⚠️ Restart recovery failed, continuing with posting: {recovery_results['error']}")
         
-        results = {
-            'total_ads': len(ad_slots),
-            'successful_posts': 0,
-            'failed_posts': 0,
-            'errors': []
-        }
+        DUE_SLOTS.set(len(ad_slots))
+        report = CycleReport(total_ads=len(ad_slots))
         
         if not ad_slots:
             logger.info("No ad slots to post")
-            return results
+            return report.as_dict()
         
         # Get all available workers
-        available_workers = await self.database.get_available_workers()
-        if not available_workers:
+        with track_stage('load_workers'):
+            self._available_workers = await self.database.get_available_workers()
+        self._worker_index = 0
+        if not self._available_workers:
             error_msg = "No available workers for posting"
             logger.error(error_msg)
-            results['errors'].append(error_msg)
-            return results
-        
-        logger.info(f"🚀 Starting parallel posting with {len(available_workers)} workers for {len(ad_slots)} ad slots")
+            report.errors.append(error_msg)
+            return report.as_dict()
         
-        # Track which slots have been marked as posted to avoid duplicate updates
-        posted_slots = set()
+        logger.info("🚀 Starting parallel posting with %s workers for %s ad slots", len(self._available_workers), len(ad_slots))
+        report = await self.pipeline.run_cycle(ad_slots)
+        POSTING_TASKS.set(report.tasks)
         
-        # Create posting tasks for each ad slot
-        posting_tasks = []
-        worker_index = 0
-        
-        for ad_slot in ad_slots:
-            slot_id = ad_slot.get('id')
-            
-            # Check if slot is paused
-            if ad_slot.get('is_paused', False):
-                pause_reason = ad_slot.get('pause_reason', 'unknown')
-                logger.info(f"Slot {slot_id} is paused: {pause_reason}, skipping")
-                continue
-            
-            # Load destinations for this slot
-            slot_type = ad_slot.get('slot_type', 'user')
-            slot_dests = await self.database.get_slot_destinations(slot_id, slot_type)
-            
-            if not slot_dests:
-                logger.debug(f"No destinations for slot {slot_id}, skipping")
-                continue
-            
-            logger.info(f"📤 Processing slot {slot_id} with {len(slot_dests)} destinations using all available workers")
-            
-            # Distribute destinations across multiple workers for maximum efficiency
-            for i, destination in enumerate(slot_dests):
-                
-                # Find next available worker with proper distribution
-                worker_assigned = False
-                attempts = 0
-                max_attempts = len(available_workers) * 2  # Try twice through all workers
-                
-                while not worker_assigned and attempts < max_attempts:
-                    # Get next worker in round-robin fashion
-                    worker_data = available_workers[worker_index % len(available_workers)]
-                    worker_id = int(worker_data['worker_id'])
-                    worker = self._get_worker_by_id(worker_id)
-                    worker_index += 1
-                    attempts += 1
-                    
-                    if worker:
-                        # Check if this worker is under limit AND not in cooldown
-                        under_limit, usage_info = await self._is_worker_under_limit(worker_id)
-                        cooldown_remaining = await self._check_worker_cooldown(worker_id)
-                        
-                        if under_limit and cooldown_remaining == 0:
-                            # Create posting task for this destination with this worker
-                            task = self._post_single_destination_parallel(ad_slot, destination, worker, results, posted_slots)
-                            posting_tasks.append(task)
-                            logger.info(f"📝 Created task: Worker {worker_id} -> Slot {slot_id} -> {destination.get('destination_name', 'Unknown')}")
-                            worker_assigned = True
-                        else:
-                            if not under_limit:
-                                logger.debug(f"Worker {worker_id} at limit, trying next worker")
-                            if cooldown_remaining > 0:
-                                logger.debug(f"Worker {worker_id} in cooldown for {cooldown_remaining}s, trying next worker")
-                    else:
-                        logger.warning(f"Worker {worker_id} not found, trying next worker")
-                
-                if not worker_assigned:
-                    error_msg = f"No available workers for slot {slot_id} destination {destination.get('destination_id')}"
-                    logger.error(error_msg)
-                    results['errors'].append(error_msg)
+        logger.info("✅ Parallel posting completed: %s successful, %s failed", report.successful_posts, report.failed_posts)
+        return report.as_dict()
+    
+    async def _assign_workers(self, ad_slot: Dict, slot_dests: List[Dict]) -> List[Assignment]:
+        """Distribute a slot's destinations round-robin over workers under limit and out of cooldown."""
+        slot_id = ad_slot.get('id')
+        available_workers = self._available_workers
+        logger.info("📤 Processing slot %s with %s destinations using all available workers", slot_id, len(slot_dests))
         
-        # Execute all posting tasks simultaneously
-        if posting_tasks:
-            logger.info(f"🔄 Executing {len(posting_tasks)} posting tasks in parallel using all {len(available_workers)} workers...")
-            try:
-                results_list = await asyncio.gather(*posting_tasks, return_exceptions=True)
+        assignments = []
+        for destination in slot_dests:
+            assignment = Assignment(ad_slot, destination)
+            attempts = 0
+            max_attempts = len(available_workers) * 2  # Try twice through all workers
+            
+            while assignment.worker is None and attempts < max_attempts:
+                # Get next worker in round-robin fashion
+                worker_data = available_workers[self._worker_index % len(available_workers)]
+                worker_id = int(worker_data['worker_id'])
+                worker = self._get_worker_by_id(worker_id)
+                self._worker_index += 1
+                attempts += 1
                 
-                # Check for exceptions in results
-                for i, result in enumerate(results_list):
-                    if isinstance(result, Exception):
-                        logger.error(f"❌ Task {i} failed with exception: {result}")
-                        results['failed_posts'] += 1
-                        results['errors'].append(f"Task {i} failed: {result}")
-                    elif result is not None:
-                        logger.debug(f"Task {i} completed with result: {result}")
+                if not worker:
+                    logger.warning(f"Worker {worker_id} not found, trying next worker")
+                    continue
                 
-                logger.info(f"✅ Parallel posting completed: {results['successful_posts']} successful, {results['failed_posts']} failed")
+                # Check if this worker is under limit AND not in cooldown
+                under_limit, usage_info = await self._is_worker_under_limit(worker_id)
+                cooldown_remaining = await self._check_worker_cooldown(worker_id)
                 
-            except Exception as e:
-                logger.error(f"❌ Error during parallel execution: {e}")
-                results['errors'].append(f"Parallel execution error: {e}")
-        else:
-            logger.warning("⚠️ No posting tasks created")
-        
-        return results
+                if under_limit and cooldown_remaining == 0:
+                    assignment.worker = worker
+                    logger.info("📝 Created task: Worker %s -> Slot %s -> %s", worker_id, slot_id, destination.get('destination_name', 'Unknown'))
+                else:
+                    if not under_limit:
+                        logger.debug("Worker %s at limit, trying next worker", worker_id)
+                    if cooldown_remaining > 0:
+                        logger.debug("Worker %s in cooldown for %ss, trying next worker", worker_id, cooldown_remaining)
+            
+            if assignment.worker is None:
+                logger.error(f"No available workers for slot {slot_id} destination {destination.get('destination_id')}")
+            assignments.append(assignment)
+        return assignments
     
-    async def _post_single_destination_parallel(self, ad_slot: Dict, destination: Dict, worker, results: Dict[str, Any], posted_slots: set = None):
+    async def _post_single_destination_parallel(self, assignment: Assignment) -> PostResult:
         """Post a single ad slot to a single destination using the assigned worker."""
+        with tracer.span('posting_task', slot_id=assignment.slot.get('id'), worker=assignment.worker_id,
+                         destination=assignment.destination.get('destination_id')):
+            return await self._run_destination_task(assignment)
+
+    async def _run_destination_task(self, assignment: Assignment) -> PostResult:
+        ad_slot, destination, worker = assignment.slot, assignment.destination, assignment.worker
         slot_id = ad_slot.get('id')
-        slot_type = ad_slot.get('slot_type', 'user')
         
-        logger.info(f"🚀 Starting task: Worker {worker.worker_id} -> Slot {slot_id} -> {destination.get('destination_name', 'Unknown')}")
+        logger.info("🚀 Starting task: Worker %s -> Slot %s -> %s", worker.worker_id, slot_id, destination.get('destination_name', 'Unknown'))
         # Add anti-ban delay
-        await self._add_anti_ban_delay()
+        with track_stage('anti_ban_delay'):
+            await self._add_anti_ban_delay()
         # Skip rate-limited destinations
         destination_id = destination.get("destination_id", "")
         if destination_id in self.rate_limited_destinations:
             if time.time() < self.rate_limited_destinations[destination_id]:
                 remaining = int(self.rate_limited_destinations[destination_id] - time.time())
-                logger.info(f"⏭️ Skipping rate-limited destination {destination_id} for {remaining}s")
-                results[destination_id] = {"success": False, "error": f"Rate limited for {remaining}s"}
-                return False
+                logger.info("⏭️ Skipping rate-limited destination %s for %ss", destination_id, remaining)
+                return assignment.result(False, f"Rate limited for {remaining}s", skipped=True)
             else:
                 # Expired, remove from tracking
                 del self.rate_limited_destinations[destination_id]
         # Validate destination first
-        if not await self.validate_destination(destination):
-            destination_id = destination.get("destination_id", "")
-            results[destination_id] = {"success": False, "error": "Invalid destination"}
-            return False
-        # Skip rate-limited destinations
-        destination_id = destination.get("destination_id", "")
-        if destination_id in self.rate_limited_destinations:
-            if time.time() < self.rate_limited_destinations[destination_id]:
-                remaining = int(self.rate_limited_destinations[destination_id] - time.time())
-                logger.info(f"⏭️ Skipping rate-limited destination {destination_id} for {remaining}s")
-                results[destination_id] = {"success": False, "error": f"Rate limited for {remaining}s"}
-                return False
-            else:
-                # Expired, remove from tracking
-                del self.rate_limited_destinations[destination_id]
-        # Validate destination first
-        if not await self.validate_destination(destination):
-            destination_id = destination.get("destination_id", "")
-            results[destination_id] = {"success": False, "error": "Invalid destination"}
-            return False
+        with track_stage('validate_destination'):
+            is_valid = await self.validate_destination(destination)
+        if not is_valid:
+            return assignment.result(False, "Invalid destination", skipped=True)
         
         try:
             # Check worker cooldown before posting
             cooldown_remaining = await self._check_worker_cooldown(worker.worker_id)
             if cooldown_remaining > 0:
                 logger.warning(f"⏳ Worker {worker.worker_id} in cooldown for {cooldown_remaining}s, skipping")
-                results['failed_posts'] += 1
-                return
+                return assignment.result(False)
             
             # Random delay before posting (2-8 seconds)
             delay = random.uniform(2, 8)
-            logger.info(f"⏱️ Worker {worker.worker_id} waiting {delay:.1f}s before posting...")
-            await asyncio.sleep(delay)
+            logger.info("⏱️ Worker %s waiting %.1fs before posting...", worker.worker_id, delay)
+            with track_stage('pre_send_delay'):
+                await asyncio.sleep(delay)
             
             # Post the ad
-            logger.debug(f"📤 Attempting to post: Worker {worker.worker_id} -> Slot {slot_id}")
-            success = await self._post_single_ad(ad_slot, destination, worker)
+            logger.debug("📤 Attempting to post: Worker %s -> Slot %s", worker.worker_id, slot_id)
+            with track_stage('send'):
+                success = await self._post_single_ad(ad_slot, destination, worker)
             
             if success:
-                results['successful_posts'] += 1
-                logger.info(f"✅ Worker {worker.worker_id} successfully posted slot {slot_id} to {destination.get('destination_name', 'Unknown')}")
+                logger.info("✅ Worker %s successfully posted slot %s to %s", worker.worker_id, slot_id, destination.get('destination_name', 'Unknown'))
                 
                 # Record usage and set cooldown
                 try:
-                    await self.database.record_worker_post(worker.worker_id, destination.get('destination_id'))
+                    with track_stage('record_worker_post'):
+                        await self.database.record_worker_post(worker.worker_id, destination.get('destination_id'))
                     # Set worker cooldown (30-60 seconds after successful post)
                     cooldown_duration = random.randint(30, 60)
                     await self._set_worker_cooldown(worker.worker_id, cooldown_duration)
-                    logger.info(f"⏳ Worker {worker.worker_id} cooldown set for {cooldown_duration}s")
+                    logger.info("⏳ Worker %s cooldown set for %ss", worker.worker_id, cooldown_duration)
                 except Exception as rec_err:
                     logger.warning(f"Failed to record worker usage: {rec_err}")
-                
-                # Update last_sent_at for the slot (only once per slot, not per destination)
-                if posted_slots is not None and slot_id not in posted_slots:
-                    posted_slots.add(slot_id)
-                    await self._mark_slot_as_posted(slot_id, slot_type)
-                
             else:
-                results['failed_posts'] += 1
                 logger.warning(f"❌ Worker {worker.worker_id} failed to post slot {slot_id} to {destination.get('destination_name', 'Unknown')}")
                 # Set shorter cooldown for failed posts (10-20 seconds)
                 cooldown_duration = random.randint(10, 20)
                 await self._set_worker_cooldown(worker.worker_id, cooldown_duration)
-                logger.info(f"⏳ Worker {worker.worker_id} cooldown set for {cooldown_duration}s after failure")
+                logger.info("⏳ Worker %s cooldown set for %ss after failure", worker.worker_id, cooldown_duration)
+            
+            logger.info("🏁 Completed task: Worker %s -> Slot %s -> %s", worker.worker_id, slot_id, destination.get('destination_name', 'Unknown'))
+            return assignment.result(success)
             
         except Exception as e:
-            error_msg = f"Error posting slot {slot_id} to destination {destination.get('destination_id')}: {e}"
-            logger.error(error_msg)
-            results['errors'].append(error_msg)
-            results['failed_posts'] += 1
+            logger.error(f"Error posting slot {slot_id} to destination {destination.get('destination_id')}: {e}")
             # Set cooldown for exceptions (15-30 seconds)
             cooldown_duration = random.randint(15, 30)
             await self._set_worker_cooldown(worker.worker_id, cooldown_duration)
-            logger.info(f"⏳ Worker {worker.worker_id} cooldown set for {cooldown_duration}s after exception")
-        
-        logger.info(f"🏁 Completed task: Worker {worker.worker_id} -> Slot {slot_id} -> {destination.get('destination_name', 'Unknown')}")
+            logger.info("⏳ Worker %s cooldown set for %ss after exception", worker.worker_id, cooldown_duration)
+            return assignment.result(False, str(e))
 
     async def _mark_slot_as_posted(self, slot_id: int, slot_type: str):
         """Mark a slot as posted (update last_sent_at) - thread-safe version."""
         try:
             success = await self.database.update_slot_last_sent(slot_id, slot_type)
             if success:
-                logger.info(f"✅ Updated last_sent_at for slot {slot_id}")
+                logger.info("✅ Updated last_sent_at for slot %s", slot_id)
             else:
                 logger.error(f"❌ Failed to update last_sent_at for slot {slot_id}")
         except Exception as e:
             logger.error(f"Failed updating last_sent_at for slot {slot_id}: {e}")
 
-    async def _post_slot_parallel(self, ad_slot: Dict, worker, results: Dict[str, Any]):
-        """Post a single ad slot to all its destinations using the assigned worker.
-        This method is kept for backward compatibility but the new _post_single_destination_parallel
-        method is preferred for better worker distribution."""
-        slot_id = ad_slot.get('id')
-        posted_any = False
-        
-        try:
-            # Load destinations for this slot
-            slot_type = ad_slot.get('slot_type', 'user')
-            slot_dests = await self.database.get_slot_destinations(slot_id, slot_type)
-            
-            if not slot_dests:
-                logger.debug(f"No destinations for slot {slot_id}, skipping")
-                return
-            
-            logger.info(f"📤 Worker {worker.worker_id} posting slot {slot_id} to {len(slot_dests)} destinations")
-            
-            for destination in slot_dests:
-                try:
-                    # Check if worker is still under limit
-                    under_limit, usage_info = await self._is_worker_under_limit(worker.worker_id)
-                    if not under_limit:
-                        logger.warning(f"Worker {worker.worker_id} at limit, skipping remaining destinations for slot {slot_id}")
-                        break
-                    
-                    # Post the ad
-                    success = await self._post_single_ad(ad_slot, destination, worker)
-                    
-                    if success:
-                        posted_any = True
-                        results['successful_posts'] += 1
-                        logger.info(f"✅ Worker {worker.worker_id} successfully posted slot {slot_id} to {destination.get('destination_name', 'Unknown')}")
-                    else:
-                        results['failed_posts'] += 1
-                        logger.warning(f"❌ Worker {worker.worker_id} failed to post slot {slot_id} to {destination.get('destination_name', 'Unknown')}")
-                    
-                    # Record usage
-                    try:
-                        await self.database.record_worker_post(worker.worker_id, destination.get('destination_id'))
-                    except Exception as rec_err:
-                        logger.warning(f"Failed to record worker usage: {rec_err}")
-                    
-                    # Small delay between posts to avoid spam
-                    await asyncio.sleep(2)
-                    
-                except Exception as e:
-                    error_msg = f"Error posting slot {slot_id} to destination {destination.get('destination_id')}: {e}"
-                    logger.error(error_msg)
-                    results['errors'].append(error_msg)
-                    results['failed_posts'] += 1
-            
-            # Update last_sent_at if any posts were made
-            if posted_any:
-                try:
-                    success = await self.database.update_slot_last_sent(slot_id, slot_type)
-                    if success:
-                        logger.info(f"✅ Updated last_sent_at for slot {slot_id}")
-                    else:
-                        logger.error(f"❌ Failed to update last_sent_at for slot {slot_id}")
-                except Exception as e:
-                    logger.error(f"Failed updating last_sent_at for slot {slot_id}: {e}")
-            else:
-                logger.info(f"ℹ️ No posts made for slot {slot_id}, skipping timestamp update")
-                
-        except Exception as e:
-            error_msg = f"Error processing slot {slot_id}: {e}"
-            logger.error(error_msg)
-            results['errors'].append(error_msg)
-            results['failed_posts'] += 1
-        
     async def _post_single_ad(self, ad_slot: Dict, destination: Dict, worker: WorkerClient) -> bool:
         """Post a single ad to a single destination."""
         try:
@@ -427,11 +307,11 @@ class PostingService:
                         # This is a forum topic - try different formats
                         # First try with @ prefix
                         destination_id = f"@{username}/{topic_id}"
-                        logger.info(f"Converted URL to forum topic: {destination_id}")
+                        logger.info("Converted URL to forum topic: %s", destination_id)
                     else:
                         # Regular group/channel
                         destination_id = f"@{username}"
-                        logger.info(f"Converted URL to username: {destination_id}")
+                        logger.info("Converted URL to username: %s", destination_id)
             
             # NEW: Try to join group before posting
             join_result = await self._ensure_worker_can_post(worker, destination_id)
@@ -445,20 +325,20 @@ class PostingService:
             try:
                 success = await worker.send_message(destination_id, rotated_message, self.database)
                 if success:
-                    logger.info(f"Successfully posted to {destination_id}")
+                    logger.info("Successfully posted to %s", destination_id)
             except Exception as send_error:
                 last_error = send_error
                 error_text = str(send_error).lower()
-                logger.info(f"Strategy 1 failed: {error_text}")
+                logger.info("Strategy 1 failed: %s", error_text)
                 
                 # Strategy 2: Handle TOPIC_CLOSED errors for forum topics
                 if "topic_closed" in error_text and "/" in destination_id:
-                    logger.info(f"Topic closed detected for {destination_id}, trying to find active topics...")
+                    logger.info("Topic closed detected for %s, trying to find active topics...", destination_id)
                     try:
                         # For forum topics, try to find active topics in the group
                         success = await self._handle_forum_topic_posting(worker, destination_id, rotated_message)
                         if success:
-                            logger.info(f"Successfully posted to active topic in {destination_id}")
+                            logger.info("Successfully posted to active topic in %s", destination_id)
                     except Exception as topic_error:
                         logger.warning(f"Failed to find active topics: {topic_error}")
                         last_error = topic_error
@@ -467,11 +347,11 @@ class PostingService:
                 # Strategy 3: Handle special groups like Sector Market that require additional steps
                 elif "cannot find any entity" in error_text or "entity not found" in error_text:
                     if "sector" in destination_id.lower() or "market" in destination_id.lower():
-                        logger.info(f"Special group detected: {destination_id}, trying enhanced joining...")
+                        logger.info("Special group detected: %s, trying enhanced joining...", destination_id)
                         try:
                             success = await self._handle_special_group_posting(worker, destination_id, rotated_message)
                             if success:
-                                logger.info(f"Successfully posted to special group: {destination_id}")
+                                logger.info("Successfully posted to special group: %s", destination_id)
                         except Exception as special_error:
                             logger.warning(f"Failed to post to special group: {special_error}")
                             last_error = special_error
@@ -481,10 +361,10 @@ class PostingService:
                 elif ("cannot find any entity" in error_text or "entity not found" in error_text) and "/" in destination_id:
                     try:
                         group_only = destination_id.split('/')[0]
-                        logger.info(f"Strategy 4: Retrying with group only: {group_only}")
+                        logger.info("Strategy 4: Retrying with group only: %s", group_only)
                         success = await worker.send_message(group_only, rotated_message, self.database)
                         if success:
-                            logger.info(f"Successfully posted to group (without topic): {group_only}")
+                            logger.info("Successfully posted to group (without topic): %s", group_only)
                         else:
                             logger.warning(f"Strategy 4 failed: {group_only}")
                     except Exception as fallback_error:
@@ -497,10 +377,10 @@ class PostingService:
                     try:
                         # Convert @username/topic to t.me/username/topic
                         t_me_format = destination_id.replace("@", "t.me/")
-                        logger.info(f"Strategy 5: Trying t.me format: {t_me_format}")
+                        logger.info("Strategy 5: Trying t.me format: %s", t_me_format)
                         success = await worker.send_message(t_me_format, rotated_message, self.database)
                         if success:
-                            logger.info(f"Successfully posted using t.me format: {t_me_format}")
+                            logger.info("Successfully posted using t.me format: %s", t_me_format)
                         else:
                             logger.warning(f"Strategy 5 failed: {t_me_format}")
                     except Exception as t_me_error:
@@ -513,10 +393,10 @@ class PostingService:
                     try:
                         # Convert @username/topic to https://t.me/username/topic
                         https_format = f"https://{destination_id.replace('@', 't.me/')}"
-                        logger.info(f"Strategy 6: Trying https format: {https_format}")
+                        logger.info("Strategy 6: Trying https format: %s", https_format)
                         success = await worker.send_message(https_format, rotated_message, self.database)
                         if success:
-                            logger.info(f"Successfully posted using https format: {https_format}")
+                            logger.info("Successfully posted using https format: %s", https_format)
                         else:
                             logger.warning(f"Strategy 6 failed: {https_format}")
                     except Exception as https_error:
@@ -552,7 +432,7 @@ class PostingService:
                 # Record successful post metadata (optional analytics)
                 await self._record_successful_post(ad_slot, destination, worker)
                 self.performance_monitor.record_post_attempt(str(destination_id), True)
-                logger.info(f"Successfully posted ad {ad_slot.get('id')} to {destination_id}")
+                logger.info("Successfully posted ad %s to %s", ad_slot.get('id'), destination_id)
                 return True
             else:
                 self.performance_monitor.record_post_attempt(str(destination_id), False)
@@ -647,7 +527,7 @@ class PostingService:
             # Record in posting history
             await self.database.record_posting_attempt(
                 worker_id=worker.worker_id,
-                group_id=destination.get('destination_id'),
+                destination_id=destination.get('destination_id'),
                 success=success,
                 error=error_message
             )
@@ -776,7 +656,7 @@ class PostingService:
             
             # Check if worker is already a member
             if await worker.is_member_of_channel(destination_id):
-                logger.info(f"Worker {worker.worker_id} already member of {destination_id}")
+                logger.info("Worker %s already member of %s", worker.worker_id, destination_id)
                 return {'success': True, 'reason': 'already_member', 'method': 'check'}
             
             # Add delay before join attempt
@@ -791,7 +671,7 @@ class PostingService:
                     # Longer delay for successful joins
                     await asyncio.sleep(5)
                     self._record_global_join()
-                    logger.info(f"Worker {worker.worker_id} joined {destination_id} using {join_result['method']}")
+                    logger.info("Worker %s joined %s using %s", worker.worker_id, destination_id, join_result['method'])
                 else:
                     # Short delay for already member
                     await asyncio.sleep(1)
@@ -812,7 +692,7 @@ class PostingService:
         """Log successful join attempt."""
         try:
             # This could be expanded to log to database for analytics
-            logger.info(f"Join success: Worker {worker.worker_id} -> {destination_id} ({join_result['method']})")
+            logger.info("Join success: Worker %s -> %s (%s)", worker.worker_id, destination_id, join_result['method'])
         except Exception as e:
             logger.error(f"Error logging join success: {e}")
 
@@ -880,17 +760,18 @@ class PostingService:
                 group_name = destination_id
                 original_topic_id = None
             
-            logger.info(f"Attempting to find active topics in {group_name}")
+            logger.info("Attempting to find active topics in %s", group_name)
             
             # First, ensure worker is a member of the main group
             try:
-                group_entity = await worker.get_entity(group_name)
+                with track_stage('resolve_entity'):
+                    group_entity = await worker.get_entity(group_name)
                 
                 # Try to join the group if not already a member
                 try:
                     from telethon.tl.functions.channels import JoinChannelRequest
                     await worker.client(JoinChannelRequest(group_entity))
-                    logger.info(f"Worker {worker.worker_id}: Successfully joined {group_name}")
+                    logger.info("Worker %s: Successfully joined %s", worker.worker_id, group_name)
                 except Exception as join_error:
                     if "already a participant" not in str(join_error).lower():
                         logger.warning(f"Worker {worker.worker_id}: Failed to join {group_name}: {join_error}")
@@ -916,22 +797,22 @@ class PostingService:
                     
                     # First, try to find the specific topic mentioned in the destination
                     if original_topic_id:
-                        logger.info(f"Looking for specific topic ID: {original_topic_id}")
+                        logger.info("Looking for specific topic ID: %s", original_topic_id)
                         for topic in topics_result.topics:
                             if hasattr(topic, 'id') and str(topic.id) == str(original_topic_id):
                                 try:
                                     topic_destination = f"{group_name}/{topic.id}"
-                                    logger.info(f"Found specific topic, trying to post: {topic_destination}")
+                                    logger.info("Found specific topic, trying to post: %s", topic_destination)
                                     success = await worker.send_message(topic_destination, message, self.database)
                                     if success:
-                                        logger.info(f"Successfully posted to specific topic: {topic_destination}")
+                                        logger.info("Successfully posted to specific topic: %s", topic_destination)
                                         return True
                                 except Exception as topic_error:
-                                    logger.debug(f"Failed to post to specific topic {topic.id}: {topic_error}")
+                                    logger.debug("Failed to post to specific topic %s: %s", topic.id, topic_error)
                                     break  # Don't try other topics if specific one fails
                     
                     # If specific topic not found or failed, try other active topics
-                    logger.info(f"Trying alternative active topics in {group_name}")
+                    logger.info("Trying alternative active topics in %s", group_name)
                     for topic in topics_result.topics[:5]:  # Try first 5 topics as fallback
                         if hasattr(topic, 'id') and topic.id:
                             # Skip if this is the original topic we already tried
@@ -940,13 +821,13 @@ class PostingService:
                                 
                             try:
                                 topic_destination = f"{group_name}/{topic.id}"
-                                logger.info(f"Trying to post to alternative topic: {topic_destination}")
+                                logger.info("Trying to post to alternative topic: %s", topic_destination)
                                 success = await worker.send_message(topic_destination, message, self.database)
                                 if success:
-                                    logger.info(f"Successfully posted to alternative topic: {topic_destination}")
+                                    logger.info("Successfully posted to alternative topic: %s", topic_destination)
                                     return True
                             except Exception as topic_error:
-                                logger.debug(f"Failed to post to alternative topic {topic.id}: {topic_error}")
+                                logger.debug("Failed to post to alternative topic %s: %s", topic.id, topic_error)
                                 continue
                     
                     logger.warning(f"No active topics found in {group_name}")
@@ -956,10 +837,10 @@ class PostingService:
                 logger.warning(f"Could not get forum topics for {group_name}: {forum_error}")
                 # Try posting to main group as fallback
                 try:
-                    logger.info(f"Trying to post to main group as fallback: {group_name}")
+                    logger.info("Trying to post to main group as fallback: %s", group_name)
                     success = await worker.send_message(group_name, message, self.database)
                     if success:
-                        logger.info(f"Successfully posted to main group: {group_name}")
+                        logger.info("Successfully posted to main group: %s", group_name)
                         return True
                 except Exception as fallback_error:
                     logger.warning(f"Fallback posting to main group also failed: {fallback_error}")
@@ -972,7 +853,7 @@ class PostingService:
     async def _handle_special_group_posting(self, worker: WorkerClient, destination_id: str, message: str) -> bool:
         """Handle posting to special groups that require additional steps."""
         try:
-            logger.info(f"Handling special group posting for: {destination_id}")
+            logger.info("Handling special group posting for: %s", destination_id)
             
             # For Sector Market type groups, try to navigate to the posting area
             if "sector" in destination_id.lower():
@@ -980,8 +861,9 @@ class PostingService:
                 
                 # Try to get group info first
                 try:
-                    group_entity = await worker.get_entity(destination_id)
-                    logger.info(f"Successfully got entity for {destination_id}")
+                    with track_stage('resolve_entity'):
+                        group_entity = await worker.get_entity(destination_id)
+                    logger.info("Successfully got entity for %s", destination_id)
                     
                     # Try posting with a slight delay to allow for group loading
                     await asyncio.sleep(2)
@@ -989,7 +871,7 @@ class PostingService:
                     # Try posting again
                     success = await worker.send_message(destination_id, message, self.database)
                     if success:
-                        logger.info(f"Successfully posted to Sector Market: {destination_id}")
+                        logger.info("Successfully posted to Sector Market: %s", destination_id)
                         return True
                     else:
                         logger.warning(f"Failed to post to Sector Market: {destination_id}")
@@ -1001,7 +883,7 @@ class PostingService:
             
             # For other special groups, try standard approach
             else:
-                logger.info(f"Trying standard posting for special group: {destination_id}")
+                logger.info("Trying standard posting for special group: %s", destination_id)
                 success = await worker.send_message(destination_id, message, self.database)
                 return success
                 
@@ -1011,54 +893,17 @@ class PostingService:
 
     async def _check_worker_cooldown(self, worker_id: int) -> int:
         """Check if worker is in cooldown period."""
-        try:
-            conn = sqlite3.connect(self.database.db_path)
-            cursor = conn.cursor()
-            
-            cursor.execute("""
-                SELECT cooldown_until FROM worker_cooldowns 
-                WHERE worker_id = ? AND cooldown_until > datetime('now')
-            """, (worker_id,))
-            
-            result = cursor.fetchone()
-            conn.close()
-            
-            if result:
-                cooldown_until = datetime.strptime(result[0], '%Y-%m-%d %H:%M:%S')
-                remaining = int((cooldown_until - datetime.now()).total_seconds())
-                return max(0, remaining)
-            
-            return 0
-            
-        except Exception as e:
-            logger.error(f"Error checking worker cooldown: {e}")
-            return 0
+        return await self.database.get_worker_cooldown(worker_id)
 
     async def _set_worker_cooldown(self, worker_id: int, duration_seconds: int):
         """Set worker cooldown period."""
-        try:
-            conn = sqlite3.connect(self.database.db_path)
-            cursor = conn.cursor()
-            
-            cooldown_until = (datetime.now() + timedelta(seconds=duration_seconds)).strftime('%Y-%m-%d %H:%M:%S')
-            
-            cursor.execute("""
-                INSERT OR REPLACE INTO worker_cooldowns (worker_id, cooldown_until, created_at)
-                VALUES (?, ?, datetime('now'))
-            """, (worker_id, cooldown_until))
-            
-            conn.commit()
-            conn.close()
-            
-        except Exception as e:
-            logger.error(f"Error setting worker cooldown: {e}")
-            
+        await self.database.set_worker_cooldown(worker_id, duration_seconds)
     
     async def _add_anti_ban_delay(self):
         """Add random delay between posts for anti-ban protection."""
         import random
         delay = random.uniform(2, 8)  # 2-8 seconds
-        logger.debug(f"🛡️ Anti-ban delay: {delay:.1f}s")
+        logger.debug("🛡️ Anti-ban delay: %.1fs", delay)
         await asyncio.sleep(delay)
 
     async def validate_destination(self, destination: Dict) -> bool:
@@ -1068,14 +913,14 @@ class PostingService:
         
         # Skip known invalid destinations
         if hasattr(self, "invalid_destinations") and destination_id in self.invalid_destinations:
-            logger.info(f"⏭️ Skipping known invalid destination: {destination_name} ({destination_id})")
+            logger.info("⏭️ Skipping known invalid destination: %s (%s)", destination_name, destination_id)
             return False
             
         # Skip rate-limited destinations
         if hasattr(self, "rate_limited_destinations") and destination_id in self.rate_limited_destinations:
             if time.time() < self.rate_limited_destinations[destination_id]:
                 remaining = int(self.rate_limited_destinations[destination_id] - time.time())
-                logger.info(f"⏭️ Skipping rate-limited destination {destination_name} for {remaining}s")
+                logger.info("⏭️ Skipping rate-limited destination %s for %ss", destination_name, remaining)
                 return False
         
         # Check format validity (basic checks)
@@ -9,8 +9,11 @@ import logging
 from typing import List, Dict, Any
 from datetime import datetime, timedelta
 from .posting_service import PostingService
-from ..workers.worker_client import WorkerClient
+from ..workers.worker_client import WorkerClient, connect_worker
 from ..config.scheduler_config import SchedulerConfig
+from ..monitoring.performance_tracker import POSTING_CYCLE_SECONDS, track_stage
+from src.monitoring.tracing import tracer
+from src.services.worker_pool_client import get_worker_pool_client
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +27,7 @@ class AutomatedScheduler:
         self.posting_service: PostingService = None
         self.is_running = False
         self.last_run = None
+        self._bootstrap_task: asyncio.Task = None
         
     async def initialize(self):
         """Initialize the scheduler."""
@@ -42,12 +46,16 @@ class AutomatedScheduler:
         return True
         
     async def _initialize_workers(self):
-        """Initialize worker accounts with timeout."""
+        """Connect worker accounts concurrently.
+        
+        Returns as soon as one worker is connected (or every attempt has
+        finished); the remaining workers keep connecting in the background
+        and join self.workers as they come up.
+        """
         logger.info("Initializing worker accounts...")
         
         # Load worker credentials from config
         from ..config.worker_config import WorkerConfig
-        from ..workers.worker_client import WorkerClient
         
         worker_config = WorkerConfig()
         worker_creds = worker_config.load_workers_from_env()
@@ -56,43 +64,55 @@ class AutomatedScheduler:
             logger.warning("No worker credentials found - running without workers")
             return
         
-        # Create worker clients with timeout
         self.workers = []
-        for i, creds in enumerate(worker_creds):
-            # Add delay between worker initializations to reduce database contention
-            if i > 0:
-                await asyncio.sleep(1)  # Reduced delay
-            try:
-                worker = WorkerClient(
-                    api_id=creds.api_id,
-                    api_hash=creds.api_hash,
-                    phone=creds.phone,
-                    session_file=creds.session_file,
-                    worker_id=creds.worker_id
-                )
-                
-                # Add timeout to worker connection
-                try:
-                    success = await asyncio.wait_for(worker.connect(), timeout=10.0)
-                    if success:
-                        self.workers.append(worker)
-                        # Initialize worker limits in database
-                        try:
-                            await self.database.initialize_worker_limits(creds.worker_id)
-                        except Exception as e:
-                            logger.warning(f"Failed to initialize limits for worker {creds.worker_id}: {e}")
-                        logger.info(f"Worker {creds.worker_id} initialized successfully")
-                    else:
-                        logger.warning(f"Worker {creds.worker_id} failed to connect")
-                except asyncio.TimeoutError:
-                    logger.warning(f"Worker {creds.worker_id} connection timed out after 10 seconds")
-                except Exception as e:
-                    logger.error(f"Worker {creds.worker_id} connection error: {e}")
-                    
-            except Exception as e:
-                logger.error(f"Failed to initialize worker {creds.worker_id}: {e}")
+        # Initialize worker limits in database, one batch for all workers
+        try:
+            await self.database.bulk_initialize_worker_limits([creds.worker_id for creds in worker_creds])
+        except Exception as e:
+            logger.warning(f"Failed to initialize worker limits: {e}")
+        
+        # Sessions owned by a worker pool daemon are used through it, never opened here
+        pool = get_worker_pool_client()
+        if pool is not None:
+            await self._attach_worker_pool(pool)
+            return
         
-        logger.info(f"Initialized {len(self.workers)} workers out of {len(worker_creds)} attempted")
+        semaphore = asyncio.Semaphore(max(1, self.config.worker_connect_concurrency))
+        tasks = [asyncio.create_task(self._connect_worker(creds, semaphore)) for creds in worker_creds]
+        self._bootstrap_task = asyncio.create_task(self._finish_worker_bootstrap(tasks))
+        
+        pending = set(tasks)
+        while pending and not self.workers:
+            _, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+        if pending:
+            logger.info(f"{len(self.workers)} workers ready, {len(pending)} still connecting in the background")
+            
+    async def _attach_worker_pool(self, pool):
+        """Use the workers of the worker pool daemon."""
+        from ..workers.pool import RemoteWorker
+        
+        try:
+            workers = await pool.workers()
+        except Exception as e:
+            logger.error(f"Worker pool at {pool.socket_path} is not reachable: {e}")
+            return
+        self.workers.extend(
+            RemoteWorker(pool, info['worker_id'], is_connected=info['state'] != 'failed', is_banned=info['is_banned'])
+            for info in workers
+        )
+        logger.info(f"Using {len(self.workers)} workers from the worker pool at {pool.socket_path}")
+        
+    async def _connect_worker(self, creds, semaphore: asyncio.Semaphore):
+        """Connect one worker and add it to self.workers on success."""
+        async with semaphore:
+            worker = await connect_worker(creds, self.config.worker_connect_timeout_seconds)
+        if worker:
+            self.workers.append(worker)
+            
+    async def _finish_worker_bootstrap(self, tasks: List[asyncio.Task]):
+        """Wait for every worker connection attempt and log the outcome."""
+        await asyncio.gather(*tasks, return_exceptions=True)
+        logger.info(f"Initialized {len(self.workers)} workers out of {len(tasks)} attempted")
         
     async def start(self):
         """Start the scheduler main loop."""
@@ -115,6 +135,8 @@ class AutomatedScheduler:
     async def stop(self):
         """Stop the scheduler."""
         self.is_running = False
+        if self._bootstrap_task and not self._bootstrap_task.done():
+            self._bootstrap_task.cancel()
         logger.info("Stopping automated scheduler...")
         
     async def _run_posting_cycle(self):
@@ -122,20 +144,24 @@ class AutomatedScheduler:
         logger.info("Starting posting cycle...")
         
         try:
-            # Get active ad slots
-            ad_slots = await self._get_active_ad_slots()
-            if not ad_slots:
-                logger.info("No active ad slots found")
-                return
-                
-            # Post ads (only if we have workers)
-            if self.workers:
-                results = await self.posting_service.post_ads(ad_slots)
-                logger.info(f"Posting cycle completed: {results}")
-            else:
-                logger.info(f"Found {len(ad_slots)} ad slots but no workers available for posting")
-                
-            self.last_run = datetime.now()
+            with POSTING_CYCLE_SECONDS.time(), tracer.trace('posting_cycle', workers=len(self.workers)) as cycle_span:
+                # Get active ad slots
+                with track_stage('fetch_due_slots'):
+                    ad_slots = await self._get_active_ad_slots()
+                if cycle_span is not None:
+                    cycle_span.attrs['due_slots'] = len(ad_slots)
+                if not ad_slots:
+                    logger.info("No active ad slots found")
+                    return
+                    
+                # Post ads (only if we have workers)
+                if self.workers:
+                    results = await self.posting_service.post_ads(ad_slots)
+                    logger.info(f"Posting cycle completed: {results}")
+                else:
+                    logger.info(f"Found {len(ad_slots)} ad slots but no workers available for posting")
+                    
+                self.last_run = datetime.now()
             
         except Exception as e:
             logger.error(f"Posting cycle error: {e}")
@@ -158,6 +184,7 @@ class AutomatedScheduler:
             'is_running': self.is_running,
             'last_run': self.last_run,
             'worker_count': len(self.workers),
+            'workers_connecting': bool(self._bootstrap_task and not self._bootstrap_task.done()),
             'config': {
                 'posting_interval_minutes': self.config.posting_interval_minutes,
                 'max_posts_per_cycle': self.config.max_posts_per_cycle
@@ -6,9 +6,14 @@ Monitors scheduler performance and statistics
 
 import logging
 import time
+from collections import deque
 from typing import Dict, Any, List
 from datetime import datetime, timedelta
 from dataclasses import dataclass
+from .performance_tracker import POSTS_TOTAL, SCHEDULER_ERRORS_TOTAL
+
+# Keep only the most recent errors in memory
+MAX_ERROR_LOG = 1000
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +34,7 @@ class PerformanceMonitor:
         self.stats = PostingStats()
         self.stats.start_time = datetime.now()
         self.cycle_stats = []
-        self.error_log = []
+        self.error_log = deque(maxlen=MAX_ERROR_LOG)
         
     def record_post_attempt(self, destination: str, success: bool, delay: float = 0):
         """Record a posting attempt."""
@@ -40,6 +45,7 @@ class PerformanceMonitor:
             self.stats.successful_posts += 1
         else:
             self.stats.failed_posts += 1
+        POSTS_TOTAL.labels(outcome='success' if success else 'failure').inc()
             
         if delay > 0:
             self.stats.average_delay = (
@@ -55,6 +61,7 @@ class PerformanceMonitor:
             'context': context
         }
         self.error_log.append(error_entry)
+        SCHEDULER_ERRORS_TOTAL.labels(context=context or 'unknown').inc()
         logger.error(f"Scheduler error: {error} - {context}")
         
     def get_success_rate(self) -> float:
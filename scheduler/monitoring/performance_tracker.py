@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Performance Tracker
+Scheduler metrics (posting stages, sends, outcomes) on the shared metrics registry
+"""
+
+from contextlib import contextmanager
+
+from src.monitoring.metrics import metrics
+from src.monitoring.tracing import tracer
+
+# Per-stage latency of a posting cycle, e.g. stage="load_destinations"
+POSTING_STAGE_SECONDS = metrics.histogram(
+    'scheduler_posting_stage_seconds', 'Duration of each posting cycle stage', ['stage']
+)
+POSTING_CYCLE_SECONDS = metrics.histogram(
+    'scheduler_posting_cycle_seconds', 'Duration of a full posting cycle'
+)
+DUE_SLOTS = metrics.gauge(
+    'scheduler_due_slots', 'Ad slots due for posting in the last cycle'
+)
+POSTING_TASKS = metrics.gauge(
+    'scheduler_posting_tasks', 'Posting tasks created in the last cycle'
+)
+POSTS_TOTAL = metrics.counter(
+    'scheduler_posts_total', 'Posting attempts by outcome', ['outcome']
+)
+SCHEDULER_ERRORS_TOTAL = metrics.counter(
+    'scheduler_errors_total', 'Errors recorded by the performance monitor', ['context']
+)
+
+# Telegram send latency as seen by WorkerClient.send_message
+WORKER_SEND_SECONDS = metrics.histogram(
+    'worker_send_seconds', 'WorkerClient.send_message latency', ['outcome']
+)
+WORKER_SENDS_TOTAL = metrics.counter(
+    'worker_sends_total', 'WorkerClient.send_message calls', ['worker', 'outcome']
+)
+
+
+@contextmanager
+def track_stage(stage: str, **attrs):
+    """Context manager timing one posting stage (histogram + trace span)."""
+    with tracer.span(stage, **attrs), POSTING_STAGE_SECONDS.labels(stage=stage).time():
+        yield
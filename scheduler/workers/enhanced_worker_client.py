@@ -14,6 +14,7 @@ from telethon.errors import SessionPasswordNeededError, PhoneCodeInvalidError
 from telethon.tl.functions.channels import JoinChannelRequest, GetParticipantRequest
 from telethon.tl.functions.messages import SendMessageRequest
 from telethon.errors import InviteRequestSentError, UserPrivacyRestrictedError
+from src.utils.session_lock import acquire_session, release_session
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +36,11 @@ class EnhancedWorkerClient:
         
     async def connect(self) -> bool:
         """Connect to Telegram using existing session."""
+        # One process per session file (see src.utils.session_lock)
+        if not acquire_session(self.session_file):
+            logger.warning(f"Worker {self.worker_id}: Session is in use by another process (worker pool?)")
+            return False
+            
         try:
             # Create client
             self.client = TelegramClient(self.session_file, self.api_id, self.api_hash)
@@ -50,10 +56,12 @@ class EnhancedWorkerClient:
             else:
                 logger.warning(f"Worker {self.worker_id}: Session not authorized - run setup_workers.py first")
                 await self.client.disconnect()
+                release_session(self.session_file)
                 return False
                 
         except Exception as e:
             logger.error(f"Worker {self.worker_id}: Connection failed: {e}")
+            release_session(self.session_file)
             return False
             
     async def disconnect(self):
@@ -61,6 +69,7 @@ class EnhancedWorkerClient:
         if self.client:
             await self.client.disconnect()
             self.is_connected = False
+        release_session(self.session_file)
             
     async def send_message(self, chat_id: str, message: str) -> bool:
         """Send message to chat."""
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+"""
+Entity Cache
+Per-worker cache of resolved Telegram destinations, persisted in SQLite
+
+Resolving '@group' costs a ResolveUsername round trip and checking or
+joining a group another request. The answers rarely change, so each worker
+keeps, per destination:
+
+- the input peer (type, id and access hash; access hashes are per
+  account, hence per worker),
+- whether the worker is a member,
+- whether the group is a forum, plus the basic channel info.
+
+Entries live in memory and in the ``worker_entity_cache`` table of a small
+SQLite file next to the session files, so a restarted scheduler does not
+resolve every destination again. The stored entries are read in a worker
+thread (EntityCache.load) and changes are written by one background writer
+thread in order, so the event loop never waits on SQLite. Entries expire
+after ``ttl_seconds``; errors saying the peer is gone drop the entry, and
+errors saying the worker cannot post there clear the membership flag.
+"""
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from src.utils.lazy_imports import lazy_module
+
+logger = logging.getLogger(__name__)
+
+telethon_types = lazy_module('telethon.tl.types')
+telethon_utils = lazy_module('telethon.utils')
+
+DEFAULT_TTL_SECONDS = 24 * 3600
+
+SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS worker_entity_cache (
+        worker_id INTEGER NOT NULL,
+        destination TEXT NOT NULL,
+        peer_type TEXT,
+        peer_id INTEGER,
+        access_hash INTEGER,
+        is_member INTEGER,
+        is_forum INTEGER,
+        is_channel INTEGER,
+        is_group INTEGER,
+        title TEXT,
+        username TEXT,
+        participants_count INTEGER,
+        updated_at REAL NOT NULL,
+        PRIMARY KEY (worker_id, destination)
+    )
+'''
+
+COLUMNS = ('peer_type', 'peer_id', 'access_hash', 'is_member', 'is_forum', 'is_channel', 'is_group',
+           'title', 'username', 'participants_count', 'updated_at')
+
+# Telethon errors meaning the stored peer is no longer valid for this worker
+PEER_ERRORS = ('ChannelInvalidError', 'ChannelPrivateError', 'ChatIdInvalidError', 'PeerIdInvalidError',
+               'UsernameInvalidError', 'UsernameNotOccupiedError', 'ValueError')
+
+# Telethon errors meaning the worker is not (or no longer) a member
+MEMBERSHIP_ERRORS = ('UserNotParticipantError', 'ChatWriteForbiddenError', 'UserBannedInChannelError',
+                     'ChatAdminRequiredError', 'ChannelPublicGroupNaError')
+
+
+# One writer thread for every worker's cache keeps writes in order and off the event loop
+_writer: Optional[ThreadPoolExecutor] = None
+
+
+def _get_writer() -> ThreadPoolExecutor:
+    global _writer
+    if _writer is None:
+        _writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='entity-cache')
+    return _writer
+
+
+def destination_key(destination: str) -> str:
+    """Cache key for a destination: lower-case username or the id as given."""
+    value = str(destination).strip()
+    for prefix in ('https://', 'http://'):
+        if value.startswith(prefix):
+            value = value[len(prefix):]
+    if value.startswith('t.me/'):
+        value = value[len('t.me/'):]
+    value = value.lstrip('@')
+    return value if value.lstrip('-').isdigit() else value.lower()
+
+
+class EntityCache:
+    """Resolved peers and membership of one worker, persisted in SQLite."""
+
+    def __init__(self, worker_id: int, db_path: Optional[str] = None, ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        """Initialize the cache; stored entries are read by load() or on first use.
+
+        Args:
+            worker_id: Worker the entries belong to
+            db_path: SQLite file for persistence (None keeps entries in memory only)
+            ttl_seconds: Seconds an entry is trusted before resolving again
+        """
+        self.worker_id = worker_id
+        self.db_path = db_path
+        self.ttl_seconds = ttl_seconds
+        self._entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._last_write: Optional[Future] = None
+        self.hits = 0
+        self.misses = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, timeout=5)
+        conn.execute(SCHEMA)
+        return conn
+
+    def _read(self) -> Dict[str, Dict[str, Any]]:
+        """Stored, unexpired entries of this worker (blocking)."""
+        if not self.db_path:
+            return {}
+        try:
+            conn = self._connect()
+            try:
+                rows = conn.execute(
+                    f"SELECT destination, {', '.join(COLUMNS)} FROM worker_entity_cache WHERE worker_id = ? AND updated_at > ?",
+                    (self.worker_id, time.time() - self.ttl_seconds)
+                ).fetchall()
+            finally:
+                conn.close()
+            entries = {row[0]: dict(zip(COLUMNS, row[1:])) for row in rows}
+            logger.info(f"Worker {self.worker_id}: Loaded {len(entries)} cached destinations")
+            return entries
+        except sqlite3.Error as e:
+            logger.warning(f"Worker {self.worker_id}: Could not load entity cache: {e}")
+            return {}
+
+    async def load(self) -> None:
+        """Read the stored entries in a worker thread (call once after connecting)."""
+        if self._entries is None:
+            entries = await asyncio.to_thread(self._read)
+            if self._entries is None:
+                self._entries = entries
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        if self._entries is None:
+            # Not preloaded with load(); read synchronously
+            self._entries = self._read()
+        return self._entries
+
+    def _write(self, key: str, entry: Optional[Dict[str, Any]]) -> None:
+        try:
+            conn = self._connect()
+            try:
+                if entry is None:
+                    conn.execute('DELETE FROM worker_entity_cache WHERE worker_id = ? AND destination = ?',
+                                 (self.worker_id, key))
+                else:
+                    conn.execute(
+                        f"INSERT OR REPLACE INTO worker_entity_cache (worker_id, destination, {', '.join(COLUMNS)}) "
+                        f"VALUES (?, ?, {', '.join('?' * len(COLUMNS))})",
+                        (self.worker_id, key, *(entry.get(column) for column in COLUMNS))
+                    )
+                conn.commit()
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Worker {self.worker_id}: Could not persist entity cache entry {key}: {e}")
+
+    def _save(self, key: str, entry: Optional[Dict[str, Any]]) -> None:
+        """Persist an entry (None deletes it) on the writer thread."""
+        if not self.db_path:
+            return
+        self._last_write = _get_writer().submit(self._write, key, None if entry is None else dict(entry))
+
+    async def flush(self) -> None:
+        """Wait until the changes made so far are written."""
+        if self._last_write is not None:
+            await asyncio.wrap_future(self._last_write)
+
+    def get(self, destination: str) -> Optional[Dict[str, Any]]:
+        """Fresh entry for a destination, or None."""
+        key = destination_key(destination)
+        entry = self._load().get(key)
+        if entry is None or entry['updated_at'] <= time.time() - self.ttl_seconds:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry
+
+    def update(self, destination: str, **fields: Any) -> Dict[str, Any]:
+        """Merge fields into the destination's entry and persist it."""
+        key = destination_key(destination)
+        entries = self._load()
+        entry = dict(entries.get(key) or dict.fromkeys(COLUMNS))
+        entry.update(fields)
+        entry['updated_at'] = time.time()
+        entries[key] = entry
+        self._save(key, entry)
+        return entry
+
+    def store_peer(self, destination: str, peer: Any, **fields: Any) -> Dict[str, Any]:
+        """Remember the input peer a destination resolved to."""
+        if isinstance(peer, telethon_types.InputPeerChannel):
+            fields.update(peer_type='channel', peer_id=peer.channel_id, access_hash=peer.access_hash)
+        elif isinstance(peer, telethon_types.InputPeerChat):
+            fields.update(peer_type='chat', peer_id=peer.chat_id, access_hash=None)
+        elif isinstance(peer, telethon_types.InputPeerUser):
+            fields.update(peer_type='user', peer_id=peer.user_id, access_hash=peer.access_hash)
+        return self.update(destination, **fields)
+
+    def store_entity(self, destination: str, entity: Any) -> Dict[str, Any]:
+        """Remember a full entity (peer and channel info)."""
+        return self.store_peer(
+            destination, telethon_utils.get_input_peer(entity),
+            title=getattr(entity, 'title', None),
+            username=getattr(entity, 'username', None),
+            participants_count=getattr(entity, 'participants_count', None),
+            is_channel=int(hasattr(entity, 'broadcast')),
+            is_group=int(hasattr(entity, 'megagroup')),
+            is_forum=int(bool(getattr(entity, 'forum', False))),
+        )
+
+    @staticmethod
+    def input_peer(entry: Optional[Dict[str, Any]]) -> Any:
+        """Telethon input peer of an entry, or None if it has none."""
+        if not entry or entry.get('peer_id') is None:
+            return None
+        if entry['peer_type'] == 'channel':
+            return telethon_types.InputPeerChannel(entry['peer_id'], entry['access_hash'])
+        if entry['peer_type'] == 'chat':
+            return telethon_types.InputPeerChat(entry['peer_id'])
+        if entry['peer_type'] == 'user':
+            return telethon_types.InputPeerUser(entry['peer_id'], entry['access_hash'])
+        return None
+
+    def invalidate(self, destination: str) -> None:
+        key = destination_key(destination)
+        if self._load().pop(key, None) is not None:
+            self._save(key, None)
+
+    def handle_error(self, destination: str, error: Exception) -> None:
+        """Drop or downgrade the entry after an error from Telegram."""
+        name = type(error).__name__
+        if name in PEER_ERRORS:
+            self.invalidate(destination)
+        elif name in MEMBERSHIP_ERRORS and self.get(destination):
+            self.update(destination, is_member=0)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._load()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+def default_db_path(session_file: str) -> str:
+    """Entity cache file stored next to the worker session files."""
+    return os.path.join(os.path.dirname(session_file) or '.', 'entity_cache.db')
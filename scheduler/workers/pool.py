@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Worker Pool
+Daemon that owns every worker's Telethon session and runs commands for other processes
+
+Run it once per host:
+
+    WORKER_POOL_SOCKET=sessions/worker_pool.sock python -m scheduler.workers.pool
+
+With WORKER_POOL_SOCKET set, the scheduler and the bot's WorkerManager send
+their send/join/resolve commands here (src.services.worker_pool_client)
+instead of opening the session files, so each account has one connection.
+
+Every worker has its own bounded command queue drained by one task, so an
+account executes commands one at a time in arrival order. A full queue
+makes callers wait up to enqueue_timeout seconds, then the command is
+refused with PoolBusyError.
+"""
+
+import asyncio
+import base64
+import logging
+import os
+import signal
+import sys
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from src.services.worker_pool_client import (
+    DEFAULT_SOCKET, STREAM_LIMIT, WorkerPoolClient, WorkerPoolError, decode, encode
+)
+from src.utils.media_cache import MediaCache, bot_file_loader, get_media_cache
+from .worker_client import WorkerClient, connect_worker
+
+logger = logging.getLogger(__name__)
+
+
+class PoolBusyError(Exception):
+    """A worker's command queue stayed full for enqueue_timeout seconds."""
+
+
+class WorkerNotConnectedError(Exception):
+    """The worker is unknown to the pool or failed to connect."""
+
+
+class _WorkerSlot:
+    """A worker's connection state and command queue."""
+
+    def __init__(self, worker_id: int, queue_size: int):
+        self.worker_id = worker_id
+        self.worker: Optional[WorkerClient] = None
+        self.state = 'connecting'
+        self.ready = asyncio.Event()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.task: Optional[asyncio.Task] = None
+        self.processed = 0
+
+
+class WorkerPool:
+    """Owns the worker clients and serves commands over a Unix socket."""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, database=None, queue_size: int = 100,
+                 enqueue_timeout: float = 30.0, connect_concurrency: int = 5, connect_timeout: float = 10.0,
+                 media_cache: MediaCache = None, media_loader: Callable[[str], Awaitable[bytes]] = None):
+        """Initialize the pool.
+
+        Args:
+            socket_path: Unix socket to listen on
+            database: DatabaseManager used for ban checks on 'send'
+            queue_size: Commands waiting per worker before callers block
+            enqueue_timeout: Seconds a caller waits for queue space
+            connect_concurrency: Workers connecting at the same time
+            connect_timeout: Per-worker connection timeout
+            media_cache: Uploaded-media cache for 'send_file'
+            media_loader: Downloads the Bot API file ids 'send_file' receives
+                (see bot_file_loader)
+        """
+        self.socket_path = socket_path
+        self.database = database
+        self.queue_size = queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self.connect_concurrency = connect_concurrency
+        self.connect_timeout = connect_timeout
+        self.media_cache = media_cache or get_media_cache()
+        self.media_loader = media_loader
+        self.slots: Dict[int, _WorkerSlot] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connect_tasks: List[asyncio.Task] = []
+        self._connections: Set[asyncio.StreamWriter] = set()
+
+    async def start(self, worker_creds) -> None:
+        """Start listening and connect the workers in the background."""
+        if os.path.exists(self.socket_path):
+            probe = WorkerPoolClient(self.socket_path, timeout=5)
+            running = await probe.ping()
+            await probe.close()
+            if running:
+                raise RuntimeError(f"A worker pool is already listening on {self.socket_path}")
+            os.unlink(self.socket_path)
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+
+        semaphore = asyncio.Semaphore(max(1, self.connect_concurrency))
+        for creds in worker_creds:
+            slot = _WorkerSlot(creds.worker_id, self.queue_size)
+            slot.task = asyncio.create_task(self._drain(slot))
+            self.slots[creds.worker_id] = slot
+            self._connect_tasks.append(asyncio.create_task(self._connect(slot, creds, semaphore)))
+
+        self._server = await asyncio.start_unix_server(self._handle_connection, self.socket_path,
+                                                       limit=STREAM_LIMIT)
+        logger.info(f"🔌 Worker pool listening on {self.socket_path} for {len(self.slots)} workers")
+
+    async def _connect(self, slot: _WorkerSlot, creds, semaphore: asyncio.Semaphore) -> None:
+        async with semaphore:
+            slot.worker = await connect_worker(creds, self.connect_timeout)
+        slot.state = 'connected' if slot.worker else 'failed'
+        slot.ready.set()
+
+    async def _drain(self, slot: _WorkerSlot) -> None:
+        """Run a worker's commands one at a time, in order."""
+        while True:
+            op, params, future = await slot.queue.get()
+            try:
+                if future.done():
+                    continue
+                await slot.ready.wait()
+                if slot.worker is None:
+                    raise WorkerNotConnectedError(f"Worker {slot.worker_id} is not connected")
+                future.set_result(await self._run(slot.worker, op, params))
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+            finally:
+                slot.processed += 1
+                slot.queue.task_done()
+
+    async def _run(self, worker: WorkerClient, op: str, params: Dict[str, Any]) -> Any:
+        destination = params['destination']
+        if op == 'send':
+            database = self.database if params.get('check_bans') else None
+            return await worker.send_message(destination, params['message'], database)
+        if op == 'send_file':
+            # A file_id is downloaded once, then uploaded once per worker like bytes
+            media = params['file_id'] if params.get('file_id') else base64.b64decode(params['media'])
+            await self.media_cache.send(
+                f"worker:{worker.worker_id}", media,
+                send=lambda media: worker.client.send_file(destination, media, caption=params.get('caption')),
+                reference_of=lambda message: message.media,
+                loader=self.media_loader,
+            )
+            return True
+        if op == 'join':
+            return await worker.join_channel_with_fallback(destination)
+        if op == 'is_member':
+            return await worker.is_member_of_channel(destination)
+        if op == 'resolve':
+            return await worker.get_channel_info(destination)
+        raise ValueError(f"Unknown operation: {op}")
+
+    async def submit(self, worker_id: int, op: str, params: Dict[str, Any]) -> Any:
+        """Queue a command for a worker and wait for its result."""
+        slot = self.slots.get(worker_id)
+        if slot is None:
+            raise WorkerNotConnectedError(f"Worker {worker_id} is not in the pool")
+        future = asyncio.get_running_loop().create_future()
+        try:
+            await asyncio.wait_for(slot.queue.put((op, params, future)), self.enqueue_timeout)
+        except asyncio.TimeoutError:
+            raise PoolBusyError(f"Worker {worker_id} has {slot.queue.qsize()} commands queued")
+        return await future
+
+    def status(self) -> List[Dict[str, Any]]:
+        return [
+            {
+                'worker_id': slot.worker_id,
+                'state': slot.state,
+                'is_connected': bool(slot.worker and slot.worker.is_connected),
+                'is_banned': bool(slot.worker and slot.worker.is_banned),
+                'queued': slot.queue.qsize(),
+                'processed': slot.processed,
+            }
+            for slot in self.slots.values()
+        ]
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        tasks = set()
+        self._connections.add(writer)
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._answer(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, ValueError) as e:
+            logger.warning(f"Worker pool connection dropped: {e}")
+        finally:
+            self._connections.discard(writer)
+            for task in tasks:
+                task.cancel()
+            writer.close()
+
+    async def _answer(self, line: bytes, writer: asyncio.StreamWriter) -> None:
+        request: Dict[str, Any] = {}
+        try:
+            request = decode(line)
+            op = request.get('op')
+            if op == 'ping':
+                result = 'pong'
+            elif op == 'workers':
+                result = self.status()
+            else:
+                result = await self.submit(request.get('worker_id'), op, request)
+            response = {'id': request.get('id'), 'ok': True, 'result': result}
+        except Exception as e:
+            response = {'id': request.get('id'), 'ok': False, 'error': type(e).__name__, 'message': str(e),
+                        'seconds': getattr(e, 'seconds', None)}
+        if not writer.is_closing():
+            writer.write(encode(response))
+            await writer.drain()
+
+    async def serve_forever(self) -> None:
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def close(self) -> None:
+        """Stop serving and disconnect every worker."""
+        if self._server is not None:
+            self._server.close()
+        for writer in list(self._connections):
+            writer.close()
+        for task in self._connect_tasks:
+            task.cancel()
+        for slot in self.slots.values():
+            if slot.task:
+                slot.task.cancel()
+            if slot.worker:
+                await slot.worker.disconnect()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        logger.info("Worker pool stopped")
+
+
+class RemoteWorker:
+    """WorkerClient stand-in whose commands run in the worker pool daemon."""
+
+    def __init__(self, pool: WorkerPoolClient, worker_id: int, is_connected: bool = True, is_banned: bool = False):
+        self.pool = pool
+        self.worker_id = worker_id
+        self.is_connected = is_connected
+        self.is_banned = is_banned
+        self.last_activity = None
+
+    async def send_message(self, chat_id: str, message: str, database_manager=None) -> bool:
+        """Send message to chat; ban detection runs in the pool."""
+        try:
+            return await self.pool.send(self.worker_id, chat_id, message, check_bans=database_manager is not None)
+        except (WorkerPoolError, OSError, asyncio.TimeoutError) as e:
+            logger.error(f"Worker {self.worker_id}: Pool send failed: {e}")
+            return False
+
+    async def is_member_of_channel(self, channel_username: str) -> bool:
+        try:
+            return await self.pool.is_member(self.worker_id, channel_username)
+        except (WorkerPoolError, OSError, asyncio.TimeoutError):
+            return False
+
+    async def join_channel(self, channel_username: str) -> bool:
+        return (await self.join_channel_with_fallback(channel_username)).get('success', False)
+
+    async def join_channel_with_fallback(self, channel_username: str) -> Dict[str, Any]:
+        try:
+            return await self.pool.join(self.worker_id, channel_username)
+        except (WorkerPoolError, OSError, asyncio.TimeoutError) as e:
+            return {'success': False, 'reason': str(e), 'method': None}
+
+    async def get_channel_info(self, channel_username: str) -> Dict[str, Any]:
+        try:
+            return await self.pool.resolve(self.worker_id, channel_username)
+        except (WorkerPoolError, OSError, asyncio.TimeoutError) as e:
+            return {'error': str(e)}
+
+    async def disconnect(self):
+        """Sessions stay open in the pool."""
+        self.is_connected = False
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            'worker_id': self.worker_id,
+            'is_connected': self.is_connected,
+            'is_banned': self.is_banned,
+            'last_activity': self.last_activity,
+            'pool': self.pool.socket_path
+        }
+
+
+async def main():
+    """Run the worker pool until interrupted."""
+    from dotenv import load_dotenv
+    from src.config.bot_config import BotConfig
+    from src.database.backend import create_database_manager
+    from src.monitoring.logging_setup import setup_logging
+    from ..config.worker_config import WorkerConfig
+
+    load_dotenv('config/.env')
+    setup_logging('worker_pool.log')
+
+    worker_creds = WorkerConfig().load_workers_from_env()
+    if not worker_creds:
+        logger.error("No worker credentials found. Please add WORKER_*_API_ID, WORKER_*_API_HASH, WORKER_*_PHONE to environment.")
+        return 1
+
+    config = BotConfig.load_from_env()
+    database = create_database_manager(logging.getLogger('src.database.manager'), config.db_path)
+    await database.initialize()
+
+    # Slot media is stored as Bot API file ids; the bot token is needed to download them
+    bot = None
+    if config.bot_token:
+        from telegram import Bot
+        bot = Bot(config.bot_token)
+        await bot.initialize()
+    else:
+        logger.warning("BOT_TOKEN is not set; media posts through the pool will fail")
+
+    pool = WorkerPool(
+        socket_path=os.getenv('WORKER_POOL_SOCKET', DEFAULT_SOCKET),
+        database=database,
+        queue_size=int(os.getenv('WORKER_POOL_QUEUE_SIZE', '100')),
+        connect_concurrency=int(os.getenv('SCHEDULER_WORKER_CONNECT_CONCURRENCY', '5')),
+        media_loader=bot_file_loader(bot) if bot else None,
+    )
+    await pool.start(worker_creds)
+
+    serving = asyncio.create_task(pool.serve_forever())
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, serving.cancel)
+    try:
+        await serving
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await pool.close()
+        if bot is not None:
+            await bot.shutdown()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(asyncio.run(main()))
@@ -6,6 +6,7 @@ Manages rotation between worker accounts
 
 import random
 import logging
+from collections import defaultdict
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from .worker_client import WorkerClient
@@ -18,7 +19,8 @@ class WorkerRotator:
     def __init__(self, workers: List[WorkerClient]):
         self.workers = workers
         self.current_worker_index = 0
-        self.worker_stats = {i: {'posts': 0, 'bans': 0, 'last_used': None} for i in range(len(workers))}
+        # Keyed by index; workers that finish connecting later get an entry on first use
+        self.worker_stats = defaultdict(lambda: {'posts': 0, 'bans': 0, 'last_used': None})
         
     def get_next_worker(self) -> Optional[WorkerClient]:
         """Get next available worker using round-robin."""
@@ -9,18 +9,25 @@ import logging
 import os
 import time
 from typing import Optional, Dict, Any, List
-from telethon import TelegramClient
-from telethon.errors import SessionPasswordNeededError, PhoneCodeInvalidError
-from telethon.tl.functions.channels import JoinChannelRequest
-from telethon.tl.functions.messages import SendMessageRequest
-from telethon.errors import InviteRequestSentError, UserPrivacyRestrictedError
+from src.utils.lazy_imports import lazy_module
+from ..monitoring.performance_tracker import WORKER_SEND_SECONDS, WORKER_SENDS_TOTAL, track_stage
+from src.monitoring.tracing import tracer
+from src.utils.session_lock import acquire_session, release_session
+from .entity_cache import EntityCache, default_db_path
 
 logger = logging.getLogger(__name__)
 
+# Telethon is imported when the first worker connects, not when the package loads
+telethon = lazy_module('telethon')
+telethon_errors = lazy_module('telethon.errors')
+telethon_channels = lazy_module('telethon.tl.functions.channels')
+telethon_types = lazy_module('telethon.tl.types')
+
 class WorkerClient:
     """Individual worker client for Telegram operations."""
     
-    def __init__(self, api_id: str, api_hash: str, phone: str, session_file: str, worker_id: int = None):
+    def __init__(self, api_id: str, api_hash: str, phone: str, session_file: str, worker_id: int = None,
+                 entity_cache: EntityCache = None):
         self.worker_id = worker_id
         self.api_id = api_id
         self.api_hash = api_hash
@@ -32,28 +39,38 @@ class WorkerClient:
         self.last_activity = None
         self.last_join_attempt = None
         self.join_attempts_today = 0
+        # Resolved peers and membership, so sends skip resolve and join round trips
+        self.entity_cache = entity_cache or EntityCache(worker_id, default_db_path(session_file))
         
     async def connect(self) -> bool:
         """Connect to Telegram using existing session."""
+        # One process per session file (see src.utils.session_lock)
+        if not acquire_session(self.session_file):
+            logger.warning(f"Worker {self.worker_id}: Session is in use by another process (worker pool?)")
+            return False
+            
         try:
             # Create client
-            self.client = TelegramClient(self.session_file, self.api_id, self.api_hash)
+            self.client = telethon.TelegramClient(self.session_file, self.api_id, self.api_hash)
             
             # Connect to Telegram
             await self.client.connect()
             
             # Check if session is valid
             if await self.client.is_user_authorized():
-                logger.info(f"Worker {self.worker_id}: Connected successfully")
+                logger.info("Worker %s: Connected successfully", self.worker_id)
                 self.is_connected = True
+                await self.entity_cache.load()
                 return True
             else:
                 logger.warning(f"Worker {self.worker_id}: Session not authorized - run setup_workers.py first")
                 await self.client.disconnect()
+                release_session(self.session_file)
                 return False
                 
         except Exception as e:
             logger.error(f"Worker {self.worker_id}: Connection failed: {e}")
+            release_session(self.session_file)
             return False
             
     async def disconnect(self):
@@ -61,9 +78,32 @@ class WorkerClient:
         if self.client:
             await self.client.disconnect()
             self.is_connected = False
+        release_session(self.session_file)
+        await self.entity_cache.flush()
             
     async def send_message(self, chat_id: str, message: str, database_manager=None) -> bool:
         """Send message to chat with ban detection."""
+        started = time.perf_counter()
+        success = False
+        try:
+            with tracer.span('telegram_send', worker=self.worker_id):
+                success = await self._send_message(chat_id, message, database_manager)
+            return success
+        finally:
+            outcome = 'ok' if success else 'failed'
+            WORKER_SEND_SECONDS.labels(outcome=outcome).observe(time.perf_counter() - started)
+            WORKER_SENDS_TOTAL.labels(worker=str(self.worker_id), outcome=outcome).inc()
+
+    async def _input_peer(self, destination: str):
+        """Input peer for a destination, resolved over the network only on a cache miss."""
+        peer = self.entity_cache.input_peer(self.entity_cache.get(destination))
+        if peer is None:
+            with track_stage('resolve_entity'):
+                peer = await self.client.get_input_entity(destination)
+            self.entity_cache.store_peer(destination, peer)
+        return peer
+
+    async def _send_message(self, chat_id: str, message: str, database_manager=None) -> bool:
         if not self.is_connected:
             logger.error(f"Worker {self.worker_id}: Not connected")
             return False
@@ -95,19 +135,23 @@ class WorkerClient:
                     group_username = parts[0]
                     topic_id = int(parts[1])
                     
-                    logger.info(f"Worker {self.worker_id}: Sending to forum topic {group_username}, topic {topic_id}")
+                    logger.info("Worker %s: Sending to forum topic %s, topic %s", self.worker_id, group_username, topic_id)
                     
                     try:
                         # First, ensure we're a member of the main group
-                        group_entity = await self.client.get_entity(group_username)
+                        group_entity = await self._input_peer(group_username)
                         
-                        # Try to join the group if not already a member
-                        try:
-                            await self.client(JoinChannelRequest(group_entity))
-                            logger.info(f"Worker {self.worker_id}: Successfully joined {group_username}")
-                        except Exception as join_error:
-                            if "already a participant" not in str(join_error).lower():
-                                logger.warning(f"Worker {self.worker_id}: Failed to join {group_username}: {join_error}")
+                        # Try to join the group unless already known to be a member
+                        if not (self.entity_cache.get(group_username) or {}).get('is_member'):
+                            try:
+                                await self.client(telethon_channels.JoinChannelRequest(group_entity))
+                                self.entity_cache.update(group_username, is_member=1)
+                                logger.info("Worker %s: Successfully joined %s", self.worker_id, group_username)
+                            except Exception as join_error:
+                                if "already a participant" in str(join_error).lower():
+                                    self.entity_cache.update(group_username, is_member=1)
+                                else:
+                                    logger.warning(f"Worker {self.worker_id}: Failed to join {group_username}: {join_error}")
                         
                         # Send message to the specific topic
                         await self.client.send_message(
@@ -119,16 +163,18 @@ class WorkerClient:
                         return True
                         
                     except Exception as forum_error:
+                        self.entity_cache.handle_error(group_username, forum_error)
                         logger.warning(f"Worker {self.worker_id}: Forum topic posting failed: {forum_error}")
                         # Fall back to regular posting
                         pass
             
             # Regular chat/channel posting
-            await self.client.send_message(chat_id, message)
+            await self.client.send_message(await self._input_peer(chat_id), message)
             self.last_activity = time.time()
             return True
             
         except Exception as e:
+            self.entity_cache.handle_error(chat_id, e)
             error_text = str(e)
             logger.error(f"Worker {self.worker_id}: Failed to send message: {error_text}")
             
@@ -205,7 +251,7 @@ class WorkerClient:
         try:
             success = await database_manager.clear_worker_ban(self.worker_id, destination_id)
             if success:
-                logger.info(f"Worker {self.worker_id}: Ban cleared for {destination_id}")
+                logger.info("Worker %s: Ban cleared for %s", self.worker_id, destination_id)
             return success
         except Exception as e:
             logger.error(f"Worker {self.worker_id}: Error clearing ban: {e}")
@@ -217,10 +263,11 @@ class WorkerClient:
             return False
             
         try:
-            await self.client(JoinChannelRequest(channel_username))
+            await self.client(telethon_channels.JoinChannelRequest(channel_username))
+            self.entity_cache.update(channel_username, is_member=1)
             return True
-        except InviteRequestSentError:
-            logger.info(f"Worker {self.worker_id}: Join request sent for {channel_username}")
+        except telethon_errors.InviteRequestSentError:
+            logger.info("Worker %s: Join request sent for %s", self.worker_id, channel_username)
             return True
         except Exception as e:
             logger.error(f"Worker {self.worker_id}: Failed to join {channel_username}: {e}")
@@ -233,24 +280,24 @@ class WorkerClient:
         if not self.is_connected:
             return False
             
-        try:
-            from telethon.tl.functions.channels import GetParticipantRequest
-            
-            # Get the channel entity
-            entity = await self.client.get_entity(channel_username)
-            
-            # Get worker's own user info
-            me = await self.client.get_me()
+        cached = self.entity_cache.get(channel_username)
+        if cached and cached.get('is_member') is not None:
+            return bool(cached['is_member'])
             
+        try:
             # Check if worker is participant
-            participant = await self.client(GetParticipantRequest(
-                channel=entity,
-                participant=me
+            await self.client(telethon_channels.GetParticipantRequest(
+                channel=await self._input_peer(channel_username),
+                participant=telethon_types.InputPeerSelf()
             ))
-            
+            self.entity_cache.update(channel_username, is_member=1)
             return True
             
         except Exception as e:
+            if type(e).__name__ == 'UserNotParticipantError':
+                self.entity_cache.update(channel_username, is_member=0)
+            else:
+                self.entity_cache.handle_error(channel_username, e)
             # If we can't get participant info, assume not a member
             return False
 
@@ -272,23 +319,24 @@ class WorkerClient:
         
         for format_variant in join_formats:
             try:
-                await self.client(JoinChannelRequest(channel=format_variant))
+                await self.client(telethon_channels.JoinChannelRequest(channel=format_variant))
                 self._record_join_attempt()
-                logger.info(f"Worker {self.worker_id}: Successfully joined {channel_username} using {format_variant}")
+                self.entity_cache.update(channel_username, is_member=1)
+                logger.info("Worker %s: Successfully joined %s using %s", self.worker_id, channel_username, format_variant)
                 return {'success': True, 'reason': 'joined', 'method': format_variant}
                 
-            except InviteRequestSentError:
+            except telethon_errors.InviteRequestSentError:
                 self._record_join_attempt()
-                logger.info(f"Worker {self.worker_id}: Join request sent for {channel_username} using {format_variant}")
+                logger.info("Worker %s: Join request sent for %s using %s", self.worker_id, channel_username, format_variant)
                 return {'success': True, 'reason': 'join_request_sent', 'method': format_variant}
                 
-            except UserPrivacyRestrictedError:
+            except telethon_errors.UserPrivacyRestrictedError:
                 logger.warning(f"Worker {self.worker_id}: Cannot join {channel_username} due to privacy settings")
                 return {'success': False, 'reason': 'privacy_restricted', 'method': format_variant}
                 
             except Exception as e:
                 error_text = str(e).lower()
-                logger.debug(f"Worker {self.worker_id}: Failed to join {channel_username} with {format_variant}: {e}")
+                logger.debug("Worker %s: Failed to join %s with %s: %s", self.worker_id, channel_username, format_variant, e)
                 # Add delay between format attempts
                 await asyncio.sleep(2)
                 continue
@@ -367,19 +415,23 @@ class WorkerClient:
             return {'error': 'not_connected'}
         
         try:
-            entity = await self.client.get_entity(channel_username)
+            info = self.entity_cache.get(channel_username)
+            if not info or info.get('is_channel') is None:
+                entity = await self.client.get_entity(channel_username)
+                info = self.entity_cache.store_entity(channel_username, entity)
             
             return {
-                'id': entity.id,
-                'title': getattr(entity, 'title', 'Unknown'),
-                'username': getattr(entity, 'username', None),
-                'participants_count': getattr(entity, 'participants_count', 0),
-                'is_channel': hasattr(entity, 'broadcast'),
-                'is_group': hasattr(entity, 'megagroup'),
-                'is_forum': getattr(entity, 'forum', False)
+                'id': info['peer_id'],
+                'title': info['title'] or 'Unknown',
+                'username': info['username'],
+                'participants_count': info['participants_count'] or 0,
+                'is_channel': bool(info['is_channel']),
+                'is_group': bool(info['is_group']),
+                'is_forum': bool(info['is_forum'])
             }
             
         except Exception as e:
+            self.entity_cache.handle_error(channel_username, e)
             return {'error': str(e)}
             
     def get_status(self) -> Dict[str, Any]:
@@ -389,5 +441,34 @@ class WorkerClient:
             'is_connected': self.is_connected,
             'is_banned': self.is_banned,
             'last_activity': self.last_activity,
-            'session_file': self.session_file
+            'session_file': self.session_file,
+            'entity_cache': self.entity_cache.stats()
         }
+
+
+async def connect_worker(creds, timeout: float) -> Optional[WorkerClient]:
+    """Create and connect a WorkerClient for credentials, logging connect latency."""
+    started = time.perf_counter()
+    try:
+        worker = WorkerClient(
+            api_id=creds.api_id,
+            api_hash=creds.api_hash,
+            phone=creds.phone,
+            session_file=creds.session_file,
+            worker_id=creds.worker_id
+        )
+        success = await asyncio.wait_for(worker.connect(), timeout=timeout)
+    except asyncio.TimeoutError:
+        release_session(creds.session_file)
+        logger.warning(f"Worker {creds.worker_id} connection timed out after {timeout} seconds")
+        return None
+    except Exception as e:
+        logger.error(f"Worker {creds.worker_id} connection error: {e}")
+        return None
+    
+    elapsed = time.perf_counter() - started
+    if not success:
+        logger.warning(f"Worker {creds.worker_id} failed to connect after {elapsed:.2f}s")
+        return None
+    logger.info("Worker %s initialized successfully in %.2fs", creds.worker_id, elapsed)
+    return worker
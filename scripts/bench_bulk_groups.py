@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Managed-group bulk import benchmark.
+
+Imports N synthetic groups into a fresh temporary database twice:
+
+- per-row:  one add_managed_group() call per group (lock, connection and
+            commit per row), as the bulk import flow did before
+- bulk:     one bulk_upsert_managed_groups() call (single transaction)
+
+then re-imports the same rows with bulk (mostly unchanged, some updated)
+to show the update path.
+
+Usage:
+    python scripts/bench_bulk_groups.py
+    python scripts/bench_bulk_groups.py --rows 2000 --per-row-rows 500
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database.manager import DatabaseManager
+
+
+def make_rows(count: int, categories: int = 20):
+    return [
+        {'group_id': f"@bench_group_{i}", 'group_name': f"bench_group_{i}", 'category': f"Category {i % categories}"}
+        for i in range(count)
+    ]
+
+
+async def new_db(directory: str, name: str) -> DatabaseManager:
+    logger = logging.getLogger('bench')
+    logger.setLevel(logging.WARNING)
+    db = DatabaseManager(os.path.join(directory, name), logger)
+    await db.initialize()
+    return db
+
+
+async def run(rows: int, per_row_rows: int) -> None:
+    data = make_rows(rows)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = await new_db(tmp, 'per_row.db')
+        started = time.perf_counter()
+        for row in data[:per_row_rows]:
+            await db.add_managed_group(row['group_id'], row['group_name'], row['category'])
+        per_row = time.perf_counter() - started
+        per_row_ms = per_row / per_row_rows * 1000
+
+        db = await new_db(tmp, 'bulk.db')
+        started = time.perf_counter()
+        first = await db.bulk_upsert_managed_groups(data)
+        bulk = time.perf_counter() - started
+
+        # Re-import: rename one group in ten, the rest are unchanged
+        changed = [dict(row, group_name=row['group_name'] + '_v2') if i % 10 == 0 else row for i, row in enumerate(data)]
+        started = time.perf_counter()
+        second = await db.bulk_upsert_managed_groups(changed + data[:100])
+        reimport = time.perf_counter() - started
+
+    print(f"\n📊 Managed-group import, {rows} rows")
+    print(f"   per-row add_managed_group  {per_row_ms:8.2f} ms/row  "
+          f"({per_row_rows} rows measured, ~{per_row_ms * rows / 1000:.1f} s for {rows})")
+    print(f"   bulk_upsert (new rows)     {bulk * 1000:8.1f} ms total  {first}")
+    print(f"   bulk_upsert (re-import)    {reimport * 1000:8.1f} ms total  {second}")
+    print(f"   speedup vs per-row         ~{per_row_ms * rows / 1000 / bulk:.0f}x")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark managed-group bulk import')
+    parser.add_argument('--rows', type=int, default=10000, help='Rows to import')
+    parser.add_argument('--per-row-rows', type=int, default=1000,
+                        help='Rows imported one by one for the baseline (extrapolated to --rows)')
+    args = parser.parse_args()
+    asyncio.run(run(args.rows, min(args.per_row_rows, args.rows)))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
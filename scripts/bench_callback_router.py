@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: regex CallbackQueryHandler scan vs CallbackRouter lookup.
+
+python-telegram-bot tries every CallbackQueryHandler pattern in order until
+one matches, so the cost of a button press grows with the number of routes.
+CallbackRouter resolves through dict lookups and a prefix trie, so its cost
+should stay flat as routes are added.
+
+Usage:
+    python scripts/bench_callback_router.py [--iterations 20000]
+"""
+
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.callback_router import CallbackRouter
+
+
+async def _handler(update, context):
+    return None
+
+
+def build_routes(count: int):
+    """Build count routes mixing namespace, exact and prefix styles."""
+    regexes = []
+    router = CallbackRouter()
+    for i in range(count):
+        kind = i % 3
+        if kind == 0:
+            regexes.append((re.compile(f'^ns{i}:'), _handler))
+            router.namespace(f'ns{i}', _handler)
+        elif kind == 1:
+            regexes.append((re.compile(f'^exact_{i}$'), _handler))
+            router.exact(f'exact_{i}', _handler)
+        else:
+            regexes.append((re.compile(f'^prefix_{i}_'), _handler))
+            router.prefix(f'prefix_{i}_', _handler)
+    return regexes, router
+
+
+def regex_resolve(regexes, data: str):
+    """What the regex handler list does: first pattern that matches wins."""
+    for pattern, handler in regexes:
+        if pattern.match(data):
+            return handler
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=20000)
+    args = parser.parse_args()
+
+    print(f"{'routes':>8} {'regex worst (us)':>18} {'router worst (us)':>19} {'router mixed (us)':>19}")
+    for count in (10, 60, 250, 1000, 5000):
+        regexes, router = build_routes(count)
+        # Worst case for the regex scan: the last registered route
+        last = count - 1
+        worst = {0: f'ns{last}:action:42', 1: f'exact_{last}', 2: f'prefix_{last}_42'}[last % 3]
+        mixed = ['ns0:action:1', f'exact_{1 if count > 1 else 0}', f'prefix_{2 if count > 2 else 0}_x', worst]
+
+        assert regex_resolve(regexes, worst) is router.resolve(worst)[0].handler
+
+        regex_time = timeit.timeit(lambda: regex_resolve(regexes, worst), number=args.iterations)
+        router_time = timeit.timeit(lambda: router.resolve(worst), number=args.iterations)
+        mixed_time = timeit.timeit(lambda: [router.resolve(d) for d in mixed], number=args.iterations // len(mixed))
+
+        per_call = 1e6 / args.iterations
+        print(f"{count:>8} {regex_time * per_call:>18.2f} {router_time * per_call:>19.2f} "
+              f"{mixed_time * per_call:>19.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Per-post logging overhead benchmark.
+
+Replays the INFO lines one successful post emits (created task, starting
+task, waiting, posted, cooldown set, completed, updated last_sent_at) and
+measures the time spent on the calling thread, i.e. the time the event loop
+is blocked by logging:
+
+- before:  logging.basicConfig with a FileHandler and f-string messages
+- queue:   setup_logging() (QueueHandler + JSON listener), lazy %-args
+- sampled: as queue, with the default per-logger sampling
+
+Usage:
+    python scripts/bench_logging.py
+    python scripts/bench_logging.py --posts 20000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.monitoring.logging_setup import TEXT_FORMAT, setup_logging, stop_logging
+
+posting_log = logging.getLogger('scheduler.core.posting_service')
+db_log = logging.getLogger('src.database.manager')
+
+
+def post_fstrings(worker_id: int, slot_id: int, name: str, delay: float, cooldown: int) -> None:
+    posting_log.info(f"📝 Created task: Worker {worker_id} -> Slot {slot_id} -> {name}")
+    posting_log.info(f"🚀 Starting task: Worker {worker_id} -> Slot {slot_id} -> {name}")
+    posting_log.info(f"⏱️ Worker {worker_id} waiting {delay:.1f}s before posting...")
+    posting_log.info(f"✅ Worker {worker_id} successfully posted slot {slot_id} to {name}")
+    posting_log.info(f"⏳ Worker {worker_id} cooldown set for {cooldown}s")
+    posting_log.info(f"🏁 Completed task: Worker {worker_id} -> Slot {slot_id} -> {name}")
+    db_log.info(f"✅ Updated last_sent_at for user slot {slot_id}")
+
+
+def post_lazy(worker_id: int, slot_id: int, name: str, delay: float, cooldown: int) -> None:
+    posting_log.info("📝 Created task: Worker %s -> Slot %s -> %s", worker_id, slot_id, name)
+    posting_log.info("🚀 Starting task: Worker %s -> Slot %s -> %s", worker_id, slot_id, name)
+    posting_log.info("⏱️ Worker %s waiting %.1fs before posting...", worker_id, delay)
+    posting_log.info("✅ Worker %s successfully posted slot %s to %s", worker_id, slot_id, name)
+    posting_log.info("⏳ Worker %s cooldown set for %ss", worker_id, cooldown)
+    posting_log.info("🏁 Completed task: Worker %s -> Slot %s -> %s", worker_id, slot_id, name)
+    db_log.info("✅ Updated last_sent_at for %s slot %s", 'user', slot_id)
+
+
+def run(post, posts: int, repeats: int = 3) -> float:
+    """Best-of-N mean calling-thread time per post in microseconds."""
+    best = float('inf')
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for i in range(posts):
+            post(i % 10, i % 500, f"Group {i % 200}", 2 + (i % 60) / 10, 30 + i % 30)
+        best = min(best, (time.perf_counter() - started) / posts * 1e6)
+    return best
+
+
+def reset_root() -> None:
+    stop_logging()
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark per-post logging overhead')
+    parser.add_argument('--posts', type=int, default=10000, help='Simulated posts per run')
+    parser.add_argument('--repeats', type=int, default=3, help='Runs per variant (best is reported)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+
+        reset_root()
+        handler = logging.FileHandler(os.path.join(tmp, 'before.log'), encoding='utf-8')
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        logging.getLogger().addHandler(handler)
+        logging.getLogger().setLevel(logging.INFO)
+        results['before (FileHandler, f-strings)'] = run(post_fstrings, args.posts, args.repeats)
+
+        reset_root()
+        setup_logging(os.path.join(tmp, 'queue.log'), level='INFO', json_format=True,
+                      sample_rates={}, console=False)
+        results['queue + JSON, lazy args'] = run(post_lazy, args.posts, args.repeats)
+        stop_logging()
+
+        reset_root()
+        setup_logging(os.path.join(tmp, 'sampled.log'), level='INFO', json_format=True,
+                      sample_rates=None, console=False)
+        results['queue + JSON, lazy args, sampled'] = run(post_lazy, args.posts, args.repeats)
+        stop_logging()
+
+        lines = {}
+        for name in ('before.log', 'queue.log', 'sampled.log'):
+            with open(os.path.join(tmp, name), encoding='utf-8') as f:
+                lines[name] = sum(1 for _ in f)
+        reset_root()
+
+    baseline = results['before (FileHandler, f-strings)']
+    print(f"\n📊 Logging overhead per post ({args.posts} posts x {args.repeats}, 7 INFO lines each, calling thread only)")
+    for label, per_post in results.items():
+        print(f"   {label:<36} {per_post:8.1f} µs/post  ({baseline / per_post:4.1f}x)")
+    print(f"   lines written: before {lines['before.log']}, queue {lines['queue.log']}, "
+          f"sampled {lines['sampled.log']}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
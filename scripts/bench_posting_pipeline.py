@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark: one posting cycle through the shared posting pipeline.
+
+The scheduler's PostingService, AutoPoster and the bot's PostingService all
+run src.services.posting_pipeline, so this is the one place to measure a
+cycle. Stages are in memory; --send-ms simulates the Telegram round trip.
+Parallel mode is the scheduler's (all assignments gathered), sequential mode
+is AutoPoster's (one destination after another).
+
+Usage:
+    python scripts/bench_posting_pipeline.py [--slots 50] [--destinations 20] [--workers 10] [--send-ms 5]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.services.posting_pipeline import Assignment, PostingPipeline
+
+
+def build_pipeline(args, parallel):
+    slots = [{'id': i, 'slot_type': 'user', 'content': f'Ad {i}'} for i in range(args.slots)]
+    destinations = [{'destination_id': f'-100{d}', 'destination_name': f'group_{d}'}
+                    for d in range(args.destinations)]
+    counters = {'sent': 0, 'marked': 0, 'logged': 0}
+
+    async def source():
+        return slots
+
+    async def load_destinations(slot):
+        return destinations
+
+    async def assign(slot, slot_destinations):
+        return [Assignment(slot, destination, (slot['id'] + index) % args.workers + 1)
+                for index, destination in enumerate(slot_destinations)]
+
+    async def send(assignment):
+        await asyncio.sleep(args.send_ms / 1000)
+        counters['sent'] += 1
+        return assignment.result(True)
+
+    async def mark_posted(slot):
+        counters['marked'] += 1
+
+    async def telemetry(result):
+        counters['logged'] += 1
+
+    pipeline = PostingPipeline(source, load_destinations, assign, send, telemetry=telemetry,
+                               mark_posted=mark_posted, parallel=parallel)
+    return pipeline, counters
+
+
+async def run(args, parallel):
+    pipeline, counters = build_pipeline(args, parallel)
+    started = time.perf_counter()
+    report = await pipeline.run_cycle()
+    elapsed = time.perf_counter() - started
+    assert counters['sent'] == report.successful_posts == counters['logged']
+    assert counters['marked'] == report.slots_posted == args.slots
+    return elapsed, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--slots', type=int, default=50)
+    parser.add_argument('--destinations', type=int, default=20)
+    parser.add_argument('--workers', type=int, default=10)
+    parser.add_argument('--send-ms', type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{args.slots} slots x {args.destinations} destinations, {args.workers} workers, "
+          f"{args.send_ms:g} ms per send")
+    print(f"{'mode':>12} {'posts':>7} {'seconds':>9} {'posts/s':>10} {'overhead us/post':>17}")
+    for parallel in (True, False):
+        elapsed, report = asyncio.run(run(args, parallel))
+        posts = report.successful_posts
+        send_seconds = 0 if parallel else posts * args.send_ms / 1000
+        overhead = max(elapsed - send_seconds, 0) / posts * 1e6
+        mode = 'parallel' if parallel else 'sequential'
+        print(f"{mode:>12} {posts:>7} {elapsed:>9.3f} {posts / elapsed:>10.0f} {overhead:>17.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: list-of-datetimes rate limiter vs GCRA limiter.
+
+The legacy limiter rebuilt a list of every timestamp in the window on each
+check and never evicted idle users. GCRALimiter keeps one (tat, interval)
+pair per key with LRU eviction, so the cost per check should stay constant
+from 1k to 100k distinct users and memory should stay bounded.
+
+Usage:
+    python scripts/bench_rate_limiter.py [--checks 200000]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.rate_limiter import GCRALimiter
+
+MAX_ACTIONS = 20
+WINDOW_SECONDS = 60
+
+
+class LegacyRateLimiter:
+    """The previous per-check list rebuild, kept here for comparison."""
+
+    def __init__(self):
+        self.user_actions = defaultdict(lambda: defaultdict(list))
+
+    def check_rate_limit(self, user_id, action, max_actions, window_seconds):
+        now = datetime.now()
+        cutoff_time = now - timedelta(seconds=window_seconds)
+        self.user_actions[user_id][action] = [
+            t for t in self.user_actions[user_id][action] if t > cutoff_time
+        ]
+        if len(self.user_actions[user_id][action]) >= max_actions:
+            return False
+        self.user_actions[user_id][action].append(now)
+        return True
+
+
+def run(check, keys, max_actions):
+    tracemalloc.start()
+    started = time.perf_counter()
+    for key in keys:
+        check(key, 'send_message', max_actions, WINDOW_SECONDS)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed / len(keys) * 1e6, peak / (1024 * 1024)
+
+
+def gcra_check(limiter):
+    # Same call shape as the legacy limiter, without RateLimiter's logging
+    return lambda user_id, action, max_actions, window: limiter.allow((user_id, action), max_actions, window)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--checks', type=int, default=200000)
+    args = parser.parse_args()
+
+    print("Distinct users (uniform traffic, 20 actions / 60s)")
+    print(f"{'users':>8} {'legacy us/check':>16} {'legacy MiB':>11} {'gcra us/check':>14} {'gcra MiB':>9}")
+    for users in (1_000, 10_000, 100_000):
+        rng = random.Random(users)
+        keys = [rng.randrange(users) for _ in range(args.checks)]
+        legacy_us, legacy_mb = run(LegacyRateLimiter().check_rate_limit, keys, MAX_ACTIONS)
+        gcra_us, gcra_mb = run(gcra_check(GCRALimiter(max_keys=100_000)), keys, MAX_ACTIONS)
+        print(f"{users:>8} {legacy_us:>16.2f} {legacy_mb:>11.1f} {gcra_us:>14.2f} {gcra_mb:>9.1f}")
+
+    print("\nOne hot user (cost vs actions allowed per window)")
+    print(f"{'max':>8} {'legacy us/check':>16} {'gcra us/check':>14}")
+    checks = min(args.checks, 20000)
+    for max_actions in (10, 100, 1000, 10000):
+        keys = [1] * checks
+        legacy_us, _ = run(LegacyRateLimiter().check_rate_limit, keys, max_actions)
+        gcra_us, _ = run(gcra_check(GCRALimiter()), keys, max_actions)
+        print(f"{max_actions:>8} {legacy_us:>16.2f} {gcra_us:>14.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Startup import budget check for the bot and scheduler entry points.
+
+Runs ``python -X importtime -c "import <entry>"`` in a fresh interpreter and
+fails if:
+- a module that should load lazily (admin handlers, aiohttp, asyncpg,
+  telethon, qrcode/PIL, hdwallet) was imported at startup, or
+- the total cumulative import time exceeds the entry point's budget.
+
+The lazy-module check is deterministic; the time budget depends on the
+machine, so override it with --budget-ms when running on slow hosts.
+
+tests/test_import_budget.py runs the same checks under pytest; this script
+prints the slowest modules when a budget is exceeded.
+
+Usage:
+    python scripts/check_import_budget.py                 # bot and scheduler
+    python scripts/check_import_budget.py bot --top 15
+    python scripts/check_import_budget.py scheduler --budget-ms 400
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+from typing import List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative import time budget per entry point (milliseconds)
+IMPORT_BUDGETS_MS = {
+    'bot': 1200,
+    'scheduler': 600,
+}
+
+# Modules that must not be imported at startup (matched as prefixes)
+LAZY_MODULES = {
+    'bot': [
+        'commands.admin_commands', 'commands.admin_slot_commands',
+        'aiohttp', 'asyncpg', 'telethon', 'qrcode', 'PIL', 'hdwallet',
+    ],
+    'scheduler': [
+        'telethon', 'aiohttp', 'qrcode', 'PIL', 'hdwallet',
+    ],
+}
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure(entry: str) -> List[Tuple[str, int, int, int]]:
+    """Return (module, self_us, cumulative_us, depth) for one fresh import of entry."""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {entry}'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True,
+        env=dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [PROJECT_ROOT, os.getenv('PYTHONPATH')])))
+    )
+    if result.returncode != 0:
+        tail = result.stderr.strip().splitlines()[-1:] or ['unknown error']
+        raise RuntimeError(f"import {entry} failed: {tail[0]}")
+
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows
+
+
+def check(entry: str, budget_ms: float, top: int) -> List[str]:
+    """Measure one entry point and return a list of violations."""
+    rows = measure(entry)
+    imported = {module for module, _, _, _ in rows}
+    # Top-level imports (depth 0) add up to the total
+    total_ms = sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000
+
+    print(f"\n📦 import {entry}: {total_ms:.0f} ms total, {len(rows)} modules (budget {budget_ms:.0f} ms)")
+    for module, self_us, cumulative_us, _ in sorted(rows, key=lambda r: r[1], reverse=True)[:top]:
+        print(f"   {self_us / 1000:8.1f} ms self {cumulative_us / 1000:8.1f} ms cumulative  {module}")
+
+    violations = []
+    for prefix in LAZY_MODULES.get(entry, []):
+        eager = sorted(m for m in imported if m == prefix or m.startswith(prefix + '.'))
+        if eager:
+            violations.append(f"{entry}: {prefix} imported at startup ({len(eager)} modules)")
+    if total_ms > budget_ms:
+        violations.append(f"{entry}: import took {total_ms:.0f} ms, budget {budget_ms:.0f} ms")
+    return violations
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Check startup import time and lazy imports')
+    parser.add_argument('entries', nargs='*', default=list(IMPORT_BUDGETS_MS), help='Entry modules to check')
+    parser.add_argument('--budget-ms', type=float, help='Override the time budget for all entries')
+    parser.add_argument('--top', type=int, default=10, help='Show the N slowest modules')
+    args = parser.parse_args()
+
+    violations: List[str] = []
+    for entry in args.entries:
+        budget = args.budget_ms or IMPORT_BUDGETS_MS.get(entry, 1000)
+        try:
+            violations.extend(check(entry, budget, args.top))
+        except RuntimeError as e:
+            violations.append(str(e))
+
+    if violations:
+        print("\n❌ Import budget check failed:")
+        for violation in violations:
+            print(f"   • {violation}")
+        return 1
+    print("\n✅ Import budget check passed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+One-time compaction of slot destination tables.
+
+Before destination saves became diff-based, every save deactivated (user
+slots) or deleted (admin slots) all rows and inserted new ones, leaving
+duplicate and inactive rows behind. This keeps one row per
+(slot_id, destination_id) (the active one if any) and adds the unique
+index that prevents new duplicates.
+
+DatabaseManager.initialize() runs the same migration automatically the
+first time; use this script to run it ahead of a deploy or to preview it.
+
+Usage:
+    python scripts/compact_slot_destinations.py [--db bot_database.db] [--dry-run]
+"""
+
+import argparse
+import os
+import sqlite3
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.database import slot_destinations
+
+
+def table_stats(cursor: sqlite3.Cursor, table: str):
+    cursor.execute(f'''
+        SELECT COUNT(*),
+               SUM(CASE WHEN is_active = 1 THEN 1 ELSE 0 END),
+               COUNT(DISTINCT slot_id || '|' || COALESCE(destination_id, ''))
+        FROM {table}
+    ''')
+    total, active, distinct = cursor.fetchone()
+    return total or 0, active or 0, distinct or 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Compact slot destination tables')
+    parser.add_argument('--db', default='bot_database.db', help='SQLite database path')
+    parser.add_argument('--dry-run', action='store_true', help='Report without changing anything')
+    args = parser.parse_args()
+
+    if not os.path.exists(args.db):
+        print(f"❌ Database not found: {args.db}")
+        return 1
+
+    conn = sqlite3.connect(args.db, timeout=30)
+    try:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        for table in slot_destinations.TABLES:
+            try:
+                total, active, distinct = table_stats(cursor, table)
+            except sqlite3.OperationalError as e:
+                print(f"⏭️ {table}: skipped ({e})")
+                continue
+            if slot_destinations.has_unique_index(cursor, table):
+                print(f"✅ {table}: already compacted ({total} rows, {active} active)")
+                continue
+            removed = slot_destinations.ensure_unique_index(cursor, table)
+            print(f"🧹 {table}: {total} rows, {active} active, {distinct} distinct pairs -> removed {removed}")
+        if args.dry_run:
+            conn.rollback()
+            print("ℹ️ Dry run, no changes written")
+        else:
+            conn.commit()
+            cursor.execute('VACUUM')
+    finally:
+        conn.close()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
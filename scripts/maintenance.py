@@ -41,7 +41,8 @@ class MaintenanceService:
     async def cleanup_expired_subscriptions(self):
         """Deactivate expired subscriptions."""
         try:
-            expired_count = await self.db.deactivate_expired_subscriptions()
+            results = await self.db.deactivate_expired_subscriptions()
+            expired_count = results['deactivated']
             if expired_count > 0:
                 logger.info(f"Deactivated {expired_count} expired subscriptions")
             else:
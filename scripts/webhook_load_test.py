@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Webhook load test: replay recorded updates into the webhook endpoint.
+
+Record real traffic by running the bot with WEBHOOK_RECORD_PATH set, then
+replay that JSONL file against a staging bot (BOT_MODE=webhook). Reports
+client-side updates/sec and ack latency, plus the server's receive ->
+handled latency percentiles from the stats endpoint.
+
+Usage:
+    python scripts/webhook_load_test.py --updates data/webhook_updates.jsonl \
+        --url http://127.0.0.1:8081/telegram/webhook --secret $WEBHOOK_SECRET \
+        --concurrency 20 --repeat 5
+
+Do not point this at a production bot: handlers run for real and will
+reply to the recorded chats.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List
+
+import aiohttp
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.webhook_server import SECRET_HEADER, _percentile
+
+
+def load_updates(path: str) -> List[dict]:
+    updates = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                updates.append(json.loads(line))
+    return updates
+
+
+def build_payloads(updates: List[dict], repeat: int) -> List[dict]:
+    """Repeat the recording, giving every copy a fresh update_id."""
+    base = int(time.time()) * 1000
+    payloads = []
+    for round_no in range(repeat):
+        for i, update in enumerate(updates):
+            payload = dict(update)
+            payload['update_id'] = base + round_no * len(updates) + i
+            payloads.append(payload)
+    return payloads
+
+
+async def replay(url: str, secret: str, payloads: List[dict], concurrency: int) -> dict:
+    queue: asyncio.Queue = asyncio.Queue()
+    for payload in payloads:
+        queue.put_nowait(payload)
+
+    latencies: List[float] = []
+    statuses: dict = {}
+    headers = {SECRET_HEADER: secret}
+
+    async def worker(session: aiohttp.ClientSession):
+        while True:
+            try:
+                payload = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            started = time.perf_counter()
+            try:
+                async with session.post(url, json=payload, headers=headers) as resp:
+                    await resp.read()
+                    statuses[resp.status] = statuses.get(resp.status, 0) + 1
+            except aiohttp.ClientError as e:
+                statuses[type(e).__name__] = statuses.get(type(e).__name__, 0) + 1
+            latencies.append(time.perf_counter() - started)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(session) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'sent': len(payloads),
+        'elapsed_seconds': round(elapsed, 3),
+        'updates_per_second': round(len(payloads) / elapsed, 1) if elapsed else 0.0,
+        'ack_p50_ms': round(_percentile(latencies, 50) * 1000, 2),
+        'ack_p99_ms': round(_percentile(latencies, 99) * 1000, 2),
+        'statuses': statuses,
+    }
+
+
+async def fetch_server_stats(url: str, secret: str, reset: bool = False) -> dict:
+    stats_url = f"{url.rstrip('/')}/stats" + ('?reset=1' if reset else '')
+    async with aiohttp.ClientSession() as session:
+        async with session.get(stats_url, headers={SECRET_HEADER: secret}) as resp:
+            if resp.status != 200:
+                return {'error': f"HTTP {resp.status}"}
+            return await resp.json()
+
+
+async def wait_for_drain(url: str, secret: str, expected: int, timeout: float) -> dict:
+    """Poll the stats endpoint until every replayed update has been handled."""
+    deadline = time.monotonic() + timeout
+    stats = {}
+    while time.monotonic() < deadline:
+        stats = await fetch_server_stats(url, secret)
+        if 'error' in stats or stats.get('processed', 0) >= expected:
+            break
+        await asyncio.sleep(0.5)
+    return stats
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--updates', required=True, help='JSONL file of recorded updates')
+    parser.add_argument('--url', default='http://127.0.0.1:8081/telegram/webhook')
+    parser.add_argument('--secret', default=os.getenv('WEBHOOK_SECRET', ''))
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--drain-timeout', type=float, default=60.0)
+    args = parser.parse_args()
+
+    updates = load_updates(args.updates)
+    if not updates:
+        print("❌ No updates in recording")
+        return
+    payloads = build_payloads(updates, args.repeat)
+
+    await fetch_server_stats(args.url, args.secret, reset=True)
+    print(f"🚀 Replaying {len(payloads)} updates with concurrency {args.concurrency}")
+    client = await replay(args.url, args.secret, payloads, args.concurrency)
+    server = await wait_for_drain(args.url, args.secret, client['sent'], args.drain_timeout)
+
+    print("\n📊 Client")
+    for key, value in client.items():
+        print(f"  {key}: {value}")
+    print("\n📊 Server (receive -> handlers done)")
+    for key, value in server.items():
+        print(f"  {key}: {value}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -8,13 +8,16 @@ from telegram.ext import (
 )
 
 from src.config.bot_config import BotConfig
-from src.database.manager import DatabaseManager
+from src.database.backend import create_database_manager
 from src.services.blockchain_payments import BlockchainPaymentProcessor
 from src.notifications import NotificationManager
 from src.error_logger import TelegramErrorLogger
 from src.forwarding import MessageForwarder
 from src.filters import MessageFilter
 from src.commands import user, admin, forwarding as fwd_cmds
+from src.monitoring.metrics import start_metrics_server_from_env
+from src.monitoring.health_probe import get_health_probe, database_check
+from src.monitoring.logging_setup import setup_logging
 
 # --- Global logger setup ---
 LOGGER = logging.getLogger(__name__)
@@ -30,6 +33,11 @@ async def post_init(application: Application):
     LOGGER.info("Custom bot commands have been set.")
     # Initialize database right after bot is ready
     await application.bot_data['db'].initialize()
+    # Expose /metrics, /livez and /readyz on BOT_METRICS_PORT or METRICS_PORT (Docker HEALTHCHECK)
+    probe = get_health_probe()
+    probe.add_check('database', database_check(application.bot_data['db']))
+    probe.set_ready('bot', True)
+    application.bot_data['metrics_server'] = await start_metrics_server_from_env('bot')
 
 async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE):
     """Logs errors and notifies the admin."""
@@ -44,7 +52,7 @@ async def main() -> None:
     app = ApplicationBuilder().token(config.bot_token).post_init(post_init).build()
 
     # --- Initialize Components ---
-    db = DatabaseManager("bot_database.db", LOGGER)
+    db = create_database_manager(LOGGER, "bot_database.db")
     notifier = NotificationManager(app.bot, LOGGER)
     payments = BlockchainPaymentProcessor(db, notifier, config, LOGGER)
     message_filter = MessageFilter(LOGGER)
@@ -115,11 +123,7 @@ if __name__ == '__main__':
     os.makedirs("data", exist_ok=True)
     os.makedirs("logs", exist_ok=True)
 
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        handlers=[logging.FileHandler("logs/bot.log"), logging.StreamHandler()]
-    )
+    setup_logging("logs/bot.log")
     logging.getLogger("httpx").setLevel(logging.WARNING)
 
     # Only run asyncio.run() if this file is executed directly
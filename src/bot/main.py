@@ -22,6 +22,7 @@ from config import BotConfig
 from src.database.manager import DatabaseManager
 from commands import user_commands
 from commands import admin_commands
+from src.utils.media_cache import bot_file_loader
 
 # Import new classes
 try:
@@ -96,7 +97,7 @@ class AutoFarmingBot:
         try:
             # Initialize new components if available
             if NEW_CLASSES_AVAILABLE:
-                self.worker_manager = WorkerManager(self.db, logger)
+                self.worker_manager = WorkerManager(self.db, logger, media_loader=bot_file_loader(self.app.bot))
                 self.payment_processor = PaymentProcessor(self.db, logger)
                 self.posting_service = PostingService(self.db, self.worker_manager, logger)
                 self.app.bot_data.update({
@@ -122,7 +123,8 @@ class AutoFarmingBot:
             
             # Initialize posting service if available
             if POSTING_SERVICE_AVAILABLE:
-                self.posting_service = initialize_posting_service(self.db, logger)
+                self.posting_service = initialize_posting_service(
+                    self.db, logger, media_loader=bot_file_loader(self.app.bot))
                 self.app.bot_data['posting_service'] = self.posting_service
                 logger.info("Posting service initialized")
             else:
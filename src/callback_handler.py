@@ -4,6 +4,93 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from src.core_systems import safe_rate_limit, safe_error_handling
 from src.ui_manager import get_ui_manager
+from src.menu_registry import RenderedMenu, menu_registry
+
+# Static settings/help screens are built once at import
+menu_registry.register_static(
+    'callbacks.notifications',
+    "🔔 **Notification Settings**\n\n"
+    "Configure which notifications you want to receive:\n\n"
+    "• Payment confirmations\n"
+    "• Ad posting status\n"
+    "• Subscription reminders\n"
+    "• System updates",
+    [
+        [InlineKeyboardButton("🔔 Enable All", callback_data="notif_enable_all")],
+        [InlineKeyboardButton("🔕 Disable All", callback_data="notif_disable_all")],
+        [InlineKeyboardButton("🔙 Back", callback_data="menu_settings")]
+    ]
+)
+menu_registry.register_static(
+    'callbacks.language',
+    "🌐 **Language Settings**\n\n"
+    "Choose your preferred language:",
+    [
+        [InlineKeyboardButton("🇺🇸 English", callback_data="lang_en")],
+        [InlineKeyboardButton("🇪🇸 Español", callback_data="lang_es")],
+        [InlineKeyboardButton("🇫🇷 Français", callback_data="lang_fr")],
+        [InlineKeyboardButton("🔙 Back", callback_data="menu_settings")]
+    ]
+)
+menu_registry.register_static(
+    'callbacks.privacy',
+    "🔒 **Privacy Settings**\n\n"
+    "Configure your privacy preferences:\n\n"
+    "• Data collection\n"
+    "• Analytics sharing\n"
+    "• Message storage",
+    [
+        [InlineKeyboardButton("🔒 High Privacy", callback_data="privacy_high")],
+        [InlineKeyboardButton("🔓 Standard", callback_data="privacy_standard")],
+        [InlineKeyboardButton("🔙 Back", callback_data="menu_settings")]
+    ]
+)
+menu_registry.register_static(
+    'callbacks.how_it_works',
+    "📖 **How It Works**\n\n"
+    "1. **Subscribe** - Choose a plan that fits your needs\n"
+    "2. **Create Slots** - Each slot can have 10 destinations\n"
+    "3. **Set Content** - Add your ad message or media\n"
+    "4. **Add Destinations** - Choose groups/channels to post to\n"
+    "5. **Activate** - Turn on your slot to start posting\n\n"
+    "The bot will automatically post your content to all destinations at regular intervals.",
+    [
+        [InlineKeyboardButton("🔙 Back", callback_data="menu_help")]
+    ]
+)
+menu_registry.register_static(
+    'callbacks.faq',
+    "❓ **Frequently Asked Questions**\n\n"
+    "**Q: How many groups can I post to?**\n"
+    "A: Each slot supports up to 10 destinations.\n\n"
+    "**Q: How often does it post?**\n"
+    "A: By default, every 60 minutes.\n\n"
+    "**Q: Can I use my own content?**\n"
+    "A: Yes, you can set custom text, photos, or videos.\n\n"
+    "**Q: What if the bot gets banned?**\n"
+    "A: We automatically rotate workers to avoid bans.",
+    [
+        [InlineKeyboardButton("🔙 Back", callback_data="menu_help")]
+    ]
+)
+menu_registry.register_static(
+    'callbacks.support',
+    "📞 **Support**\n\n"
+    "Need help? We're here to assist you!\n\n"
+    "**Contact Methods:**\n"
+    "• Telegram: @support_username\n"
+    "• Email: support@example.com\n"
+    "• Response time: Within 24 hours\n\n"
+    "**Before contacting:**\n"
+    "• Check the FAQ section\n"
+    "• Try restarting the bot\n"
+    "• Ensure your subscription is active",
+    [
+        [InlineKeyboardButton("📞 Contact Support", callback_data="contact_support")],
+        [InlineKeyboardButton("🔙 Back", callback_data="menu_help")]
+    ]
+)
+
 
 class CallbackHandler:
     """Handle all callback queries for UI interactions."""
@@ -564,56 +651,15 @@ class CallbackHandler:
     
     async def _show_notifications_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show notifications settings."""
-        keyboard = [
-            [InlineKeyboardButton("🔔 Enable All", callback_data="notif_enable_all")],
-            [InlineKeyboardButton("🔕 Disable All", callback_data="notif_disable_all")],
-            [InlineKeyboardButton("🔙 Back", callback_data="menu_settings")]
-        ]
-        
-        text = (
-            "🔔 **Notification Settings**\n\n"
-            "Configure which notifications you want to receive:\n\n"
-            "• Payment confirmations\n"
-            "• Ad posting status\n"
-            "• Subscription reminders\n"
-            "• System updates"
-        )
-        
-        await self._edit_message(update, context, text, keyboard)
+        await self._edit_menu(update, menu_registry.static('callbacks.notifications'))
     
     async def _show_language_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show language settings."""
-        keyboard = [
-            [InlineKeyboardButton("🇺🇸 English", callback_data="lang_en")],
-            [InlineKeyboardButton("🇪🇸 Español", callback_data="lang_es")],
-            [InlineKeyboardButton("🇫🇷 Français", callback_data="lang_fr")],
-            [InlineKeyboardButton("🔙 Back", callback_data="menu_settings")]
-        ]
-        
-        text = (
-            "🌐 **Language Settings**\n\n"
-            "Choose your preferred language:"
-        )
-        
-        await self._edit_message(update, context, text, keyboard)
+        await self._edit_menu(update, menu_registry.static('callbacks.language'))
     
     async def _show_privacy_settings(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show privacy settings."""
-        keyboard = [
-            [InlineKeyboardButton("🔒 High Privacy", callback_data="privacy_high")],
-            [InlineKeyboardButton("🔓 Standard", callback_data="privacy_standard")],
-            [InlineKeyboardButton("🔙 Back", callback_data="menu_settings")]
-        ]
-        
-        text = (
-            "🔒 **Privacy Settings**\n\n"
-            "Configure your privacy preferences:\n\n"
-            "• Data collection\n"
-            "• Analytics sharing\n"
-            "• Message storage"
-        )
-        
-        await self._edit_message(update, context, text, keyboard)
+        await self._edit_menu(update, menu_registry.static('callbacks.privacy'))
     
     async def _handle_help(self, update: Update, context: ContextTypes.DEFAULT_TYPE, data: str):
         """Handle help callbacks."""
@@ -630,63 +676,15 @@ class CallbackHandler:
     
     async def _show_how_it_works(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show how it works help."""
-        keyboard = [
-            [InlineKeyboardButton("🔙 Back", callback_data="menu_help")]
-        ]
-        
-        text = (
-            "📖 **How It Works**\n\n"
-            "1. **Subscribe** - Choose a plan that fits your needs\n"
-            "2. **Create Slots** - Each slot can have 10 destinations\n"
-            "3. **Set Content** - Add your ad message or media\n"
-            "4. **Add Destinations** - Choose groups/channels to post to\n"
-            "5. **Activate** - Turn on your slot to start posting\n\n"
-            "The bot will automatically post your content to all destinations at regular intervals."
-        )
-        
-        await self._edit_message(update, context, text, keyboard)
+        await self._edit_menu(update, menu_registry.static('callbacks.how_it_works'))
     
     async def _show_faq(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show FAQ help."""
-        keyboard = [
-            [InlineKeyboardButton("🔙 Back", callback_data="menu_help")]
-        ]
-        
-        text = (
-            "❓ **Frequently Asked Questions**\n\n"
-            "**Q: How many groups can I post to?**\n"
-            "A: Each slot supports up to 10 destinations.\n\n"
-            "**Q: How often does it post?**\n"
-            "A: By default, every 60 minutes.\n\n"
-            "**Q: Can I use my own content?**\n"
-            "A: Yes, you can set custom text, photos, or videos.\n\n"
-            "**Q: What if the bot gets banned?**\n"
-            "A: We automatically rotate workers to avoid bans."
-        )
-        
-        await self._edit_message(update, context, text, keyboard)
+        await self._edit_menu(update, menu_registry.static('callbacks.faq'))
     
     async def _show_support(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Show support information."""
-        keyboard = [
-            [InlineKeyboardButton("📞 Contact Support", callback_data="contact_support")],
-            [InlineKeyboardButton("🔙 Back", callback_data="menu_help")]
-        ]
-        
-        text = (
-            "📞 **Support**\n\n"
-            "Need help? We're here to assist you!\n\n"
-            "**Contact Methods:**\n"
-            "• Telegram: @support_username\n"
-            "• Email: support@example.com\n"
-            "• Response time: Within 24 hours\n\n"
-            "**Before contacting:**\n"
-            "• Check the FAQ section\n"
-            "• Try restarting the bot\n"
-            "• Ensure your subscription is active"
-        )
-        
-        await self._edit_message(update, context, text, keyboard)
+        await self._edit_menu(update, menu_registry.static('callbacks.support'))
     
     async def _handle_unknown_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE, data: str):
         """Handle unknown callbacks."""
@@ -695,16 +693,16 @@ class CallbackHandler:
     
     async def _edit_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE, text: str, keyboard: list):
         """Edit the callback message with new content."""
+        await self._edit_menu(update, menu_registry.render(text, keyboard))
+    
+    async def _edit_menu(self, update: Update, menu: RenderedMenu):
+        """Edit the callback message to show a menu, skipping unchanged payloads."""
         try:
-            await update.callback_query.edit_message_text(
-                text,
-                reply_markup=InlineKeyboardMarkup(keyboard),
-                parse_mode='Markdown'
-            )
+            await menu_registry.edit(update.callback_query, menu)
         except Exception as e:
             self.logger.error(f"Error editing message: {e}")
             # Fallback to simple text
-            fallback_text = text.replace('*', '').replace('_', '')
+            fallback_text = menu.text.replace('*', '').replace('_', '')
             await update.callback_query.edit_message_text(fallback_text)
     
     async def _send_fallback_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE, message: str):
@@ -0,0 +1,177 @@
+"""
+Callback query router.
+
+Replaces one regex ``CallbackQueryHandler`` per button family with a single
+dispatcher. ``callback_data`` is parsed once into ``(namespace, action,
+args)`` and resolved through dict lookups, falling back to a character trie
+for legacy prefix routes (e.g. ``subscribe_basic``), so dispatch cost depends
+on the length of the callback data rather than on the number of routes.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+Handler = Callable[..., Awaitable[Any]]
+
+# Key under which the trie stores the route terminating at a node
+_TERMINAL = ''
+
+
+@dataclass(frozen=True)
+class CallbackData:
+    """callback_data parsed once: ``namespace:action:arg1:arg2...``."""
+    raw: str
+    namespace: str
+    action: str
+    args: Tuple[str, ...]
+
+    @property
+    def parts(self) -> list:
+        """The data split on ':' (the shape legacy handlers expect)."""
+        return self.raw.split(':')
+
+    @classmethod
+    def parse(cls, data: str) -> 'CallbackData':
+        parts = data.split(':')
+        return cls(
+            raw=data,
+            namespace=parts[0],
+            action=parts[1] if len(parts) > 1 else '',
+            args=tuple(parts[2:]),
+        )
+
+
+@dataclass(frozen=True)
+class Route:
+    """A registered handler. ``with_data`` handlers also receive the CallbackData."""
+    handler: Handler
+    with_data: bool = False
+    name: str = ''
+
+
+class CallbackRouter:
+    """Dispatch callback queries to handlers without regex matching.
+
+    Resolution order, first hit wins:
+
+    1. ``exact``: the whole callback data (``compare_plans``)
+    2. ``action``: ``(namespace, action)`` pair (``cmd:admin_menu``)
+    3. ``namespace``: everything before the first ':' (``subscribe:pro``)
+    4. ``prefix``: longest registered prefix (``subscribe_`` for ``subscribe_basic``)
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None):
+        self.logger = logger or logging.getLogger(__name__)
+        self._exact: Dict[str, Route] = {}
+        self._actions: Dict[Tuple[str, str], Route] = {}
+        self._namespaces: Dict[str, Route] = {}
+        self._prefix_trie: Dict[str, Any] = {}
+        self._prefix_count = 0
+        self.stats = {
+            'dispatched': 0,
+            'unmatched': 0,
+            'errors': 0,
+        }
+
+    # --- Registration ---
+
+    @staticmethod
+    def _route(handler: Handler, with_data: bool) -> Route:
+        return Route(handler=handler, with_data=with_data, name=getattr(handler, '__qualname__', repr(handler)))
+
+    def exact(self, data: str, handler: Handler, with_data: bool = False) -> None:
+        """Route callback data equal to data."""
+        self._exact[data] = self._route(handler, with_data)
+
+    def action(self, namespace: str, action: str, handler: Handler, with_data: bool = False) -> None:
+        """Route ``namespace:action[:args...]``."""
+        self._actions[(namespace, action)] = self._route(handler, with_data)
+
+    def namespace(self, namespace: str, handler: Handler, with_data: bool = False) -> None:
+        """Route ``namespace:<anything>`` not claimed by a more specific action route."""
+        self._namespaces[namespace] = self._route(handler, with_data)
+
+    def prefix(self, prefix: str, handler: Handler, with_data: bool = False) -> None:
+        """Route callback data starting with prefix (longest registered prefix wins)."""
+        if not prefix:
+            raise ValueError("prefix must not be empty")
+        node = self._prefix_trie
+        for char in prefix:
+            node = node.setdefault(char, {})
+        if _TERMINAL not in node:
+            self._prefix_count += 1
+        node[_TERMINAL] = self._route(handler, with_data)
+
+    # --- Resolution ---
+
+    def _longest_prefix(self, data: str) -> Optional[Route]:
+        node = self._prefix_trie
+        found = None
+        for char in data:
+            node = node.get(char)
+            if node is None:
+                break
+            route = node.get(_TERMINAL)
+            if route is not None:
+                found = route
+        return found
+
+    def resolve(self, data: Optional[str]) -> Tuple[Optional[Route], Optional[CallbackData]]:
+        """Find the route for callback data. Returns (route, parsed) or (None, None)."""
+        if not data:
+            return None, None
+
+        route = self._exact.get(data)
+        parsed = CallbackData.parse(data)
+        if route is None and parsed.action:
+            route = self._actions.get((parsed.namespace, parsed.action))
+        if route is None and len(parsed.raw) > len(parsed.namespace):
+            route = self._namespaces.get(parsed.namespace)
+        if route is None:
+            route = self._longest_prefix(data)
+        if route is None:
+            return None, None
+        return route, parsed
+
+    def matches(self, data: object) -> bool:
+        """Callable pattern for ``CallbackQueryHandler``: True if data has a route.
+
+        Unrouted callbacks are left unhandled (as the regex handlers did) so
+        other handlers in the same group still get a chance at them.
+        """
+        return isinstance(data, str) and self.resolve(data)[0] is not None
+
+    # --- Dispatch ---
+
+    async def dispatch(self, update, context) -> Any:
+        """Route a callback query update to its handler."""
+        query = getattr(update, 'callback_query', None)
+        if not query or not query.data:
+            return None
+
+        route, parsed = self.resolve(query.data)
+        if route is None:
+            self.stats['unmatched'] += 1
+            self.logger.debug(f"No callback route for: {query.data}")
+            return None
+
+        self.stats['dispatched'] += 1
+        try:
+            if route.with_data:
+                return await route.handler(update, context, parsed)
+            return await route.handler(update, context)
+        except Exception:
+            self.stats['errors'] += 1
+            raise
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return route counts and dispatch counters."""
+        stats = dict(self.stats)
+        stats.update({
+            'exact_routes': len(self._exact),
+            'action_routes': len(self._actions),
+            'namespace_routes': len(self._namespaces),
+            'prefix_routes': self._prefix_count,
+        })
+        return stats
@@ -13,6 +13,16 @@ class BotConfig:
         self.database_url = os.getenv('DATABASE_URL', 'bot_database.db')
         self.db_path = os.getenv('DATABASE_PATH', 'bot_database.db')
         self.admin_ids = self._parse_admin_ids()
+
+        # Update delivery: 'polling' (default) or 'webhook'
+        self.bot_mode = os.getenv('BOT_MODE', 'polling').strip().lower()
+        self.webhook_url = os.getenv('WEBHOOK_URL', '')
+        self.webhook_listen = os.getenv('WEBHOOK_LISTEN', '127.0.0.1')
+        self.webhook_port = int(os.getenv('WEBHOOK_PORT', '8081'))
+        self.webhook_path = os.getenv('WEBHOOK_PATH', '/telegram/webhook')
+        self.webhook_secret = os.getenv('WEBHOOK_SECRET', '')
+        self.webhook_max_connections = int(os.getenv('WEBHOOK_MAX_CONNECTIONS', '40'))
+        self.webhook_record_path = os.getenv('WEBHOOK_RECORD_PATH', '')
         
     def _parse_admin_ids(self) -> List[int]:
         """Parse admin IDs from environment variable."""
@@ -74,6 +84,11 @@ class BotConfig:
         """Load configuration from environment variables."""
         return cls()
 
+    @property
+    def use_webhook(self) -> bool:
+        """Whether updates are delivered by webhook instead of polling."""
+        return self.bot_mode == 'webhook'
+
     @property
     def admin_id(self) -> int:
         """Get first admin ID for backward compatibility."""
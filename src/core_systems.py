@@ -88,7 +88,8 @@ class CoreSystems:
             'error_handler': self.error_handler.get_error_stats() if self.error_handler else {},
             'rate_limiter': {
                 'user_stats': self.rate_limiter.get_user_stats(0) if self.rate_limiter else {},
-                'global_stats': self.rate_limiter.get_global_stats() if self.rate_limiter else {}
+                'global_stats': self.rate_limiter.get_global_stats() if self.rate_limiter else {},
+                'limiter_stats': self.rate_limiter.get_limiter_stats() if self.rate_limiter else {}
             },
             'auto_restart': get_restart_stats(),
             'database': self.db_safety.get_pool_stats() if self.db_safety else {},
@@ -3,6 +3,7 @@ Database Package
 """
 
 from .manager import DatabaseManager
+from .backend import create_database_manager
 from src.config.bot_config import BotConfig
 
-__all__ = ['DatabaseManager', 'BotConfig']
+__all__ = ['DatabaseManager', 'create_database_manager', 'BotConfig']
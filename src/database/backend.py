@@ -0,0 +1,44 @@
+"""
+Database backend selection.
+
+DATABASE_BACKEND picks the store behind the DatabaseManager API:
+
+- ``sqlite`` (default): DatabaseManager on a local SQLite file.
+- ``postgres``: PostgresDatabaseManager on an asyncpg pool to DATABASE_URL,
+  sized by DATABASE_POOL_SIZE. Use it when several bot, scheduler and
+  payment processes write at once.
+"""
+
+import os
+from typing import Optional, Union
+
+from src.database.manager import DatabaseManager
+from src.database.postgres import PostgresDatabaseManager
+
+POSTGRES_BACKENDS = ('postgres', 'postgresql')
+
+
+def create_database_manager(logger, db_path: str = 'bot_database.db', backend: Optional[str] = None,
+                            database_url: Optional[str] = None) -> Union[DatabaseManager, PostgresDatabaseManager]:
+    """Create the database manager for the configured backend.
+
+    Args:
+        logger: Logger instance for error logging
+        db_path: SQLite database file (sqlite backend)
+        backend: 'sqlite' or 'postgres'; defaults to DATABASE_BACKEND
+        database_url: postgresql:// URL; defaults to DATABASE_URL
+
+    Raises:
+        ValueError: For an unknown backend or a missing/non-PostgreSQL URL
+    """
+    backend = (backend or os.getenv('DATABASE_BACKEND') or 'sqlite').strip().lower()
+    if backend == 'sqlite':
+        return DatabaseManager(db_path, logger)
+    if backend not in POSTGRES_BACKENDS:
+        raise ValueError(f"Unknown DATABASE_BACKEND: {backend}")
+
+    dsn = database_url or os.getenv('DATABASE_URL', '')
+    if not dsn.startswith(('postgres://', 'postgresql://')):
+        raise ValueError("DATABASE_BACKEND=postgres needs DATABASE_URL=postgresql://...")
+    max_size = int(os.getenv('DATABASE_POOL_SIZE', '10'))
+    return PostgresDatabaseManager(dsn, logger, min_size=min(2, max_size), max_size=max_size)
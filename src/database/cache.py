@@ -0,0 +1,178 @@
+"""
+Hot-path lookup cache for DatabaseManager.
+
+Bounded LRU cache with per-entry TTL used in front of the per-user
+subscription and ad slot lookups. Writers invalidate entries explicitly;
+the TTL only bounds staleness for writes made by other processes
+(scheduler, payment monitor) that share the same SQLite file.
+"""
+
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Set
+
+# Sentinel returned on cache miss so that ``None`` can be cached as a value
+MISSING = object()
+
+
+class LRUTTLCache:
+    """Bounded LRU cache with a fixed time-to-live per entry.
+
+    Values are deep-copied on the way in and out so callers can freely
+    mutate the dicts/lists they get back without corrupting the cache.
+    """
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 30.0,
+                 on_remove: Optional[Callable[[Hashable], None]] = None):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries kept before LRU eviction
+            ttl_seconds: Seconds an entry stays valid after being stored
+            on_remove: Called with the key of every entry that is evicted,
+                expires or is invalidated (not on clear())
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.on_remove = on_remove
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value for key, or MISSING if absent or expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return MISSING
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._removed(key)
+            self.misses += 1
+            return MISSING
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return copy.deepcopy(value)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry if full."""
+        self._entries[key] = (time.monotonic() + self.ttl_seconds, copy.deepcopy(value))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            evicted, _ = self._entries.popitem(last=False)
+            self._removed(evicted)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop a single entry. Returns True if an entry was removed."""
+        if self._entries.pop(key, None) is not None:
+            self._removed(key)
+            self.invalidations += 1
+            return True
+        return False
+
+    def _removed(self, key: Hashable) -> None:
+        if self.on_remove is not None:
+            self.on_remove(key)
+
+    def clear(self) -> None:
+        """Drop every entry (counters are preserved)."""
+        self.invalidations += len(self._entries)
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'max_entries': self.max_entries,
+            'ttl_seconds': self.ttl_seconds,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+        }
+
+
+class UserLookupCache:
+    """Per-user cache for subscription and ad slot lookups.
+
+    Keys are ``(kind, user_id)`` tuples. A reverse ``slot_id -> user_id``
+    index is maintained from cached slot lists so that slot-level writers
+    (which only know the slot id) can invalidate the owning user. Index
+    entries live only as long as a cached slot list contains the slot, so
+    the index is bounded by the cache itself.
+    """
+
+    SUBSCRIPTION = 'subscription'
+    SLOTS = 'slots'
+    AD_SLOTS = 'ad_slots'
+
+    def __init__(self, max_entries: int = 4096, ttl_seconds: float = 30.0):
+        self._cache = LRUTTLCache(max_entries=max_entries, ttl_seconds=ttl_seconds, on_remove=self._unindex)
+        self._slot_owners: Dict[int, int] = {}
+        self._indexed: Dict[Hashable, Set[int]] = {}
+
+    def get(self, kind: str, user_id: int) -> Any:
+        """Return the cached value or MISSING."""
+        return self._cache.get((kind, user_id))
+
+    def set(self, kind: str, user_id: int, value: Any) -> None:
+        """Cache a lookup result and index any slot ids it contains."""
+        key = (kind, user_id)
+        self._unindex(key)
+        if kind in (self.SLOTS, self.AD_SLOTS) and value:
+            slot_ids = {slot.get('id') for slot in value} - {None}
+            for slot_id in slot_ids:
+                self._slot_owners[slot_id] = user_id
+            self._indexed[key] = slot_ids
+        self._cache.set(key, value)
+
+    def _unindex(self, key: Hashable) -> None:
+        """Forget the slot ids of a removed slot list unless the user's other list still has them."""
+        slot_ids = self._indexed.pop(key, None)
+        if not slot_ids:
+            return
+        kind, user_id = key
+        other = self._indexed.get((self.AD_SLOTS if kind == self.SLOTS else self.SLOTS, user_id), set())
+        for slot_id in slot_ids - other:
+            if self._slot_owners.get(slot_id) == user_id:
+                del self._slot_owners[slot_id]
+
+    def invalidate_user(self, user_id: Optional[int]) -> None:
+        """Drop every cached lookup for a user."""
+        if user_id is None:
+            return
+        for kind in (self.SUBSCRIPTION, self.SLOTS, self.AD_SLOTS):
+            self._cache.invalidate((kind, user_id))
+
+    def invalidate_slot(self, slot_id: Optional[int]) -> None:
+        """Drop cached slot lists for the user owning slot_id, if known."""
+        if slot_id is None:
+            return
+        user_id = self._slot_owners.get(slot_id)
+        if user_id is not None:
+            self._cache.invalidate((self.SLOTS, user_id))
+            self._cache.invalidate((self.AD_SLOTS, user_id))
+
+    def clear(self) -> None:
+        """Drop everything, e.g. after a bulk sweep touching many users."""
+        self._cache.clear()
+        self._slot_owners.clear()
+        self._indexed.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters for the underlying cache."""
+        stats = self._cache.stats()
+        stats['indexed_slots'] = len(self._slot_owners)
+        return stats
@@ -0,0 +1,238 @@
+"""
+Versioned in-memory index over the active managed groups.
+
+Admin views and pickers read managed groups on almost every tap. The index
+is built once from the managed_groups rows and reused by every
+DatabaseManager in the process until the table changes. Triggers on
+managed_groups bump a counter in ``data_versions``, so any writer (bot,
+scheduler, maintenance scripts) invalidates the index and a reader only
+needs a one-row primary-key lookup to know whether its copy is current.
+
+Positions in the index are stable for one version, so a picker can keep
+its selection as a bitset over them: bit ``i`` set means ``groups[i]`` is
+selected. Toggling, selecting or clearing a category is then integer
+arithmetic instead of a database round trip.
+"""
+
+import sqlite3
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+VERSION_NAME = 'managed_groups'
+
+VERSION_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS data_versions (
+        name TEXT PRIMARY KEY,
+        version INTEGER NOT NULL DEFAULT 0
+    )
+'''
+
+_BUMP = f"UPDATE data_versions SET version = version + 1 WHERE name = '{VERSION_NAME}'"
+
+VERSION_TRIGGERS = [
+    f'''
+    CREATE TRIGGER IF NOT EXISTS managed_groups_version_{event.lower()}
+    AFTER {event} ON managed_groups
+    BEGIN
+        {_BUMP};
+    END
+    '''
+    for event in ('INSERT', 'UPDATE', 'DELETE')
+]
+
+
+def ensure_version_tracking(cursor: sqlite3.Cursor) -> None:
+    """Create the version table, its managed_groups row and the bump triggers."""
+    cursor.execute(VERSION_SCHEMA)
+    cursor.execute("INSERT OR IGNORE INTO data_versions (name, version) VALUES (?, 0)", (VERSION_NAME,))
+    for trigger in VERSION_TRIGGERS:
+        cursor.execute(trigger)
+
+
+def read_version(cursor: sqlite3.Cursor) -> int:
+    cursor.execute("SELECT version FROM data_versions WHERE name = ?", (VERSION_NAME,))
+    found = cursor.fetchone()
+    return found[0] if found else 0
+
+
+def destination_key(group: Dict[str, Any]) -> str:
+    """Destination id used for a managed group (group_id, else group_name)."""
+    return group.get('group_id') or group.get('group_name')
+
+
+def normalize_username(value: Optional[str]) -> Optional[str]:
+    """Lower-case username from '@name', 't.me/name' or 'name'; None for numeric ids."""
+    value = (value or '').strip().lower()
+    for prefix in ('https://', 'http://'):
+        if value.startswith(prefix):
+            value = value[len(prefix):]
+    if value.startswith('t.me/'):
+        value = value[len('t.me/'):]
+    value = value.lstrip('@').split('/')[0]
+    if not value or value.lstrip('-').isdigit() or any(ch.isspace() for ch in value):
+        return None
+    return value
+
+
+def prepare_upsert(rows: Iterable[Dict[str, Any]]) -> Tuple[Dict[str, Tuple[str, str]], Dict[str, int]]:
+    """Validate and deduplicate rows for a bulk managed-group upsert.
+
+    Rows without category, or with an empty, overlong or
+    whitespace-containing group_id, are invalid; repeated group_ids keep
+    the first occurrence. group_name defaults to group_id.
+
+    Returns:
+        ({group_id: (group_name, category)}, counts with invalid,
+        duplicates and skipped filled in)
+    """
+    counts = {'added': 0, 'updated': 0, 'unchanged': 0, 'skipped': 0,
+              'invalid': 0, 'duplicates': 0, 'errors': 0}
+    groups: Dict[str, Tuple[str, str]] = {}
+    for row in rows:
+        group_id = str(row.get('group_id') or '').strip()
+        category = str(row.get('category') or '').strip()
+        if not group_id or not category or len(group_id) > 255 or any(ch.isspace() for ch in group_id):
+            counts['invalid'] += 1
+            continue
+        if group_id in groups:
+            counts['duplicates'] += 1
+            continue
+        group_name = str(row.get('group_name') or '').strip() or group_id
+        groups[group_id] = (group_name, category)
+    counts['skipped'] = counts['invalid'] + counts['duplicates']
+    return groups, counts
+
+
+class ManagedGroupIndex:
+    """Immutable snapshot of the active managed groups at one version."""
+
+    def __init__(self, groups: Iterable[Dict[str, Any]], version: int = 0):
+        """Build the index.
+
+        Args:
+            groups: Active managed group rows, ordered by category, group_name
+            version: data_versions counter the rows were read at
+        """
+        self.version = version
+        self.groups: Tuple[Dict[str, Any], ...] = tuple(groups)
+        self.keys: Tuple[str, ...] = tuple(destination_key(group) for group in self.groups)
+        self.positions: Dict[str, int] = {}
+        self.usernames: Dict[str, int] = {}
+        self.category_masks: Dict[str, int] = {}
+        self._category_positions: Dict[str, List[int]] = {}
+        terms = []
+        for position, (key, group) in enumerate(zip(self.keys, self.groups)):
+            self.positions.setdefault(key, position)
+            category = group.get('category') or 'other'
+            self.category_masks[category] = self.category_masks.get(category, 0) | (1 << position)
+            self._category_positions.setdefault(category, []).append(position)
+
+            username = normalize_username(group.get('group_id')) or normalize_username(group.get('group_name'))
+            if username:
+                self.usernames.setdefault(username, position)
+                terms.append((username, position))
+            name = (group.get('group_name') or '').strip().lower()
+            if name and name != username:
+                terms.append((name, position))
+        self._terms: List[Tuple[str, int]] = sorted(terms)
+        self.all_mask = (1 << len(self.groups)) - 1
+
+    def __len__(self) -> int:
+        return len(self.groups)
+
+    def categories(self) -> List[str]:
+        """Categories in display (alphabetical) order."""
+        return list(self.category_masks)
+
+    def category_counts(self) -> Dict[str, int]:
+        return {category: len(positions) for category, positions in self._category_positions.items()}
+
+    def category_mask(self, category: str) -> int:
+        return self.category_masks.get(category, 0)
+
+    def in_category(self, category: str) -> List[Dict[str, Any]]:
+        """Groups of one category, ordered by group_name."""
+        return [self.groups[position] for position in self._category_positions.get(category, ())]
+
+    def get(self, group_id: str) -> Optional[Dict[str, Any]]:
+        position = self.positions.get(group_id)
+        return self.groups[position] if position is not None else None
+
+    def by_username(self, username: str) -> Optional[Dict[str, Any]]:
+        position = self.usernames.get(normalize_username(username) or '')
+        return self.groups[position] if position is not None else None
+
+    def find(self, identifier: str) -> Optional[Dict[str, Any]]:
+        """Look a group up by destination id, then by username or t.me link."""
+        return self.get(identifier) or self.by_username(identifier)
+
+    def search(self, prefix: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Groups whose username or name starts with prefix (case-insensitive)."""
+        prefix = (prefix or '').strip().lower()
+        prefix = normalize_username(prefix) or prefix
+        if not prefix:
+            return []
+        seen, matches = set(), []
+        at = bisect_left(self._terms, (prefix, -1))
+        while at < len(self._terms) and len(matches) < limit:
+            term, position = self._terms[at]
+            if not term.startswith(prefix):
+                break
+            if position not in seen:
+                seen.add(position)
+                matches.append(position)
+            at += 1
+        return [self.groups[position] for position in matches]
+
+    def positions_in(self, mask: int) -> List[int]:
+        """Set bit positions of mask, ascending."""
+        positions = []
+        while mask:
+            low = mask & -mask
+            positions.append(low.bit_length() - 1)
+            mask ^= low
+        return positions
+
+    def mask_for(self, keys: Iterable[str]) -> int:
+        """Bitset of the given destination ids (unknown ids are ignored)."""
+        mask = 0
+        for key in keys:
+            position = self.positions.get(key)
+            if position is not None:
+                mask |= 1 << position
+        return mask
+
+    def keys_for(self, mask: int) -> List[str]:
+        return [self.keys[position] for position in self.positions_in(mask & self.all_mask)]
+
+    def groups_for(self, mask: int) -> List[Dict[str, Any]]:
+        return [self.groups[position] for position in self.positions_in(mask & self.all_mask)]
+
+    def remap(self, mask: int, other: 'ManagedGroupIndex') -> int:
+        """Translate a bitset over other into one over this index, by destination id."""
+        if other is self:
+            return mask
+        return self.mask_for(other.keys_for(mask))
+
+
+def load(cursor: sqlite3.Cursor, version: int) -> ManagedGroupIndex:
+    """Build an index from the active managed_groups rows."""
+    cursor.execute('''
+        SELECT * FROM managed_groups
+        WHERE is_active = 1
+        ORDER BY category, group_name
+    ''')
+    columns = [column[0] for column in cursor.description]
+    return ManagedGroupIndex((dict(zip(columns, row)) for row in cursor.fetchall()), version)
+
+
+# Process-wide indexes by database path, shared by all DatabaseManagers
+_indexes: Dict[str, ManagedGroupIndex] = {}
+
+
+def cached(db_path: str) -> Optional[ManagedGroupIndex]:
+    return _indexes.get(db_path)
+
+
+def remember(db_path: str, index: ManagedGroupIndex) -> None:
+    _indexes[db_path] = index
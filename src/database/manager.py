@@ -3,6 +3,30 @@ import asyncio
 from datetime import datetime, timedelta
 from typing import List, Optional, Dict, Any
 
+from src.database import group_index, slot_destinations, worker_health
+from src.database.cache import MISSING, UserLookupCache
+from src.database.group_index import ManagedGroupIndex
+from src.monitoring.metrics import metrics, timed
+
+# Latency of the hot-path DatabaseManager methods, labelled by method name
+DB_QUERY_SECONDS = metrics.histogram('db_query_seconds', 'DatabaseManager method latency', ['method'])
+
+# Ad slots per subscription tier
+TIER_SLOTS = {
+    'basic': 1,
+    'pro': 3,
+    'enterprise': 5
+}
+
+# Content of the admin slots created on first use
+ADMIN_SLOT_SAMPLE_CONTENT = [
+    "🚀 Welcome to AutoFarming Pro! Promote your services automatically.",
+    "📈 Boost your business with automated posting to premium groups.",
+    "💎 Premium advertising slots for maximum visibility.",
+    "🎯 Targeted promotion to high-quality Telegram groups.",
+    "⚡ Lightning-fast automated posting service."
+]
+
 class DatabaseManager:
     """Database manager for AutoFarming Bot.
     
@@ -10,16 +34,22 @@ class DatabaseManager:
     ad slots, payments, and analytics with proper error handling and logging.
     """
 
-    def __init__(self, db_path: str, logger):
+    backend = 'sqlite'
+
+    def __init__(self, db_path: str, logger, cache_ttl_seconds: float = 30.0,
+                 cache_max_entries: int = 4096):
         """Initialize database manager.
         
         Args:
             db_path: Path to SQLite database file
             logger: Logger instance for error logging
+            cache_ttl_seconds: TTL for cached subscription/slot lookups
+            cache_max_entries: Maximum number of cached per-user lookups
         """
         self.db_path = db_path
         self.logger = logger
         self._lock = None
+        self._user_cache = UserLookupCache(max_entries=cache_max_entries, ttl_seconds=cache_ttl_seconds)
 
     def _get_lock(self):
         """Get or create the async lock."""
@@ -27,6 +57,18 @@ class DatabaseManager:
             self._lock = asyncio.Lock()
         return self._lock
 
+    def invalidate_user_cache(self, user_id: int) -> None:
+        """Drop cached subscription and slot lookups for a user."""
+        self._user_cache.invalidate_user(user_id)
+
+    def invalidate_slot_cache(self, slot_id: int) -> None:
+        """Drop cached slot lookups for the user owning a slot."""
+        self._user_cache.invalidate_slot(slot_id)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for the per-user lookup cache."""
+        return self._user_cache.stats()
+
     def initialize_sync(self) -> None:
         """Initialize database with required tables (synchronous version).
         
@@ -178,13 +220,16 @@ class DatabaseManager:
                 ('ad_slots', 'updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'),
                 ('ad_slots', 'category', 'TEXT'),
                 ('slot_destinations', 'updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'),
-                ('users', 'updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP')
+                ('users', 'updated_at', 'TIMESTAMP DEFAULT CURRENT_TIMESTAMP'),
+                ('worker_activity_log', 'destination_id', 'TEXT'),
+                ('worker_activity_log', 'error', 'TEXT'),
+                ('worker_cooldowns', 'cooldown_until', 'TIMESTAMP')
             ]
             
             for table, column, definition in missing_columns:
                 try:
                     cursor.execute(f'ALTER TABLE {table} ADD COLUMN {column} {definition}')
-                    self.logger.info(f"Added {column} column to {table} table")
+                    self.logger.info("Added %s column to %s table", column, table)
                 except Exception as e:
                     # Column might already exist, which is fine
                     pass
@@ -234,6 +279,46 @@ class DatabaseManager:
                     updated_at TEXT
                 )
             ''')
+
+            # Outbox for user notifications produced by background sweeps
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS notification_queue (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id INTEGER NOT NULL,
+                    notification_type TEXT NOT NULL,
+                    dedupe_key TEXT NOT NULL DEFAULT '',
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    sent_at TIMESTAMP,
+                    UNIQUE (user_id, notification_type, dedupe_key)
+                )
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_notification_queue_pending
+                ON notification_queue (sent_at, notification_type)
+            ''')
+
+            # Indexes used by the expired subscription sweep
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_subscription_expires ON users (subscription_expires)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_ad_slots_user_id ON ad_slots (user_id)')
+
+            # One row per (slot_id, destination_id); compacts old tombstones once
+            for table in slot_destinations.TABLES:
+                try:
+                    removed = slot_destinations.ensure_unique_index(cursor, table)
+                    if removed:
+                        self.logger.info("🧹 Compacted %s: removed %s duplicate/inactive rows", table, removed)
+                except sqlite3.Error as e:
+                    self.logger.warning(f"Could not add unique destination index on {table}: {e}")
+
+            # Version counter bumped by managed_groups triggers (group index)
+            group_index.ensure_version_tracking(cursor)
+
+            # Per-worker health rollup, updated as posting outcomes arrive
+            cursor.execute(worker_health.SNAPSHOT_SCHEMA)
+            cursor.execute('SELECT worker_id FROM worker_cooldowns')
+            if worker_health.seed(cursor, [row[0] for row in cursor.fetchall()]):
+                worker_health.refresh_bans(cursor)
+
             conn.commit()
             conn.close()
             self.logger.info("Database initialized successfully")
@@ -319,14 +404,14 @@ class DatabaseManager:
                         SET username = ?, first_name = ?, last_name = ?, updated_at = ?
                         WHERE user_id = ?
                     ''', (username, first_name, last_name, datetime.now(), user_id))
-                    self.logger.info(f"User {user_id} updated successfully (preserved subscription)")
+                    self.logger.info("User %s updated successfully (preserved subscription)", user_id)
                 else:
                     # User doesn't exist - INSERT new user
                     cursor.execute('''
                         INSERT INTO users (user_id, username, first_name, last_name, created_at, updated_at)
                         VALUES (?, ?, ?, ?, ?, ?)
                     ''', (user_id, username, first_name, last_name, datetime.now(), datetime.now()))
-                    self.logger.info(f"User {user_id} created successfully")
+                    self.logger.info("User %s created successfully", user_id)
                 
                 conn.commit()
                 conn.close()
@@ -335,8 +420,15 @@ class DatabaseManager:
                 self.logger.error(f"Error creating/updating user {user_id}: {e}")
                 return False
 
+    @timed(DB_QUERY_SECONDS)
     async def get_user_subscription(self, user_id: int, use_lock: bool = True) -> Optional[Dict[str, Any]]:
         """Get user's subscription information."""
+        cached = self._user_cache.get(UserLookupCache.SUBSCRIPTION, user_id)
+        if cached is not MISSING:
+            if cached:
+                # Expiry is time-dependent, so re-evaluate it on every hit
+                cached['is_active'] = datetime.fromisoformat(cached['expires']) > datetime.now()
+            return cached
         if use_lock:
             async with self._get_lock():
                 return await self._get_user_subscription_internal(user_id)
@@ -356,22 +448,18 @@ class DatabaseManager:
             conn.close()
             
             if not row or not row['subscription_tier'] or not row['subscription_expires']:
+                self._user_cache.set(UserLookupCache.SUBSCRIPTION, user_id, None)
                 return None
             
             # Check if subscription is still active
             expires_at = datetime.fromisoformat(row['subscription_expires'])
-            if expires_at > datetime.now():
-                return {
-                    'tier': row['subscription_tier'],
-                    'expires': row['subscription_expires'],
-                    'is_active': True
-                }
-            else:
-                return {
-                    'tier': row['subscription_tier'],
-                    'expires': row['subscription_expires'],
-                    'is_active': False
-                }
+            subscription = {
+                'tier': row['subscription_tier'],
+                'expires': row['subscription_expires'],
+                'is_active': expires_at > datetime.now()
+            }
+            self._user_cache.set(UserLookupCache.SUBSCRIPTION, user_id, subscription)
+            return subscription
                 
         except Exception as e:
             self.logger.error(f"Error getting user subscription for {user_id}: {e}")
@@ -390,6 +478,7 @@ class DatabaseManager:
                 ''', (tier, expires, datetime.now(), user_id))
                 conn.commit()
                 conn.close()
+                self._user_cache.invalidate_user(user_id)
                 return True
             except Exception as e:
                 self.logger.error(f"Error updating subscription: {e}")
@@ -397,6 +486,9 @@ class DatabaseManager:
 
     async def get_user_slots(self, user_id: int) -> List[Dict[str, Any]]:
         """Get all ad slots for a user."""
+        cached = self._user_cache.get(UserLookupCache.SLOTS, user_id)
+        if cached is not MISSING:
+            return cached
         async with self._get_lock():
             try:
                 conn = sqlite3.connect(self.db_path)
@@ -416,6 +508,7 @@ class DatabaseManager:
                     slot['destinations'] = [dict(row) for row in cursor.fetchall()]
                 
                 conn.close()
+                self._user_cache.set(UserLookupCache.SLOTS, user_id, slots)
                 return slots
             except Exception as e:
                 self.logger.error(f"Error getting user slots: {e}")
@@ -434,6 +527,7 @@ class DatabaseManager:
                 slot_id = cursor.lastrowid
                 conn.commit()
                 conn.close()
+                self._user_cache.invalidate_user(user_id)
                 return slot_id
             except Exception as e:
                 self.logger.error(f"Error creating ad slot: {e}")
@@ -452,6 +546,7 @@ class DatabaseManager:
                 ''', (content, file_id, datetime.now(), slot_id))
                 conn.commit()
                 conn.close()
+                self._user_cache.invalidate_slot(slot_id)
                 return True
             except Exception as e:
                 self.logger.error(f"Error updating slot content: {e}")
@@ -474,12 +569,19 @@ class DatabaseManager:
                     conn.close()
                     return False
                 
+                # Reactivates a previously removed row instead of adding another
                 cursor.execute('''
-                    INSERT INTO slot_destinations (slot_id, destination_type, destination_id, destination_name, created_at)
-                    VALUES (?, ?, ?, ?, ?)
+                    INSERT INTO slot_destinations (slot_id, destination_type, destination_id, destination_name, is_active, created_at)
+                    VALUES (?, ?, ?, ?, 1, ?)
+                    ON CONFLICT(slot_id, destination_id) DO UPDATE SET
+                        destination_type = excluded.destination_type,
+                        destination_name = excluded.destination_name,
+                        is_active = 1,
+                        updated_at = excluded.created_at
                 ''', (slot_id, dest_type, dest_id, dest_name, datetime.now()))
                 conn.commit()
                 conn.close()
+                self._user_cache.invalidate_slot(slot_id)
                 return True
             except Exception as e:
                 self.logger.error(f"Error adding slot destination: {e}")
@@ -498,11 +600,13 @@ class DatabaseManager:
                 ''', (datetime.now(), slot_id, dest_id))
                 conn.commit()
                 conn.close()
+                self._user_cache.invalidate_slot(slot_id)
                 return True
             except Exception as e:
                 self.logger.error(f"Error removing slot destination: {e}")
                 return False
 
+    @timed(DB_QUERY_SECONDS)
     async def get_slot_destinations(self, slot_id: int, slot_type: str = 'user') -> List[Dict[str, Any]]:
         """Get destinations for a slot (updated method with slot_type support)."""
         async with self._get_lock():
@@ -543,6 +647,7 @@ class DatabaseManager:
                 ''', (datetime.now(), slot_id))
                 conn.commit()
                 conn.close()
+                self._user_cache.invalidate_slot(slot_id)
                 return True
             except Exception as e:
                 self.logger.error(f"Error activating slot: {e}")
@@ -561,6 +666,7 @@ class DatabaseManager:
                 ''', (datetime.now(), slot_id))
                 conn.commit()
                 conn.close()
+                self._user_cache.invalidate_slot(slot_id)
                 return True
             except Exception as e:
                 self.logger.error(f"Error deactivating slot: {e}")
@@ -665,6 +771,7 @@ class DatabaseManager:
                 self.logger.error(f"Error recording payment: {e}")
                 return False
 
+    @timed(DB_QUERY_SECONDS)
     async def update_payment_status(self, payment_id: str, status: str) -> bool:
         """Update payment status and last checked time."""
         async with self._get_lock():
@@ -730,6 +837,7 @@ class DatabaseManager:
                 self.logger.error(f"Error updating payment last_checked: {e}")
                 return False
 
+    @timed(DB_QUERY_SECONDS)
     async def get_payment(self, payment_id: str) -> Optional[Dict[str, Any]]:
         """Get payment by ID."""
         async with self._get_lock():
@@ -747,6 +855,7 @@ class DatabaseManager:
                 self.logger.error(f"Error getting payment: {e}")
                 return None
 
+    @timed(DB_QUERY_SECONDS)
     async def get_pending_payments(self, age_limit_minutes: int) -> List[Dict[str, Any]]:
         """Get pending payments older than specified minutes."""
         async with self._get_lock():
@@ -894,6 +1003,7 @@ class DatabaseManager:
                     'revenue_this_month': 0.0
                 }
 
+    @timed(DB_QUERY_SECONDS)
     async def get_active_ads_to_send(self) -> List[Dict[str, Any]]:
         """Get active ad slots that are due for posting (both user and admin slots)."""
         async with self._get_lock():
@@ -950,6 +1060,7 @@ class DatabaseManager:
                 self.logger.error(f"Error getting active ads to send: {e}")
                 return []
 
+    @timed(DB_QUERY_SECONDS)
     async def update_slot_last_sent(self, slot_id: int, slot_type: str = 'user') -> bool:
         """Update the last_sent_at timestamp for a slot (user or admin)."""
         async with self._get_lock():
@@ -975,7 +1086,9 @@ class DatabaseManager:
                 
                 conn.commit()
                 conn.close()
-                self.logger.info(f"✅ Updated last_sent_at for {slot_type} slot {slot_id} to {current_time}")
+                if slot_type != 'admin':
+                    self._user_cache.invalidate_slot(slot_id)
+                self.logger.info("✅ Updated last_sent_at for %s slot %s to %s", slot_type, slot_id, current_time)
                 return True
             except Exception as e:
                 self.logger.error(f"Error updating slot last sent: {e}")
@@ -999,33 +1112,72 @@ class DatabaseManager:
                 self.logger.error(f"Error logging ad post: {e}")
                 return False
 
-    async def get_managed_groups(self, category: str = None) -> List[Dict[str, Any]]:
-        """Get managed groups, optionally filtered by category."""
+    async def get_slot_post_stats(self, slot_ids: List[int]) -> Dict[str, int]:
+        """Count logged ad posts (total, successful, failed) for the given slots."""
+        stats = {'total': 0, 'successful': 0, 'failed': 0}
+        if not slot_ids:
+            return stats
         async with self._get_lock():
             try:
                 conn = sqlite3.connect(self.db_path)
-                conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
-                
-                if category:
-                    cursor.execute('''
-                        SELECT * FROM managed_groups 
-                        WHERE category = ? AND is_active = 1
-                        ORDER BY group_name
-                    ''', (category,))
-                else:
-                    cursor.execute('''
-                        SELECT * FROM managed_groups 
-                        WHERE is_active = 1
-                        ORDER BY category, group_name
-                    ''')
-                
-                groups = [dict(row) for row in cursor.fetchall()]
+                cursor.execute(f'''
+                    SELECT COUNT(*), SUM(CASE WHEN success = 1 THEN 1 ELSE 0 END),
+                           SUM(CASE WHEN success = 0 THEN 1 ELSE 0 END)
+                    FROM ad_posts
+                    WHERE slot_id IN ({','.join(['?'] * len(slot_ids))})
+                ''', slot_ids)
+                row = cursor.fetchone()
                 conn.close()
-                return groups
+                if row:
+                    stats = {'total': row[0] or 0, 'successful': row[1] or 0, 'failed': row[2] or 0}
+                return stats
             except Exception as e:
-                self.logger.error(f"Error getting managed groups: {e}")
-                return []
+                self.logger.error(f"Error getting slot post stats: {e}")
+                return stats
+
+    async def get_managed_group_index(self) -> ManagedGroupIndex:
+        """Get the process-wide managed-group index, rebuilt only after group writes.
+
+        Any write to managed_groups (from any process) bumps its
+        data_versions counter, so a current index costs one primary-key read.
+        """
+        index = group_index.cached(self.db_path)
+        async with self._get_lock():
+            try:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                version = group_index.read_version(cursor)
+                if index is None or index.version != version:
+                    index = group_index.load(cursor, version)
+                    group_index.remember(self.db_path, index)
+                conn.close()
+                return index
+            except Exception as e:
+                self.logger.error(f"Error loading managed group index: {e}")
+                return index or ManagedGroupIndex([])
+
+    async def get_managed_groups(self, category: str = None) -> List[Dict[str, Any]]:
+        """Get managed groups, optionally filtered by category."""
+        index = await self.get_managed_group_index()
+        groups = index.in_category(category) if category else index.groups
+        return [dict(group) for group in groups]
+
+    async def get_managed_group_categories(self) -> List[str]:
+        """Get the categories that have active managed groups."""
+        index = await self.get_managed_group_index()
+        return index.categories()
+
+    async def find_managed_group(self, identifier: str) -> Optional[Dict[str, Any]]:
+        """Find an active managed group by group id, username or t.me link."""
+        index = await self.get_managed_group_index()
+        group = index.find(identifier)
+        return dict(group) if group else None
+
+    async def search_managed_groups(self, prefix: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Find active managed groups whose username or name starts with prefix."""
+        index = await self.get_managed_group_index()
+        return [dict(group) for group in index.search(prefix, limit)]
 
     async def add_managed_group(self, group_id: str, group_name: str, category: str) -> bool:
         """Add a managed group."""
@@ -1044,6 +1196,77 @@ class DatabaseManager:
                 self.logger.error(f"Error adding managed group: {e}")
                 return False
 
+    async def bulk_upsert_managed_groups(self, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Add or update many managed groups in one transaction.
+
+        Rows are dicts with group_id, category and optional group_name
+        (defaults to group_id). Rows without category, or with an empty,
+        overlong or whitespace-containing group_id, are skipped as invalid;
+        repeated group_ids keep the first occurrence. Existing groups are
+        updated (and reactivated) only if their name, category or active
+        flag differ.
+
+        Returns:
+            Counts: added, updated, unchanged, skipped (invalid + duplicates),
+            invalid, duplicates, and errors (1 if the transaction failed)
+        """
+        groups, counts = group_index.prepare_upsert(rows)
+        if not groups:
+            return counts
+
+        async with self._get_lock():
+            conn = None
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+                cursor.execute('BEGIN IMMEDIATE')
+
+                existing = {}
+                group_ids = list(groups)
+                for start in range(0, len(group_ids), 500):
+                    chunk = group_ids[start:start + 500]
+                    cursor.execute(f'''
+                        SELECT group_id, group_name, category, is_active FROM managed_groups
+                        WHERE group_id IN ({', '.join('?' for _ in chunk)})
+                    ''', chunk)
+                    existing.update((found[0], found[1:]) for found in cursor.fetchall())
+
+                changes = []
+                for group_id, (group_name, category) in groups.items():
+                    current = existing.get(group_id)
+                    if current is None:
+                        counts['added'] += 1
+                    elif current[0] == group_name and current[1] == category and current[2]:
+                        counts['unchanged'] += 1
+                        continue
+                    else:
+                        counts['updated'] += 1
+                    changes.append((group_id, group_name, category))
+
+                cursor.executemany('''
+                    INSERT INTO managed_groups (group_id, group_name, category, is_active)
+                    VALUES (?, ?, ?, 1)
+                    ON CONFLICT(group_id) DO UPDATE SET
+                        group_name = excluded.group_name,
+                        category = excluded.category,
+                        is_active = 1
+                ''', changes)
+                conn.commit()
+                self.logger.info(
+                    "✅ Bulk upserted managed groups: %s added, %s updated, %s unchanged, %s skipped",
+                    counts['added'], counts['updated'], counts['unchanged'], counts['skipped']
+                )
+                return counts
+            except Exception as e:
+                if conn:
+                    conn.rollback()
+                self.logger.error(f"Error bulk upserting managed groups: {e}")
+                counts.update(added=0, updated=0, unchanged=0, errors=1)
+                return counts
+            finally:
+                if conn:
+                    conn.close()
+
     async def remove_managed_group(self, group_name: str) -> bool:
         """Remove a managed group."""
         async with self._get_lock():
@@ -1060,6 +1283,7 @@ class DatabaseManager:
                 self.logger.error(f"Error removing managed group: {e}")
                 return False
 
+    @timed(DB_QUERY_SECONDS)
     async def activate_subscription(self, user_id: int, tier: str, duration_days: int = 30) -> bool:
         """Activate or extend user subscription with comprehensive error handling and transaction safety."""
         async with self._get_lock():
@@ -1076,7 +1300,7 @@ class DatabaseManager:
                 
                 # FIX: Get current subscription with timeout
                 try:
-                    current_sub = await asyncio.wait_for(self.get_user_subscription(user_id, use_lock=False), timeout=10.0)
+                    current_sub = await asyncio.wait_for(self._get_user_subscription_internal(user_id), timeout=10.0)
                 except asyncio.TimeoutError:
                     self.logger.error(f"❌ Timeout getting subscription for user {user_id}")
                     return False
@@ -1105,12 +1329,12 @@ class DatabaseManager:
                     # FIX: Check if user exists, create if not
                     cursor.execute('SELECT user_id FROM users WHERE user_id = ?', (user_id,))
                     if not cursor.fetchone():
-                        self.logger.info(f"📝 User {user_id} not found, creating user first...")
+                        self.logger.info("📝 User %s not found, creating user first...", user_id)
                         cursor.execute('''
                             INSERT INTO users (user_id, username, first_name, last_name, subscription_tier, subscription_expires, created_at, updated_at)
                             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                         ''', (user_id, f"user_{user_id}", "User", None, tier, new_expiry.isoformat(), datetime.now().isoformat(), datetime.now().isoformat()))
-                        self.logger.info(f"✅ User {user_id} created with subscription")
+                        self.logger.info("✅ User %s created with subscription", user_id)
                     else:
                         # User exists, update subscription
                         cursor.execute('''
@@ -1127,14 +1351,15 @@ class DatabaseManager:
                     
                     # FIX: Commit transaction
                     cursor.execute('COMMIT')
+                    self._user_cache.invalidate_user(user_id)
                     
-                    self.logger.info(f"✅ Activated {tier} subscription for user {user_id} until {new_expiry}")
+                    self.logger.info("✅ Activated %s subscription for user %s until %s", tier, user_id, new_expiry)
                     
                     # Automatically create ad slots for the new subscription
                     try:
                         ad_slots = await self._get_or_create_ad_slots_internal(user_id, tier, existing_conn=conn)
                         if ad_slots:
-                            self.logger.info(f"✅ Created {len(ad_slots)} ad slots for user {user_id}")
+                            self.logger.info("✅ Created %s ad slots for user %s", len(ad_slots), user_id)
                         else:
                             self.logger.warning(f"⚠️ Failed to create ad slots for user {user_id}")
                     except Exception as slot_error:
@@ -1203,12 +1428,12 @@ class DatabaseManager:
                 # FIX: Check if user exists, create if not
                 cursor.execute('SELECT user_id FROM users WHERE user_id = ?', (user_id,))
                 if not cursor.fetchone():
-                    self.logger.info(f"📝 User {user_id} not found, creating user first...")
+                    self.logger.info("📝 User %s not found, creating user first...", user_id)
                     cursor.execute('''
                         INSERT INTO users (user_id, username, first_name, last_name, subscription_tier, subscription_expires, created_at, updated_at)
                         VALUES (?, ?, ?, ?, ?, ?, ?, ?)
                     ''', (user_id, f"user_{user_id}", "User", None, tier, new_expiry.isoformat(), datetime.now().isoformat(), datetime.now().isoformat()))
-                    self.logger.info(f"✅ User {user_id} created with subscription")
+                    self.logger.info("✅ User %s created with subscription", user_id)
                 else:
                     # User exists, update subscription
                     cursor.execute('''
@@ -1225,14 +1450,15 @@ class DatabaseManager:
                 
                 # FIX: Commit transaction
                 cursor.execute('COMMIT')
+                self._user_cache.invalidate_user(user_id)
                 
-                self.logger.info(f"✅ Activated {tier} subscription for user {user_id} until {new_expiry}")
+                self.logger.info("✅ Activated %s subscription for user %s until %s", tier, user_id, new_expiry)
                 
                 # Automatically create ad slots for the new subscription
                 try:
                     ad_slots = await self._get_or_create_ad_slots_internal(user_id, tier)
                     if ad_slots:
-                        self.logger.info(f"✅ Created {len(ad_slots)} ad slots for user {user_id}")
+                        self.logger.info("✅ Created %s ad slots for user %s", len(ad_slots), user_id)
                     else:
                         self.logger.warning(f"⚠️ Failed to create ad slots for user {user_id}")
                 except Exception as slot_error:
@@ -1274,14 +1500,7 @@ class DatabaseManager:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
             
-            # Define slot counts per tier
-            tier_slots = {
-                'basic': 1,
-                'pro': 3,
-                'enterprise': 5
-            }
-            
-            target_slots = tier_slots.get(tier, 1)
+            target_slots = TIER_SLOTS.get(tier, 1)
             
             # Check existing slots
             cursor.execute("""
@@ -1292,7 +1511,7 @@ class DatabaseManager:
             """, (user_id,))
             
             existing_slots = cursor.fetchall()
-            self.logger.info(f"Found {len(existing_slots)} existing ad slots for user {user_id}")
+            self.logger.info("Found %s existing ad slots for user %s", len(existing_slots), user_id)
             
             # Create missing slots
             slots_created = 0
@@ -1305,12 +1524,16 @@ class DatabaseManager:
                         VALUES (?, ?, ?, ?, ?, ?)
                     """, (user_id, slot_number, "", True, 60, datetime.now()))
                     slots_created += 1
-                    self.logger.info(f"Created ad slot {slot_number} for user {user_id}")
+                    self.logger.info("Created ad slot %s for user %s", slot_number, user_id)
             
+            if existing_conn and slots_created:
+                # The caller has already committed its own transaction
+                conn.commit()
+
             if slots_created > 0:
-                self.logger.info(f"Created {slots_created} new ad slots for user {user_id}")
+                self.logger.info("Created %s new ad slots for user %s", slots_created, user_id)
             else:
-                self.logger.info(f"No new ad slots needed for user {user_id} - all slots already exist")
+                self.logger.info("No new ad slots needed for user %s - all slots already exist", user_id)
             
             # Commit the transaction to ensure slots are saved (only if we created the connection)
             if not existing_conn:
@@ -1331,9 +1554,9 @@ class DatabaseManager:
             """, (user_id,))
             
             all_slots = cursor.fetchall()
-            self.logger.info(f"After commit - found {len(all_slots)} slots for user {user_id}")
+            self.logger.info("After commit - found %s slots for user %s", len(all_slots), user_id)
             for slot in all_slots:
-                self.logger.info(f"  Slot: ID={slot['id']}, Number={slot['slot_number']}")
+                self.logger.info("  Slot: ID=%s, Number=%s", slot['id'], slot['slot_number'])
             
             # Close connection only if we created it
             if not existing_conn:
@@ -1352,7 +1575,8 @@ class DatabaseManager:
                     'last_sent_at': slot['last_sent_at']
                 })
             
-            self.logger.info(f"Retrieved {len(slots_list)} ad slots for user {user_id}")
+            self._user_cache.invalidate_user(user_id)
+            self.logger.info("Retrieved %s ad slots for user %s", len(slots_list), user_id)
             return slots_list
             
         except Exception as e:
@@ -1369,7 +1593,7 @@ class DatabaseManager:
                 conn.commit()
                 conn.close()
                 
-                self.logger.info(f"✅ Deleted payment {payment_id}")
+                self.logger.info("✅ Deleted payment %s", payment_id)
                 return True
                 
             except Exception as e:
@@ -1389,8 +1613,9 @@ class DatabaseManager:
                 ''', (datetime.now(), user_id))
                 conn.commit()
                 conn.close()
+                self._user_cache.invalidate_user(user_id)
                 
-                self.logger.info(f"✅ Deleted subscription for user {user_id}")
+                self.logger.info("✅ Deleted subscription for user %s", user_id)
                 return True
                 
             except Exception as e:
@@ -1632,7 +1857,7 @@ class DatabaseManager:
                 existing_user = cursor.fetchone()
                 
                 if existing_user:
-                    self.logger.info(f"✅ User {user_id} already exists in database")
+                    self.logger.info("✅ User %s already exists in database", user_id)
                     return True  # User already exists
                 
                 # FIX: Create new user with proper error handling
@@ -1647,7 +1872,7 @@ class DatabaseManager:
                     return False
                 
                 conn.commit()
-                self.logger.info(f"✅ Created user {user_id} in database")
+                self.logger.info("✅ Created user %s in database", user_id)
                 return True
                 
             except sqlite3.IntegrityError as e:
@@ -1675,6 +1900,9 @@ class DatabaseManager:
         Returns:
             List of ad slot dictionaries
         """
+        cached = self._user_cache.get(UserLookupCache.AD_SLOTS, user_id)
+        if cached is not MISSING:
+            return cached
         async with self._get_lock():
             try:
                 conn = sqlite3.connect(self.db_path)
@@ -1705,6 +1933,7 @@ class DatabaseManager:
                         'created_at': slot['created_at']
                     })
                 
+                self._user_cache.set(UserLookupCache.AD_SLOTS, user_id, slots_list)
                 return slots_list
                 
             except Exception as e:
@@ -1727,14 +1956,7 @@ class DatabaseManager:
                 conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
                 
-                # Define slot counts per tier
-                tier_slots = {
-                    'basic': 1,
-                    'pro': 3,
-                    'enterprise': 5
-                }
-                
-                target_slots = tier_slots.get(tier, 1)
+                target_slots = TIER_SLOTS.get(tier, 1)
                 
                 # Check existing slots
                 cursor.execute("""
@@ -1755,7 +1977,8 @@ class DatabaseManager:
                             INSERT INTO ad_slots (user_id, slot_number, content, is_active, interval_minutes, created_at)
                             VALUES (?, ?, ?, ?, ?, ?)
                         """, (user_id, slot_number, "", True, 60, datetime.now()))
-                        self.logger.info(f"Created ad slot {slot_number} for user {user_id}")
+                        self.logger.info("Created ad slot %s for user %s", slot_number, user_id)
+                conn.commit()
                 
                 # Get all slots (including newly created ones)
                 cursor.execute("""
@@ -1781,7 +2004,8 @@ class DatabaseManager:
                         'last_sent_at': slot['last_sent_at']
                     })
                 
-                self.logger.info(f"Retrieved {len(slots_list)} ad slots for user {user_id}")
+                self._user_cache.invalidate_user(user_id)
+                self.logger.info("Retrieved %s ad slots for user %s", len(slots_list), user_id)
                 return slots_list
                 
             except Exception as e:
@@ -1891,7 +2115,8 @@ class DatabaseManager:
                 conn.close()
                 
                 if cursor.rowcount > 0:
-                    self.logger.info(f"✅ Updated category for ad slot {slot_id} to {category}")
+                    self._user_cache.invalidate_slot(slot_id)
+                    self.logger.info("✅ Updated category for ad slot %s to %s", slot_id, category)
                     return True
                 else:
                     self.logger.warning(f"⚠️ No ad slot found with ID {slot_id}")
@@ -1927,7 +2152,8 @@ class DatabaseManager:
                 conn.close()
                 
                 if cursor.rowcount > 0:
-                    self.logger.info(f"✅ Updated content for ad slot {slot_id}")
+                    self._user_cache.invalidate_slot(slot_id)
+                    self.logger.info("✅ Updated content for ad slot %s", slot_id)
                     return True
                 else:
                     self.logger.warning(f"⚠️ No ad slot found with ID {slot_id}")
@@ -1966,7 +2192,9 @@ class DatabaseManager:
                 conn.close()
                 
                 if cursor.rowcount > 0:
-                    self.logger.info(f"✅ Updated schedule for {slot_type} slot {slot_id}: {interval_minutes} minutes")
+                    if slot_type != 'admin':
+                        self._user_cache.invalidate_slot(slot_id)
+                    self.logger.info("✅ Updated schedule for %s slot %s: %s minutes", slot_type, slot_id, interval_minutes)
                     return True
                 else:
                     self.logger.warning(f"⚠️ No {slot_type} slot found with ID {slot_id}")
@@ -2001,8 +2229,9 @@ class DatabaseManager:
                 conn.close()
                 
                 if cursor.rowcount > 0:
+                    self._user_cache.invalidate_slot(slot_id)
                     status_text = "activated" if is_active else "deactivated"
-                    self.logger.info(f"✅ {status_text.capitalize()} ad slot {slot_id}")
+                    self.logger.info("✅ %s ad slot %s", status_text.capitalize(), slot_id)
                     return True
                 else:
                     self.logger.warning(f"⚠️ No ad slot found with ID {slot_id}")
@@ -2074,34 +2303,19 @@ class DatabaseManager:
                 # Start transaction
                 cursor.execute('BEGIN TRANSACTION')
                 
-                # First, deactivate all existing destinations for this slot
-                cursor.execute("""
-                    UPDATE slot_destinations 
-                    SET is_active = 0
-                    WHERE slot_id = ?
-                """, (slot_id,))
-                
-                # Insert new destinations
-                for dest in destinations:
-                    cursor.execute("""
-                        INSERT INTO slot_destinations 
-                        (slot_id, destination_type, destination_id, destination_name, alias, is_active, created_at)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        slot_id,
-                        dest.get('destination_type', 'group'),
-                        dest.get('destination_id'),
-                        dest.get('destination_name'),
-                        dest.get('alias'),
-                        1,  # is_active
-                        datetime.now()
-                    ))
+                # Write only the added/removed/changed destinations
+                changes = slot_destinations.apply_diff(cursor, slot_destinations.USER_TABLE, slot_id, destinations)
                 
                 # Commit transaction
                 cursor.execute('COMMIT')
                 conn.close()
+                self._user_cache.invalidate_slot(slot_id)
                 
-                self.logger.info(f"✅ Updated {len(destinations)} destinations for slot {slot_id}")
+                self.logger.info(
+                    "✅ Updated destinations for slot %s: +%s -%s ~%s =%s",
+                    slot_id, changes['added'] + changes['reactivated'], changes['removed'],
+                    changes['updated'], changes['unchanged']
+                )
                 return True
                 
             except Exception as e:
@@ -2113,6 +2327,7 @@ class DatabaseManager:
                         pass
                 return False
 
+    @timed(DB_QUERY_SECONDS)
     async def get_slot_destinations(self, slot_id: int, slot_type: str = 'user') -> List[Dict[str, Any]]:
         """Get destinations for a slot (used by posting system).
         
@@ -2144,7 +2359,7 @@ class DatabaseManager:
                 destinations = [dict(row) for row in cursor.fetchall()]
                 conn.close()
                 
-                self.logger.info(f"get_slot_destinations({slot_id}, {slot_type}): Found {len(destinations)} destinations")
+                self.logger.info("get_slot_destinations(%s, %s): Found %s destinations", slot_id, slot_type, len(destinations))
                 return destinations
                 
             except Exception as e:
@@ -2221,7 +2436,7 @@ class DatabaseManager:
                 
                 conn.close()
                 
-                self.logger.info(f"📊 Retrieved bot statistics: {stats}")
+                self.logger.info("📊 Retrieved bot statistics: %s", stats)
                 return stats
                 
             except Exception as e:
@@ -2256,7 +2471,9 @@ class DatabaseManager:
                 conn.close()
                 
                 if cursor.rowcount > 0:
-                    self.logger.info(f"✅ Updated last_sent_at for {slot_type} slot {slot_id}")
+                    if slot_type != 'admin':
+                        self._user_cache.invalidate_slot(slot_id)
+                    self.logger.info("✅ Updated last_sent_at for %s slot %s", slot_type, slot_id)
                     return True
                 else:
                     self.logger.warning(f"⚠️ No {slot_type} slot found with ID {slot_id}")
@@ -2266,6 +2483,7 @@ class DatabaseManager:
                 self.logger.error(f"Error updating last_sent_at for {slot_type} slot {slot_id}: {e}")
                 return False
 
+    @timed(DB_QUERY_SECONDS)
     async def create_payment(self, payment_id: str, user_id: int, amount_usd: float, 
                               crypto_type: str, payment_provider: str, pay_to_address: str,
                               expected_amount_crypto: float, payment_url: str, expires_at: datetime,
@@ -2282,7 +2500,7 @@ class DatabaseManager:
                 conn.commit()
                 conn.close()
                 
-                self.logger.info(f"✅ Created payment {payment_id} for user {user_id}")
+                self.logger.info("✅ Created payment %s for user %s", payment_id, user_id)
                 return True
                 
             except Exception as e:
@@ -2346,7 +2564,7 @@ class DatabaseManager:
                         
                         if success:
                             results['recovered'] += 1
-                            self.logger.info(f"✅ Recovered subscription for user {user_id} from payment {payment_id}")
+                            self.logger.info("✅ Recovered subscription for user %s from payment %s", user_id, payment_id)
                         else:
                             results['failed'] += 1
                             results['errors'].append(f"Failed to activate subscription for user {user_id}")
@@ -2356,7 +2574,7 @@ class DatabaseManager:
                         results['errors'].append(f"Error recovering user {user_id}: {e}")
                         self.logger.error(f"❌ Error recovering subscription for user {user_id}: {e}")
                 
-                self.logger.info(f"📊 Recovery completed: {results['recovered']} recovered, {results['failed']} failed")
+                self.logger.info("📊 Recovery completed: %s recovered, %s failed", results['recovered'], results['failed'])
                 return results
                 
             except Exception as e:
@@ -2382,6 +2600,7 @@ class DatabaseManager:
             'ad_slot_flow': False,
             'missing_subscriptions': 0,
             'orphaned_payments': 0,
+            'lookup_cache': self.get_cache_stats(),
             'errors': []
         }
         
@@ -2504,85 +2723,182 @@ class DatabaseManager:
                         'created_at': sub['created_at']
                     })
                 
-                self.logger.info(f"Found {len(expired_list)} expired subscriptions")
+                self.logger.info("Found %s expired subscriptions", len(expired_list))
                 return expired_list
                 
             except Exception as e:
                 self.logger.error(f"Error getting expired subscriptions: {e}")
                 return []
 
+    @timed(DB_QUERY_SECONDS)
+    async def sweep_expired_subscriptions(self) -> Dict[str, Any]:
+        """Deactivate expired subscriptions in a single set-based pass.
+
+        Expired users are collected once into a temp table; ad slots are
+        deactivated, subscriptions cleared and one 'subscription_expired'
+        notification per expiry is queued with a handful of
+        ``... WHERE user_id IN (SELECT ...)`` statements in one transaction.
+        Running it again is a no-op, so the cost is O(changed rows).
+
+        Returns:
+            Dictionary with per-step counts and errors
+        """
+        results = {
+            'expired_users': 0,
+            'slots_deactivated': 0,
+            'subscriptions_cleared': 0,
+            'notifications_queued': 0,
+            'errors': []
+        }
+
+        async with self._get_lock():
+            conn = None
+            try:
+                now = datetime.now().isoformat()
+                conn = sqlite3.connect(self.db_path, timeout=30.0)
+                cursor = conn.cursor()
+
+                cursor.execute('BEGIN IMMEDIATE')
+                cursor.execute('CREATE TEMP TABLE IF NOT EXISTS expired_sweep (user_id INTEGER PRIMARY KEY)')
+                cursor.execute('DELETE FROM expired_sweep')
+                cursor.execute("""
+                    INSERT INTO expired_sweep (user_id)
+                    SELECT user_id FROM users
+                    WHERE subscription_tier IS NOT NULL
+                    AND subscription_expires IS NOT NULL
+                    AND subscription_expires < ?
+                """, (now,))
+                results['expired_users'] = cursor.rowcount
+
+                if results['expired_users']:
+                    cursor.execute("""
+                        INSERT OR IGNORE INTO notification_queue
+                            (user_id, notification_type, dedupe_key, created_at)
+                        SELECT user_id, 'subscription_expired', subscription_expires, ?
+                        FROM users
+                        WHERE user_id IN (SELECT user_id FROM expired_sweep)
+                    """, (now,))
+                    results['notifications_queued'] = cursor.rowcount
+
+                    cursor.execute("""
+                        UPDATE ad_slots
+                        SET is_active = 0, updated_at = ?
+                        WHERE is_active = 1
+                        AND user_id IN (SELECT user_id FROM expired_sweep)
+                    """, (now,))
+                    results['slots_deactivated'] = cursor.rowcount
+
+                    cursor.execute("""
+                        UPDATE users
+                        SET subscription_tier = NULL, subscription_expires = NULL, updated_at = ?
+                        WHERE user_id IN (SELECT user_id FROM expired_sweep)
+                    """, (now,))
+                    results['subscriptions_cleared'] = cursor.rowcount
+
+                cursor.execute('SELECT user_id FROM expired_sweep')
+                expired_user_ids = [row[0] for row in cursor.fetchall()]
+                cursor.execute('COMMIT')
+
+                for user_id in expired_user_ids:
+                    self._user_cache.invalidate_user(user_id)
+
+                if results['expired_users']:
+                    self.logger.info(
+                        "📊 Expiry sweep: %s subscriptions cleared, %s slots deactivated, %s notifications queued",
+                        results['subscriptions_cleared'], results['slots_deactivated'],
+                        results['notifications_queued']
+                    )
+                return results
+
+            except Exception as e:
+                self.logger.error(f"❌ Error in sweep_expired_subscriptions: {e}")
+                if conn:
+                    try:
+                        conn.rollback()
+                    except:
+                        pass
+                results['errors'].append(f"Sweep failed: {e}")
+                return results
+            finally:
+                if conn:
+                    conn.close()
+
     async def deactivate_expired_subscriptions(self) -> Dict[str, Any]:
         """Deactivate all expired subscriptions and their associated ad slots.
         
         Returns:
             Dictionary with deactivation results
         """
+        sweep = await self.sweep_expired_subscriptions()
+        return {
+            'total_expired': sweep['expired_users'],
+            'deactivated': sweep['subscriptions_cleared'],
+            'slots_deactivated': sweep['slots_deactivated'],
+            'notifications_queued': sweep['notifications_queued'],
+            'errors': sweep['errors']
+        }
+
+    async def get_pending_notifications(self, notification_type: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get queued notifications that have not been sent yet.
+        
+        Args:
+            notification_type: Only return this type (optional)
+            limit: Maximum number of notifications to return
+            
+        Returns:
+            List of notification dictionaries, oldest first
+        """
         async with self._get_lock():
             try:
                 conn = sqlite3.connect(self.db_path)
+                conn.row_factory = sqlite3.Row
                 cursor = conn.cursor()
-                
-                # Start transaction
-                cursor.execute('BEGIN TRANSACTION')
-                
-                # Get expired subscriptions
-                cursor.execute("""
-                    SELECT user_id, subscription_tier, subscription_expires
-                    FROM users 
-                    WHERE subscription_tier IS NOT NULL 
-                    AND subscription_expires IS NOT NULL
-                    AND subscription_expires < ?
-                """, (datetime.now().isoformat(),))
-                
-                expired_subs = cursor.fetchall()
-                
-                deactivated_count = 0
-                errors = []
-                
-                for sub in expired_subs:
-                    user_id = sub[0]
-                    try:
-                        # Clear subscription data
-                        cursor.execute("""
-                            UPDATE users 
-                            SET subscription_tier = NULL, subscription_expires = NULL, updated_at = ?
-                            WHERE user_id = ?
-                        """, (datetime.now().isoformat(), user_id))
-                        
-                        # Deactivate all ad slots for this user
-                        cursor.execute("""
-                            UPDATE ad_slots 
-                            SET is_active = 0, updated_at = ?
-                            WHERE user_id = ?
-                        """, (datetime.now().isoformat(), user_id))
-                        
-                        deactivated_count += 1
-                        self.logger.info(f"✅ Deactivated expired subscription for user {user_id}")
-                        
-                    except Exception as e:
-                        errors.append(f"Error deactivating user {user_id}: {e}")
-                        self.logger.error(f"❌ Error deactivating subscription for user {user_id}: {e}")
-                
-                # Commit transaction
-                cursor.execute('COMMIT')
+                if notification_type:
+                    cursor.execute("""
+                        SELECT * FROM notification_queue
+                        WHERE sent_at IS NULL AND notification_type = ?
+                        ORDER BY id LIMIT ?
+                    """, (notification_type, limit))
+                else:
+                    cursor.execute("""
+                        SELECT * FROM notification_queue
+                        WHERE sent_at IS NULL
+                        ORDER BY id LIMIT ?
+                    """, (limit,))
+                notifications = [dict(row) for row in cursor.fetchall()]
                 conn.close()
-                
-                results = {
-                    'total_expired': len(expired_subs),
-                    'deactivated': deactivated_count,
-                    'errors': errors
-                }
-                
-                self.logger.info(f"📊 Deactivation completed: {deactivated_count}/{len(expired_subs)} subscriptions deactivated")
-                return results
-                
+                return notifications
             except Exception as e:
-                self.logger.error(f"❌ Error in deactivate_expired_subscriptions: {e}")
-                return {
-                    'total_expired': 0,
-                    'deactivated': 0,
-                    'errors': [f"Deactivation failed: {e}"]
-                }
+                self.logger.error(f"Error getting pending notifications: {e}")
+                return []
+
+    async def mark_notifications_sent(self, notification_ids: List[int]) -> int:
+        """Mark queued notifications as sent.
+        
+        Args:
+            notification_ids: IDs from notification_queue
+            
+        Returns:
+            Number of notifications marked
+        """
+        if not notification_ids:
+            return 0
+        async with self._get_lock():
+            try:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                now = datetime.now().isoformat()
+                cursor.executemany(
+                    "UPDATE notification_queue SET sent_at = ? WHERE id = ? AND sent_at IS NULL",
+                    [(now, notification_id) for notification_id in notification_ids]
+                )
+                marked = cursor.rowcount
+                conn.commit()
+                conn.close()
+                return marked
+            except Exception as e:
+                self.logger.error(f"Error marking notifications sent: {e}")
+                return 0
 
     async def get_active_ad_slots(self, slot_type: str = 'user') -> List[Dict[str, Any]]:
         """Get all active ad slots.
@@ -2638,7 +2954,7 @@ class DatabaseManager:
                     
                     slots_list.append(slot_dict)
                 
-                self.logger.info(f"Found {len(slots_list)} active {slot_type} ad slots")
+                self.logger.info("Found %s active %s ad slots", len(slots_list), slot_type)
                 return slots_list
                 
             except Exception as e:
@@ -2690,7 +3006,7 @@ class DatabaseManager:
                         'created_at': dest['created_at']
                     })
                 
-                self.logger.info(f"Found {len(destinations_list)} destinations for {slot_type} slot {slot_id}")
+                self.logger.info("Found %s destinations for %s slot %s", len(destinations_list), slot_type, slot_id)
                 return destinations_list
                 
             except Exception as e:
@@ -2699,6 +3015,10 @@ class DatabaseManager:
 
     async def initialize_worker_limits(self, worker_id: int) -> bool:
         """Initialize worker limits for a new worker."""
+        return await self.bulk_initialize_worker_limits([worker_id])
+
+    async def bulk_initialize_worker_limits(self, worker_ids: List[int]) -> bool:
+        """Initialize worker limits for several workers in one transaction."""
         async with self._get_lock():
             try:
                 conn = sqlite3.connect(self.db_path, timeout=60)
@@ -2707,11 +3027,12 @@ class DatabaseManager:
                 cursor = conn.cursor()
                 
                 # Initialize in worker_usage table
-                cursor.execute('''
+                now = datetime.now()
+                cursor.executemany('''
                     INSERT OR IGNORE INTO worker_usage 
                     (worker_id, hourly_posts, daily_posts, hourly_limit, daily_limit, created_at)
                     VALUES (?, 0, 0, 15, 150, ?)
-                ''', (worker_id, datetime.now()))
+                ''', [(worker_id, now) for worker_id in worker_ids])
                 
                 # Note: worker_cooldowns table is created separately and doesn't need initialization
                 # Cooldowns are set dynamically when workers are used
@@ -2719,11 +3040,11 @@ class DatabaseManager:
                 conn.commit()
                 conn.close()
                 
-                self.logger.info(f"Initialized limits for worker {worker_id}")
+                self.logger.info("Initialized limits for workers %s", worker_ids)
                 return True
                 
             except Exception as e:
-                self.logger.error(f"Error initializing worker limits for {worker_id}: {e}")
+                self.logger.error(f"Error initializing worker limits for {worker_ids}: {e}")
                 return False
 
     async def get_worker_bans(self, worker_id: int = None, active_only: bool = True) -> List[Dict[str, Any]]:
@@ -2837,6 +3158,184 @@ class DatabaseManager:
                 self.logger.error(f"Error getting destination health summary: {e}")
                 return {'destinations': [], 'total_destinations': 0}
 
+    async def get_last_successful_posts(self) -> List[Dict[str, Any]]:
+        """Get the latest successful post time per slot for restart recovery."""
+        async with self._get_lock():
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=15)
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT slot_id, COALESCE(slot_type, 'user') AS slot_type, MAX(posted_at) AS last_posted_at
+                    FROM posting_history
+                    WHERE success = 1
+                    GROUP BY slot_id, COALESCE(slot_type, 'user')
+                ''')
+                
+                rows = [dict(row) for row in cursor.fetchall()]
+                conn.close()
+                return rows
+                
+            except Exception as e:
+                self.logger.error(f"Error getting last successful posts: {e}")
+                return []
+
+    async def set_slot_last_sent_times(self, updates: Dict[str, List[tuple]]) -> bool:
+        """Set last_sent_at of user and admin slots in one transaction.
+        
+        Args:
+            updates: 'user' and 'admin' lists of (last_sent_at, slot_id) pairs
+        """
+        if not updates.get('user') and not updates.get('admin'):
+            return True
+        async with self._get_lock():
+            conn = None
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=15)
+                conn.execute('BEGIN IMMEDIATE')
+                if updates.get('user'):
+                    conn.executemany('UPDATE ad_slots SET last_sent_at = ? WHERE id = ?', updates['user'])
+                if updates.get('admin'):
+                    conn.executemany('UPDATE admin_ad_slots SET last_sent_at = ? WHERE id = ?', updates['admin'])
+                conn.commit()
+                for _, slot_id in updates.get('user', []):
+                    self._user_cache.invalidate_slot(slot_id)
+                return True
+                
+            except Exception as e:
+                if conn:
+                    conn.rollback()
+                self.logger.error(f"Error updating slot timestamps: {e}")
+                return False
+            finally:
+                if conn:
+                    conn.close()
+
+    async def expire_worker_bans(self) -> List[Dict[str, Any]]:
+        """Deactivate bans whose estimated unban time has passed and return them."""
+        async with self._get_lock():
+            conn = None
+            try:
+                now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                conn = sqlite3.connect(self.db_path, timeout=15)
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                
+                conn.execute('BEGIN IMMEDIATE')
+                cursor.execute('''
+                    SELECT worker_id, destination_id, ban_type, estimated_unban_time AS expired_at
+                    FROM worker_bans
+                    WHERE is_active = 1 AND estimated_unban_time IS NOT NULL
+                    AND datetime(estimated_unban_time) < datetime(?)
+                ''', (now,))
+                expired = [dict(row) for row in cursor.fetchall()]
+                if expired:
+                    cursor.execute('''
+                        UPDATE worker_bans SET is_active = 0
+                        WHERE is_active = 1 AND estimated_unban_time IS NOT NULL
+                        AND datetime(estimated_unban_time) < datetime(?)
+                    ''', (now,))
+                    worker_health.refresh_bans(cursor, {ban['worker_id'] for ban in expired})
+                conn.commit()
+                return expired
+                
+            except Exception as e:
+                if conn:
+                    conn.rollback()
+                self.logger.error(f"Error expiring worker bans: {e}")
+                return []
+            finally:
+                if conn:
+                    conn.close()
+
+    async def get_active_worker_bans(self) -> List[Dict[str, Any]]:
+        """Get every active per-destination worker ban."""
+        async with self._get_lock():
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=15)
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT worker_id, destination_id, ban_type, banned_at, estimated_unban_time
+                    FROM worker_bans
+                    WHERE is_active = 1
+                    ORDER BY worker_id, id
+                ''')
+                
+                rows = [dict(row) for row in cursor.fetchall()]
+                conn.close()
+                return rows
+                
+            except Exception as e:
+                self.logger.error(f"Error getting active worker bans: {e}")
+                return []
+
+    async def get_worker_posting_stats(self, hours: int = 24) -> List[Dict[str, Any]]:
+        """Get per-worker post, success and ban counts over the last hours."""
+        async with self._get_lock():
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=15)
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT worker_id,
+                           COUNT(*) AS total_posts,
+                           COALESCE(SUM(CASE WHEN success THEN 1 ELSE 0 END), 0) AS successful_posts,
+                           COALESCE(SUM(CASE WHEN ban_detected THEN 1 ELSE 0 END), 0) AS ban_detections,
+                           COUNT(DISTINCT slot_id) AS slot_count,
+                           MAX(posted_at) AS last_activity
+                    FROM posting_history
+                    WHERE posted_at > datetime('now', '-' || ? || ' hours')
+                    GROUP BY worker_id
+                    ORDER BY worker_id
+                ''', (hours,))
+                
+                rows = [dict(row) for row in cursor.fetchall()]
+                conn.close()
+                return rows
+                
+            except Exception as e:
+                self.logger.error(f"Error getting worker posting stats: {e}")
+                return []
+
+    async def get_destination_health_overview(self, worst_limit: int = 20) -> Dict[str, Any]:
+        """Get destination health counts by band and the worst destinations."""
+        overview = {'total_destinations': 0, 'average_success_rate': 0, 'critical_destinations': 0,
+                    'warning_destinations': 0, 'worst_destinations': []}
+        async with self._get_lock():
+            try:
+                conn = sqlite3.connect(self.db_path, timeout=15)
+                conn.row_factory = sqlite3.Row
+                cursor = conn.cursor()
+                
+                cursor.execute('''
+                    SELECT COUNT(*) AS total_destinations,
+                           COALESCE(AVG(success_rate), 0) AS average_success_rate,
+                           COALESCE(SUM(CASE WHEN success_rate < 30 THEN 1 ELSE 0 END), 0) AS critical_destinations,
+                           COALESCE(SUM(CASE WHEN success_rate >= 30 AND success_rate < 60 THEN 1 ELSE 0 END), 0)
+                               AS warning_destinations
+                    FROM destination_health
+                ''')
+                overview.update(dict(cursor.fetchone()))
+                cursor.execute('''
+                    SELECT destination_id, success_rate, total_attempts
+                    FROM destination_health
+                    ORDER BY success_rate ASC, destination_id
+                    LIMIT ?
+                ''', (worst_limit,))
+                overview['worst_destinations'] = [dict(row) for row in cursor.fetchall()]
+                
+                conn.close()
+                return overview
+                
+            except Exception as e:
+                self.logger.error(f"Error getting destination health overview: {e}")
+                return overview
+
+    @timed(DB_QUERY_SECONDS)
     async def get_worker_usage(self, worker_id: int) -> Dict[str, Any]:
         """Get worker usage statistics."""
         async with self._get_lock():
@@ -2996,15 +3495,53 @@ class DatabaseManager:
                     (worker_id, destination_id, ban_type, ban_reason, banned_at, estimated_unban_time, is_active)
                     VALUES (?, ?, ?, ?, ?, ?, 1)
                 ''', (worker_id, destination_id, ban_type, ban_reason, now, estimated_unban_time))
+                worker_health.refresh_bans(cursor, [worker_id])
                 
                 conn.commit()
                 conn.close()
-                self.logger.info(f"Recorded ban for worker {worker_id} in {destination_id}: {ban_type}")
+                self.logger.info("Recorded ban for worker %s in %s: %s", worker_id, destination_id, ban_type)
                 return True
             except Exception as e:
                 self.logger.error(f"Error recording worker ban: {e}")
                 return False
                 
+    async def clear_worker_ban(self, worker_id: int, destination_id: str) -> bool:
+        """Deactivate a worker's active bans for one destination."""
+        async with self._get_lock():
+            try:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                cursor.execute('''
+                    UPDATE worker_bans SET is_active = 0
+                    WHERE worker_id = ? AND destination_id = ? AND is_active = 1
+                ''', (worker_id, destination_id))
+                cleared = cursor.rowcount
+                if cleared:
+                    worker_health.refresh_bans(cursor, [worker_id])
+                conn.commit()
+                conn.close()
+                if cleared:
+                    self.logger.info("Cleared %s ban(s) for worker %s in %s", cleared, worker_id, destination_id)
+                return cleared > 0
+            except Exception as e:
+                self.logger.error(f"Error clearing worker ban: {e}")
+                return False
+
+    @timed(DB_QUERY_SECONDS)
+    async def get_worker_health_snapshots(self) -> List[Dict[str, Any]]:
+        """Get the precomputed health row of every worker (one query, no joins)."""
+        async with self._get_lock():
+            try:
+                conn = sqlite3.connect(self.db_path)
+                try:
+                    return worker_health.read_all(conn.cursor())
+                finally:
+                    conn.close()
+            except Exception as e:
+                self.logger.error(f"Error getting worker health snapshots: {e}")
+                return []
+
+    @timed(DB_QUERY_SECONDS)
     async def is_worker_banned(self, worker_id: int, group_id: str = None) -> bool:
         """Check if worker is banned."""
         async with self._get_lock():
@@ -3030,16 +3567,19 @@ class DatabaseManager:
                 self.logger.error(f"Error checking worker ban: {e}")
                 return False
 
+    @timed(DB_QUERY_SECONDS)
     async def record_posting_attempt(self, worker_id: int, destination_id: str, success: bool, error: str = None) -> bool:
         """Record a posting attempt."""
         async with self._get_lock():
             try:
                 conn = sqlite3.connect(self.db_path)
                 cursor = conn.cursor()
+                now = datetime.now()
                 cursor.execute('''
                     INSERT INTO worker_activity_log (worker_id, destination_id, success, error, created_at)
                     VALUES (?, ?, ?, ?, ?)
-                ''', (worker_id, destination_id, success, error, datetime.now()))
+                ''', (worker_id, destination_id, success, error, now))
+                worker_health.record_attempt(cursor, worker_id, success, error, now)
                 conn.commit()
                 conn.close()
                 return True
@@ -3076,6 +3616,7 @@ class DatabaseManager:
                 self.logger.error(f"Error updating destination health: {e}")
                 return False
 
+    @timed(DB_QUERY_SECONDS)
     async def record_worker_post(self, worker_id: int, destination_id: str) -> bool:
         """Record worker post for usage tracking."""
         async with self._get_lock():
@@ -3106,6 +3647,7 @@ class DatabaseManager:
                         VALUES (?, ?, 1, 1, ?, ?)
                     ''', (worker_id, today, current_hour, datetime.now()))
                 
+                worker_health.record_post(cursor, worker_id)
                 conn.commit()
                 conn.close()
                 return True
@@ -3218,7 +3760,7 @@ class DatabaseManager:
                 conn.commit()
                 conn.close()
                 
-                self.logger.info(f"Updated admin slot {slot_number} content")
+                self.logger.info("Updated admin slot %s content", slot_number)
                 return True
                 
             except Exception as e:
@@ -3241,7 +3783,7 @@ class DatabaseManager:
                 conn.commit()
                 conn.close()
                 
-                self.logger.info(f"Updated admin slot {slot_number} status to {is_active}")
+                self.logger.info("Updated admin slot %s status to %s", slot_number, is_active)
                 return True
                 
             except Exception as e:
@@ -3264,29 +3806,20 @@ class DatabaseManager:
                 
                 slot_id = slot_row[0]
                 
-                # Delete existing destinations
-                cursor.execute('DELETE FROM admin_slot_destinations WHERE slot_id = ?', (slot_id,))
-                
-                # Insert new destinations
-                for dest in destinations:
-                    cursor.execute('''
-                        INSERT INTO admin_slot_destinations 
-                        (slot_id, destination_type, destination_id, destination_name, alias, is_active, created_at, updated_at)
-                        VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP, ?)
-                    ''', (
-                        slot_id,
-                        dest.get('destination_type', 'group'),
-                        dest.get('destination_id', ''),
-                        dest.get('destination_name', ''),
-                        dest.get('alias', ''),
-                        dest.get('is_active', True),
-                        datetime.now().isoformat()
-                    ))
+                # Apply only the differences; removed destinations are deleted
+                active = [dest for dest in destinations if dest.get('is_active', True)]
+                changes = slot_destinations.apply_diff(
+                    cursor, slot_destinations.ADMIN_TABLE, slot_id, active, soft_delete=False
+                )
                 
                 conn.commit()
                 conn.close()
                 
-                self.logger.info(f"Updated admin slot {slot_number} destinations ({len(destinations)} destinations)")
+                self.logger.info(
+                    "Updated admin slot %s destinations (%s destinations: +%s -%s ~%s)",
+                    slot_number, len(active), changes['added'] + changes['reactivated'],
+                    changes['removed'], changes['updated']
+                )
                 return True
                 
             except Exception as e:
@@ -3338,7 +3871,7 @@ class DatabaseManager:
                 conn.commit()
                 conn.close()
                 
-                self.logger.info(f"Added destination to admin slot {slot_number}: {destination_data.get('destination_name', 'Unknown')}")
+                self.logger.info("Added destination to admin slot %s: %s", slot_number, destination_data.get('destination_name', 'Unknown'))
                 return True
                 
             except Exception as e:
@@ -3372,7 +3905,7 @@ class DatabaseManager:
                 conn.close()
                 
                 if deleted_count > 0:
-                    self.logger.info(f"Removed destination from admin slot {slot_number}: {destination_id}")
+                    self.logger.info("Removed destination from admin slot %s: %s", slot_number, destination_id)
                     return True
                 else:
                     self.logger.warning(f"Destination not found in admin slot {slot_number}: {destination_id}")
@@ -3398,7 +3931,7 @@ class DatabaseManager:
                 conn.commit()
                 conn.close()
                 
-                self.logger.info(f"Deleted admin slot {slot_number}")
+                self.logger.info("Deleted admin slot %s", slot_number)
                 return True
                 
             except Exception as e:
@@ -3417,24 +3950,16 @@ class DatabaseManager:
                 existing_count = cursor.fetchone()[0]
                 
                 if existing_count > 0:
-                    self.logger.info(f"Admin slots already exist ({existing_count} slots)")
+                    self.logger.info("Admin slots already exist (%s slots)", existing_count)
                     conn.close()
                     return True
                 
                 # Create 5 initial admin slots
-                sample_content = [
-                    "🚀 Welcome to AutoFarming Pro! Promote your services automatically.",
-                    "📈 Boost your business with automated posting to premium groups.",
-                    "💎 Premium advertising slots for maximum visibility.",
-                    "🎯 Targeted promotion to high-quality Telegram groups.",
-                    "⚡ Lightning-fast automated posting service."
-                ]
-                
-                for i in range(1, 6):
+                for i, content in enumerate(ADMIN_SLOT_SAMPLE_CONTENT, start=1):
                     cursor.execute('''
                         INSERT INTO admin_ad_slots (slot_number, content, is_active, created_at, updated_at)
                         VALUES (?, ?, ?, ?, ?)
-                    ''', (i, sample_content[i-1], True, datetime.now(), datetime.now()))
+                    ''', (i, content, True, datetime.now(), datetime.now()))
                 
                 conn.commit()
                 conn.close()
@@ -3477,6 +4002,7 @@ class DatabaseManager:
                 self.logger.error(f"Error getting all workers: {e}")
                 return []
 
+    @timed(DB_QUERY_SECONDS)
     async def get_available_workers(self) -> List[Dict[str, Any]]:
         """Get available (active and not at limit) workers."""
         async with self._get_lock():
@@ -3510,29 +4036,8 @@ class DatabaseManager:
 
     async def get_managed_group_category_counts(self) -> Dict[str, int]:
         """Get count of managed groups by category."""
-        async with self._get_lock():
-            try:
-                conn = sqlite3.connect(self.db_path)
-                cursor = conn.cursor()
-                
-                cursor.execute('''
-                    SELECT category, COUNT(*) as count 
-                    FROM managed_groups 
-                    WHERE is_active = 1 
-                    GROUP BY category
-                    ORDER BY category
-                ''')
-                
-                counts = {}
-                for row in cursor.fetchall():
-                    counts[row[0]] = row[1]
-                
-                conn.close()
-                return counts
-                
-            except Exception as e:
-                self.logger.error(f"Error getting group category counts: {e}")
-                return {}
+        index = await self.get_managed_group_index()
+        return index.category_counts()
 
     async def get_failed_group_joins(self, limit: int = 50) -> List[Dict[str, Any]]:
         """Get recent failed group join attempts."""
@@ -3713,6 +4218,49 @@ class DatabaseManager:
             except Exception as e:
                 self.logger.error(f"Error ensuring worker_cooldowns table: {e}")
 
+    @timed(DB_QUERY_SECONDS)
+    async def get_worker_cooldown(self, worker_id: int) -> int:
+        """Seconds left in a worker's posting cooldown (0 if none)."""
+        async with self._get_lock():
+            try:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                now = datetime.now()
+                cursor.execute('''
+                    SELECT MAX(cooldown_until) FROM worker_cooldowns
+                    WHERE worker_id = ? AND cooldown_until > ?
+                ''', (worker_id, now.strftime('%Y-%m-%d %H:%M:%S')))
+                row = cursor.fetchone()
+                conn.close()
+
+                if row and row[0]:
+                    cooldown_until = datetime.strptime(str(row[0])[:19], '%Y-%m-%d %H:%M:%S')
+                    return max(0, int((cooldown_until - now).total_seconds()))
+                return 0
+
+            except Exception as e:
+                self.logger.error(f"Error checking worker cooldown: {e}")
+                return 0
+
+    async def set_worker_cooldown(self, worker_id: int, duration_seconds: int) -> bool:
+        """Put a worker in a posting cooldown for duration_seconds."""
+        async with self._get_lock():
+            try:
+                conn = sqlite3.connect(self.db_path)
+                cursor = conn.cursor()
+                cooldown_until = (datetime.now() + timedelta(seconds=duration_seconds)).strftime('%Y-%m-%d %H:%M:%S')
+                cursor.execute('''
+                    INSERT OR REPLACE INTO worker_cooldowns (worker_id, cooldown_until, created_at)
+                    VALUES (?, ?, datetime('now'))
+                ''', (worker_id, cooldown_until))
+                conn.commit()
+                conn.close()
+                return True
+
+            except Exception as e:
+                self.logger.error(f"Error setting worker cooldown: {e}")
+                return False
+
 
     async def get_paused_slots(self) -> List[Dict[str, Any]]:
         """Get all paused ad slots for monitoring."""
@@ -3932,7 +4480,8 @@ class DatabaseManager:
                 
                 conn.commit()
                 conn.close()
-                self.logger.info(f"Deleted user {user_id} and associated data")
+                self._user_cache.invalidate_user(user_id)
+                self.logger.info("Deleted user %s and associated data", user_id)
                 return True
                 
             except Exception as e:
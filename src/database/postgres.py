@@ -0,0 +1,2427 @@
+"""
+PostgreSQL backend for DatabaseManager.
+
+PostgresDatabaseManager implements DatabaseManager's public API on an
+asyncpg connection pool, so several bot, scheduler and payment processes can
+write at the same time instead of queueing behind one SQLite file lock.
+
+- Connections come from one pool per manager (``db.pool``, also used by
+  ContentModerator, analytics and the payment scripts via
+  ``db.pool.acquire()``).
+- asyncpg prepares every statement on first use and keeps it in the
+  connection's statement cache, so the hot-path queries are parsed and
+  planned once per connection.
+- Bulk managed-group imports go through ``COPY`` into a temp table and one
+  ``INSERT ... ON CONFLICT``.
+- Multi-statement writes run in a transaction; there is no process-wide
+  lock as in the SQLite manager.
+
+Values come back in the shapes SQLite callers expect: timestamps as
+``'YYYY-MM-DD HH:MM:SS[.ffffff]'`` strings (what sqlite3 stores for a
+datetime) and flags as 0/1 integers. The schema is the union of the columns
+the SQLite manager reads and writes.
+
+Methods that are not ported yet raise BackendNotSupported (both
+NotImplementedError and AttributeError, so ``hasattr`` checks keep working);
+``PostgresDatabaseManager.unported_methods()`` lists them.
+"""
+
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional
+
+from src.database import group_index, slot_destinations, worker_health
+from src.database.cache import MISSING, UserLookupCache
+from src.database.group_index import ManagedGroupIndex
+from src.database.manager import ADMIN_SLOT_SAMPLE_CONTENT, DB_QUERY_SECONDS, TIER_SLOTS, DatabaseManager
+from src.monitoring.metrics import timed
+from src.utils.lazy_imports import lazy_module
+
+# Only needed when the PostgreSQL backend is selected
+asyncpg = lazy_module('asyncpg')
+
+# SQLite's CURRENT_TIMESTAMP: UTC, whole seconds
+_NOW = "(date_trunc('second', CURRENT_TIMESTAMP AT TIME ZONE 'UTC'))"
+
+# Serializes schema setup between processes starting at the same time
+_SCHEMA_LOCK_ID = 0x6175746f
+
+SCHEMA = [
+    f'''
+    CREATE TABLE IF NOT EXISTS users (
+        user_id BIGINT PRIMARY KEY,
+        username TEXT,
+        first_name TEXT,
+        last_name TEXT,
+        subscription_tier TEXT,
+        subscription_expires TIMESTAMP,
+        created_at TIMESTAMP DEFAULT {_NOW},
+        updated_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS ad_slots (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT,
+        slot_number INTEGER,
+        content TEXT,
+        file_id TEXT,
+        category TEXT,
+        is_active INTEGER DEFAULT 0,
+        is_paused INTEGER DEFAULT 0,
+        pause_reason TEXT,
+        pause_time TIMESTAMP,
+        interval_minutes INTEGER DEFAULT 60,
+        last_sent_at TIMESTAMP,
+        created_at TIMESTAMP DEFAULT {_NOW},
+        updated_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS slot_destinations (
+        id BIGSERIAL PRIMARY KEY,
+        slot_id BIGINT,
+        destination_type TEXT,
+        destination_id TEXT,
+        destination_name TEXT,
+        alias TEXT,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT {_NOW},
+        updated_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS payments (
+        id BIGSERIAL PRIMARY KEY,
+        payment_id TEXT UNIQUE,
+        user_id BIGINT,
+        tier TEXT,
+        amount DOUBLE PRECISION,
+        currency TEXT,
+        amount_usd DOUBLE PRECISION,
+        amount_crypto DOUBLE PRECISION,
+        crypto_type TEXT,
+        payment_provider TEXT,
+        pay_to_address TEXT,
+        expected_amount_crypto DOUBLE PRECISION,
+        payment_url TEXT,
+        expires_at TIMESTAMP,
+        timeout_minutes INTEGER,
+        attribution_method TEXT DEFAULT 'amount_only',
+        status TEXT DEFAULT 'pending',
+        transaction_hash TEXT,
+        manual_verification INTEGER DEFAULT 0,
+        verified_by_admin BIGINT,
+        verification_attempts INTEGER DEFAULT 0,
+        last_verification_at TIMESTAMP,
+        last_checked TIMESTAMP,
+        created_at TIMESTAMP DEFAULT {_NOW},
+        updated_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS message_stats (
+        user_id BIGINT,
+        date DATE,
+        message_count INTEGER DEFAULT 0,
+        PRIMARY KEY (user_id, date)
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS workers (
+        worker_id BIGINT PRIMARY KEY,
+        api_id TEXT,
+        api_hash TEXT,
+        phone_number TEXT,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT {_NOW},
+        updated_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS worker_cooldowns (
+        worker_id BIGINT PRIMARY KEY,
+        last_used_at TIMESTAMP,
+        cooldown_until TIMESTAMP,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT {_NOW},
+        updated_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS worker_usage (
+        id BIGSERIAL PRIMARY KEY,
+        worker_id BIGINT,
+        date DATE,
+        messages_sent_today INTEGER DEFAULT 0,
+        messages_sent_this_hour INTEGER DEFAULT 0,
+        last_reset_hour INTEGER,
+        hourly_posts INTEGER DEFAULT 0,
+        daily_posts INTEGER DEFAULT 0,
+        hourly_limit INTEGER DEFAULT 15,
+        daily_limit INTEGER DEFAULT 150,
+        created_at TIMESTAMP DEFAULT {_NOW},
+        updated_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS worker_health (
+        worker_id BIGINT PRIMARY KEY,
+        ban_count INTEGER DEFAULT 0,
+        last_ban_date TIMESTAMP,
+        is_banned INTEGER DEFAULT 0,
+        created_at TIMESTAMP DEFAULT {_NOW},
+        updated_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS worker_activity_log (
+        id BIGSERIAL PRIMARY KEY,
+        worker_id BIGINT,
+        chat_id BIGINT,
+        destination_id TEXT,
+        destination_name TEXT,
+        action_type TEXT,
+        success INTEGER,
+        error TEXT,
+        error_message TEXT,
+        created_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS worker_bans (
+        id BIGSERIAL PRIMARY KEY,
+        worker_id BIGINT,
+        chat_id TEXT,
+        destination_id TEXT,
+        ban_type TEXT,
+        ban_reason TEXT,
+        banned_at TIMESTAMP DEFAULT {_NOW},
+        estimated_unban_time TIMESTAMP,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS failed_group_joins (
+        id BIGSERIAL PRIMARY KEY,
+        worker_id BIGINT,
+        group_id TEXT,
+        error TEXT,
+        created_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS managed_groups (
+        id BIGSERIAL PRIMARY KEY,
+        group_id TEXT UNIQUE,
+        group_name TEXT,
+        category TEXT,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS ad_posts (
+        id BIGSERIAL PRIMARY KEY,
+        slot_id BIGINT,
+        destination_id TEXT,
+        destination_name TEXT,
+        worker_id BIGINT,
+        success INTEGER,
+        error TEXT,
+        posted_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS posting_history (
+        id BIGSERIAL PRIMARY KEY,
+        slot_id BIGINT,
+        slot_type TEXT DEFAULT 'user',
+        destination_id TEXT,
+        destination_name TEXT,
+        worker_id BIGINT,
+        success INTEGER,
+        error_message TEXT,
+        posted_at TIMESTAMP DEFAULT {_NOW},
+        message_content_hash TEXT,
+        retry_count INTEGER DEFAULT 0,
+        ban_detected INTEGER DEFAULT 0,
+        ban_type TEXT,
+        created_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS destination_health (
+        destination_id TEXT PRIMARY KEY,
+        destination_name TEXT,
+        total_attempts INTEGER DEFAULT 0,
+        successful_posts INTEGER DEFAULT 0,
+        failed_posts INTEGER DEFAULT 0,
+        success_rate DOUBLE PRECISION DEFAULT 100.0,
+        last_success TIMESTAMP,
+        last_failure TIMESTAMP,
+        created_at TIMESTAMP DEFAULT {_NOW},
+        updated_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS admin_ad_slots (
+        id BIGSERIAL PRIMARY KEY,
+        slot_number INTEGER UNIQUE,
+        content TEXT,
+        file_id TEXT,
+        is_active INTEGER DEFAULT 1,
+        is_paused INTEGER DEFAULT 0,
+        interval_minutes INTEGER DEFAULT 60,
+        last_sent_at TIMESTAMP,
+        created_at TIMESTAMP DEFAULT {_NOW},
+        updated_at TIMESTAMP DEFAULT {_NOW}
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS admin_slot_destinations (
+        id BIGSERIAL PRIMARY KEY,
+        slot_id BIGINT,
+        destination_type TEXT DEFAULT 'group',
+        destination_id TEXT,
+        destination_name TEXT,
+        alias TEXT,
+        is_active INTEGER DEFAULT 1,
+        created_at TIMESTAMP DEFAULT {_NOW},
+        updated_at TIMESTAMP
+    )
+    ''',
+    f'''
+    CREATE TABLE IF NOT EXISTS notification_queue (
+        id BIGSERIAL PRIMARY KEY,
+        user_id BIGINT NOT NULL,
+        notification_type TEXT NOT NULL,
+        dedupe_key TEXT NOT NULL DEFAULT '',
+        created_at TIMESTAMP DEFAULT {_NOW},
+        sent_at TIMESTAMP,
+        UNIQUE (user_id, notification_type, dedupe_key)
+    )
+    ''',
+    '''
+    CREATE TABLE IF NOT EXISTS worker_health_snapshot (
+        worker_id BIGINT PRIMARY KEY,
+        total_attempts INTEGER DEFAULT 0,
+        total_failures INTEGER DEFAULT 0,
+        consecutive_failures INTEGER DEFAULT 0,
+        error_rate DOUBLE PRECISION DEFAULT 0,
+        hour_bucket TEXT,
+        posts_this_hour INTEGER DEFAULT 0,
+        day_bucket TEXT,
+        posts_today INTEGER DEFAULT 0,
+        hourly_limit INTEGER DEFAULT 15,
+        daily_limit INTEGER DEFAULT 150,
+        utilization DOUBLE PRECISION DEFAULT 0,
+        active_bans INTEGER DEFAULT 0,
+        ban_types TEXT,
+        last_success_at TEXT,
+        last_error_at TEXT,
+        last_error TEXT,
+        health_score INTEGER DEFAULT 100,
+        status TEXT DEFAULT 'healthy',
+        updated_at TEXT
+    )
+    ''',
+    'CREATE INDEX IF NOT EXISTS idx_notification_queue_pending ON notification_queue (sent_at, notification_type)',
+    'CREATE INDEX IF NOT EXISTS idx_users_subscription_expires ON users (subscription_expires)',
+    'CREATE INDEX IF NOT EXISTS idx_ad_slots_user_id ON ad_slots (user_id)',
+    'CREATE INDEX IF NOT EXISTS idx_worker_activity_log_created_at ON worker_activity_log (created_at)',
+    'CREATE INDEX IF NOT EXISTS idx_worker_bans_worker_id ON worker_bans (worker_id)',
+    *[
+        f"CREATE UNIQUE INDEX IF NOT EXISTS idx_{table}_slot_destination ON {table} (slot_id, destination_id)"
+        for table in slot_destinations.TABLES
+    ],
+    # Version counter for the managed-group index, bumped once per writing statement
+    '''
+    CREATE TABLE IF NOT EXISTS data_versions (
+        name TEXT PRIMARY KEY,
+        version BIGINT NOT NULL DEFAULT 0
+    )
+    ''',
+    f"INSERT INTO data_versions (name, version) VALUES ('{group_index.VERSION_NAME}', 0) ON CONFLICT DO NOTHING",
+    f'''
+    CREATE OR REPLACE FUNCTION bump_managed_groups_version() RETURNS trigger AS $$
+    BEGIN
+        UPDATE data_versions SET version = version + 1 WHERE name = '{group_index.VERSION_NAME}';
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    'DROP TRIGGER IF EXISTS managed_groups_version ON managed_groups',
+    '''
+    CREATE TRIGGER managed_groups_version
+    AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON managed_groups
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_managed_groups_version()
+    ''',
+]
+
+_SNAPSHOT_SELECT = f"SELECT {', '.join(worker_health.COLUMNS)} FROM worker_health_snapshot"
+
+_SNAPSHOT_UPSERT = '''
+    INSERT INTO worker_health_snapshot ({columns}) VALUES ({placeholders})
+    ON CONFLICT (worker_id) DO UPDATE SET {updates}
+'''.format(
+    columns=', '.join(worker_health.COLUMNS),
+    placeholders=', '.join(f"${i}" for i in range(1, len(worker_health.COLUMNS) + 1)),
+    updates=', '.join(f"{column} = excluded.{column}" for column in worker_health.COLUMNS[1:]),
+)
+
+# Payment fields update_payment_field may set, with the timestamp ones marked
+_PAYMENT_FIELDS = {
+    'status': False, 'amount_usd': False, 'amount_crypto': False, 'crypto_type': False,
+    'payment_provider': False, 'transaction_hash': False, 'manual_verification': False,
+    'verification_attempts': False, 'last_verification_at': True, 'verified_by_admin': False,
+}
+
+_DEFAULT_USAGE = {
+    'daily_limit': 50,
+    'hourly_limit': 20,
+    'messages_sent_today': 0,
+    'messages_sent_this_hour': 0,
+    'daily_percentage': 0,
+    'hourly_percentage': 0
+}
+
+
+def _value(value: Any) -> Any:
+    """Column value as the SQLite manager returns it."""
+    if isinstance(value, datetime):
+        return str(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _row(record) -> Dict[str, Any]:
+    return {key: _value(value) for key, value in record.items()}
+
+
+def _rows(records: Iterable) -> List[Dict[str, Any]]:
+    return [_row(record) for record in records]
+
+
+def timestamp(value: Any) -> Optional[datetime]:
+    """datetime for a TIMESTAMP parameter from a datetime, date or ISO string."""
+    if value is None or value == '':
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        return datetime.combine(value, time())
+    else:
+        parsed = datetime.fromisoformat(str(value).strip().replace('Z', '+00:00'))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone().replace(tzinfo=None)
+    return parsed
+
+
+def _count(status: str) -> int:
+    """Row count from a command status such as 'UPDATE 3'."""
+    try:
+        return int(status.rsplit(' ', 1)[-1])
+    except (AttributeError, ValueError):
+        return 0
+
+
+class BackendNotSupported(NotImplementedError, AttributeError):
+    """A DatabaseManager method that has no PostgreSQL implementation yet."""
+
+
+class PostgresDatabaseManager:
+    """DatabaseManager API on a PostgreSQL connection pool."""
+
+    backend = 'postgres'
+
+    def __init__(self, dsn: str, logger, min_size: int = 2, max_size: int = 10,
+                 statement_cache_size: int = 256, command_timeout: float = 60.0,
+                 cache_ttl_seconds: float = 30.0, cache_max_entries: int = 4096):
+        """Initialize the manager; the pool is created by initialize().
+
+        Args:
+            dsn: postgresql:// connection URL
+            logger: Logger instance for error logging
+            min_size: Connections opened at startup
+            max_size: Maximum pooled connections
+            statement_cache_size: Prepared statements kept per connection
+            command_timeout: Seconds before a query is cancelled
+            cache_ttl_seconds: TTL for cached subscription/slot lookups
+            cache_max_entries: Maximum number of cached per-user lookups
+        """
+        self.dsn = dsn
+        # No database file; code that opens the SQLite file directly is SQLite-only
+        self.db_path = None
+        self.logger = logger
+        self.pool = None
+        self.min_size = min_size
+        self.max_size = max_size
+        self.statement_cache_size = statement_cache_size
+        self.command_timeout = command_timeout
+        self._user_cache = UserLookupCache(max_entries=cache_max_entries, ttl_seconds=cache_ttl_seconds)
+
+    def __getattr__(self, name: str):
+        if not name.startswith('_') and callable(getattr(DatabaseManager, name, None)):
+            raise BackendNotSupported(f"DatabaseManager.{name} is not implemented for the PostgreSQL backend")
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    @classmethod
+    def unported_methods(cls) -> List[str]:
+        """Public DatabaseManager methods without a PostgreSQL implementation."""
+        return sorted(
+            name for name in dir(DatabaseManager)
+            if not name.startswith('_') and callable(getattr(DatabaseManager, name)) and not hasattr(cls, name)
+        )
+
+    def invalidate_user_cache(self, user_id: int) -> None:
+        """Drop cached subscription and slot lookups for a user."""
+        self._user_cache.invalidate_user(user_id)
+
+    def invalidate_slot_cache(self, slot_id: int) -> None:
+        """Drop cached slot lookups for the user owning a slot."""
+        self._user_cache.invalidate_slot(slot_id)
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters for the per-user lookup cache."""
+        return self._user_cache.stats()
+
+    def initialize_sync(self) -> None:
+        raise BackendNotSupported("The PostgreSQL backend is initialized with 'await db.initialize()'")
+
+    async def initialize(self) -> None:
+        """Create the connection pool and any missing tables.
+
+        Raises:
+            Exception: If the pool cannot be created or the schema fails
+        """
+        try:
+            if self.pool is None:
+                self.pool = await asyncpg.create_pool(
+                    self.dsn,
+                    min_size=self.min_size,
+                    max_size=self.max_size,
+                    statement_cache_size=self.statement_cache_size,
+                    command_timeout=self.command_timeout,
+                    server_settings={'application_name': 'autofarming_bot'},
+                )
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute('SELECT pg_advisory_xact_lock($1)', _SCHEMA_LOCK_ID)
+                    for statement in SCHEMA:
+                        await conn.execute(statement)
+                    worker_ids = [row[0] for row in await conn.fetch('SELECT worker_id FROM worker_cooldowns')]
+                    await self._seed_snapshots(conn, worker_ids)
+            self.logger.info("PostgreSQL database initialized successfully")
+        except Exception as e:
+            self.logger.error(f"PostgreSQL initialization error: {e}")
+            raise
+
+    async def close(self):
+        """Close the connection pool."""
+        if self.pool is not None:
+            await self.pool.close()
+            self.pool = None
+
+    # --- Users and subscriptions ---
+
+    async def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Get user information by user ID."""
+        if not user_id or user_id <= 0:
+            self.logger.warning(f"Invalid user_id: {user_id}")
+            return None
+        try:
+            row = await self.pool.fetchrow('SELECT * FROM users WHERE user_id = $1', user_id)
+            return _row(row) if row else None
+        except Exception as e:
+            self.logger.error(f"Error getting user {user_id}: {e}")
+            return None
+
+    async def create_or_update_user(self, user_id: int, username: str = None,
+                                    first_name: str = None, last_name: str = None) -> bool:
+        """Create or update user record, preserving subscription data."""
+        if not user_id or user_id <= 0:
+            self.logger.warning(f"Invalid user_id: {user_id}")
+            return False
+        try:
+            now = datetime.now()
+            await self.pool.execute('''
+                INSERT INTO users (user_id, username, first_name, last_name, created_at, updated_at)
+                VALUES ($1, $2, $3, $4, $5, $5)
+                ON CONFLICT (user_id) DO UPDATE SET
+                    username = excluded.username,
+                    first_name = excluded.first_name,
+                    last_name = excluded.last_name,
+                    updated_at = excluded.updated_at
+            ''', user_id, username, first_name, last_name, now)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error creating/updating user {user_id}: {e}")
+            return False
+
+    async def create_user(self, user_id: int, username: str = None, first_name: str = None) -> bool:
+        """Create a new user if it does not exist yet."""
+        if not user_id:
+            self.logger.error(f"❌ Invalid user_id: {user_id}")
+            return False
+        try:
+            now = datetime.now()
+            await self.pool.execute('''
+                INSERT INTO users (user_id, username, first_name, created_at, updated_at)
+                VALUES ($1, $2, $3, $4, $4)
+                ON CONFLICT (user_id) DO NOTHING
+            ''', user_id, username, first_name, now)
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Error creating user {user_id}: {e}")
+            return False
+
+    @timed(DB_QUERY_SECONDS)
+    async def get_user_subscription(self, user_id: int, use_lock: bool = True) -> Optional[Dict[str, Any]]:
+        """Get user's subscription information."""
+        cached = self._user_cache.get(UserLookupCache.SUBSCRIPTION, user_id)
+        if cached is not MISSING:
+            if cached:
+                # Expiry is time-dependent, so re-evaluate it on every hit
+                cached['is_active'] = datetime.fromisoformat(cached['expires']) > datetime.now()
+            return cached
+        try:
+            row = await self.pool.fetchrow(
+                'SELECT subscription_tier, subscription_expires FROM users WHERE user_id = $1', user_id
+            )
+            if not row or not row['subscription_tier'] or not row['subscription_expires']:
+                self._user_cache.set(UserLookupCache.SUBSCRIPTION, user_id, None)
+                return None
+            subscription = {
+                'tier': row['subscription_tier'],
+                'expires': _value(row['subscription_expires']),
+                'is_active': row['subscription_expires'] > datetime.now()
+            }
+            self._user_cache.set(UserLookupCache.SUBSCRIPTION, user_id, subscription)
+            return subscription
+        except Exception as e:
+            self.logger.error(f"Error getting user subscription for {user_id}: {e}")
+            return None
+
+    async def update_subscription(self, user_id: int, tier: str, duration_days: int) -> bool:
+        """Update user's subscription."""
+        try:
+            now = datetime.now()
+            await self.pool.execute('''
+                UPDATE users SET subscription_tier = $1, subscription_expires = $2, updated_at = $3
+                WHERE user_id = $4
+            ''', tier, now + timedelta(days=duration_days), now, user_id)
+            self._user_cache.invalidate_user(user_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating subscription: {e}")
+            return False
+
+    @timed(DB_QUERY_SECONDS)
+    async def activate_subscription(self, user_id: int, tier: str, duration_days: int = 30) -> bool:
+        """Activate or extend a subscription and create the tier's ad slots, in one transaction."""
+        if not user_id or not tier or duration_days <= 0:
+            self.logger.error(f"❌ Invalid subscription parameters: user_id={user_id}, tier={tier}, duration={duration_days}")
+            return False
+        try:
+            now = datetime.now()
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    current = await conn.fetchval(
+                        'SELECT subscription_expires FROM users WHERE user_id = $1 FOR UPDATE', user_id
+                    )
+                    # Extend an active subscription, otherwise start a new one
+                    start = current if current and current > now else now
+                    new_expiry = start + timedelta(days=duration_days)
+                    await conn.execute('''
+                        INSERT INTO users (user_id, username, first_name, subscription_tier, subscription_expires,
+                                           created_at, updated_at)
+                        VALUES ($1, $2, 'User', $3, $4, $5, $5)
+                        ON CONFLICT (user_id) DO UPDATE SET
+                            subscription_tier = excluded.subscription_tier,
+                            subscription_expires = excluded.subscription_expires,
+                            updated_at = excluded.updated_at
+                    ''', user_id, f"user_{user_id}", tier, new_expiry, now)
+                    created = await self._ensure_slots(conn, user_id, tier, now)
+            self._user_cache.invalidate_user(user_id)
+            self.logger.info("✅ Activated %s subscription for user %s until %s", tier, user_id, new_expiry)
+            if created:
+                self.logger.info("✅ Created %s ad slots for user %s", created, user_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"❌ Error activating subscription for user {user_id}: {e}")
+            return False
+
+    async def delete_user_subscription(self, user_id: int) -> bool:
+        """Delete user subscription."""
+        try:
+            await self.pool.execute('''
+                UPDATE users SET subscription_tier = NULL, subscription_expires = NULL, updated_at = $1
+                WHERE user_id = $2
+            ''', datetime.now(), user_id)
+            self._user_cache.invalidate_user(user_id)
+            self.logger.info("✅ Deleted subscription for user %s", user_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting subscription for user {user_id}: {e}")
+            return False
+
+    async def get_all_users(self) -> List[Dict[str, Any]]:
+        """Get all users from the database."""
+        try:
+            return _rows(await self.pool.fetch('''
+                SELECT user_id, username, first_name, last_name,
+                       subscription_tier, subscription_expires, created_at, updated_at
+                FROM users ORDER BY user_id
+            '''))
+        except Exception as e:
+            self.logger.error(f"Error getting all users: {e}")
+            return []
+
+    async def get_all_subscriptions(self) -> List[Dict[str, Any]]:
+        """Get all user subscriptions from the database."""
+        try:
+            return _rows(await self.pool.fetch('''
+                SELECT user_id, subscription_tier AS tier, subscription_expires AS expires, created_at, updated_at
+                FROM users WHERE subscription_tier IS NOT NULL ORDER BY user_id
+            '''))
+        except Exception as e:
+            self.logger.error(f"Error getting all subscriptions: {e}")
+            return []
+
+    async def get_expiring_subscriptions(self, days_from_now: int) -> List[Dict[str, Any]]:
+        """Get subscriptions expiring within specified days."""
+        try:
+            now = datetime.now()
+            return _rows(await self.pool.fetch('''
+                SELECT user_id, subscription_tier, subscription_expires FROM users
+                WHERE subscription_expires BETWEEN $1 AND $2
+            ''', now, now + timedelta(days=days_from_now)))
+        except Exception as e:
+            self.logger.error(f"Error getting expiring subscriptions: {e}")
+            return []
+
+    async def get_expired_subscriptions(self) -> List[Dict[str, Any]]:
+        """Get all expired subscriptions."""
+        try:
+            return _rows(await self.pool.fetch('''
+                SELECT user_id, username, subscription_tier, subscription_expires, created_at
+                FROM users
+                WHERE subscription_tier IS NOT NULL
+                AND subscription_expires IS NOT NULL
+                AND subscription_expires < $1
+                ORDER BY subscription_expires DESC
+            ''', datetime.now()))
+        except Exception as e:
+            self.logger.error(f"Error getting expired subscriptions: {e}")
+            return []
+
+    @timed(DB_QUERY_SECONDS)
+    async def sweep_expired_subscriptions(self) -> Dict[str, Any]:
+        """Deactivate expired subscriptions in a single set-based transaction.
+
+        Same steps and counts as the SQLite sweep; the expired users are
+        locked with FOR UPDATE instead of collected into a temp table.
+        """
+        results = {
+            'expired_users': 0,
+            'slots_deactivated': 0,
+            'subscriptions_cleared': 0,
+            'notifications_queued': 0,
+            'errors': []
+        }
+        try:
+            now = datetime.now()
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    expired = await conn.fetch('''
+                        SELECT user_id, subscription_expires FROM users
+                        WHERE subscription_tier IS NOT NULL
+                        AND subscription_expires IS NOT NULL
+                        AND subscription_expires < $1
+                        FOR UPDATE
+                    ''', now)
+                    user_ids = [row['user_id'] for row in expired]
+                    results['expired_users'] = len(user_ids)
+                    if user_ids:
+                        results['notifications_queued'] = _count(await conn.execute('''
+                            INSERT INTO notification_queue (user_id, notification_type, dedupe_key, created_at)
+                            SELECT user_id, 'subscription_expired', dedupe_key, $3
+                            FROM unnest($1::bigint[], $2::text[]) AS expired (user_id, dedupe_key)
+                            ON CONFLICT DO NOTHING
+                        ''', user_ids, [row['subscription_expires'].isoformat() for row in expired], now))
+                        results['slots_deactivated'] = _count(await conn.execute('''
+                            UPDATE ad_slots SET is_active = 0, updated_at = $2
+                            WHERE is_active = 1 AND user_id = ANY($1::bigint[])
+                        ''', user_ids, now))
+                        results['subscriptions_cleared'] = _count(await conn.execute('''
+                            UPDATE users SET subscription_tier = NULL, subscription_expires = NULL, updated_at = $2
+                            WHERE user_id = ANY($1::bigint[])
+                        ''', user_ids, now))
+            for user_id in user_ids:
+                self._user_cache.invalidate_user(user_id)
+            if results['expired_users']:
+                self.logger.info(
+                    "📊 Expiry sweep: %s subscriptions cleared, %s slots deactivated, %s notifications queued",
+                    results['subscriptions_cleared'], results['slots_deactivated'],
+                    results['notifications_queued']
+                )
+            return results
+        except Exception as e:
+            self.logger.error(f"❌ Error in sweep_expired_subscriptions: {e}")
+            results['errors'].append(f"Sweep failed: {e}")
+            return results
+
+    async def deactivate_expired_subscriptions(self) -> Dict[str, Any]:
+        """Deactivate all expired subscriptions and their associated ad slots."""
+        sweep = await self.sweep_expired_subscriptions()
+        return {
+            'total_expired': sweep['expired_users'],
+            'deactivated': sweep['subscriptions_cleared'],
+            'slots_deactivated': sweep['slots_deactivated'],
+            'notifications_queued': sweep['notifications_queued'],
+            'errors': sweep['errors']
+        }
+
+    async def recover_missing_subscriptions(self) -> Dict[str, Any]:
+        """Recover subscriptions for users with completed payments but no active subscription."""
+        results = {'total_candidates': 0, 'recovered': 0, 'failed': 0, 'errors': []}
+        try:
+            candidates = await self.pool.fetch('''
+                SELECT DISTINCT p.user_id, p.amount_usd, p.payment_id, p.updated_at
+                FROM payments p
+                LEFT JOIN users u ON p.user_id = u.user_id
+                WHERE p.status = 'completed'
+                AND (u.subscription_tier IS NULL
+                     OR u.subscription_expires IS NULL
+                     OR u.subscription_expires < $1)
+                ORDER BY p.updated_at DESC
+            ''', datetime.now())
+        except Exception as e:
+            self.logger.error(f"❌ Error in subscription recovery: {e}")
+            results['errors'].append(f"Recovery failed: {e}")
+            return results
+
+        results['total_candidates'] = len(candidates)
+        tiers = {15.0: 'basic', 45.0: 'pro', 75.0: 'enterprise'}
+        for candidate in candidates:
+            user_id = candidate['user_id']
+            if await self.activate_subscription(user_id, tiers.get(candidate['amount_usd'], 'basic'), 30):
+                results['recovered'] += 1
+                self.logger.info("✅ Recovered subscription for user %s from payment %s", user_id, candidate['payment_id'])
+            else:
+                results['failed'] += 1
+                results['errors'].append(f"Failed to activate subscription for user {user_id}")
+        self.logger.info("📊 Recovery completed: %s recovered, %s failed", results['recovered'], results['failed'])
+        return results
+
+    async def get_pending_notifications(self, notification_type: str = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """Get queued notifications that have not been sent yet, oldest first."""
+        try:
+            if notification_type:
+                rows = await self.pool.fetch('''
+                    SELECT * FROM notification_queue
+                    WHERE sent_at IS NULL AND notification_type = $1
+                    ORDER BY id LIMIT $2
+                ''', notification_type, limit)
+            else:
+                rows = await self.pool.fetch('''
+                    SELECT * FROM notification_queue WHERE sent_at IS NULL ORDER BY id LIMIT $1
+                ''', limit)
+            return _rows(rows)
+        except Exception as e:
+            self.logger.error(f"Error getting pending notifications: {e}")
+            return []
+
+    async def mark_notifications_sent(self, notification_ids: List[int]) -> int:
+        """Mark queued notifications as sent; returns the number marked."""
+        if not notification_ids:
+            return 0
+        try:
+            return _count(await self.pool.execute('''
+                UPDATE notification_queue SET sent_at = $1
+                WHERE id = ANY($2::bigint[]) AND sent_at IS NULL
+            ''', datetime.now(), list(notification_ids)))
+        except Exception as e:
+            self.logger.error(f"Error marking notifications sent: {e}")
+            return 0
+
+    async def increment_message_count(self, user_id: int) -> bool:
+        """Increment message count for user."""
+        try:
+            await self.pool.execute('''
+                INSERT INTO message_stats (user_id, date, message_count) VALUES ($1, $2, 1)
+                ON CONFLICT (user_id, date) DO UPDATE SET message_count = message_stats.message_count + 1
+            ''', user_id, date.today())
+            return True
+        except Exception as e:
+            self.logger.error(f"Error incrementing message count: {e}")
+            return False
+
+    async def get_stats(self) -> Dict[str, Any]:
+        """Get system statistics."""
+        try:
+            row = await self.pool.fetchrow('''
+                SELECT
+                    (SELECT COUNT(*) FROM users) AS total_users,
+                    (SELECT COUNT(*) FROM users WHERE subscription_expires > $1) AS active_subscriptions,
+                    (SELECT COALESCE(SUM(message_count), 0) FROM message_stats WHERE date = $2) AS messages_today
+            ''', datetime.now(), date.today())
+            return {
+                'total_users': row['total_users'],
+                'active_subscriptions': row['active_subscriptions'],
+                'messages_today': row['messages_today'],
+                'revenue_this_month': 0.0
+            }
+        except Exception as e:
+            self.logger.error(f"Error getting stats: {e}")
+            return {'total_users': 0, 'active_subscriptions': 0, 'messages_today': 0, 'revenue_this_month': 0.0}
+
+    async def get_bot_statistics(self) -> Dict[str, Any]:
+        """Get comprehensive bot statistics."""
+        try:
+            now = datetime.now()
+            row = await self.pool.fetchrow('''
+                SELECT
+                    (SELECT COUNT(*) FROM users) AS total_users,
+                    (SELECT COUNT(*) FROM users
+                     WHERE subscription_tier IS NOT NULL AND subscription_expires > $1) AS active_subscriptions,
+                    (SELECT COUNT(*) FROM payments) AS total_payments,
+                    (SELECT COUNT(*) FROM payments WHERE status = 'completed') AS completed_payments,
+                    (SELECT COUNT(*) FROM ad_slots) AS total_ad_slots,
+                    (SELECT COUNT(*) FROM ad_slots WHERE is_active = 1) AS active_ad_slots,
+                    (SELECT COUNT(*) FROM workers) AS total_workers,
+                    (SELECT COUNT(*) FROM workers WHERE is_active = 1) AS active_workers,
+                    (SELECT COALESCE(SUM(amount_usd), 0) FROM payments
+                     WHERE status = 'completed' AND created_at >= date_trunc('month', $1::timestamp)) AS revenue_this_month,
+                    (SELECT COUNT(*) FROM worker_activity_log
+                     WHERE created_at > $1::timestamp - INTERVAL '24 hours') AS activity_last_24h
+            ''', now)
+            stats = dict(row)
+            self.logger.info("📊 Retrieved bot statistics: %s", stats)
+            return stats
+        except Exception as e:
+            self.logger.error(f"Error getting bot statistics: {e}")
+            return {}
+
+    async def delete_user_and_data(self, user_id: int) -> bool:
+        """Delete a user and all related data (ad slots, destinations, payments, stats, posts)."""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    slot_ids = [row['id'] for row in await conn.fetch('SELECT id FROM ad_slots WHERE user_id = $1', user_id)]
+                    if slot_ids:
+                        await conn.execute('DELETE FROM slot_destinations WHERE slot_id = ANY($1::bigint[])', slot_ids)
+                        await conn.execute('DELETE FROM ad_posts WHERE slot_id = ANY($1::bigint[])', slot_ids)
+                    await conn.execute('DELETE FROM ad_slots WHERE user_id = $1', user_id)
+                    await conn.execute('DELETE FROM payments WHERE user_id = $1', user_id)
+                    await conn.execute('DELETE FROM message_stats WHERE user_id = $1', user_id)
+                    await conn.execute('DELETE FROM users WHERE user_id = $1', user_id)
+            self._user_cache.invalidate_user(user_id)
+            self.logger.info("Deleted user %s and associated data", user_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting user {user_id}: {e}")
+            return False
+
+    # --- Payments ---
+
+    @timed(DB_QUERY_SECONDS)
+    async def create_payment(self, payment_id: str, user_id: int, amount_usd: float,
+                             crypto_type: str, payment_provider: str, pay_to_address: str,
+                             expected_amount_crypto: float, payment_url: str, expires_at: datetime,
+                             attribution_method: str = 'amount_only') -> bool:
+        """Create a new payment record in the database."""
+        try:
+            now = datetime.now()
+            await self.pool.execute('''
+                INSERT INTO payments (payment_id, user_id, amount_usd, crypto_type, payment_provider, pay_to_address,
+                                      expected_amount_crypto, payment_url, expires_at, attribution_method, status,
+                                      created_at, updated_at)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, 'pending', $11, $11)
+            ''', payment_id, user_id, amount_usd, crypto_type, payment_provider, pay_to_address,
+                expected_amount_crypto, payment_url, timestamp(expires_at), attribution_method, now)
+            self.logger.info("✅ Created payment %s for user %s", payment_id, user_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error creating payment {payment_id}: {e}")
+            return False
+
+    async def record_payment(self, user_id: int, payment_id: str, amount: float,
+                             currency: str, status: str, expires_at: datetime,
+                             timeout_minutes: int) -> bool:
+        """Record a new payment."""
+        try:
+            await self.pool.execute('''
+                INSERT INTO payments (payment_id, user_id, amount, currency, status, created_at, expires_at,
+                                      timeout_minutes)
+                VALUES ($1, $2, $3, $4, $5, $6, $7, $8)
+            ''', payment_id, user_id, amount, currency, status, datetime.now(), timestamp(expires_at),
+                timeout_minutes)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error recording payment: {e}")
+            return False
+
+    @timed(DB_QUERY_SECONDS)
+    async def update_payment_status(self, payment_id: str, status: str) -> bool:
+        """Update payment status and last checked time."""
+        try:
+            now = datetime.now()
+            await self.pool.execute('''
+                UPDATE payments SET status = $1, updated_at = $2, last_checked = $2 WHERE payment_id = $3
+            ''', status, now, payment_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating payment status: {e}")
+            return False
+
+    async def update_payment_field(self, payment_id: str, field_name: str, field_value: Any) -> bool:
+        """Update a specific (whitelisted) field in a payment record."""
+        if field_name not in _PAYMENT_FIELDS:
+            self.logger.error(f"Invalid payment field name: {field_name}")
+            return False
+        try:
+            if _PAYMENT_FIELDS[field_name]:
+                field_value = timestamp(field_value)
+            await self.pool.execute(
+                f"UPDATE payments SET {field_name} = $1, updated_at = $2 WHERE payment_id = $3",
+                field_value, datetime.now(), payment_id
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating payment field {field_name}: {e}")
+            return False
+
+    async def update_payment_last_checked(self, payment_id: str) -> bool:
+        """Update the last_checked time for a payment (used by background monitoring)."""
+        try:
+            await self.pool.execute('UPDATE payments SET last_checked = $1 WHERE payment_id = $2',
+                                    datetime.now(), payment_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating payment last_checked: {e}")
+            return False
+
+    @timed(DB_QUERY_SECONDS)
+    async def get_payment(self, payment_id: str) -> Optional[Dict[str, Any]]:
+        """Get payment by ID."""
+        try:
+            row = await self.pool.fetchrow('SELECT * FROM payments WHERE payment_id = $1', payment_id)
+            return _row(row) if row else None
+        except Exception as e:
+            self.logger.error(f"Error getting payment: {e}")
+            return None
+
+    @timed(DB_QUERY_SECONDS)
+    async def get_pending_payments(self, age_limit_minutes: int) -> List[Dict[str, Any]]:
+        """Get pending payments older than specified minutes."""
+        try:
+            cutoff_time = datetime.now() - timedelta(minutes=age_limit_minutes)
+            return _rows(await self.pool.fetch(
+                "SELECT * FROM payments WHERE status = 'pending' AND created_at < $1", cutoff_time
+            ))
+        except Exception as e:
+            self.logger.error(f"Error getting pending payments: {e}")
+            return []
+
+    async def delete_payment(self, payment_id: str) -> bool:
+        """Delete a payment from the database."""
+        try:
+            await self.pool.execute('DELETE FROM payments WHERE payment_id = $1', payment_id)
+            self.logger.info("✅ Deleted payment %s", payment_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting payment {payment_id}: {e}")
+            return False
+
+    async def get_all_payments(self) -> List[Dict[str, Any]]:
+        """Get all payments from the database."""
+        try:
+            return _rows(await self.pool.fetch('''
+                SELECT id, payment_id, user_id, tier, amount_usd, amount_crypto, crypto_type, status, created_at
+                FROM payments ORDER BY created_at DESC
+            '''))
+        except Exception as e:
+            self.logger.error(f"Error getting all payments: {e}")
+            return []
+
+    async def get_revenue_stats(self) -> Dict[str, Any]:
+        """Get revenue statistics from payments."""
+        try:
+            async with self.pool.acquire() as conn:
+                stats = await conn.fetchrow('''
+                    SELECT
+                        COUNT(*) AS total_payments,
+                        COALESCE(SUM(amount), 0) AS total_revenue,
+                        COUNT(*) FILTER (WHERE status = 'completed') AS completed_payments,
+                        COUNT(*) FILTER (WHERE status = 'pending') AS pending_payments,
+                        COUNT(*) FILTER (WHERE status = 'cancelled') AS cancelled_payments,
+                        COUNT(*) FILTER (WHERE status = 'completed' AND created_at >= $1) AS recent_count,
+                        COALESCE(SUM(amount) FILTER (WHERE status = 'completed' AND created_at >= $1), 0) AS recent_revenue
+                    FROM payments
+                ''', datetime.now() - timedelta(days=7))
+                crypto_stats = await conn.fetch('''
+                    SELECT COALESCE(crypto_type, currency, 'Unknown') AS crypto,
+                           COUNT(*) AS count, COALESCE(SUM(amount), 0) AS revenue
+                    FROM payments WHERE status = 'completed'
+                    GROUP BY COALESCE(crypto_type, currency, 'Unknown')
+                    ORDER BY revenue DESC
+                ''')
+            result = dict(stats)
+            result['crypto_breakdown'] = [tuple(row) for row in crypto_stats]
+            return result
+        except Exception as e:
+            self.logger.error(f"Error getting revenue stats: {e}")
+            return {
+                'total_payments': 0, 'total_revenue': 0, 'completed_payments': 0,
+                'pending_payments': 0, 'cancelled_payments': 0, 'recent_count': 0,
+                'recent_revenue': 0, 'crypto_breakdown': []
+            }
+
+    # --- User ad slots and destinations ---
+
+    async def _ensure_slots(self, conn, user_id: int, tier: str, now: datetime) -> int:
+        """Create the tier's missing ad slots for a user; returns slots created."""
+        return _count(await conn.execute('''
+            INSERT INTO ad_slots (user_id, slot_number, content, is_active, interval_minutes, created_at)
+            SELECT $1, wanted.slot_number, '', 1, 60, $3
+            FROM generate_series(1, $2::int) AS wanted (slot_number)
+            WHERE NOT EXISTS (
+                SELECT 1 FROM ad_slots s WHERE s.user_id = $1 AND s.slot_number = wanted.slot_number
+            )
+        ''', user_id, TIER_SLOTS.get(tier, 1), now))
+
+    async def get_user_slots(self, user_id: int) -> List[Dict[str, Any]]:
+        """Get all ad slots for a user, with their active destinations."""
+        cached = self._user_cache.get(UserLookupCache.SLOTS, user_id)
+        if cached is not MISSING:
+            return cached
+        try:
+            async with self.pool.acquire() as conn:
+                slots = _rows(await conn.fetch('SELECT * FROM ad_slots WHERE user_id = $1 ORDER BY slot_number', user_id))
+                destinations = await conn.fetch('''
+                    SELECT * FROM slot_destinations
+                    WHERE slot_id = ANY($1::bigint[]) AND is_active = 1
+                    ORDER BY id
+                ''', [slot['id'] for slot in slots])
+            by_slot: Dict[int, List[Dict[str, Any]]] = {}
+            for dest in destinations:
+                by_slot.setdefault(dest['slot_id'], []).append(_row(dest))
+            for slot in slots:
+                slot['destinations'] = by_slot.get(slot['id'], [])
+            self._user_cache.set(UserLookupCache.SLOTS, user_id, slots)
+            return slots
+        except Exception as e:
+            self.logger.error(f"Error getting user slots: {e}")
+            return []
+
+    async def get_user_ad_slots(self, user_id: int) -> List[Dict[str, Any]]:
+        """Get all ad slots for a user."""
+        cached = self._user_cache.get(UserLookupCache.AD_SLOTS, user_id)
+        if cached is not MISSING:
+            return cached
+        try:
+            slots = self._slot_dicts(await self.pool.fetch('''
+                SELECT id, slot_number, content, file_id, is_active, interval_minutes, last_sent_at, created_at
+                FROM ad_slots WHERE user_id = $1 ORDER BY slot_number
+            ''', user_id))
+            self._user_cache.set(UserLookupCache.AD_SLOTS, user_id, slots)
+            return slots
+        except Exception as e:
+            self.logger.error(f"Error getting user ad slots for {user_id}: {e}")
+            return []
+
+    async def get_or_create_ad_slots(self, user_id: int, tier: str = 'basic') -> List[Dict[str, Any]]:
+        """Get or create ad slots for a user based on their subscription tier."""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await self._ensure_slots(conn, user_id, tier, datetime.now())
+                    slots = self._slot_dicts(await conn.fetch('''
+                        SELECT id, slot_number, content, file_id, is_active, interval_minutes, last_sent_at
+                        FROM ad_slots WHERE user_id = $1 ORDER BY slot_number
+                    ''', user_id))
+            self._user_cache.invalidate_user(user_id)
+            self.logger.info("Retrieved %s ad slots for user %s", len(slots), user_id)
+            return slots
+        except Exception as e:
+            self.logger.error(f"Error getting/creating ad slots for user {user_id}: {e}")
+            return []
+
+    @staticmethod
+    def _slot_dicts(records: Iterable) -> List[Dict[str, Any]]:
+        slots = _rows(records)
+        for slot in slots:
+            slot['is_active'] = bool(slot['is_active'])
+        return slots
+
+    async def get_ad_slot_by_id(self, slot_id: int) -> Optional[Dict[str, Any]]:
+        """Get a specific ad slot by ID."""
+        try:
+            slots = self._slot_dicts(await self.pool.fetch('''
+                SELECT id, user_id, slot_number, content, file_id, is_active, interval_minutes, last_sent_at, created_at
+                FROM ad_slots WHERE id = $1
+            ''', slot_id))
+            return slots[0] if slots else None
+        except Exception as e:
+            self.logger.error(f"Error getting ad slot {slot_id}: {e}")
+            return None
+
+    async def get_ad_slots(self) -> List[Dict[str, Any]]:
+        """Get all ad slots from the database."""
+        try:
+            return self._slot_dicts(await self.pool.fetch('''
+                SELECT id, user_id, slot_number, content, file_id, is_active, interval_minutes, last_sent_at, created_at
+                FROM ad_slots ORDER BY user_id, slot_number
+            '''))
+        except Exception as e:
+            self.logger.error(f"Error getting ad slots: {e}")
+            return []
+
+    async def get_active_ad_slots(self, slot_type: str = 'user') -> List[Dict[str, Any]]:
+        """Get all active ad slots of one type ('user' or 'admin')."""
+        try:
+            if slot_type == 'admin':
+                rows = await self.pool.fetch('''
+                    SELECT id, slot_number, content, file_id, is_active, interval_minutes, last_sent_at, created_at
+                    FROM admin_ad_slots WHERE is_active = 1 ORDER BY slot_number
+                ''')
+            else:
+                rows = await self.pool.fetch('''
+                    SELECT id, user_id, slot_number, content, file_id, is_active, interval_minutes, last_sent_at, created_at
+                    FROM ad_slots WHERE is_active = 1 ORDER BY user_id, slot_number
+                ''')
+            slots = self._slot_dicts(rows)
+            self.logger.info("Found %s active %s ad slots", len(slots), slot_type)
+            return slots
+        except Exception as e:
+            self.logger.error(f"Error getting active {slot_type} ad slots: {e}")
+            return []
+
+    async def create_ad_slot(self, user_id: int, slot_number: int) -> Optional[int]:
+        """Create a new ad slot for a user."""
+        try:
+            slot_id = await self.pool.fetchval('''
+                INSERT INTO ad_slots (user_id, slot_number, created_at) VALUES ($1, $2, $3) RETURNING id
+            ''', user_id, slot_number, datetime.now())
+            self._user_cache.invalidate_user(user_id)
+            return slot_id
+        except Exception as e:
+            self.logger.error(f"Error creating ad slot: {e}")
+            return None
+
+    async def _update_slot(self, slot_id: int, assignments: str, *args, table: str = 'ad_slots') -> int:
+        """Run ``UPDATE table SET assignments, updated_at WHERE id`` and return the row count."""
+        count = len(args)
+        status = await self.pool.execute(
+            f"UPDATE {table} SET {assignments}, updated_at = ${count + 1} WHERE id = ${count + 2}",
+            *args, datetime.now(), slot_id
+        )
+        if table == 'ad_slots':
+            self._user_cache.invalidate_slot(slot_id)
+        return _count(status)
+
+    async def update_slot_content(self, slot_id: int, content: str, file_id: str = None) -> bool:
+        """Update slot content."""
+        try:
+            await self._update_slot(slot_id, 'content = $1, file_id = $2', content, file_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating slot content: {e}")
+            return False
+
+    async def update_ad_slot_content(self, slot_id: int, content: str, file_id: str = None) -> bool:
+        """Update the content of an ad slot."""
+        try:
+            if await self._update_slot(slot_id, 'content = $1, file_id = $2', content, file_id):
+                self.logger.info("✅ Updated content for ad slot %s", slot_id)
+                return True
+            self.logger.warning(f"⚠️ No ad slot found with ID {slot_id}")
+            return False
+        except Exception as e:
+            self.logger.error(f"Error updating ad slot content for {slot_id}: {e}")
+            return False
+
+    async def update_slot_category(self, slot_id: int, category: str) -> bool:
+        """Update the category of an ad slot."""
+        try:
+            if await self._update_slot(slot_id, 'category = $1', category):
+                self.logger.info("✅ Updated category for ad slot %s to %s", slot_id, category)
+                return True
+            self.logger.warning(f"⚠️ No ad slot found with ID {slot_id}")
+            return False
+        except Exception as e:
+            self.logger.error(f"Error updating category for ad slot {slot_id}: {e}")
+            return False
+
+    async def update_ad_slot_schedule(self, slot_id: int, interval_minutes: int, slot_type: str = 'user') -> bool:
+        """Update the posting schedule for an ad slot."""
+        table = 'admin_ad_slots' if slot_type == 'admin' else 'ad_slots'
+        try:
+            if await self._update_slot(slot_id, 'interval_minutes = $1', interval_minutes, table=table):
+                self.logger.info("✅ Updated schedule for %s slot %s: %s minutes", slot_type, slot_id, interval_minutes)
+                return True
+            self.logger.warning(f"⚠️ No {slot_type} slot found with ID {slot_id}")
+            return False
+        except Exception as e:
+            self.logger.error(f"Error updating schedule for {slot_type} slot {slot_id}: {e}")
+            return False
+
+    async def update_ad_slot_status(self, slot_id: int, is_active: bool) -> bool:
+        """Update the active status of an ad slot."""
+        try:
+            if await self._update_slot(slot_id, 'is_active = $1', int(bool(is_active))):
+                self.logger.info("✅ %s ad slot %s", 'Activated' if is_active else 'Deactivated', slot_id)
+                return True
+            self.logger.warning(f"⚠️ No ad slot found with ID {slot_id}")
+            return False
+        except Exception as e:
+            self.logger.error(f"Error updating ad slot status for {slot_id}: {e}")
+            return False
+
+    async def activate_slot(self, slot_id: int) -> bool:
+        """Activate a slot."""
+        try:
+            await self._update_slot(slot_id, 'is_active = 1')
+            return True
+        except Exception as e:
+            self.logger.error(f"Error activating slot: {e}")
+            return False
+
+    async def deactivate_slot(self, slot_id: int) -> bool:
+        """Deactivate a slot."""
+        try:
+            await self._update_slot(slot_id, 'is_active = 0')
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deactivating slot: {e}")
+            return False
+
+    async def add_slot_destination(self, slot_id: int, dest_type: str, dest_id: str, dest_name: str) -> bool:
+        """Add destination to a slot (at most 10 active destinations)."""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    count = await conn.fetchval(
+                        'SELECT COUNT(*) FROM slot_destinations WHERE slot_id = $1 AND is_active = 1', slot_id
+                    )
+                    if count >= 10:
+                        return False
+                    # Reactivates a previously removed row instead of adding another
+                    await conn.execute('''
+                        INSERT INTO slot_destinations (slot_id, destination_type, destination_id, destination_name,
+                                                       is_active, created_at)
+                        VALUES ($1, $2, $3, $4, 1, $5)
+                        ON CONFLICT (slot_id, destination_id) DO UPDATE SET
+                            destination_type = excluded.destination_type,
+                            destination_name = excluded.destination_name,
+                            is_active = 1,
+                            updated_at = excluded.created_at
+                    ''', slot_id, dest_type, dest_id, dest_name, datetime.now())
+            self._user_cache.invalidate_slot(slot_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error adding slot destination: {e}")
+            return False
+
+    async def remove_slot_destination(self, slot_id: int, dest_id: str) -> bool:
+        """Remove destination from a slot."""
+        try:
+            await self.pool.execute('''
+                UPDATE slot_destinations SET is_active = 0, updated_at = $1
+                WHERE slot_id = $2 AND destination_id = $3
+            ''', datetime.now(), slot_id, dest_id)
+            self._user_cache.invalidate_slot(slot_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error removing slot destination: {e}")
+            return False
+
+    @timed(DB_QUERY_SECONDS)
+    async def get_slot_destinations(self, slot_id: int, slot_type: str = 'user') -> List[Dict[str, Any]]:
+        """Get active destinations for a slot (used by posting system)."""
+        table = slot_destinations.ADMIN_TABLE if slot_type == 'admin' else slot_destinations.USER_TABLE
+        try:
+            return _rows(await self.pool.fetch(
+                f"SELECT * FROM {table} WHERE slot_id = $1 AND is_active = 1 ORDER BY created_at, id", slot_id
+            ))
+        except Exception as e:
+            self.logger.error(f"Error getting slot destinations: {e}")
+            return []
+
+    async def get_destinations_for_slot(self, slot_id: int) -> List[Dict[str, Any]]:
+        """Get destinations for a specific ad slot."""
+        try:
+            destinations = _rows(await self.pool.fetch('''
+                SELECT id, destination_type, destination_id, destination_name, alias, is_active
+                FROM slot_destinations WHERE slot_id = $1 AND is_active = 1 ORDER BY id
+            ''', slot_id))
+            for dest in destinations:
+                dest['is_active'] = bool(dest['is_active'])
+            return destinations
+        except Exception as e:
+            self.logger.error(f"Error getting destinations for slot {slot_id}: {e}")
+            return []
+
+    async def get_ad_destinations(self, slot_id: int, slot_type: str = 'user') -> List[Dict[str, Any]]:
+        """Get all destinations for a specific ad slot."""
+        table = slot_destinations.ADMIN_TABLE if slot_type == 'admin' else slot_destinations.USER_TABLE
+        try:
+            destinations = _rows(await self.pool.fetch(f'''
+                SELECT id, destination_type, destination_id, destination_name, alias, is_active, created_at
+                FROM {table} WHERE slot_id = $1 AND is_active = 1 ORDER BY id
+            ''', slot_id))
+            for dest in destinations:
+                dest['is_active'] = bool(dest['is_active'])
+            return destinations
+        except Exception as e:
+            self.logger.error(f"Error getting destinations for {slot_type} slot {slot_id}: {e}")
+            return []
+
+    async def _apply_destination_diff(self, conn, table: str, slot_id: int,
+                                      destinations: List[Dict[str, Any]], soft_delete: bool) -> Dict[str, int]:
+        """Postgres writer for slot_destinations.plan_diff (see slot_destinations.apply_diff)."""
+        now = datetime.now().replace(microsecond=0)
+        current = await conn.fetch(f'''
+            SELECT id, destination_id, destination_type, destination_name, alias, is_active
+            FROM {table} WHERE slot_id = $1
+        ''', slot_id)
+        counts, inserts, updates, removed = slot_destinations.plan_diff(
+            [tuple(row) for row in current], slot_id, destinations, now
+        )
+        if inserts:
+            await conn.executemany(f'''
+                INSERT INTO {table}
+                (slot_id, destination_type, destination_id, destination_name, alias, is_active, created_at, updated_at)
+                VALUES ($1, $2, $3, $4, $5, 1, $6, $7)
+            ''', inserts)
+        if updates:
+            await conn.executemany(f'''
+                UPDATE {table}
+                SET destination_type = $1, destination_name = $2, alias = $3, is_active = 1, updated_at = $4
+                WHERE id = $5
+            ''', updates)
+        if removed:
+            if soft_delete:
+                await conn.execute(f"UPDATE {table} SET is_active = 0, updated_at = $1 WHERE id = ANY($2::bigint[])",
+                                   now, removed)
+            else:
+                await conn.execute(f"DELETE FROM {table} WHERE id = ANY($1::bigint[])", removed)
+        return counts
+
+    async def update_destinations_for_slot(self, slot_id: int, destinations: List[Dict[str, Any]]) -> bool:
+        """Replace a slot's destinations, writing only the differences."""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    changes = await self._apply_destination_diff(
+                        conn, slot_destinations.USER_TABLE, slot_id, destinations, soft_delete=True
+                    )
+            self._user_cache.invalidate_slot(slot_id)
+            self.logger.info(
+                "✅ Updated destinations for slot %s: +%s -%s ~%s =%s",
+                slot_id, changes['added'] + changes['reactivated'], changes['removed'],
+                changes['updated'], changes['unchanged']
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating destinations for slot {slot_id}: {e}")
+            return False
+
+    async def get_paused_slots(self) -> List[Dict[str, Any]]:
+        """Get all paused ad slots for monitoring."""
+        try:
+            return _rows(await self.pool.fetch('''
+                SELECT s.*, u.username, u.first_name
+                FROM ad_slots s
+                JOIN users u ON s.user_id = u.user_id
+                WHERE s.is_paused = 1
+                ORDER BY s.pause_time DESC
+            '''))
+        except Exception as e:
+            self.logger.error(f"Error getting paused slots: {e}")
+            return []
+
+    # Legacy single-list destinations, kept on the user's first slot
+
+    async def add_destination(self, user_id: int, dest_type: str, dest_id: str, dest_name: str) -> bool:
+        """Legacy method - redirects to slot system."""
+        slots = await self.get_user_slots(user_id)
+        slot_id = slots[0]['id'] if slots else await self.create_ad_slot(user_id, 1)
+        if slot_id is None:
+            return False
+        return await self.add_slot_destination(slot_id, dest_type, dest_id, dest_name)
+
+    async def get_destinations(self, user_id: int = None) -> List[Dict[str, Any]]:
+        """Legacy method - get destinations from first slot."""
+        slots = await self.get_user_slots(user_id)
+        if not slots:
+            return []
+        return await self.get_slot_destinations(slots[0]['id'])
+
+    async def get_destination_by_id(self, dest_id: int, user_id: int) -> Optional[Dict[str, Any]]:
+        """Legacy method - get destination by ID."""
+        try:
+            row = await self.pool.fetchrow('''
+                SELECT sd.* FROM slot_destinations sd
+                JOIN ad_slots s ON sd.slot_id = s.id
+                WHERE sd.id = $1 AND s.user_id = $2 AND sd.is_active = 1
+            ''', dest_id, user_id)
+            return _row(row) if row else None
+        except Exception as e:
+            self.logger.error(f"Error getting destination by ID: {e}")
+            return None
+
+    async def set_destination_alias(self, dest_id: int, user_id: int, alias: str) -> bool:
+        """Legacy method - set destination alias."""
+        try:
+            await self.pool.execute('''
+                UPDATE slot_destinations SET alias = $1, updated_at = $2
+                WHERE id = $3 AND slot_id IN (SELECT id FROM ad_slots WHERE user_id = $4)
+            ''', alias, datetime.now(), dest_id, user_id)
+            self._user_cache.invalidate_user(user_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error setting destination alias: {e}")
+            return False
+
+    async def remove_destination(self, user_id: int, dest_id: int) -> bool:
+        """Legacy method - remove destination."""
+        try:
+            await self.pool.execute('''
+                UPDATE slot_destinations SET is_active = 0, updated_at = $1
+                WHERE id = $2 AND slot_id IN (SELECT id FROM ad_slots WHERE user_id = $3)
+            ''', datetime.now(), dest_id, user_id)
+            self._user_cache.invalidate_user(user_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error removing destination: {e}")
+            return False
+
+    # --- Posting loop ---
+
+    @timed(DB_QUERY_SECONDS)
+    async def get_active_ads_to_send(self) -> List[Dict[str, Any]]:
+        """Get active ad slots that are due for posting (both user and admin slots)."""
+        try:
+            now = datetime.now()
+            async with self.pool.acquire() as conn:
+                user_slots = await conn.fetch('''
+                    SELECT s.*, u.username, 'user' AS slot_type
+                    FROM ad_slots s
+                    JOIN users u ON s.user_id = u.user_id
+                    WHERE s.is_active = 1
+                    AND s.content IS NOT NULL
+                    AND s.content <> ''
+                    AND (u.subscription_expires IS NULL OR $1 < u.subscription_expires)
+                    AND (s.last_sent_at IS NULL
+                         OR $1 >= s.last_sent_at + make_interval(mins => s.interval_minutes))
+                ''', now)
+                admin_slots = await conn.fetch('''
+                    SELECT s.*, 'admin' AS username, 'admin' AS slot_type
+                    FROM admin_ad_slots s
+                    WHERE s.is_active = 1
+                    AND s.content IS NOT NULL
+                    AND s.content <> ''
+                    AND (s.last_sent_at IS NULL
+                         OR $1 >= s.last_sent_at + make_interval(mins => s.interval_minutes))
+                ''', now)
+            all_slots = _rows(user_slots) + _rows(admin_slots)
+            # NULL first, then oldest
+            all_slots.sort(key=lambda x: (x['last_sent_at'] is not None, x['last_sent_at'] or ''))
+            return all_slots
+        except Exception as e:
+            self.logger.error(f"Error getting active ads to send: {e}")
+            return []
+
+    @timed(DB_QUERY_SECONDS)
+    async def update_slot_last_sent(self, slot_id: int, slot_type: str = 'user') -> bool:
+        """Update the last_sent_at timestamp for a slot (user or admin)."""
+        table = 'admin_ad_slots' if slot_type == 'admin' else 'ad_slots'
+        try:
+            current_time = datetime.now().replace(microsecond=0)
+            await self.pool.execute(
+                f"UPDATE {table} SET last_sent_at = $1, updated_at = $1 WHERE id = $2", current_time, slot_id
+            )
+            if slot_type != 'admin':
+                self._user_cache.invalidate_slot(slot_id)
+            self.logger.info("✅ Updated last_sent_at for %s slot %s to %s", slot_type, slot_id, current_time)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating slot last sent: {e}")
+            return False
+
+    async def update_ad_last_sent(self, slot_id: int, slot_type: str = 'user') -> bool:
+        """Update the last_sent_at timestamp for an ad slot."""
+        table = 'admin_ad_slots' if slot_type == 'admin' else 'ad_slots'
+        try:
+            now = datetime.now()
+            status = await self.pool.execute(
+                f"UPDATE {table} SET last_sent_at = $1, updated_at = $1 WHERE id = $2", now, slot_id
+            )
+            if not _count(status):
+                self.logger.warning(f"⚠️ No {slot_type} slot found with ID {slot_id}")
+                return False
+            if slot_type != 'admin':
+                self._user_cache.invalidate_slot(slot_id)
+            self.logger.info("✅ Updated last_sent_at for %s slot %s", slot_type, slot_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating last_sent_at for {slot_type} slot {slot_id}: {e}")
+            return False
+
+    async def log_ad_post(self, slot_id: int, destination_id: str, destination_name: str,
+                          worker_id: int, success: bool, error: str = None) -> bool:
+        """Log an ad post attempt."""
+        try:
+            await self.pool.execute('''
+                INSERT INTO ad_posts (slot_id, destination_id, destination_name, worker_id, success, error)
+                VALUES ($1, $2, $3, $4, $5, $6)
+            ''', slot_id, destination_id, destination_name, worker_id, int(bool(success)), error)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error logging ad post: {e}")
+            return False
+
+    async def get_slot_post_stats(self, slot_ids: List[int]) -> Dict[str, int]:
+        """Count logged ad posts (total, successful, failed) for the given slots."""
+        stats = {'total': 0, 'successful': 0, 'failed': 0}
+        if not slot_ids:
+            return stats
+        try:
+            row = await self.pool.fetchrow('''
+                SELECT COUNT(*) AS total,
+                       COUNT(*) FILTER (WHERE success = 1) AS successful,
+                       COUNT(*) FILTER (WHERE success = 0) AS failed
+                FROM ad_posts WHERE slot_id = ANY($1::bigint[])
+            ''', list(slot_ids))
+            return dict(row) if row else stats
+        except Exception as e:
+            self.logger.error(f"Error getting slot post stats: {e}")
+            return stats
+
+    @timed(DB_QUERY_SECONDS)
+    async def update_destination_health(self, destination_id: str, success: bool) -> bool:
+        """Update destination health stats."""
+        column = 'last_success' if success else 'last_failure'
+        try:
+            await self.pool.execute(f'''
+                UPDATE destination_health SET {column} = $1, total_attempts = total_attempts + 1
+                WHERE destination_id = $2
+            ''', datetime.now(), destination_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating destination health: {e}")
+            return False
+
+    async def get_destination_health_summary(self) -> Dict[str, Any]:
+        """Get destination health summary for recovery."""
+        try:
+            destinations = _rows(await self.pool.fetch('''
+                SELECT destination_id, success_rate, last_success, last_failure, total_attempts
+                FROM destination_health
+                ORDER BY success_rate DESC
+            '''))
+            return {'destinations': destinations, 'total_destinations': len(destinations)}
+        except Exception as e:
+            self.logger.error(f"Error getting destination health summary: {e}")
+            return {'destinations': [], 'total_destinations': 0}
+
+    async def get_recent_posting_activity(self, hours: int = 24) -> List[Dict[str, Any]]:
+        """Get recent posting activity for recovery analysis."""
+        try:
+            activity = _rows(await self.pool.fetch('''
+                SELECT slot_id, worker_id, destination_id, posted_at, success
+                FROM posting_history
+                WHERE posted_at > $1
+                ORDER BY posted_at DESC
+            ''', datetime.now() - timedelta(hours=hours)))
+            for entry in activity:
+                entry['success'] = bool(entry['success'])
+            return activity
+        except Exception as e:
+            self.logger.error(f"Error getting recent posting activity: {e}")
+            return []
+
+    async def get_problematic_destinations(self, min_failures: int = 3) -> List[Dict[str, Any]]:
+        """Get destinations with more than min_failures failed posts in the last 24 hours."""
+        try:
+            return _rows(await self.pool.fetch('''
+                SELECT destination_id, destination_name, COUNT(*) AS error_count
+                FROM worker_activity_log
+                WHERE success = 0 AND created_at > $1
+                GROUP BY destination_id, destination_name
+                HAVING COUNT(*) > $2
+                ORDER BY error_count DESC
+            ''', datetime.now() - timedelta(hours=24), min_failures))
+        except Exception as e:
+            self.logger.error(f"Error getting problematic destinations: {e}")
+            return []
+
+    async def get_last_successful_posts(self) -> List[Dict[str, Any]]:
+        """Get the latest successful post time per slot for restart recovery."""
+        try:
+            return _rows(await self.pool.fetch('''
+                SELECT slot_id, COALESCE(slot_type, 'user') AS slot_type, MAX(posted_at) AS last_posted_at
+                FROM posting_history
+                WHERE success = 1
+                GROUP BY slot_id, COALESCE(slot_type, 'user')
+            '''))
+        except Exception as e:
+            self.logger.error(f"Error getting last successful posts: {e}")
+            return []
+
+    async def set_slot_last_sent_times(self, updates: Dict[str, List[tuple]]) -> bool:
+        """Set last_sent_at of user and admin slots in one transaction.
+
+        Args:
+            updates: 'user' and 'admin' lists of (last_sent_at, slot_id) pairs
+        """
+        if not updates.get('user') and not updates.get('admin'):
+            return True
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    for slot_type, table in (('user', 'ad_slots'), ('admin', 'admin_ad_slots')):
+                        if updates.get(slot_type):
+                            await conn.executemany(
+                                f"UPDATE {table} SET last_sent_at = $1 WHERE id = $2",
+                                [(timestamp(sent_at), slot_id) for sent_at, slot_id in updates[slot_type]]
+                            )
+            for _, slot_id in updates.get('user', []):
+                self._user_cache.invalidate_slot(slot_id)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating slot timestamps: {e}")
+            return False
+
+    async def expire_worker_bans(self) -> List[Dict[str, Any]]:
+        """Deactivate bans whose estimated unban time has passed and return them."""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    expired = _rows(await conn.fetch('''
+                        UPDATE worker_bans SET is_active = 0
+                        WHERE is_active = 1 AND estimated_unban_time IS NOT NULL AND estimated_unban_time < $1
+                        RETURNING worker_id, destination_id, ban_type, estimated_unban_time AS expired_at
+                    ''', datetime.now()))
+                    for worker_id in sorted({ban['worker_id'] for ban in expired}):
+                        await self._refresh_bans(conn, worker_id)
+            return expired
+        except Exception as e:
+            self.logger.error(f"Error expiring worker bans: {e}")
+            return []
+
+    async def get_active_worker_bans(self) -> List[Dict[str, Any]]:
+        """Get every active per-destination worker ban."""
+        try:
+            return _rows(await self.pool.fetch('''
+                SELECT worker_id, destination_id, ban_type, banned_at, estimated_unban_time
+                FROM worker_bans
+                WHERE is_active = 1
+                ORDER BY worker_id, id
+            '''))
+        except Exception as e:
+            self.logger.error(f"Error getting active worker bans: {e}")
+            return []
+
+    async def get_worker_posting_stats(self, hours: int = 24) -> List[Dict[str, Any]]:
+        """Get per-worker post, success and ban counts over the last hours."""
+        try:
+            return _rows(await self.pool.fetch('''
+                SELECT worker_id,
+                       COUNT(*) AS total_posts,
+                       COUNT(*) FILTER (WHERE success = 1) AS successful_posts,
+                       COUNT(*) FILTER (WHERE ban_detected = 1) AS ban_detections,
+                       COUNT(DISTINCT slot_id) AS slot_count,
+                       MAX(posted_at) AS last_activity
+                FROM posting_history
+                WHERE posted_at > $1
+                GROUP BY worker_id
+                ORDER BY worker_id
+            ''', datetime.now() - timedelta(hours=hours)))
+        except Exception as e:
+            self.logger.error(f"Error getting worker posting stats: {e}")
+            return []
+
+    async def get_destination_health_overview(self, worst_limit: int = 20) -> Dict[str, Any]:
+        """Get destination health counts by band and the worst destinations."""
+        overview = {'total_destinations': 0, 'average_success_rate': 0, 'critical_destinations': 0,
+                    'warning_destinations': 0, 'worst_destinations': []}
+        try:
+            async with self.pool.acquire() as conn:
+                overview.update(_row(await conn.fetchrow('''
+                    SELECT COUNT(*) AS total_destinations,
+                           COALESCE(AVG(success_rate), 0) AS average_success_rate,
+                           COUNT(*) FILTER (WHERE success_rate < 30) AS critical_destinations,
+                           COUNT(*) FILTER (WHERE success_rate >= 30 AND success_rate < 60) AS warning_destinations
+                    FROM destination_health
+                ''')))
+                overview['worst_destinations'] = _rows(await conn.fetch('''
+                    SELECT destination_id, success_rate, total_attempts
+                    FROM destination_health
+                    ORDER BY success_rate ASC, destination_id
+                    LIMIT $1
+                ''', worst_limit))
+            return overview
+        except Exception as e:
+            self.logger.error(f"Error getting destination health overview: {e}")
+            return overview
+
+    # --- Managed groups ---
+
+    async def get_managed_group_index(self) -> ManagedGroupIndex:
+        """Get the process-wide managed-group index, rebuilt only after group writes."""
+        index = group_index.cached(self.dsn)
+        try:
+            async with self.pool.acquire() as conn:
+                version = await conn.fetchval(
+                    'SELECT version FROM data_versions WHERE name = $1', group_index.VERSION_NAME
+                ) or 0
+                if index is None or index.version != version:
+                    # Byte order like SQLite, so positions and menus match across backends
+                    rows = await conn.fetch('''
+                        SELECT * FROM managed_groups
+                        WHERE is_active = 1
+                        ORDER BY category COLLATE "C", group_name COLLATE "C"
+                    ''')
+                    index = ManagedGroupIndex(_rows(rows), version)
+                    group_index.remember(self.dsn, index)
+            return index
+        except Exception as e:
+            self.logger.error(f"Error loading managed group index: {e}")
+            return index or ManagedGroupIndex([])
+
+    async def get_managed_groups(self, category: str = None) -> List[Dict[str, Any]]:
+        """Get managed groups, optionally filtered by category."""
+        index = await self.get_managed_group_index()
+        groups = index.in_category(category) if category else index.groups
+        return [dict(group) for group in groups]
+
+    async def get_managed_group_categories(self) -> List[str]:
+        """Get the categories that have active managed groups."""
+        index = await self.get_managed_group_index()
+        return index.categories()
+
+    async def get_managed_group_category_counts(self) -> Dict[str, int]:
+        """Get count of managed groups by category."""
+        index = await self.get_managed_group_index()
+        return index.category_counts()
+
+    async def find_managed_group(self, identifier: str) -> Optional[Dict[str, Any]]:
+        """Find an active managed group by group id, username or t.me link."""
+        index = await self.get_managed_group_index()
+        group = index.find(identifier)
+        return dict(group) if group else None
+
+    async def search_managed_groups(self, prefix: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Find active managed groups whose username or name starts with prefix."""
+        index = await self.get_managed_group_index()
+        return [dict(group) for group in index.search(prefix, limit)]
+
+    async def add_managed_group(self, group_id: str, group_name: str, category: str) -> bool:
+        """Add a managed group (or replace the one with the same group_id)."""
+        try:
+            await self.pool.execute('''
+                INSERT INTO managed_groups (group_id, group_name, category, is_active) VALUES ($1, $2, $3, 1)
+                ON CONFLICT (group_id) DO UPDATE SET
+                    group_name = excluded.group_name,
+                    category = excluded.category,
+                    is_active = 1
+            ''', group_id, group_name, category)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error adding managed group: {e}")
+            return False
+
+    async def bulk_upsert_managed_groups(self, rows: List[Dict[str, Any]]) -> Dict[str, int]:
+        """Add or update many managed groups in one transaction.
+
+        Rows are COPYed into a temp table and merged with one
+        ``INSERT ... ON CONFLICT`` that only touches changed groups.
+        Validation and counts are the same as DatabaseManager's.
+        """
+        groups, counts = group_index.prepare_upsert(rows)
+        if not groups:
+            return counts
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute('''
+                        CREATE TEMP TABLE managed_groups_import (
+                            group_id TEXT PRIMARY KEY, group_name TEXT, category TEXT
+                        ) ON COMMIT DROP
+                    ''')
+                    await conn.copy_records_to_table(
+                        'managed_groups_import',
+                        records=[(group_id, name, category) for group_id, (name, category) in groups.items()],
+                        columns=['group_id', 'group_name', 'category'],
+                    )
+                    changed = await conn.fetch('''
+                        INSERT INTO managed_groups (group_id, group_name, category, is_active)
+                        SELECT group_id, group_name, category, 1 FROM managed_groups_import
+                        ON CONFLICT (group_id) DO UPDATE SET
+                            group_name = excluded.group_name,
+                            category = excluded.category,
+                            is_active = 1
+                        WHERE managed_groups.group_name IS DISTINCT FROM excluded.group_name
+                        OR managed_groups.category IS DISTINCT FROM excluded.category
+                        OR COALESCE(managed_groups.is_active, 0) = 0
+                        RETURNING (xmax = 0) AS inserted
+                    ''')
+            counts['added'] = sum(1 for row in changed if row['inserted'])
+            counts['updated'] = len(changed) - counts['added']
+            counts['unchanged'] = len(groups) - len(changed)
+            self.logger.info(
+                "✅ Bulk upserted managed groups: %s added, %s updated, %s unchanged, %s skipped",
+                counts['added'], counts['updated'], counts['unchanged'], counts['skipped']
+            )
+            return counts
+        except Exception as e:
+            self.logger.error(f"Error bulk upserting managed groups: {e}")
+            counts.update(added=0, updated=0, unchanged=0, errors=1)
+            return counts
+
+    async def remove_managed_group(self, group_name: str) -> bool:
+        """Remove a managed group."""
+        try:
+            await self.pool.execute('DELETE FROM managed_groups WHERE group_name = $1', group_name)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error removing managed group: {e}")
+            return False
+
+    # --- Admin slots ---
+
+    async def get_admin_ad_slots(self) -> List[Dict[str, Any]]:
+        """Get all admin ad slots."""
+        try:
+            return _rows(await self.pool.fetch('SELECT * FROM admin_ad_slots ORDER BY id'))
+        except Exception as e:
+            self.logger.error(f"Error getting admin ad slots: {e}")
+            return []
+
+    async def get_admin_ad_slot(self, slot_number: int) -> Optional[Dict[str, Any]]:
+        """Get a specific admin ad slot by slot number."""
+        try:
+            row = await self.pool.fetchrow('SELECT * FROM admin_ad_slots WHERE slot_number = $1', slot_number)
+            return _row(row) if row else None
+        except Exception as e:
+            self.logger.error(f"Error getting admin ad slot {slot_number}: {e}")
+            return None
+
+    async def get_admin_slot_destinations(self, slot_number: int) -> List[Dict[str, Any]]:
+        """Get destinations for a specific admin ad slot."""
+        try:
+            return _rows(await self.pool.fetch('''
+                SELECT d.* FROM admin_slot_destinations d
+                JOIN admin_ad_slots s ON s.id = d.slot_id
+                WHERE s.slot_number = $1 AND d.is_active = 1
+                ORDER BY d.id
+            ''', slot_number))
+        except Exception as e:
+            self.logger.error(f"Error getting admin slot destinations for slot {slot_number}: {e}")
+            return []
+
+    async def update_admin_slot_content(self, slot_number: int, content: str, file_id: str = None) -> bool:
+        """Update content for a specific admin ad slot (file_id is kept if not given)."""
+        try:
+            await self.pool.execute('''
+                UPDATE admin_ad_slots SET content = $1, file_id = COALESCE($2, file_id), updated_at = $3
+                WHERE slot_number = $4
+            ''', content, file_id or None, datetime.now(), slot_number)
+            self.logger.info("Updated admin slot %s content", slot_number)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating admin slot {slot_number} content: {e}")
+            return False
+
+    async def update_admin_slot_status(self, slot_number: int, is_active: bool) -> bool:
+        """Update status for a specific admin ad slot."""
+        try:
+            await self.pool.execute('''
+                UPDATE admin_ad_slots SET is_active = $1, updated_at = $2 WHERE slot_number = $3
+            ''', int(bool(is_active)), datetime.now(), slot_number)
+            self.logger.info("Updated admin slot %s status to %s", slot_number, is_active)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating admin slot {slot_number} status: {e}")
+            return False
+
+    async def update_admin_slot_destinations(self, slot_number: int, destinations: List[Dict[str, Any]]) -> bool:
+        """Update destinations for an admin slot; removed destinations are deleted."""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    slot_id = await conn.fetchval('SELECT id FROM admin_ad_slots WHERE slot_number = $1', slot_number)
+                    if slot_id is None:
+                        return False
+                    active = [dest for dest in destinations if dest.get('is_active', True)]
+                    changes = await self._apply_destination_diff(
+                        conn, slot_destinations.ADMIN_TABLE, slot_id, active, soft_delete=False
+                    )
+            self.logger.info(
+                "Updated admin slot %s destinations (%s destinations: +%s -%s ~%s)",
+                slot_number, len(active), changes['added'] + changes['reactivated'],
+                changes['removed'], changes['updated']
+            )
+            return True
+        except Exception as e:
+            self.logger.error(f"Error updating admin slot {slot_number} destinations: {e}")
+            return False
+
+    async def add_admin_slot_destination(self, slot_number: int, destination_data: Dict[str, Any]) -> bool:
+        """Add a single destination to an admin slot (no-op if already present)."""
+        try:
+            async with self.pool.acquire() as conn:
+                slot_id = await conn.fetchval('SELECT id FROM admin_ad_slots WHERE slot_number = $1', slot_number)
+                if slot_id is None:
+                    return False
+                now = datetime.now()
+                await conn.execute('''
+                    INSERT INTO admin_slot_destinations
+                    (slot_id, destination_type, destination_id, destination_name, alias, is_active, created_at, updated_at)
+                    VALUES ($1, $2, $3, $4, $5, $6, $7, $7)
+                    ON CONFLICT (slot_id, destination_id) DO NOTHING
+                ''', slot_id, destination_data.get('destination_type', 'group'),
+                    destination_data.get('destination_id', ''), destination_data.get('destination_name', ''),
+                    destination_data.get('alias', ''), int(bool(destination_data.get('is_active', True))), now)
+            self.logger.info("Added destination to admin slot %s: %s", slot_number, destination_data.get('destination_name', 'Unknown'))
+            return True
+        except Exception as e:
+            self.logger.error(f"Error adding destination to admin slot {slot_number}: {e}")
+            return False
+
+    async def remove_admin_slot_destination(self, slot_number: int, destination_id: str) -> bool:
+        """Remove a single destination from an admin slot."""
+        try:
+            status = await self.pool.execute('''
+                DELETE FROM admin_slot_destinations
+                WHERE slot_id = (SELECT id FROM admin_ad_slots WHERE slot_number = $1) AND destination_id = $2
+            ''', slot_number, destination_id)
+            if _count(status):
+                self.logger.info("Removed destination from admin slot %s: %s", slot_number, destination_id)
+                return True
+            self.logger.warning(f"Destination not found in admin slot {slot_number}: {destination_id}")
+            return False
+        except Exception as e:
+            self.logger.error(f"Error removing destination from admin slot {slot_number}: {e}")
+            return False
+
+    async def delete_admin_slot(self, slot_number: int) -> bool:
+        """Delete a specific admin ad slot and its destinations."""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute('''
+                        DELETE FROM admin_slot_destinations
+                        WHERE slot_id IN (SELECT id FROM admin_ad_slots WHERE slot_number = $1)
+                    ''', slot_number)
+                    await conn.execute('DELETE FROM admin_ad_slots WHERE slot_number = $1', slot_number)
+            self.logger.info("Deleted admin slot %s", slot_number)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error deleting admin slot {slot_number}: {e}")
+            return False
+
+    async def create_admin_ad_slots(self) -> bool:
+        """Create initial admin ad slots if none exist."""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    existing_count = await conn.fetchval('SELECT COUNT(*) FROM admin_ad_slots')
+                    if existing_count > 0:
+                        self.logger.info("Admin slots already exist (%s slots)", existing_count)
+                        return True
+                    now = datetime.now()
+                    await conn.executemany('''
+                        INSERT INTO admin_ad_slots (slot_number, content, is_active, created_at, updated_at)
+                        VALUES ($1, $2, 1, $3, $3)
+                        ON CONFLICT (slot_number) DO NOTHING
+                    ''', [(i, content, now) for i, content in enumerate(ADMIN_SLOT_SAMPLE_CONTENT, start=1)])
+            self.logger.info("Created 5 initial admin ad slots")
+            return True
+        except Exception as e:
+            self.logger.error(f"Error creating admin ad slots: {e}")
+            return False
+
+    async def get_admin_slots_stats(self) -> Dict[str, Any]:
+        """Get admin slot statistics."""
+        try:
+            row = await self.pool.fetchrow('''
+                SELECT COUNT(*) AS total_slots,
+                       COUNT(*) FILTER (WHERE is_active = 1) AS active_slots,
+                       COUNT(*) FILTER (WHERE is_paused = 1) AS paused_slots
+                FROM admin_ad_slots
+            ''')
+            return dict(row)
+        except Exception as e:
+            self.logger.error(f"Error getting admin slots stats: {e}")
+            return {'total_slots': 0, 'active_slots': 0, 'paused_slots': 0}
+
+    # --- Workers ---
+
+    async def _seed_snapshots(self, conn, worker_ids: List[int]) -> int:
+        """Create default health snapshot rows for workers without one."""
+        existing = {row[0] for row in await conn.fetch('SELECT worker_id FROM worker_health_snapshot')}
+        now = datetime.now()
+        rows = [worker_health.derive(worker_health.new_snapshot(worker_id), now)
+                for worker_id in set(worker_ids) - existing]
+        await self._save_snapshots(conn, rows)
+        return len(rows)
+
+    @staticmethod
+    async def _load_snapshot(conn, worker_id: int) -> Dict[str, Any]:
+        """Snapshot row of a worker, locked for the rest of the transaction."""
+        found = await conn.fetchrow(f"{_SNAPSHOT_SELECT} WHERE worker_id = $1 FOR UPDATE", worker_id)
+        return dict(found) if found else worker_health.new_snapshot(worker_id)
+
+    @staticmethod
+    async def _save_snapshots(conn, rows: List[Dict[str, Any]]) -> None:
+        if rows:
+            await conn.executemany(
+                _SNAPSHOT_UPSERT, [tuple(row[column] for column in worker_health.COLUMNS) for row in rows]
+            )
+
+    async def _refresh_bans(self, conn, worker_id: int) -> None:
+        count, ban_types = await conn.fetchrow('''
+            SELECT COUNT(*), string_agg(DISTINCT ban_type, ',')
+            FROM worker_bans WHERE worker_id = $1 AND is_active = 1
+        ''', worker_id)
+        row = await self._load_snapshot(conn, worker_id)
+        await self._save_snapshots(conn, [worker_health.apply_bans(row, count, ban_types, datetime.now())])
+
+    @timed(DB_QUERY_SECONDS)
+    async def record_posting_attempt(self, worker_id: int, destination_id: str, success: bool, error: str = None) -> bool:
+        """Record a posting attempt and fold it into the worker's health snapshot."""
+        try:
+            now = datetime.now()
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute('''
+                        INSERT INTO worker_activity_log (worker_id, destination_id, success, error, created_at)
+                        VALUES ($1, $2, $3, $4, $5)
+                    ''', worker_id, destination_id, int(bool(success)), error, now)
+                    row = await self._load_snapshot(conn, worker_id)
+                    await self._save_snapshots(conn, [worker_health.apply_attempt(row, success, error, now)])
+            return True
+        except Exception as e:
+            self.logger.error(f"Error recording posting attempt: {e}")
+            return False
+
+    @timed(DB_QUERY_SECONDS)
+    async def record_worker_post(self, worker_id: int, destination_id: str) -> bool:
+        """Record worker post for usage tracking."""
+        try:
+            now = datetime.now()
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    status = await conn.execute('''
+                        UPDATE worker_usage
+                        SET messages_sent_today = messages_sent_today + 1,
+                            messages_sent_this_hour = CASE
+                                WHEN last_reset_hour = $1 THEN messages_sent_this_hour + 1
+                                ELSE 1
+                            END,
+                            last_reset_hour = $1,
+                            updated_at = $2
+                        WHERE worker_id = $3 AND date = $4
+                    ''', now.hour, now, worker_id, now.date())
+                    if not _count(status):
+                        await conn.execute('''
+                            INSERT INTO worker_usage (worker_id, date, messages_sent_today, messages_sent_this_hour,
+                                                      last_reset_hour, created_at)
+                            VALUES ($1, $2, 1, 1, $3, $4)
+                        ''', worker_id, now.date(), now.hour, now)
+                    row = await self._load_snapshot(conn, worker_id)
+                    await self._save_snapshots(conn, [worker_health.apply_post(row, now)])
+            return True
+        except Exception as e:
+            self.logger.error(f"Error recording worker post: {e}")
+            return False
+
+    async def record_worker_ban(self, worker_id: int, destination_id: str, ban_type: str, ban_reason: str,
+                                estimated_unban_time: str = None) -> bool:
+        """Record a worker ban for a specific destination."""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    await conn.execute('''
+                        INSERT INTO worker_bans
+                        (worker_id, destination_id, ban_type, ban_reason, banned_at, estimated_unban_time, is_active)
+                        VALUES ($1, $2, $3, $4, $5, $6, 1)
+                    ''', worker_id, destination_id, ban_type, ban_reason,
+                        datetime.now().replace(microsecond=0), timestamp(estimated_unban_time))
+                    await self._refresh_bans(conn, worker_id)
+            self.logger.info("Recorded ban for worker %s in %s: %s", worker_id, destination_id, ban_type)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error recording worker ban: {e}")
+            return False
+
+    async def clear_worker_ban(self, worker_id: int, destination_id: str) -> bool:
+        """Deactivate a worker's active bans for one destination."""
+        try:
+            async with self.pool.acquire() as conn:
+                async with conn.transaction():
+                    cleared = _count(await conn.execute('''
+                        UPDATE worker_bans SET is_active = 0
+                        WHERE worker_id = $1 AND destination_id = $2 AND is_active = 1
+                    ''', worker_id, destination_id))
+                    if cleared:
+                        await self._refresh_bans(conn, worker_id)
+            if cleared:
+                self.logger.info("Cleared %s ban(s) for worker %s in %s", cleared, worker_id, destination_id)
+            return cleared > 0
+        except Exception as e:
+            self.logger.error(f"Error clearing worker ban: {e}")
+            return False
+
+    @timed(DB_QUERY_SECONDS)
+    async def is_worker_banned(self, worker_id: int, group_id: str = None) -> bool:
+        """Check if worker is banned (same chat_id lookup as DatabaseManager)."""
+        try:
+            if group_id:
+                count = await self.pool.fetchval(
+                    'SELECT COUNT(*) FROM worker_bans WHERE worker_id = $1 AND chat_id = $2', worker_id, str(group_id)
+                )
+            else:
+                count = await self.pool.fetchval('SELECT COUNT(*) FROM worker_bans WHERE worker_id = $1', worker_id)
+            return count > 0
+        except Exception as e:
+            self.logger.error(f"Error checking worker ban: {e}")
+            return False
+
+    async def get_worker_bans(self, worker_id: int = None, active_only: bool = True) -> List[Dict[str, Any]]:
+        """Get worker ban information (legacy worker_health table)."""
+        try:
+            if worker_id:
+                rows = await self.pool.fetch('''
+                    SELECT worker_id, ban_count, last_ban_date, is_banned FROM worker_health WHERE worker_id = $1
+                ''', worker_id)
+            else:
+                rows = await self.pool.fetch('SELECT worker_id, ban_count, last_ban_date, is_banned FROM worker_health')
+            bans = _rows(rows)
+            for ban in bans:
+                ban['is_banned'] = bool(ban['is_banned'])
+            return bans
+        except Exception as e:
+            self.logger.error(f"Error getting worker bans: {e}")
+            return []
+
+    @timed(DB_QUERY_SECONDS)
+    async def get_worker_health_snapshots(self) -> List[Dict[str, Any]]:
+        """Get the precomputed health row of every worker (one query, no joins)."""
+        try:
+            now = datetime.now()
+            rows = await self.pool.fetch(f"{_SNAPSHOT_SELECT} ORDER BY worker_id")
+            return [worker_health.for_display(dict(row), now) for row in rows]
+        except Exception as e:
+            self.logger.error(f"Error getting worker health snapshots: {e}")
+            return []
+
+    @timed(DB_QUERY_SECONDS)
+    async def get_worker_usage(self, worker_id: int) -> Dict[str, Any]:
+        """Get worker usage statistics."""
+        try:
+            row = await self.pool.fetchrow('''
+                SELECT daily_limit, hourly_limit, messages_sent_today, messages_sent_this_hour
+                FROM worker_usage WHERE worker_id = $1
+                ORDER BY date DESC NULLS LAST, id DESC LIMIT 1
+            ''', worker_id)
+            if not row:
+                return dict(_DEFAULT_USAGE)
+            usage = dict(row)
+            usage['daily_percentage'] = (usage['messages_sent_today'] / usage['daily_limit']) * 100 if usage['daily_limit'] > 0 else 0
+            usage['hourly_percentage'] = (usage['messages_sent_this_hour'] / usage['hourly_limit']) * 100 if usage['hourly_limit'] > 0 else 0
+            return usage
+        except Exception as e:
+            self.logger.error(f"Error getting worker usage: {e}")
+            return dict(_DEFAULT_USAGE)
+
+    async def initialize_worker_limits(self, worker_id: int) -> bool:
+        """Initialize worker limits for a new worker."""
+        return await self.bulk_initialize_worker_limits([worker_id])
+
+    async def bulk_initialize_worker_limits(self, worker_ids: List[int]) -> bool:
+        """Initialize worker limits for several workers in one statement."""
+        try:
+            await self.pool.execute('''
+                INSERT INTO worker_usage (worker_id, hourly_posts, daily_posts, hourly_limit, daily_limit, created_at)
+                SELECT DISTINCT ids.worker_id, 0, 0, 15, 150, $2::timestamp
+                FROM unnest($1::bigint[]) AS ids (worker_id)
+                WHERE NOT EXISTS (SELECT 1 FROM worker_usage wu WHERE wu.worker_id = ids.worker_id)
+            ''', list(worker_ids), datetime.now())
+            self.logger.info("Initialized limits for workers %s", list(worker_ids))
+            return True
+        except Exception as e:
+            self.logger.error(f"Error initializing worker limits for {list(worker_ids)}: {e}")
+            return False
+
+    async def get_all_workers(self) -> List[Dict[str, Any]]:
+        """Get all workers with today's usage."""
+        try:
+            return _rows(await self.pool.fetch('''
+                SELECT wc.worker_id, wc.is_active, wc.last_used_at, wc.created_at,
+                       COALESCE(wu.messages_sent_today, 0) AS messages_today,
+                       COALESCE(wu.daily_limit, 50) AS daily_limit
+                FROM worker_cooldowns wc
+                LEFT JOIN worker_usage wu ON wc.worker_id = wu.worker_id AND wu.date = $1
+                ORDER BY wc.worker_id
+            ''', date.today()))
+        except Exception as e:
+            self.logger.error(f"Error getting all workers: {e}")
+            return []
+
+    @timed(DB_QUERY_SECONDS)
+    async def get_available_workers(self) -> List[Dict[str, Any]]:
+        """Get available (active and not at limit) workers."""
+        try:
+            return _rows(await self.pool.fetch('''
+                SELECT wc.worker_id, wc.is_active, wc.last_used_at,
+                       COALESCE(wu.messages_sent_today, 0) AS messages_today,
+                       COALESCE(wu.daily_limit, 50) AS daily_limit
+                FROM worker_cooldowns wc
+                LEFT JOIN worker_usage wu ON wc.worker_id = wu.worker_id AND wu.date = $1
+                WHERE wc.is_active = 1
+                AND COALESCE(wu.messages_sent_today, 0) < COALESCE(wu.daily_limit, 50)
+                ORDER BY wc.last_used_at ASC NULLS FIRST
+            ''', date.today()))
+        except Exception as e:
+            self.logger.error(f"Error getting available workers: {e}")
+            return []
+
+    async def get_posting_history(self, worker_id: int = None, hours: int = 24, limit: int = None) -> List[Dict[str, Any]]:
+        """Get posting history."""
+        try:
+            since = datetime.now() - timedelta(hours=hours)
+            if worker_id:
+                rows = await self.pool.fetch('''
+                    SELECT * FROM worker_activity_log WHERE worker_id = $1 AND created_at > $2
+                    ORDER BY created_at DESC LIMIT $3
+                ''', worker_id, since, limit)
+            else:
+                rows = await self.pool.fetch('''
+                    SELECT * FROM worker_activity_log WHERE created_at > $1
+                    ORDER BY created_at DESC LIMIT $2
+                ''', since, limit)
+            return _rows(rows)
+        except Exception as e:
+            self.logger.error(f"Error getting posting history: {e}")
+            return []
+
+    async def create_worker_cooldowns_table(self):
+        """No-op: initialize() creates worker_cooldowns."""
+
+    async def ensure_worker_cooldowns_table(self):
+        """No-op: initialize() creates worker_cooldowns."""
+
+    @timed(DB_QUERY_SECONDS)
+    async def get_worker_cooldown(self, worker_id: int) -> int:
+        """Seconds left in a worker's posting cooldown (0 if none)."""
+        try:
+            now = datetime.now()
+            cooldown_until = await self.pool.fetchval(
+                'SELECT cooldown_until FROM worker_cooldowns WHERE worker_id = $1 AND cooldown_until > $2',
+                worker_id, now
+            )
+            return max(0, int((cooldown_until - now).total_seconds())) if cooldown_until else 0
+        except Exception as e:
+            self.logger.error(f"Error checking worker cooldown: {e}")
+            return 0
+
+    async def set_worker_cooldown(self, worker_id: int, duration_seconds: int) -> bool:
+        """Put a worker in a posting cooldown for duration_seconds."""
+        try:
+            now = datetime.now().replace(microsecond=0)
+            await self.pool.execute('''
+                INSERT INTO worker_cooldowns (worker_id, cooldown_until, created_at, updated_at)
+                VALUES ($1, $2, $3, $3)
+                ON CONFLICT (worker_id) DO UPDATE SET
+                    cooldown_until = excluded.cooldown_until,
+                    updated_at = excluded.updated_at
+            ''', worker_id, now + timedelta(seconds=duration_seconds), now)
+            return True
+        except Exception as e:
+            self.logger.error(f"Error setting worker cooldown: {e}")
+            return False
+
+    async def record_failed_group_join(self, worker_id: int, group_id: str, error: str) -> bool:
+        """Record a failed group join attempt."""
+        try:
+            await self.pool.execute('''
+                INSERT INTO failed_group_joins (worker_id, group_id, error, created_at) VALUES ($1, $2, $3, $4)
+            ''', worker_id, group_id, error, datetime.now())
+            return True
+        except Exception as e:
+            self.logger.error(f"Error recording failed group join: {e}")
+            return False
+
+    async def get_failed_group_joins(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """Get recent failed group join attempts."""
+        try:
+            return _rows(await self.pool.fetch(
+                'SELECT * FROM failed_group_joins ORDER BY created_at DESC LIMIT $1', limit
+            ))
+        except Exception as e:
+            self.logger.error(f"Error getting failed group joins: {e}")
+            return []
+
+    # --- Health ---
+
+    async def health_check(self) -> Dict[str, Any]:
+        """Perform a health check of the database and the main flows."""
+        health_status = {
+            'database_connection': False,
+            'tables_exist': False,
+            'subscription_flow': False,
+            'payment_flow': False,
+            'ad_slot_flow': False,
+            'missing_subscriptions': 0,
+            'orphaned_payments': 0,
+            'lookup_cache': self.get_cache_stats(),
+            'pool': {'size': 0, 'idle': 0, 'max_size': self.max_size},
+            'errors': []
+        }
+        try:
+            required_tables = ['users', 'payments', 'ad_slots', 'slot_destinations',
+                               'admin_ad_slots', 'admin_slot_destinations']
+            async with self.pool.acquire() as conn:
+                await conn.fetchval('SELECT 1')
+                health_status['database_connection'] = True
+                existing = await conn.fetchval(
+                    'SELECT COUNT(*) FROM unnest($1::text[]) AS t (name) WHERE to_regclass(name) IS NOT NULL',
+                    required_tables
+                )
+                health_status['tables_exist'] = existing == len(required_tables)
+                health_status['missing_subscriptions'] = await conn.fetchval('''
+                    SELECT COUNT(DISTINCT p.user_id)
+                    FROM payments p
+                    LEFT JOIN users u ON p.user_id = u.user_id
+                    WHERE p.status = 'completed'
+                    AND (u.subscription_tier IS NULL
+                         OR u.subscription_expires IS NULL
+                         OR u.subscription_expires < $1)
+                ''', datetime.now())
+                health_status['orphaned_payments'] = await conn.fetchval('''
+                    SELECT COUNT(*) FROM payments p
+                    LEFT JOIN users u ON p.user_id = u.user_id
+                    WHERE u.user_id IS NULL
+                ''')
+            health_status['pool'].update(size=self.pool.get_size(), idle=self.pool.get_idle_size())
+        except Exception as e:
+            health_status['errors'].append(f"Health check failed: {e}")
+            return health_status
+
+        test_user_id = 999999999
+        for flow, check in (('subscription_flow', lambda: self.get_user_subscription(test_user_id)),
+                            ('payment_flow', lambda: self.get_payment("TEST_PAYMENT_ID")),
+                            ('ad_slot_flow', lambda: self.get_user_ad_slots(test_user_id))):
+            try:
+                await check()
+                health_status[flow] = True
+            except Exception as e:
+                health_status['errors'].append(f"Error testing {flow.replace('_', ' ')}: {e}")
+        return health_status
@@ -0,0 +1,154 @@
+"""
+Set-diff updates for slot destination tables.
+
+Saving a slot's destinations used to deactivate (user slots) or delete
+(admin slots) every row and insert the full list again, so
+slot_destinations grew by one dead row per destination per save. apply_diff()
+compares the desired list with the rows already stored for the slot and
+writes only the differences with executemany:
+
+- new destination ids are inserted (or an inactive row is reactivated),
+- kept ids are updated only if their type, name or alias changed,
+- ids no longer wanted are deactivated (soft delete) or deleted.
+
+A unique (slot_id, destination_id) index keeps at most one row per
+destination and slot. compact() is the one-time migration that removes
+the duplicate and tombstone rows that existed before the index.
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+USER_TABLE = 'slot_destinations'
+ADMIN_TABLE = 'admin_slot_destinations'
+TABLES = (USER_TABLE, ADMIN_TABLE)
+
+
+def _index_name(table: str) -> str:
+    return f"idx_{table}_slot_destination"
+
+
+def has_unique_index(cursor: sqlite3.Cursor, table: str) -> bool:
+    cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (_index_name(table),))
+    return cursor.fetchone() is not None
+
+
+def compact(cursor: sqlite3.Cursor, table: str) -> int:
+    """Keep one row per (slot_id, destination_id); returns rows removed.
+
+    The active row wins over inactive ones, then the newest row. Rows
+    without a destination_id are dropped.
+    """
+    cursor.execute(f"DELETE FROM {table} WHERE destination_id IS NULL OR destination_id = ''")
+    removed = cursor.rowcount
+    cursor.execute(f'''
+        DELETE FROM {table}
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY slot_id, destination_id
+                    ORDER BY COALESCE(is_active, 0) DESC, id DESC
+                ) AS row_rank
+                FROM {table}
+            )
+            WHERE row_rank > 1
+        )
+    ''')
+    return removed + cursor.rowcount
+
+
+def ensure_unique_index(cursor: sqlite3.Cursor, table: str) -> int:
+    """Compact the table once and create the unique index; returns rows removed."""
+    if has_unique_index(cursor, table):
+        return 0
+    removed = compact(cursor, table)
+    cursor.execute(f"CREATE UNIQUE INDEX IF NOT EXISTS {_index_name(table)} ON {table} (slot_id, destination_id)")
+    return removed
+
+
+def _desired(destinations: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """Destinations keyed by destination_id (first occurrence wins)."""
+    desired: Dict[str, Dict[str, Any]] = {}
+    for dest in destinations:
+        destination_id = dest.get('destination_id')
+        if destination_id and destination_id not in desired:
+            desired[destination_id] = dest
+    return desired
+
+
+def plan_diff(current_rows: List[tuple], slot_id: int, destinations: List[Dict[str, Any]],
+              now: Any) -> Tuple[Dict[str, int], List[tuple], List[tuple], List[int]]:
+    """Work out the writes that make a slot's active destinations equal destinations.
+
+    Args:
+        current_rows: Stored (id, destination_id, destination_type,
+            destination_name, alias, is_active) rows of the slot
+        slot_id: Slot the rows belong to
+        destinations: Desired destinations
+        now: Timestamp value written to created_at/updated_at
+
+    Returns:
+        (counts, inserts, updates, removed_ids) where inserts are
+        (slot_id, type, destination_id, name, alias, created_at, updated_at)
+        and updates are (type, name, alias, updated_at, row_id)
+    """
+    current = {row[1]: row for row in current_rows}
+    desired = _desired(destinations)
+
+    counts = {'added': 0, 'reactivated': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+    inserts, updates = [], []
+    for destination_id, dest in desired.items():
+        dest_type = dest.get('destination_type') or 'group'
+        name = dest.get('destination_name') or destination_id
+        row = current.get(destination_id)
+        if row is None:
+            inserts.append((slot_id, dest_type, destination_id, name, dest.get('alias'), now, now))
+            counts['added'] += 1
+            continue
+        row_id, _, old_type, old_name, old_alias, is_active = row
+        alias = old_alias if dest.get('alias') is None else dest.get('alias')
+        if is_active and (old_type, old_name, old_alias) == (dest_type, name, alias):
+            counts['unchanged'] += 1
+            continue
+        updates.append((dest_type, name, alias, now, row_id))
+        counts['updated' if is_active else 'reactivated'] += 1
+
+    removed = [row[0] for destination_id, row in current.items() if row[5] and destination_id not in desired]
+    counts['removed'] = len(removed)
+    return counts, inserts, updates, removed
+
+
+def apply_diff(cursor: sqlite3.Cursor, table: str, slot_id: int, destinations: List[Dict[str, Any]],
+               soft_delete: bool = True, now: Optional[datetime] = None) -> Dict[str, int]:
+    """Make the slot's active destinations equal to destinations.
+
+    An alias of None keeps the stored alias. Returns counts of added,
+    reactivated, updated, removed and unchanged destinations.
+    """
+    now = (now or datetime.now()).isoformat(sep=' ', timespec='seconds')
+    cursor.execute(f'''
+        SELECT id, destination_id, destination_type, destination_name, alias, is_active
+        FROM {table} WHERE slot_id = ?
+    ''', (slot_id,))
+    counts, inserts, updates, removed = plan_diff(cursor.fetchall(), slot_id, destinations, now)
+
+    if inserts:
+        cursor.executemany(f'''
+            INSERT INTO {table}
+            (slot_id, destination_type, destination_id, destination_name, alias, is_active, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, 1, ?, ?)
+        ''', inserts)
+    if updates:
+        cursor.executemany(f'''
+            UPDATE {table}
+            SET destination_type = ?, destination_name = ?, alias = ?, is_active = 1, updated_at = ?
+            WHERE id = ?
+        ''', updates)
+    if removed:
+        if soft_delete:
+            cursor.executemany(f"UPDATE {table} SET is_active = 0, updated_at = ? WHERE id = ?",
+                               [(now, row_id) for row_id in removed])
+        else:
+            cursor.executemany(f"DELETE FROM {table} WHERE id = ?", [(row_id,) for row_id in removed])
+    return counts
@@ -0,0 +1,261 @@
+"""
+Per-worker health snapshot maintained incrementally.
+
+Every posting outcome updates one ``worker_health_snapshot`` row for the
+worker: attempt and failure counters, an exponentially weighted error rate,
+hourly/daily post buckets for utilization, active ban summary, the last
+error, and the derived health score and status. Dashboards
+(/worker_status, /capacity_check, WorkerHealthMonitor, restart recovery)
+read one precomputed row per worker instead of joining workers,
+worker_usage, worker_health and worker_bans and scoring in Python on
+every call.
+
+The cursor functions take an open sqlite3 cursor so DatabaseManager can
+apply the snapshot update in the same transaction as the write it derives
+from. The row arithmetic lives in the apply_*/derive functions, which the
+PostgreSQL backend reuses with its own queries.
+"""
+
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+DEFAULT_HOURLY_LIMIT = 15
+DEFAULT_DAILY_LIMIT = 150
+
+# Weight of the newest outcome in the error rate (about the last 10 attempts)
+ERROR_RATE_ALPHA = 0.1
+
+# Score thresholds for status
+HEALTHY_SCORE = 70
+WARNING_SCORE = 40
+
+SNAPSHOT_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS worker_health_snapshot (
+        worker_id INTEGER PRIMARY KEY,
+        total_attempts INTEGER DEFAULT 0,
+        total_failures INTEGER DEFAULT 0,
+        consecutive_failures INTEGER DEFAULT 0,
+        error_rate REAL DEFAULT 0,
+        hour_bucket TEXT,
+        posts_this_hour INTEGER DEFAULT 0,
+        day_bucket TEXT,
+        posts_today INTEGER DEFAULT 0,
+        hourly_limit INTEGER DEFAULT 15,
+        daily_limit INTEGER DEFAULT 150,
+        utilization REAL DEFAULT 0,
+        active_bans INTEGER DEFAULT 0,
+        ban_types TEXT,
+        last_success_at TEXT,
+        last_error_at TEXT,
+        last_error TEXT,
+        health_score INTEGER DEFAULT 100,
+        status TEXT DEFAULT 'healthy',
+        updated_at TEXT
+    )
+'''
+
+COLUMNS = (
+    'worker_id', 'total_attempts', 'total_failures', 'consecutive_failures', 'error_rate',
+    'hour_bucket', 'posts_this_hour', 'day_bucket', 'posts_today', 'hourly_limit', 'daily_limit',
+    'utilization', 'active_bans', 'ban_types', 'last_success_at', 'last_error_at', 'last_error',
+    'health_score', 'status', 'updated_at',
+)
+
+_UPSERT = '''
+    INSERT INTO worker_health_snapshot ({columns}) VALUES ({placeholders})
+    ON CONFLICT(worker_id) DO UPDATE SET {updates}
+'''.format(
+    columns=', '.join(COLUMNS),
+    placeholders=', '.join('?' for _ in COLUMNS),
+    updates=', '.join(f"{column} = excluded.{column}" for column in COLUMNS[1:]),
+)
+
+
+def new_snapshot(worker_id: int) -> Dict[str, Any]:
+    """Default row for a worker without history."""
+    return {
+        'worker_id': worker_id, 'total_attempts': 0, 'total_failures': 0, 'consecutive_failures': 0,
+        'error_rate': 0.0, 'hour_bucket': None, 'posts_this_hour': 0, 'day_bucket': None,
+        'posts_today': 0, 'hourly_limit': DEFAULT_HOURLY_LIMIT, 'daily_limit': DEFAULT_DAILY_LIMIT,
+        'utilization': 0.0, 'active_bans': 0, 'ban_types': None, 'last_success_at': None,
+        'last_error_at': None, 'last_error': None, 'health_score': 100, 'status': 'healthy',
+        'updated_at': None,
+    }
+
+
+def _buckets(now: datetime) -> Tuple[str, str]:
+    return now.strftime('%Y-%m-%d %H'), now.strftime('%Y-%m-%d')
+
+
+def roll_buckets(row: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Reset the hourly/daily post counters when their bucket has passed."""
+    hour, day = _buckets(now)
+    if row['hour_bucket'] != hour:
+        row['hour_bucket'], row['posts_this_hour'] = hour, 0
+    if row['day_bucket'] != day:
+        row['day_bucket'], row['posts_today'] = day, 0
+    return row
+
+
+def score(row: Dict[str, Any]) -> Tuple[int, str]:
+    """Health score (0-100) and status derived from one snapshot row."""
+    value = 100
+    value -= round(row['error_rate'] * 50)
+    value -= min(row['consecutive_failures'] * 10, 30)
+    value -= min(row['active_bans'] * 20, 50)
+    ban_types = (row['ban_types'] or '').split(',')
+    if 'permission_denied' in ban_types:
+        value -= 30
+    if 'rate_limit' in ban_types:
+        value -= 15
+    if row['posts_this_hour'] > row['hourly_limit'] * 0.8:
+        value -= 20
+    if row['posts_today'] > row['daily_limit'] * 0.8:
+        value -= 20
+    value = max(0, min(100, value))
+    status = 'healthy' if value >= HEALTHY_SCORE else 'warning' if value >= WARNING_SCORE else 'critical'
+    return value, status
+
+
+def derive(row: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Roll buckets and recompute utilization, score, status and updated_at."""
+    roll_buckets(row, now)
+    row['utilization'] = round(max(
+        row['posts_this_hour'] / max(row['hourly_limit'], 1),
+        row['posts_today'] / max(row['daily_limit'], 1),
+    ), 4)
+    row['health_score'], row['status'] = score(row)
+    row['updated_at'] = now.isoformat(sep=' ', timespec='seconds')
+    return row
+
+
+def apply_attempt(row: Dict[str, Any], success: bool, error: Optional[str], now: datetime) -> Dict[str, Any]:
+    """Fold one posting attempt into a snapshot row."""
+    row['total_attempts'] += 1
+    row['error_rate'] = round((1 - ERROR_RATE_ALPHA) * row['error_rate'] + ERROR_RATE_ALPHA * (0 if success else 1), 4)
+    timestamp = now.isoformat(sep=' ', timespec='seconds')
+    if success:
+        row['consecutive_failures'] = 0
+        row['last_success_at'] = timestamp
+    else:
+        row['total_failures'] += 1
+        row['consecutive_failures'] += 1
+        row['last_error_at'] = timestamp
+        row['last_error'] = (error or 'unknown error')[:500]
+    return derive(row, now)
+
+
+def apply_post(row: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Count one successful post in a snapshot row."""
+    roll_buckets(row, now)
+    row['posts_this_hour'] += 1
+    row['posts_today'] += 1
+    return derive(row, now)
+
+
+def apply_bans(row: Dict[str, Any], count: int, ban_types: Optional[str], now: datetime) -> Dict[str, Any]:
+    """Set a snapshot row's active ban summary."""
+    row['active_bans'], row['ban_types'] = count, ban_types
+    return derive(row, now)
+
+
+def for_display(row: Dict[str, Any], now: datetime) -> Dict[str, Any]:
+    """Roll stale hour/day buckets of a stored row, keeping its updated_at."""
+    hour, day = _buckets(now)
+    if row['hour_bucket'] != hour or row['day_bucket'] != day:
+        updated_at = row['updated_at']
+        derive(row, now)
+        row['updated_at'] = updated_at
+    return row
+
+
+def load(cursor: sqlite3.Cursor, worker_id: int) -> Dict[str, Any]:
+    cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM worker_health_snapshot WHERE worker_id = ?", (worker_id,))
+    found = cursor.fetchone()
+    return dict(zip(COLUMNS, found)) if found else new_snapshot(worker_id)
+
+
+def save(cursor: sqlite3.Cursor, rows: Iterable[Dict[str, Any]]) -> None:
+    cursor.executemany(_UPSERT, [tuple(row[column] for column in COLUMNS) for row in rows])
+
+
+def record_attempt(cursor: sqlite3.Cursor, worker_id: int, success: bool,
+                   error: Optional[str] = None, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Fold one posting attempt into the worker's snapshot."""
+    row = apply_attempt(load(cursor, worker_id), success, error, now or datetime.now())
+    save(cursor, [row])
+    return row
+
+
+def record_post(cursor: sqlite3.Cursor, worker_id: int, now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Count one successful post towards the worker's hourly/daily utilization."""
+    row = apply_post(load(cursor, worker_id), now or datetime.now())
+    save(cursor, [row])
+    return row
+
+
+def refresh_bans(cursor: sqlite3.Cursor, worker_ids: Optional[Iterable[int]] = None,
+                 now: Optional[datetime] = None) -> int:
+    """Recompute active ban fields from worker_bans (all workers if worker_ids is None).
+
+    Runs after ban changes, which are rare compared to posting outcomes.
+    Returns the number of snapshot rows written.
+    """
+    now = now or datetime.now()
+    try:
+        cursor.execute('''
+            SELECT worker_id, COUNT(*), GROUP_CONCAT(DISTINCT ban_type)
+            FROM worker_bans
+            WHERE is_active = 1
+            GROUP BY worker_id
+        ''')
+        bans = {worker_id: (count, types) for worker_id, count, types in cursor.fetchall()}
+    except sqlite3.OperationalError:
+        # Legacy worker_bans without is_active/ban_type
+        bans = {}
+
+    cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM worker_health_snapshot")
+    rows = {found[0]: dict(zip(COLUMNS, found)) for found in cursor.fetchall()}
+    targets = set(rows) | set(bans) if worker_ids is None else set(worker_ids)
+
+    updated = []
+    for worker_id in targets:
+        count, ban_types = bans.get(worker_id, (0, None))
+        updated.append(apply_bans(rows.get(worker_id) or new_snapshot(worker_id), count, ban_types, now))
+    save(cursor, updated)
+    return len(updated)
+
+
+def seed(cursor: sqlite3.Cursor, worker_ids: Iterable[int], now: Optional[datetime] = None) -> int:
+    """Create default rows for workers that have none yet; returns rows created."""
+    now = now or datetime.now()
+    cursor.execute('SELECT worker_id FROM worker_health_snapshot')
+    existing = {found[0] for found in cursor.fetchall()}
+    rows = [derive(new_snapshot(worker_id), now) for worker_id in set(worker_ids) - existing]
+    save(cursor, rows)
+    return len(rows)
+
+
+def read_all(cursor: sqlite3.Cursor, now: Optional[datetime] = None) -> List[Dict[str, Any]]:
+    """All snapshot rows, with stale hour/day buckets rolled over for display."""
+    now = now or datetime.now()
+    cursor.execute(f"SELECT {', '.join(COLUMNS)} FROM worker_health_snapshot ORDER BY worker_id")
+    return [for_display(dict(zip(COLUMNS, found)), now) for found in cursor.fetchall()]
+
+
+def summarize(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Fleet totals for dashboards."""
+    total = len(rows)
+    return {
+        'total_workers': total,
+        'healthy': sum(1 for row in rows if row['status'] == 'healthy'),
+        'warning': sum(1 for row in rows if row['status'] == 'warning'),
+        'critical': sum(1 for row in rows if row['status'] == 'critical'),
+        'banned': sum(1 for row in rows if row['active_bans'] > 0),
+        'overloaded': sum(1 for row in rows if row['utilization'] > 0.9),
+        'posts_this_hour': sum(row['posts_this_hour'] for row in rows),
+        'posts_today': sum(row['posts_today'] for row in rows),
+        'avg_health_score': round(sum(row['health_score'] for row in rows) / total, 1) if total else 0.0,
+        'avg_error_rate': round(sum(row['error_rate'] for row in rows) / total, 4) if total else 0.0,
+    }
@@ -1,10 +1,14 @@
 import asyncio
 import logging
-import asyncpg
 from typing import Optional, Dict, Any, List
 from datetime import datetime, timedelta
 from contextlib import asynccontextmanager
 
+from src.utils.lazy_imports import lazy_module
+
+# Only needed when a PostgreSQL pool is created
+asyncpg = lazy_module('asyncpg')
+
 class DatabaseSafety:
     """Production-ready database safety layer."""
     
@@ -0,0 +1,220 @@
+"""
+Prebuilt menus for the bot's inline keyboards.
+
+Static menus are rendered once and shared; per-user menus are rebuilt only
+when their content version changes, and edits that would show the same
+payload again are skipped. ``menu_registry`` is the shared instance.
+"""
+
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+from telegram import InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest
+
+KeyboardRows = Sequence[Sequence[InlineKeyboardButton]]
+
+
+def content_version(*parts: Any) -> str:
+    """Build a short version string for the data a dynamic menu renders."""
+    return hashlib.blake2b(repr(parts).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _keyboard_fingerprint(markup: Optional[InlineKeyboardMarkup]) -> str:
+    """Fingerprint the buttons of a keyboard (text, callback data and url)."""
+    if not markup:
+        return ''
+    rows = tuple(
+        tuple((button.text, button.callback_data, button.url) for button in row)
+        for row in markup.inline_keyboard
+    )
+    return content_version(rows)
+
+
+@dataclass(frozen=True)
+class RenderedMenu:
+    """A ready-to-send menu: text, prebuilt markup and payload fingerprints."""
+    text: str
+    reply_markup: Optional[InlineKeyboardMarkup]
+    parse_mode: Optional[str]
+    keyboard_fingerprint: str
+    fingerprint: str
+
+
+class MenuRegistry:
+    """Registry of prebuilt inline keyboards and rendered menus.
+
+    Static menus and keyboards are built once (at import/startup) and shared
+    by every click. Per-user dynamic menus are cached by ``(menu, user_id)``
+    and rebuilt only when their content version changes. ``edit`` skips
+    ``edit_message_text`` when the message already shows the same payload,
+    which avoids Telegram's "message is not modified" round trips.
+    """
+
+    def __init__(self, logger: Optional[logging.Logger] = None,
+                 max_dynamic_entries: int = 2048, max_tracked_messages: int = 4096):
+        self.logger = logger or logging.getLogger(__name__)
+        self.max_dynamic_entries = max_dynamic_entries
+        self.max_tracked_messages = max_tracked_messages
+        self._keyboards: Dict[str, InlineKeyboardMarkup] = {}
+        self._static: Dict[str, RenderedMenu] = {}
+        self._dynamic: "OrderedDict[Tuple[str, Hashable], Tuple[str, RenderedMenu]]" = OrderedDict()
+        self._sent: "OrderedDict[Tuple[int, int], str]" = OrderedDict()
+        self.stats = {
+            'dynamic_hits': 0,
+            'dynamic_builds': 0,
+            'edits_sent': 0,
+            'edits_skipped': 0,
+        }
+
+    # --- Building ---
+
+    @staticmethod
+    def render(text: str, keyboard: Optional[KeyboardRows] = None,
+               parse_mode: Optional[str] = 'Markdown',
+               reply_markup: Optional[InlineKeyboardMarkup] = None) -> RenderedMenu:
+        """Render text plus keyboard rows (or a prebuilt markup) into a RenderedMenu."""
+        if reply_markup is None and keyboard is not None:
+            reply_markup = InlineKeyboardMarkup([list(row) for row in keyboard])
+        keyboard_fingerprint = _keyboard_fingerprint(reply_markup)
+        return RenderedMenu(
+            text=text,
+            reply_markup=reply_markup,
+            parse_mode=parse_mode,
+            keyboard_fingerprint=keyboard_fingerprint,
+            fingerprint=content_version(text, parse_mode, keyboard_fingerprint),
+        )
+
+    def register_keyboard(self, name: str, keyboard: KeyboardRows) -> InlineKeyboardMarkup:
+        """Build a static keyboard once and store it under name."""
+        markup = InlineKeyboardMarkup([list(row) for row in keyboard])
+        self._keyboards[name] = markup
+        return markup
+
+    def keyboard(self, name: str) -> InlineKeyboardMarkup:
+        """Return a prebuilt static keyboard."""
+        return self._keyboards[name]
+
+    def register_static(self, name: str, text: str, keyboard: Optional[KeyboardRows] = None,
+                        parse_mode: Optional[str] = 'Markdown') -> RenderedMenu:
+        """Build a static menu once and store it under name."""
+        menu = self.render(text, keyboard, parse_mode)
+        self._static[name] = menu
+        return menu
+
+    def static(self, name: str) -> RenderedMenu:
+        """Return a prebuilt static menu."""
+        return self._static[name]
+
+    def dynamic(self, name: str, user_id: Hashable, version: str,
+                builder: Callable[[], RenderedMenu]) -> RenderedMenu:
+        """Return a per-user menu, rebuilding it only when version changes."""
+        key = (name, user_id)
+        cached = self._dynamic.get(key)
+        if cached is not None and cached[0] == version:
+            self._dynamic.move_to_end(key)
+            self.stats['dynamic_hits'] += 1
+            return cached[1]
+
+        menu = builder()
+        self._dynamic[key] = (version, menu)
+        self._dynamic.move_to_end(key)
+        while len(self._dynamic) > self.max_dynamic_entries:
+            self._dynamic.popitem(last=False)
+        self.stats['dynamic_builds'] += 1
+        return menu
+
+    def invalidate_user(self, user_id: Hashable) -> None:
+        """Drop every cached dynamic menu for a user."""
+        for key in [key for key in self._dynamic if key[1] == user_id]:
+            del self._dynamic[key]
+
+    # --- Sending ---
+
+    def _remember(self, chat_id: Optional[int], message_id: Optional[int], fingerprint: str) -> None:
+        if chat_id is None or message_id is None:
+            return
+        key = (chat_id, message_id)
+        self._sent[key] = fingerprint
+        self._sent.move_to_end(key)
+        while len(self._sent) > self.max_tracked_messages:
+            self._sent.popitem(last=False)
+
+    def is_unchanged(self, query, menu: RenderedMenu) -> bool:
+        """Check whether the query's message already shows this menu.
+
+        Both the fingerprint we last sent for that message and the keyboard
+        Telegram reports on the message must match, so edits made outside
+        the registry are never mistaken for an unchanged payload.
+        """
+        message = getattr(query, 'message', None)
+        if message is None:
+            return False
+        sent = self._sent.get((message.chat_id, message.message_id))
+        if sent != menu.fingerprint:
+            return False
+        return _keyboard_fingerprint(message.reply_markup) == menu.keyboard_fingerprint
+
+    async def edit(self, query, menu: RenderedMenu) -> bool:
+        """Edit the callback message to show menu unless it already does.
+
+        Returns:
+            True if an edit was sent, False if it was skipped
+        """
+        if self.is_unchanged(query, menu):
+            self.stats['edits_skipped'] += 1
+            return False
+
+        message = getattr(query, 'message', None)
+        try:
+            await query.edit_message_text(
+                menu.text,
+                reply_markup=menu.reply_markup,
+                parse_mode=menu.parse_mode
+            )
+        except BadRequest as e:
+            if 'message is not modified' not in str(e).lower():
+                raise
+            self.stats['edits_skipped'] += 1
+            if message is not None:
+                self._remember(message.chat_id, message.message_id, menu.fingerprint)
+            return False
+
+        self.stats['edits_sent'] += 1
+        if message is not None:
+            self._remember(message.chat_id, message.message_id, menu.fingerprint)
+        return True
+
+    async def reply(self, message, menu: RenderedMenu):
+        """Reply to a message with menu and remember what was sent."""
+        sent = await message.reply_text(
+            menu.text,
+            reply_markup=menu.reply_markup,
+            parse_mode=menu.parse_mode
+        )
+        if sent is not None:
+            self._remember(getattr(sent, 'chat_id', None), getattr(sent, 'message_id', None), menu.fingerprint)
+        return sent
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return cache and edit counters."""
+        stats = dict(self.stats)
+        stats.update({
+            'static_menus': len(self._static),
+            'static_keyboards': len(self._keyboards),
+            'dynamic_menus': len(self._dynamic),
+            'tracked_messages': len(self._sent),
+        })
+        return stats
+
+
+# Global menu registry instance (static menus register into it on import)
+menu_registry = MenuRegistry()
+
+
+def get_menu_registry() -> MenuRegistry:
+    """Get the global menu registry instance."""
+    return menu_registry
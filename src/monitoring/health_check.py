@@ -3,9 +3,13 @@
 Comprehensive Health Check for AutoFarming Bot
 
 This script performs a complete health check of your bot system and provides
-detailed reports on what needs to be fixed.
+detailed reports on what needs to be fixed. It is meant to run once at
+startup; results of checks that depend only on files (imports, syntax,
+configuration) are cached in data/health_cache.json and reused until one of
+the input files changes. The cheap liveness/readiness probe used by Docker
+lives in src/monitoring/health_probe.py.
 
-Usage: python3 health_check.py
+Usage: python3 health_check.py [--no-cache]
 """
 
 import asyncio
@@ -13,6 +17,7 @@ import logging
 import sys
 import os
 import importlib
+import importlib.util
 from dotenv import load_dotenv
 load_dotenv("config/.env")
 import traceback
@@ -20,21 +25,43 @@ from datetime import datetime
 from typing import Dict, List, Optional, Tuple
 import json
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('health_check.log'),
-        logging.StreamHandler(sys.stdout)
-    ]
-)
 logger = logging.getLogger(__name__)
 
+HEALTH_REPORT_PATH = 'health_report.json'
+HEALTH_CACHE_PATH = 'data/health_cache.json'
+
+# Files whose changes invalidate cached import/handler/syntax results
+SOURCE_DIRS = ['commands', 'scheduler', 'src']
+SOURCE_FILES = ['bot.py', 'config.py', 'database.py', 'multi_crypto_payments.py', 'config/.env']
+
+
+def file_fingerprint(paths: List[str]) -> List[list]:
+    """[path, mtime_ns, size] per path (None values for missing files)."""
+    fingerprint = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            fingerprint.append([path, stat.st_mtime_ns, stat.st_size])
+        except OSError:
+            fingerprint.append([path, None, None])
+    return fingerprint
+
+
+def source_files() -> List[str]:
+    """All Python source files the deep checks depend on."""
+    paths = list(SOURCE_FILES)
+    for directory in SOURCE_DIRS:
+        for root, dirs, files in os.walk(directory):
+            dirs[:] = [d for d in dirs if d != '__pycache__']
+            paths.extend(os.path.join(root, name) for name in files if name.endswith('.py'))
+    return sorted(paths)
+
 class HealthChecker:
     """Comprehensive health check system for AutoFarming Bot."""
     
-    def __init__(self):
+    def __init__(self, cache_path: str = HEALTH_CACHE_PATH, report_path: str = HEALTH_REPORT_PATH):
+        self.cache_path = cache_path
+        self.report_path = report_path
         self.health_report = {
             'timestamp': datetime.now().isoformat(),
             'overall_status': 'UNKNOWN',
@@ -46,25 +73,50 @@ class HealthChecker:
             'total_checks': 0
         }
         
-    async def run_comprehensive_check(self):
-        """Run all health checks."""
+    async def run_comprehensive_check(self, use_cache: bool = True):
+        """Run all health checks.
+
+        With use_cache, passing results of file-dependent checks are reused
+        while their input files (by mtime and size) are unchanged.
+        """
         logger.info("🏥 Starting Comprehensive Health Check...")
         logger.info("=" * 60)
         
-        # Run all checks
+        sources = file_fingerprint(source_files())
+        env_key = {
+            'files': file_fingerprint(['config/.env']),
+            'set': sorted(name for name, value in os.environ.items() if value),
+        }
+        
+        # (check, report key, cache key or None if it must always run)
         checks = [
-            self.check_environment_variables,
-            self.check_dependencies,
-            self.check_imports,
-            self.check_database_connection,
-            self.check_bot_configuration,
-            self.check_command_handlers,
-            self.check_critical_user_flows,
-            self.check_file_structure,
-            self.check_syntax_errors
+            (self.check_environment_variables, 'environment_variables', env_key),
+            (self.check_dependencies, 'dependencies', None),
+            (self.check_imports, 'imports', sources),
+            (self.check_database_connection, 'database', None),
+            (self.check_bot_configuration, 'bot_configuration', env_key),
+            (self.check_command_handlers, 'command_handlers', sources),
+            (self.check_critical_user_flows, 'critical_user_flows', None),
+            (self.check_file_structure, 'file_structure', None),
+            (self.check_syntax_errors, 'syntax_errors', sources)
         ]
         
-        for check in checks:
+        cache = self._load_cache() if use_cache else {}
+        new_cache = {}
+        
+        for check, report_key, cache_key in checks:
+            if cache_key is not None:
+                # Normalise to the JSON form used in the cache file
+                cache_key = json.loads(json.dumps(cache_key))
+                cached = cache.get(report_key)
+                if cached and cached.get('key') == cache_key:
+                    self.health_report['checks'][report_key] = dict(cached['result'], cached=True)
+                    self.health_report['warnings'].extend(cached.get('warnings', []))
+                    new_cache[report_key] = cached
+                    logger.info(f"✅ {report_key}: PASS (cached, inputs unchanged)")
+                    continue
+            
+            warnings_before = len(self.health_report['warnings'])
             try:
                 await check()
                 logger.info("-" * 40)
@@ -73,11 +125,42 @@ class HealthChecker:
                 self.health_report['checks'][check.__name__] = {
                     'status': 'FAILED',
                     'error': str(e),
+                    'issues': [str(e)],
                     'fixes': []
                 }
+                continue
+            
+            result = self.health_report['checks'].get(report_key)
+            # Only passing results are cached so failures are re-checked next time
+            if cache_key is not None and result and result['status'] == 'PASS':
+                new_cache[report_key] = {
+                    'key': cache_key,
+                    'result': result,
+                    'warnings': self.health_report['warnings'][warnings_before:]
+                }
+        
+        self._save_cache(new_cache)
         
         # Generate final report
         self.generate_health_report()
+        return self.health_report
+    
+    def _load_cache(self) -> Dict:
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def _save_cache(self, cache: Dict):
+        try:
+            directory = os.path.dirname(self.cache_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.cache_path, 'w', encoding='utf-8') as f:
+                json.dump(cache, f, default=str)
+        except OSError as e:
+            logger.warning(f"⚠️ Could not save health check cache: {e}")
         
     async def check_environment_variables(self):
         """Check if all required environment variables are set."""
@@ -85,8 +168,7 @@ class HealthChecker:
         
         required_vars = [
             'BOT_TOKEN',
-            'ADMIN_ID', 
-            'DATABASE_URL'
+            'ADMIN_ID'
         ]
         
         optional_vars = [
@@ -164,16 +246,13 @@ class HealthChecker:
         missing_required = []
         missing_optional = []
         
+        # find_spec locates packages without importing them
         for package in required_packages:
-            try:
-                importlib.import_module(package.replace('-', '_'))
-            except ImportError:
+            if importlib.util.find_spec(package.replace('-', '_')) is None:
                 missing_required.append(package)
         
         for package in optional_packages:
-            try:
-                importlib.import_module(package)
-            except ImportError:
+            if importlib.util.find_spec(package) is None:
                 missing_optional.append(package)
         
         if missing_required:
@@ -181,7 +260,7 @@ class HealthChecker:
             issues = [f"Missing required package: {pkg}" for pkg in missing_required]
             fixes = [
                 "Install missing packages: pip install " + " ".join(missing_required),
-                "Or run: pip install -r config/requirements.txt"
+                "Or run: pip install -r requirements.txt"
             ]
         else:
             status = 'PASS'
@@ -254,24 +333,29 @@ class HealthChecker:
         try:
             # Try to import and initialize database
             from config import BotConfig
-            from src.database.manager import DatabaseManager
+            from src.database.backend import create_database_manager
             
             config = BotConfig.load_from_env()
-            db = DatabaseManager(config.database_url or "bot_database.db", logger)
+            db = create_database_manager(logger, config.database_url or "bot_database.db")
             await db.initialize()
             
             # Test basic database operations
             try:
-                # Just test that we can connect and access tables
-                conn = await db.get_connection()
-                cursor = conn.cursor()
-                cursor.execute('SELECT name FROM sqlite_master WHERE type="table"')
-                tables = cursor.fetchall()
+                # Connection and required tables, on either backend
+                db_health = await db.health_check()
                 await db.close()
                 
-                status = 'PASS'
-                issues = []
-                fixes = []
+                if db_health['database_connection'] and db_health['tables_exist']:
+                    status = 'PASS'
+                    issues = []
+                    fixes = []
+                else:
+                    status = 'FAIL'
+                    issues = db_health['errors'] or ["Required database tables are missing"]
+                    fixes = [
+                        "Run database migrations: python3 run_migration.py",
+                        "Check database schema and table structure"
+                    ]
                 
             except Exception as e:
                 status = 'FAIL'
@@ -416,18 +500,15 @@ class HealthChecker:
         
         try:
             from config import BotConfig
-            from src.database.manager import DatabaseManager
+            from src.database.backend import create_database_manager
             
             config = BotConfig.load_from_env()
-            db = DatabaseManager(config.database_url or "bot_database.db", logger)
+            db = create_database_manager(logger, config.database_url or "bot_database.db")
             await db.initialize()
             
             # Test basic database connectivity
             try:
-                conn = await db.get_connection()
-                cursor = conn.cursor()
-                cursor.execute('SELECT COUNT(*) FROM users')
-                user_count = cursor.fetchone()[0]
+                user_count = (await db.get_stats())['total_users']
                 await db.close()
                 
                 if user_count >= 0:  # Just check that we can query the database
@@ -482,7 +563,7 @@ class HealthChecker:
             'commands/__init__.py',
             'commands/user_commands.py',
             'commands/admin_commands.py',
-            'config/requirements.txt'
+            'requirements.txt'
         ]
         
         required_dirs = [
@@ -635,11 +716,11 @@ class HealthChecker:
                 logger.warning(f"   {warning}")
         
         # Save report to file
-        with open('health_report.json', 'w') as f:
+        with open(self.report_path, 'w') as f:
             json.dump(self.health_report, f, indent=2, default=str)
         
         logger.info("\n" + "=" * 60)
-        logger.info("📄 Detailed report saved to: health_report.json")
+        logger.info(f"📄 Detailed report saved to: {self.report_path}")
         
         # Provide action items
         if overall_status == 'CRITICAL':
@@ -649,12 +730,25 @@ class HealthChecker:
         else:
             logger.info("✅ Bot appears healthy - Ready for deployment!")
 
-async def main():
+def configure_logging():
+    """Log to health_check.log and stdout (CLI use only)."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        handlers=[
+            logging.FileHandler('health_check.log'),
+            logging.StreamHandler(sys.stdout)
+        ]
+    )
+
+async def main(use_cache: bool = True):
     """Main function to run health check."""
     checker = HealthChecker()
-    await checker.run_comprehensive_check()
+    report = await checker.run_comprehensive_check(use_cache=use_cache)
+    return 1 if report['overall_status'] == 'CRITICAL' else 0
 
 if __name__ == "__main__":
+    configure_logging()
     print("🏥 AutoFarming Bot Health Check")
     print("=" * 50)
-    asyncio.run(main()) 
\ No newline at end of file
+    sys.exit(asyncio.run(main(use_cache='--no-cache' not in sys.argv)))
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Liveness / readiness probe for AutoFarming Bot
+
+Cheap in-process checks (well under 10 ms) served as /livez and /readyz by
+the local metrics endpoint, so Docker and systemd can poll a running process
+with curl instead of starting a new Python interpreter for every check.
+
+- liveness: the event loop answered the request.
+- readiness: every registered check passes (e.g. SQLite answers SELECT 1,
+  the scheduler loop is running) and the last startup deep check
+  (health_report.json, re-read only when its mtime changes) is not CRITICAL.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HEALTH_REPORT_PATH = 'health_report.json'
+
+
+def sqlite_check(db_path: str, timeout: float = 0.5) -> Callable[[], bool]:
+    """Readiness check: the database file opens read-only and answers SELECT 1."""
+    def check() -> bool:
+        if not os.path.exists(db_path):
+            return False
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=timeout)
+        try:
+            return conn.execute('SELECT 1').fetchone() == (1,)
+        finally:
+            conn.close()
+    return check
+
+
+def database_check(db) -> Callable[[], bool]:
+    """Readiness check for either database backend.
+
+    SQLite uses sqlite_check; for PostgreSQL the pool must be open (no
+    query, checks must not do network I/O).
+    """
+    if getattr(db, 'backend', 'sqlite') == 'sqlite':
+        return sqlite_check(db.db_path)
+    return lambda: db.pool is not None and not db.pool.is_closing()
+
+
+class HealthProbe:
+    """Registry of cheap readiness checks for one process."""
+
+    def __init__(self, report_path: str = HEALTH_REPORT_PATH):
+        self.report_path = report_path
+        self.started_at = time.monotonic()
+        self._checks: Dict[str, Callable[[], bool]] = {}
+        self._flags: Dict[str, bool] = {}
+        # (mtime_ns, overall_status) of the last health report read
+        self._report_cache: Tuple[Optional[int], Optional[str]] = (None, None)
+
+    def add_check(self, name: str, check: Callable[[], bool]) -> None:
+        """Register a synchronous check; it must be cheap (no network I/O).
+
+        Replaces a readiness flag of the same name.
+        """
+        self._flags.pop(name, None)
+        self._checks[name] = check
+
+    def set_ready(self, name: str, ready: bool) -> None:
+        """Set a readiness flag, e.g. set_ready('bot', True) after startup."""
+        self._flags[name] = ready
+
+    def liveness(self) -> Dict[str, Any]:
+        return {
+            'status': 'ok',
+            'pid': os.getpid(),
+            'uptime_seconds': round(time.monotonic() - self.started_at, 1),
+        }
+
+    def readiness(self) -> Tuple[bool, Dict[str, Any]]:
+        """Run all checks; returns (ready, details)."""
+        started = time.perf_counter()
+        results: Dict[str, Any] = dict(self._flags)
+
+        for name, check in self._checks.items():
+            try:
+                results[name] = bool(check())
+            except Exception as e:
+                results[name] = f"error: {e}"
+
+        startup_status = self._startup_status()
+        results['startup_check'] = startup_status or 'not run'
+
+        ready = all(value is True for key, value in results.items() if key != 'startup_check') \
+            and startup_status != 'CRITICAL'
+        return ready, {
+            'status': 'ready' if ready else 'not_ready',
+            'checks': results,
+            'duration_ms': round((time.perf_counter() - started) * 1000, 3),
+            'timestamp': datetime.now().isoformat(),
+        }
+
+    def _startup_status(self) -> Optional[str]:
+        """overall_status of the startup deep check, cached by file mtime."""
+        try:
+            mtime = os.stat(self.report_path).st_mtime_ns
+        except OSError:
+            return None
+        cached_mtime, status = self._report_cache
+        if mtime != cached_mtime:
+            try:
+                with open(self.report_path, 'r', encoding='utf-8') as f:
+                    status = json.load(f).get('overall_status')
+            except (OSError, ValueError) as e:
+                logger.warning(f"⚠️ Could not read {self.report_path}: {e}")
+                status = None
+            self._report_cache = (mtime, status)
+        return status
+
+
+# Global probe instance for this process
+health_probe = HealthProbe()
+
+
+def get_health_probe() -> HealthProbe:
+    """Get the global health probe instance."""
+    return health_probe
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Non-blocking logging pipeline for AutoFarming Bot
+
+The posting loop logs several INFO lines per post. With a FileHandler on the
+root logger every one of them is formatted and written to disk on the event
+loop thread. setup_logging() instead installs a single QueueHandler on the
+root logger and moves formatting and I/O to a QueueListener thread:
+
+- records are enqueued unformatted, so ``logger.info("... %s", value)``
+  only builds the message string on the listener thread,
+- high-volume INFO events of selected loggers are sampled (1 in N per
+  message template) before they are enqueued; WARNING and above are
+  always kept,
+- the log file is written as JSON lines (one object per record), the
+  console keeps the plain text format.
+
+Configuration (environment):
+    LOG_LEVEL         root level (default INFO)
+    LOG_FORMAT        json | text for the log file (default json)
+    LOG_SAMPLE_RATES  logger=rate pairs, e.g.
+                      "scheduler.core.posting_service=0.1,src.database.manager=0.2";
+                      "none" disables sampling
+"""
+
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# Loggers that emit one or more INFO lines per post (keep 1 in 10)
+DEFAULT_SAMPLE_RATES = {
+    'scheduler.core.posting_service': 0.1,
+    'scheduler.workers.worker_client': 0.1,
+    'src.database.manager': 0.1,
+}
+
+# Attributes every LogRecord has; anything else was passed via extra=
+_RECORD_ATTRS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+
+def parse_sample_rates(value: Optional[str]) -> Dict[str, float]:
+    """Parse LOG_SAMPLE_RATES ("name=rate,name=rate"); empty means the defaults."""
+    if value is None or not value.strip():
+        return dict(DEFAULT_SAMPLE_RATES)
+    if value.strip().lower() in ('none', 'off', '0'):
+        return {}
+    rates = {}
+    for item in value.split(','):
+        name, sep, rate = item.strip().partition('=')
+        if not sep:
+            continue
+        try:
+            rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+        except ValueError:
+            continue
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep 1 in N records per (logger, message template) at INFO and below.
+
+    Rates are matched by logger name prefix (the longest match wins). The
+    first occurrence of every template is always kept, so a new message
+    never disappears entirely. Kept records get ``sample_every`` = N so
+    counts can be re-weighted downstream. Templates are the unformatted
+    ``record.msg``, so sampled loggers must use %-style arguments; at most
+    max_templates counters are kept (least recently used are dropped).
+    """
+
+    def __init__(self, rates: Dict[str, float], max_level: int = logging.INFO, max_templates: int = 4096):
+        super().__init__()
+        self.max_level = max_level
+        self.max_templates = max_templates
+        # name prefix -> keep every Nth record (0 = drop all)
+        self._every = {name: (round(1 / rate) if rate > 0 else 0) for name, rate in rates.items() if rate < 1}
+        self._resolved: Dict[str, int] = {}
+        self._counts: "OrderedDict[Tuple[str, str], int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _every_for(self, name: str) -> int:
+        every = self._resolved.get(name)
+        if every is None:
+            every = 1
+            best = -1
+            for prefix, value in self._every.items():
+                if (name == prefix or name.startswith(prefix + '.')) and len(prefix) > best:
+                    every, best = value, len(prefix)
+            self._resolved[name] = every
+        return every
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level:
+            return True
+        every = self._every_for(record.name)
+        if every == 1:
+            return True
+        if every == 0:
+            self.dropped += 1
+            return False
+
+        key = (record.name, str(record.msg))
+        with self._lock:
+            count = self._counts.get(key, 0)
+            self._counts[key] = count + 1
+            self._counts.move_to_end(key)
+            if len(self._counts) > self.max_templates:
+                self._counts.popitem(last=False)
+        if count % every:
+            self.dropped += 1
+            return False
+        record.sample_every = every
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: ts, level, logger, msg, extras, exc."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRS and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exc'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that leaves message formatting to the listener thread.
+
+    The stock QueueHandler formats every record before enqueueing it, which
+    keeps the string work on the caller's thread. Records are passed through
+    as-is instead; log arguments should therefore be values that are not
+    mutated after the call (ids, names, numbers).
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_sampling_filter: Optional[SamplingFilter] = None
+
+
+def setup_logging(log_file: Optional[str] = None, level: Optional[str] = None,
+                  json_format: Optional[bool] = None,
+                  sample_rates: Optional[Dict[str, float]] = None,
+                  console: bool = True) -> logging.handlers.QueueListener:
+    """Route all logging through a background QueueListener.
+
+    Replaces the root logger's handlers, so call it once at process startup
+    instead of logging.basicConfig(). Safe to call again (the previous
+    listener is stopped first).
+    """
+    global _listener, _sampling_filter
+
+    level = level or os.getenv('LOG_LEVEL', 'INFO')
+    if json_format is None:
+        json_format = os.getenv('LOG_FORMAT', 'json').lower() == 'json'
+    if sample_rates is None:
+        sample_rates = parse_sample_rates(os.getenv('LOG_SAMPLE_RATES'))
+
+    stop_logging()
+    # processName lookups cost ~1 µs per record and no formatter uses them
+    logging.logMultiprocessing = False
+
+    handlers = []
+    if log_file:
+        directory = os.path.dirname(log_file)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        file_handler = logging.FileHandler(log_file, encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter() if json_format else logging.Formatter(TEXT_FORMAT))
+        handlers.append(file_handler)
+    if console:
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        handlers.append(stream_handler)
+
+    log_queue = queue.SimpleQueue()
+    queue_handler = DeferredQueueHandler(log_queue)
+    _sampling_filter = SamplingFilter(sample_rates)
+    queue_handler.addFilter(_sampling_filter)
+
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+        handler.close()
+    root.addHandler(queue_handler)
+    root.setLevel(level.upper() if isinstance(level, str) else level)
+
+    _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    return _listener
+
+
+def stop_logging() -> None:
+    """Flush queued records and stop the listener thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+
+def get_sampling_filter() -> Optional[SamplingFilter]:
+    """The active sampling filter (None before setup_logging)."""
+    return _sampling_filter
+
+
+atexit.register(stop_logging)
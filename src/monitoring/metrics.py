@@ -0,0 +1,438 @@
+#!/usr/bin/env python3
+"""
+In-process metrics registry for AutoFarming Bot
+
+Counters, gauges and HDR-style latency histograms with bounded memory,
+exported in Prometheus text format from a small local HTTP endpoint.
+
+Histograms use log-linear buckets (16 sub-buckets per power of two over
+microseconds, <= 6.25% relative error) held in a fixed-size array, so
+recording is O(1) and memory does not grow with the number of samples.
+They are exported as Prometheus summaries (p50/p90/p99 + _sum/_count).
+
+Usage:
+    from src.monitoring.metrics import metrics
+
+    SEND_SECONDS = metrics.histogram('worker_send_seconds', 'Send latency', ['outcome'])
+    with SEND_SECONDS.labels(outcome='ok').time():
+        ...
+"""
+
+import asyncio
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.monitoring.health_probe import HealthProbe, get_health_probe
+
+logger = logging.getLogger(__name__)
+
+# HDR bucket layout: values in microseconds, 2**PRECISION_BITS sub-buckets per octave
+PRECISION_BITS = 4
+SUB_BUCKETS = 1 << PRECISION_BITS
+MAX_EXPONENT = 36  # 2**36 us ~ 19 hours; larger values are clamped
+BUCKET_COUNT = (MAX_EXPONENT - PRECISION_BITS + 2) * SUB_BUCKETS
+
+DEFAULT_QUANTILES = (0.5, 0.9, 0.99)
+DEFAULT_MAX_LABEL_SETS = 500
+OVERFLOW_LABEL = '__overflow__'
+
+
+def _bucket_index(micros: int) -> int:
+    if micros < SUB_BUCKETS:
+        return max(micros, 0)
+    exponent = micros.bit_length() - 1
+    if exponent > MAX_EXPONENT:
+        return BUCKET_COUNT - 1
+    shift = exponent - PRECISION_BITS
+    return (shift + 1) * SUB_BUCKETS + (micros >> shift) - SUB_BUCKETS
+
+
+def _bucket_midpoint(index: int) -> float:
+    """Representative value (microseconds) of a bucket."""
+    if index < SUB_BUCKETS:
+        return float(index)
+    shift = index // SUB_BUCKETS - 1
+    lower = (SUB_BUCKETS + index % SUB_BUCKETS) << shift
+    return lower + ((1 << shift) - 1) / 2.0
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in labels) + '}'
+
+
+class _CounterChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ('value',)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        self.value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.value -= amount
+
+
+class _HistogramChild:
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record a duration in seconds."""
+        if seconds < 0:
+            seconds = 0.0
+        self.counts[_bucket_index(int(seconds * 1_000_000))] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q: float) -> float:
+        """Approximate quantile in seconds."""
+        if not self.count:
+            return 0.0
+        rank = max(1, int(q * self.count + 0.5))
+        seen = 0
+        for index, bucket in enumerate(self.counts):
+            if bucket:
+                seen += bucket
+                if seen >= rank:
+                    return min(_bucket_midpoint(index) / 1_000_000, self.max)
+        return self.max
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """Context manager observing the elapsed wall time of the block."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started)
+
+
+class _Metric:
+    """Base class: a named metric with optional labels and bounded children."""
+
+    kind = 'untyped'
+    child_class: Any = None
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 max_label_sets: int = DEFAULT_MAX_LABEL_SETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.max_label_sets = max_label_sets
+        self._children: Dict[Tuple[str, ...], Any] = {}
+        if not self.labelnames:
+            self._children[()] = self.child_class()
+
+    def labels(self, *values: Any, **kwargs: Any):
+        """Return the child for a label combination (created on first use)."""
+        if kwargs:
+            values = tuple(kwargs.get(name, '') for name in self.labelnames)
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(self._children) >= self.max_label_sets:
+                # Keep memory bounded under label explosions
+                key = (OVERFLOW_LABEL,) * len(self.labelnames)
+                child = self._children.get(key)
+                if child is not None:
+                    return child
+            child = self.child_class()
+            self._children[key] = child
+        return child
+
+    def _default(self):
+        if self.labelnames:
+            raise ValueError(f"Metric {self.name} requires labels {self.labelnames}")
+        return self._children[()]
+
+    def _samples(self) -> Iterator[Tuple[Tuple[Tuple[str, str], ...], Any]]:
+        for key, child in list(self._children.items()):
+            yield tuple(zip(self.labelnames, key)), child
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    kind = 'counter'
+    child_class = _CounterChild
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {child.value}" for labels, child in self._samples()]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down."""
+
+    kind = 'gauge'
+    child_class = _GaugeChild
+
+    def set(self, value: float) -> None:
+        self._default().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self._default().dec(amount)
+
+    def render(self) -> List[str]:
+        return [f"{self.name}{_format_labels(labels)} {child.value}" for labels, child in self._samples()]
+
+
+class Histogram(_Metric):
+    """HDR-style latency histogram exported as a Prometheus summary."""
+
+    kind = 'summary'
+    child_class = _HistogramChild
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 quantiles: Sequence[float] = DEFAULT_QUANTILES,
+                 max_label_sets: int = DEFAULT_MAX_LABEL_SETS):
+        super().__init__(name, documentation, labelnames, max_label_sets)
+        self.quantiles = tuple(quantiles)
+
+    def observe(self, seconds: float) -> None:
+        self._default().observe(seconds)
+
+    def time(self):
+        return self._default().time()
+
+    def render(self) -> List[str]:
+        lines = []
+        for labels, child in self._samples():
+            for q in self.quantiles:
+                lines.append(f"{self.name}{_format_labels(labels + (('quantile', str(q)),))} {child.quantile(q)}")
+            lines.append(f"{self.name}_sum{_format_labels(labels)} {child.total}")
+            lines.append(f"{self.name}_count{_format_labels(labels)} {child.count}")
+        return lines
+
+
+def timed(histogram: Histogram, **labels: Any):
+    """Decorator observing the duration of a sync or async function.
+
+    If the histogram has a ``method`` label and it is not given, the
+    function name is used.
+    """
+    def decorator(func):
+        label_values = dict(labels)
+        if 'method' in histogram.labelnames and 'method' not in label_values:
+            label_values['method'] = func.__name__
+        child = histogram.labels(**label_values) if histogram.labelnames else histogram._default()
+
+        if asyncio.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    child.observe(time.perf_counter() - started)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                child.observe(time.perf_counter() - started)
+        return wrapper
+    return decorator
+
+
+class MetricsRegistry:
+    """Holds every metric of the process; get-or-create by name."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs):
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = cls(name, documentation, labelnames, **kwargs)
+            self._metrics[name] = metric
+        elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+            raise ValueError(f"Metric {name} already registered with a different type or labels")
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  quantiles: Sequence[float] = DEFAULT_QUANTILES) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, quantiles=quantiles)
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render_prometheus(self) -> str:
+        """Render every metric in Prometheus text exposition format (0.0.4)."""
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.append(f"# HELP {metric.name} {_escape(metric.documentation)}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Plain-dict view of all metrics (for admin commands / JSON)."""
+        result: Dict[str, Any] = {}
+        for metric in list(self._metrics.values()):
+            series = {}
+            for labels, child in metric._samples():
+                key = ','.join(f"{name}={value}" for name, value in labels) or '_'
+                if isinstance(child, _HistogramChild):
+                    series[key] = {
+                        'count': child.count,
+                        'p50': round(child.quantile(0.5), 6),
+                        'p99': round(child.quantile(0.99), 6),
+                        'max': round(child.max, 6),
+                    }
+                else:
+                    series[key] = child.value
+            result[metric.name] = series
+        return result
+
+
+class MetricsServer:
+    """Minimal asyncio HTTP server exposing /metrics (no extra dependencies).
+
+    With a HealthProbe it also serves /livez and /readyz (503 when not ready).
+    """
+
+    def __init__(self, registry: 'MetricsRegistry', host: str = '127.0.0.1', port: int = 9464,
+                 probe: Optional['HealthProbe'] = None):
+        self.registry = registry
+        self.host = host
+        self.port = port
+        self.probe = probe
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+            # Drain headers
+            while True:
+                line = await asyncio.wait_for(reader.readline(), timeout=5)
+                if not line or line in (b'\r\n', b'\n'):
+                    break
+            parts = request_line.decode('latin-1').split()
+            path = parts[1] if len(parts) > 1 else '/'
+            route = path.split('?')[0]
+            if route == '/metrics':
+                body = self.registry.render_prometheus().encode('utf-8')
+                status, content_type = '200 OK', 'text/plain; version=0.0.4; charset=utf-8'
+            elif route == '/livez' and self.probe is not None:
+                body = json.dumps(self.probe.liveness()).encode('utf-8')
+                status, content_type = '200 OK', 'application/json'
+            elif route == '/readyz' and self.probe is not None:
+                ready, details = self.probe.readiness()
+                body = json.dumps(details).encode('utf-8')
+                status = '200 OK' if ready else '503 Service Unavailable'
+                content_type = 'application/json'
+            else:
+                body, status, content_type = b'not found\n', '404 Not Found', 'text/plain'
+            writer.write(
+                f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode('latin-1') + body
+            )
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        logger.info(f"📈 Metrics endpoint on http://{self.host}:{self.port}/metrics")
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+
+# Global metrics registry instance
+metrics = MetricsRegistry()
+
+# Offset from METRICS_PORT for processes without their own <PROCESS>_METRICS_PORT
+METRICS_PORT_OFFSETS = {'bot': 0, 'scheduler': 1}
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get the global metrics registry instance."""
+    return metrics
+
+
+def metrics_port_from_env(process: str, default_port: Optional[int] = None) -> Optional[int]:
+    """Port of a process's metrics endpoint.
+
+    <PROCESS>_METRICS_PORT (e.g. BOT_METRICS_PORT, SCHEDULER_METRICS_PORT) wins.
+    Otherwise the bot uses METRICS_PORT and every other process METRICS_PORT
+    plus its offset, so processes started from one environment (start_bot.py)
+    never compete for the same port.
+    """
+    port = os.getenv(f'{process.upper()}_METRICS_PORT')
+    if port:
+        return int(port)
+    port = os.getenv('METRICS_PORT')
+    if port:
+        return int(port) + METRICS_PORT_OFFSETS.get(process, 0)
+    return default_port
+
+
+async def start_metrics_server_from_env(process: str = 'bot',
+                                        default_port: Optional[int] = None) -> Optional[MetricsServer]:
+    """Start the /metrics, /livez and /readyz endpoint if a port is configured for process."""
+    port = metrics_port_from_env(process, default_port)
+    if not port:
+        return None
+    server = MetricsServer(metrics, os.getenv('METRICS_HOST', '127.0.0.1'), int(port), get_health_probe())
+    try:
+        await server.start()
+    except OSError as e:
+        logger.error(f"❌ Could not start metrics endpoint on port {port}: {e}")
+        return None
+    return server
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Lightweight span tracing for AutoFarming Bot
+
+Nested timings are recorded per posting cycle and per asyncio task with no
+external tracer. The current span is tracked in a ContextVar, so tasks
+started inside a span (asyncio.gather / create_task) record their spans as
+children of it. Finished traces are kept in a bounded in-memory ring buffer
+and appended to a JSON Lines export (one trace per line, written off the
+event loop), which is how the bot process (admin command) reads traces
+recorded by the scheduler process. Every process may export to the same
+file: appends and compaction hold an advisory lock next to it.
+
+Usage:
+    from src.monitoring.tracing import tracer
+
+    with tracer.trace('posting_cycle'):
+        with tracer.span('load_destinations', slot_id=5):
+            ...
+
+    @tracer.traced('send')
+    async def send(...): ...
+"""
+
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import itertools
+import json
+import logging
+import os
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, exports are not guarded
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_TRACES = 50
+DEFAULT_MAX_SPANS_PER_TRACE = 5000
+
+
+class Span:
+    """One timed operation inside a trace."""
+
+    __slots__ = ('span_id', 'parent_id', 'name', 'attrs', 'task', 'start', 'duration', 'error')
+
+    def __init__(self, span_id: int, parent_id: Optional[int], name: str, attrs: Dict[str, Any], start: float):
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attrs = attrs
+        self.start = start
+        self.duration: Optional[float] = None
+        self.error: Optional[str] = None
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        self.task = task.get_name() if task is not None else None
+
+    def to_dict(self, trace_start: float) -> Dict[str, Any]:
+        return {
+            'id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'task': self.task,
+            'start_ms': round((self.start - trace_start) * 1000, 3),
+            'duration_ms': round(self.duration * 1000, 3) if self.duration is not None else None,
+            'attrs': self.attrs,
+            'error': self.error,
+        }
+
+
+class Trace:
+    """All spans recorded under one root span (e.g. one posting cycle)."""
+
+    def __init__(self, trace_id: int, name: str, max_spans: int):
+        self.trace_id = trace_id
+        self.name = name
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.max_spans = max_spans
+        self.spans: List[Span] = []
+        self.dropped_spans = 0
+
+    def add(self, span: Span) -> bool:
+        if len(self.spans) >= self.max_spans:
+            self.dropped_spans += 1
+            return False
+        self.spans.append(span)
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        root = self.spans[0] if self.spans else None
+        return {
+            'trace_id': self.trace_id,
+            'name': self.name,
+            'started_at': self.started_at.isoformat(),
+            'duration_ms': round(root.duration * 1000, 3) if root and root.duration is not None else None,
+            'dropped_spans': self.dropped_spans,
+            'spans': [span.to_dict(self.start) for span in self.spans],
+        }
+
+
+@contextmanager
+def _export_lock(path: str) -> Iterator[None]:
+    """Exclusive lock on an export, shared by every process writing to it."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if fcntl is None:
+        yield
+        return
+    with open(f"{path}.lock", 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+# (trace, span) of the innermost open span in the current context
+_current: contextvars.ContextVar = contextvars.ContextVar('current_span', default=None)
+
+
+class Tracer:
+    """Creates spans and keeps the most recent finished traces."""
+
+    def __init__(self, max_traces: int = DEFAULT_MAX_TRACES,
+                 max_spans_per_trace: int = DEFAULT_MAX_SPANS_PER_TRACE,
+                 export_path: Optional[str] = None):
+        self.enabled = True
+        self.max_spans_per_trace = max_spans_per_trace
+        self.export_path = export_path
+        self._traces: deque = deque(maxlen=max_traces)
+        self._ids = itertools.count(1)
+        # One writer thread keeps export appends in order and off the event loop
+        self._writer: Optional[ThreadPoolExecutor] = None
+        self._exported = 0
+
+    @contextmanager
+    def trace(self, name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+        """Start a new trace with a root span (e.g. one posting cycle)."""
+        if not self.enabled:
+            yield None
+            return
+        trace = Trace(next(self._ids), name, self.max_spans_per_trace)
+        token = _current.set(None)
+        try:
+            with self._record(trace, None, name, attrs) as span:
+                yield span
+        finally:
+            _current.reset(token)
+            self._finish(trace)
+
+    @contextmanager
+    def span(self, name: str, **attrs: Any) -> Iterator[Optional[Span]]:
+        """Time a block as a child of the current span.
+
+        Outside a trace this is a no-op, so instrumented code paths that also
+        run outside posting cycles cost nothing there.
+        """
+        current = _current.get()
+        if current is None:
+            yield None
+            return
+        trace, parent = current
+        with self._record(trace, parent.span_id, name, attrs) as span:
+            yield span
+
+    @contextmanager
+    def _record(self, trace: Trace, parent_id: Optional[int], name: str, attrs: Dict[str, Any]) -> Iterator[Span]:
+        span = Span(next(self._ids), parent_id, name, attrs, time.perf_counter())
+        token = _current.set((trace, span)) if trace.add(span) else None
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.duration = time.perf_counter() - span.start
+            if token is not None:
+                _current.reset(token)
+
+    def traced(self, name: Optional[str] = None, **attrs: Any):
+        """Decorator wrapping a sync or async function in a child span."""
+        def decorator(func):
+            span_name = name or func.__qualname__
+
+            if asyncio.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with self.span(span_name, **attrs):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name, **attrs):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _finish(self, trace: Trace) -> None:
+        self._traces.append(trace)
+        if self.export_path:
+            if self._writer is None:
+                self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix='trace-export')
+            self._writer.submit(self._export, self.export_path, trace.to_dict())
+
+    def _export(self, path: str, trace: Dict[str, Any]) -> None:
+        try:
+            self.append_export(path, trace)
+            self._exported += 1
+            # Compact once the file holds two ring buffers' worth of traces
+            if self._exported % self._traces.maxlen == 0:
+                self.compact_export(path, self._traces.maxlen)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not export traces to {self.export_path}: {e}")
+
+    # --- Access / export ---
+
+    def get_traces(self, name: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Finished traces (oldest first), optionally filtered by root span name."""
+        return [trace.to_dict() for trace in list(self._traces) if name is None or trace.name == name]
+
+    @staticmethod
+    def append_export(path: str, trace: Dict[str, Any]) -> None:
+        """Append one finished trace to a JSON Lines export."""
+        line = json.dumps(trace, default=str) + '\n'
+        with _export_lock(path), open(path, 'a', encoding='utf-8') as f:
+            f.write(line)
+
+    @staticmethod
+    def compact_export(path: str, keep: int) -> None:
+        """Keep only the last keep traces of an export (atomically).
+
+        Holds the export lock, so traces other processes append meanwhile are
+        not lost when the compacted copy replaces the file.
+        """
+        with _export_lock(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                lines = deque(f, maxlen=keep)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.writelines(lines)
+            os.replace(tmp_path, path)
+
+
+def load_traces(path: str) -> List[Dict[str, Any]]:
+    """Read traces exported by another process (oldest first)."""
+    traces = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    traces.append(json.loads(line))
+                except json.JSONDecodeError:
+                    # Line still being written by the exporting process
+                    continue
+    except FileNotFoundError:
+        return []
+    return traces
+
+
+def summarize_trace(trace: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Aggregate spans by name: count, total and self time (flame-style rows).
+
+    Self time excludes time spent in child spans. Children running in
+    parallel tasks can add up to more than their parent's wall time.
+    """
+    spans = trace.get('spans', [])
+    child_time: Dict[int, float] = {}
+    for span in spans:
+        if span['parent_id'] is not None and span['duration_ms'] is not None:
+            child_time[span['parent_id']] = child_time.get(span['parent_id'], 0.0) + span['duration_ms']
+
+    rows: Dict[str, Dict[str, Any]] = {}
+    for span in spans:
+        duration = span['duration_ms'] or 0.0
+        row = rows.setdefault(span['name'], {'name': span['name'], 'count': 0, 'total_ms': 0.0, 'self_ms': 0.0})
+        row['count'] += 1
+        row['total_ms'] += duration
+        row['self_ms'] += max(0.0, duration - child_time.get(span['id'], 0.0))
+
+    return sorted(rows.values(), key=lambda row: row['total_ms'], reverse=True)
+
+
+def format_trace_tree(trace: Dict[str, Any], max_depth: int = 4, max_children: int = 8) -> str:
+    """Indented tree of a trace's spans with durations."""
+    children: Dict[Optional[int], List[Dict[str, Any]]] = {}
+    for span in trace.get('spans', []):
+        children.setdefault(span['parent_id'], []).append(span)
+
+    lines: List[str] = []
+
+    def walk(parent_id: Optional[int], depth: int) -> None:
+        kids = children.get(parent_id, [])
+        for span in kids[:max_children]:
+            duration = f"{span['duration_ms']:.1f}ms" if span['duration_ms'] is not None else "open"
+            attrs = ' '.join(f"{k}={v}" for k, v in span['attrs'].items())
+            lines.append(f"{'  ' * depth}{span['name']} {duration}{(' ' + attrs) if attrs else ''}")
+            if depth + 1 < max_depth:
+                walk(span['id'], depth + 1)
+        if len(kids) > max_children:
+            lines.append(f"{'  ' * depth}... {len(kids) - max_children} more")
+
+    walk(None, 0)
+    return '\n'.join(lines)
+
+
+# Global tracer instance; TRACE_EXPORT_PATH makes finished traces visible to other processes
+tracer = Tracer(export_path=os.getenv('TRACE_EXPORT_PATH', 'data/posting_traces.jsonl'))
+
+
+def get_tracer() -> Tracer:
+    """Get the global tracer instance."""
+    return tracer
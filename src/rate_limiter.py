@@ -1,16 +1,108 @@
 import asyncio
 import logging
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-from collections import defaultdict
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Tuple
+
+# Slack for float error accumulated in TAT sums; one microsecond is far below
+# any window this limiter enforces but well above the rounding of monotonic()
+_TOLERANCE = 1e-6
+
+
+class GCRALimiter:
+    """Generic Cell Rate Algorithm limiter with bounded, LRU-evicted state.
+
+    "max_actions per window_seconds" is enforced by storing a single float per
+    key, the theoretical arrival time (TAT) of the next action, so every check
+    is O(1) regardless of how many actions fall in the window. A key whose TAT
+    has passed carries no information (it behaves like a new key), so idle
+    keys can be dropped freely; when more than max_keys are tracked the least
+    recently used key is evicted.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        # key -> (tat, emission_interval)
+        self._state: "OrderedDict[Hashable, Tuple[float, float]]" = OrderedDict()
+        self.allowed = 0
+        self.limited = 0
+        self.evictions = 0
+
+    def allow(self, key: Hashable, max_actions: int, window_seconds: float) -> bool:
+        """Record an action for key and return False if it exceeds the limit."""
+        now = self.clock()
+        interval = window_seconds / max_actions
+        state = self._state.get(key)
+        tat = state[0] if state is not None and state[0] > now else now
+
+        # Allow a burst of max_actions: reject once the next TAT would be
+        # more than one window ahead of now
+        new_tat = tat + interval
+        if new_tat - now > window_seconds + _TOLERANCE:
+            self.limited += 1
+            if state is not None:
+                self._state.move_to_end(key)
+            return False
+
+        self._state[key] = (new_tat, interval)
+        self._state.move_to_end(key)
+        if len(self._state) > self.max_keys:
+            self._state.popitem(last=False)
+            self.evictions += 1
+        self.allowed += 1
+        return True
+
+    def retry_after(self, key: Hashable, max_actions: int, window_seconds: float) -> float:
+        """Seconds until key may act again (0.0 if it may act now)."""
+        state = self._state.get(key)
+        if state is None:
+            return 0.0
+        interval = window_seconds / max_actions
+        wait = state[0] + interval - window_seconds - self.clock()
+        return wait if wait > _TOLERANCE else 0.0
+
+    def usage(self, key: Hashable) -> int:
+        """Approximate number of actions still counted against key's window."""
+        state = self._state.get(key)
+        if state is None:
+            return 0
+        tat, interval = state
+        remaining = tat - self.clock()
+        return math.ceil(remaining / interval - _TOLERANCE) if remaining > _TOLERANCE else 0
+
+    def purge_idle(self) -> int:
+        """Drop keys whose TAT has passed. Returns the number removed."""
+        now = self.clock()
+        idle = [key for key, (tat, _) in self._state.items() if tat <= now]
+        for key in idle:
+            del self._state[key]
+        return len(idle)
+
+    def keys(self):
+        return self._state.keys()
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            'tracked_keys': len(self._state),
+            'max_keys': self.max_keys,
+            'allowed': self.allowed,
+            'limited': self.limited,
+            'evictions': self.evictions,
+        }
+
 
 class RateLimiter:
-    """Production-ready rate limiting system."""
+    """Production-ready rate limiting system (GCRA, O(1) per check)."""
     
-    def __init__(self, logger: logging.Logger):
+    def __init__(self, logger: logging.Logger, max_tracked_keys: int = 100_000):
         self.logger = logger
-        self.user_actions: Dict[int, Dict[str, List[datetime]]] = defaultdict(lambda: defaultdict(list))
-        self.global_actions: Dict[str, List[datetime]] = defaultdict(list)
+        self.user_limiter = GCRALimiter(max_keys=max_tracked_keys)
+        self.global_limiter = GCRALimiter(max_keys=1024)
         self.cleanup_task = None
         
     async def start(self):
@@ -30,98 +122,45 @@ class RateLimiter:
     
     def check_rate_limit(self, user_id: int, action: str, max_actions: int, window_seconds: int) -> bool:
         """Check if user is within rate limits for a specific action."""
-        now = datetime.now()
-        cutoff_time = now - timedelta(seconds=window_seconds)
-        
-        # Clean old records for this user/action
-        self.user_actions[user_id][action] = [
-            time for time in self.user_actions[user_id][action]
-            if time > cutoff_time
-        ]
-        
-        # Check if user has exceeded limit
-        if len(self.user_actions[user_id][action]) >= max_actions:
+        if not self.user_limiter.allow((user_id, action), max_actions, window_seconds):
             self.logger.warning(f"Rate limit exceeded for user {user_id}, action {action}")
             return False
-        
-        # Record this action
-        self.user_actions[user_id][action].append(now)
         return True
     
     def check_global_rate_limit(self, action: str, max_actions: int, window_seconds: int) -> bool:
         """Check global rate limits (across all users)."""
-        now = datetime.now()
-        cutoff_time = now - timedelta(seconds=window_seconds)
-        
-        # Clean old records
-        self.global_actions[action] = [
-            time for time in self.global_actions[action]
-            if time > cutoff_time
-        ]
-        
-        # Check if global limit exceeded
-        if len(self.global_actions[action]) >= max_actions:
+        if not self.global_limiter.allow(action, max_actions, window_seconds):
             self.logger.warning(f"Global rate limit exceeded for action {action}")
             return False
-        
-        # Record this action
-        self.global_actions[action].append(now)
         return True
     
     def get_user_stats(self, user_id: int) -> Dict[str, int]:
-        """Get rate limit statistics for a user."""
+        """Get rate limit statistics for a user (actions still counted per action)."""
         stats = {}
-        for action, times in self.user_actions[user_id].items():
-            # Count actions in last hour
-            cutoff_time = datetime.now() - timedelta(hours=1)
-            recent_actions = [time for time in times if time > cutoff_time]
-            stats[action] = len(recent_actions)
+        for key in list(self.user_limiter.keys()):
+            if key[0] == user_id:
+                stats[key[1]] = self.user_limiter.usage(key)
         return stats
     
     def get_global_stats(self) -> Dict[str, int]:
-        """Get global rate limit statistics."""
-        stats = {}
-        for action, times in self.global_actions.items():
-            # Count actions in last hour
-            cutoff_time = datetime.now() - timedelta(hours=1)
-            recent_actions = [time for time in times if time > cutoff_time]
-            stats[action] = len(recent_actions)
-        return stats
+        """Get global rate limit statistics (actions still counted per action)."""
+        return {action: self.global_limiter.usage(action) for action in list(self.global_limiter.keys())}
+
+    def get_limiter_stats(self) -> Dict[str, Dict[str, int]]:
+        """Get tracked-key and allow/limit counters for both limiters."""
+        return {
+            'user': self.user_limiter.stats(),
+            'global': self.global_limiter.stats(),
+        }
     
     async def _cleanup_old_records(self):
-        """Periodically clean up old rate limit records."""
+        """Periodically drop idle keys (state is bounded by LRU eviction anyway)."""
         while True:
             try:
                 await asyncio.sleep(300)  # Clean up every 5 minutes
                 
-                now = datetime.now()
-                cutoff_time = now - timedelta(hours=24)  # Keep 24 hours of data
-                
-                # Clean user actions
-                for user_id in list(self.user_actions.keys()):
-                    for action in list(self.user_actions[user_id].keys()):
-                        self.user_actions[user_id][action] = [
-                            time for time in self.user_actions[user_id][action]
-                            if time > cutoff_time
-                        ]
-                        # Remove empty action lists
-                        if not self.user_actions[user_id][action]:
-                            del self.user_actions[user_id][action]
-                    # Remove users with no actions
-                    if not self.user_actions[user_id]:
-                        del self.user_actions[user_id]
-                
-                # Clean global actions
-                for action in list(self.global_actions.keys()):
-                    self.global_actions[action] = [
-                        time for time in self.global_actions[action]
-                        if time > cutoff_time
-                    ]
-                    # Remove empty action lists
-                    if not self.global_actions[action]:
-                        del self.global_actions[action]
-                
-                self.logger.debug("Rate limiter cleanup completed")
+                removed = self.user_limiter.purge_idle() + self.global_limiter.purge_idle()
+                self.logger.debug(f"Rate limiter cleanup completed ({removed} idle keys removed)")
                 
             except asyncio.CancelledError:
                 break
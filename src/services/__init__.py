@@ -1,24 +1,28 @@
 """
 Core services for AutoFarming Bot
+
+The service classes are imported on first access, so importing a light
+submodule (e.g. src.services.worker_pool_client) does not pull in Telethon
+or aiohttp through this package.
 """
-try:
-    from .posting_service import PostingService
-except ImportError:
-    PostingService = None
+import importlib
 
-try:
-    from .worker_manager import WorkerManager
-except ImportError:
-    WorkerManager = None
+_SERVICES = {
+    'PostingService': '.posting_service',
+    'WorkerManager': '.worker_manager',
+    'AutoPoster': '.auto_poster',
+    'PaymentProcessor': '.payment_processor',
+}
 
-try:
-    from .auto_poster import AutoPoster
-except ImportError:
-    AutoPoster = None
+__all__ = list(_SERVICES)
 
-try:
-    from .payment_processor import PaymentProcessor
-except ImportError:
-    PaymentProcessor = None
 
-__all__ = ['PostingService', 'WorkerManager', 'AutoPoster', 'PaymentProcessor']
+def __getattr__(name):
+    if name not in _SERVICES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    try:
+        value = getattr(importlib.import_module(_SERVICES[name], __name__), name)
+    except ImportError:
+        value = None
+    globals()[name] = value
+    return value
@@ -5,6 +5,9 @@ from typing import List, Optional, Dict, Any
 from telethon.errors import FloodWaitError, UserBannedInChannelError, ChatWriteForbiddenError
 from src.services.worker_manager import WorkerManager
 from src.database.manager import DatabaseManager
+from src.services.posting_pipeline import (
+    Assignment, CycleReport, PostingPipeline, PostResult, database_destinations, database_mark_posted
+)
 
 class AutoPoster:
     """Automated ad posting system with worker rotation and error handling."""
@@ -18,6 +21,17 @@ class AutoPoster:
         self.max_retries = 3
         self.retry_delay = 30  # seconds
         
+        # Shared posting pipeline, one slot and destination at a time
+        self.pipeline = PostingPipeline(
+            source=self.get_ads_to_post,
+            destinations=database_destinations(db_manager),
+            assign=self._assign_worker,
+            send=self._send,
+            telemetry=self._log_post,
+            mark_posted=database_mark_posted(db_manager),
+            parallel=False,
+        )
+        
     async def get_ads_to_post(self) -> List[Dict[str, Any]]:
         """Get active ad slots that are due for posting."""
         try:
@@ -30,71 +44,54 @@ class AutoPoster:
     
     async def post_ad(self, ad_slot: Dict[str, Any], destinations: List[Dict[str, Any]], worker_id: int) -> Dict[str, Any]:
         """Post a single ad to all destinations using specified worker."""
-        results = {
-            'slot_id': ad_slot['id'],
-            'total_destinations': len(destinations),
-            'successful_posts': 0,
-            'failed_posts': 0,
-            'errors': []
+        return await self._post_assignments(
+            ad_slot, [Assignment(ad_slot, destination, worker_id) for destination in destinations]
+        )
+    
+    async def _post_assignments(self, ad_slot: Dict[str, Any], assignments: List[Assignment]) -> Dict[str, Any]:
+        report = CycleReport(total_ads=1)
+        post_results = await self.pipeline.execute(assignments, report)
+        return {
+            'total_destinations': len(assignments),
+            'successful_posts': report.successful_posts,
+            'failed_posts': report.failed_posts,
+            'errors': [
+                {'destination': result.destination['destination_name'], 'error': result.error}
+                for result in post_results if not result.success
+            ]
         }
-        
-        content = ad_slot['content']
-        file_id = ad_slot.get('file_id')
-        
-        for destination in destinations:
-            try:
-                chat_id = int(destination['destination_id'])
-                destination_name = destination['destination_name']
-                
-                # Post using worker manager
-                success = await self.worker_manager.post_message(
-                    chat_id=chat_id,
-                    message_text=content,
-                    file_id=file_id
-                )
-                
-                # Log the post attempt
-                await self.db.log_ad_post(
-                    slot_id=ad_slot['id'],
-                    destination_id=destination['destination_id'],
-                    destination_name=destination_name,
-                    worker_id=worker_id,
-                    success=success
-                )
-                
-                if success:
-                    results['successful_posts'] += 1
-                    self.logger.info(f"✅ Posted ad {ad_slot['id']} to {destination_name}")
-                else:
-                    results['failed_posts'] += 1
-                    error_msg = "Worker posting failed"
-                    results['errors'].append({
-                        'destination': destination_name,
-                        'error': error_msg
-                    })
-                    self.logger.warning(f"❌ Failed to post ad {ad_slot['id']} to {destination_name}")
-                    
-            except Exception as e:
-                results['failed_posts'] += 1
-                error_msg = str(e)
-                results['errors'].append({
-                    'destination': destination['destination_name'],
-                    'error': error_msg
-                })
-                
-                # Log the failed post
-                await self.db.log_ad_post(
-                    slot_id=ad_slot['id'],
-                    destination_id=destination['destination_id'],
-                    destination_name=destination['destination_name'],
-                    worker_id=worker_id,
-                    success=False,
-                    error=error_msg
-                )
-                
-                self.logger.error(f"Error posting ad {ad_slot['id']} to {destination['destination_name']}: {e}")
-        
-        return results
+    
+    async def _assign_worker(self, ad_slot: Dict[str, Any], destinations: List[Dict[str, Any]]) -> List[Assignment]:
+        """One available worker posts the slot to all of its destinations."""
+        worker_id = await self.worker_manager.get_available_worker()
+        return [Assignment(ad_slot, destination, worker_id) for destination in destinations]
+    
+    async def _send(self, assignment: Assignment) -> PostResult:
+        """Post one destination through the worker manager."""
+        destination_name = assignment.destination['destination_name']
+        success = await self.worker_manager.post_message(
+            chat_id=int(assignment.destination['destination_id']),
+            message_text=assignment.slot['content'],
+            file_id=assignment.slot.get('file_id')
+        )
+        if success:
+            self.logger.info(f"✅ Posted ad {assignment.slot['id']} to {destination_name}")
+            return assignment.result(True)
+        self.logger.warning(f"❌ Failed to post ad {assignment.slot['id']} to {destination_name}")
+        return assignment.result(False, "Worker posting failed")
+    
+    async def _log_post(self, result: PostResult):
+        """Log every post attempt in the database."""
+        if result.worker_id is None:
+            return
+        await self.db.log_ad_post(
+            slot_id=result.slot['id'],
+            destination_id=result.destination['destination_id'],
+            destination_name=result.destination['destination_name'],
+            worker_id=result.worker_id,
+            success=result.success,
+            error=result.error
+        )
     
     async def handle_posting_errors(self, error: Exception, ad_slot: Dict[str, Any], destination: Dict[str, Any]) -> bool:
         """Handle specific posting errors and determine retry strategy."""
@@ -125,11 +122,10 @@ class AutoPoster:
     async def process_ad_slot(self, ad_slot: Dict[str, Any]) -> Dict[str, Any]:
         """Process a single ad slot with retry logic."""
         slot_id = ad_slot['id']
-        user_id = ad_slot['user_id']
         
-        # Get destinations for this slot
-        destinations = await self.db.get_slot_destinations(slot_id)
-        if not destinations:
+        # Destinations paired with an available worker
+        assignments = await self.pipeline.plan_slot(ad_slot)
+        if not assignments:
             self.logger.warning(f"No destinations found for slot {slot_id}")
             return {
                 'slot_id': slot_id,
@@ -137,9 +133,7 @@ class AutoPoster:
                 'message': 'No destinations configured'
             }
         
-        # Get available worker
-        worker_id = await self.worker_manager.get_available_worker()
-        if not worker_id:
+        if assignments[0].worker is None:
             self.logger.warning(f"No available workers for slot {slot_id}")
             return {
                 'slot_id': slot_id,
@@ -147,16 +141,10 @@ class AutoPoster:
                 'message': 'No workers available'
             }
         
-        # Try posting with retries
+        # Try posting with retries (the pipeline updates last_sent_at after the first success)
         for attempt in range(self.max_retries):
             try:
-                results = await self.post_ad(ad_slot, destinations, worker_id)
-                
-                # Update last_sent_at if any posts were successful
-                if results['successful_posts'] > 0:
-                    await self.db.update_slot_last_sent(slot_id)
-                    self.logger.info(f"✅ Updated last_sent_at for slot {slot_id}")
-                
+                results = await self._post_assignments(ad_slot, assignments)
                 return {
                     'slot_id': slot_id,
                     'status': 'completed',
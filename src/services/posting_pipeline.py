@@ -0,0 +1,261 @@
+"""
+Posting pipeline.
+
+The one posting engine behind the scheduler's PostingService, AutoPoster
+and the bot's PostingService. A cycle runs five stages, each a plain async
+callable supplied by the entry point:
+
+    source        () -> due ad slots
+    destinations  (slot) -> the slot's destinations
+    assign        (slot, destinations) -> [Assignment(slot, destination, worker)]
+    send          (assignment) -> PostResult
+    telemetry     (result) -> None, called for every PostResult
+
+Everything between the stages is shared: paused slots are skipped, a slot
+is marked sent once after its first successful post, send errors become
+failed results, and outcomes are counted in a CycleReport. Assignments run
+concurrently (parallel=True) or one after another with an optional delay
+between slots.
+
+scripts/bench_posting_pipeline.py measures a cycle with in-memory stages.
+"""
+
+import asyncio
+import copy
+import logging
+from contextlib import nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import Any, Awaitable, Callable, ContextManager, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PostResult:
+    """Outcome of posting one slot to one destination."""
+    slot: Dict[str, Any]
+    destination: Dict[str, Any]
+    worker_id: Optional[int]
+    success: bool
+    error: Optional[str] = None
+    skipped: bool = False
+
+
+@dataclass
+class Assignment:
+    """A destination of a slot and the worker that should post it (None if none is free)."""
+    slot: Dict[str, Any]
+    destination: Dict[str, Any]
+    worker: Any = None
+
+    @property
+    def worker_id(self) -> Optional[int]:
+        if self.worker is None:
+            return None
+        return self.worker if isinstance(self.worker, int) else getattr(self.worker, 'worker_id', None)
+
+    def result(self, success: bool, error: Optional[str] = None, skipped: bool = False) -> PostResult:
+        return PostResult(self.slot, self.destination, self.worker_id, success, error, skipped)
+
+
+@dataclass
+class CycleReport:
+    """Counts of a posting cycle; as_dict() is the results dict the services return."""
+    total_ads: int = 0
+    tasks: int = 0
+    successful_posts: int = 0
+    failed_posts: int = 0
+    skipped_posts: int = 0
+    slots_posted: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def add(self, result: PostResult) -> None:
+        if result.success:
+            self.successful_posts += 1
+        elif result.skipped:
+            self.skipped_posts += 1
+        else:
+            self.failed_posts += 1
+        if result.error and not result.skipped:
+            self.errors.append(
+                f"Slot {result.slot.get('id')} -> {result.destination.get('destination_id')}: {result.error}"
+            )
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+DueSlotSource = Callable[[], Awaitable[List[Dict[str, Any]]]]
+DestinationLoader = Callable[[Dict[str, Any]], Awaitable[List[Dict[str, Any]]]]
+Assigner = Callable[[Dict[str, Any], List[Dict[str, Any]]], Awaitable[List[Assignment]]]
+Sender = Callable[[Assignment], Awaitable[PostResult]]
+TelemetrySink = Callable[[PostResult], Awaitable[None]]
+
+
+def database_due_slots(db) -> DueSlotSource:
+    """Due slots from DatabaseManager.get_active_ads_to_send()."""
+    async def source() -> List[Dict[str, Any]]:
+        return await db.get_active_ads_to_send() or []
+    return source
+
+
+def database_destinations(db) -> DestinationLoader:
+    """Destinations from DatabaseManager.get_slot_destinations()."""
+    async def load(slot: Dict[str, Any]) -> List[Dict[str, Any]]:
+        return await db.get_slot_destinations(slot['id'], slot.get('slot_type', 'user')) or []
+    return load
+
+
+def database_mark_posted(db) -> Callable[[Dict[str, Any]], Awaitable[bool]]:
+    """Marks a slot sent with DatabaseManager.update_slot_last_sent()."""
+    async def mark(slot: Dict[str, Any]) -> bool:
+        return await db.update_slot_last_sent(slot['id'], slot.get('slot_type', 'user'))
+    return mark
+
+
+class PostingPipeline:
+    """Runs posting cycles through the configured stages."""
+
+    def __init__(self, source: DueSlotSource, destinations: DestinationLoader, assign: Assigner, send: Sender,
+                 telemetry: Optional[TelemetrySink] = None,
+                 mark_posted: Optional[Callable[[Dict[str, Any]], Awaitable[Any]]] = None,
+                 parallel: bool = True, max_slots: Optional[int] = None,
+                 slot_delay: Optional[Callable[[], float]] = None,
+                 stage: Optional[Callable[[str], ContextManager]] = None,
+                 should_stop: Optional[Callable[[], bool]] = None):
+        """Initialize the pipeline.
+
+        Args:
+            source: Returns the slots due for posting
+            destinations: Returns a slot's destinations
+            assign: Pairs each destination with a worker
+            send: Posts one assignment
+            telemetry: Receives every PostResult
+            mark_posted: Records that a slot was sent (once per slot and cycle)
+            parallel: Run all assignments of a cycle concurrently
+            max_slots: Slots handled per cycle at most
+            slot_delay: Seconds to wait between slots when not parallel
+            stage: Context manager factory timing each stage, e.g. track_stage
+            should_stop: Returns True to end the cycle early; checked before
+                each slot and during slot delays
+        """
+        self.source = source
+        self.destinations = destinations
+        self.assign = assign
+        self.send = send
+        self.telemetry = telemetry
+        self.mark_posted = mark_posted
+        self.parallel = parallel
+        self.max_slots = max_slots
+        self.slot_delay = slot_delay
+        self.stage = stage or (lambda name: nullcontext())
+        self.should_stop = should_stop
+
+    def with_options(self, **changes: Any) -> 'PostingPipeline':
+        """A copy of this pipeline with some stages or options replaced."""
+        pipeline = copy.copy(self)
+        for name, value in changes.items():
+            if not hasattr(pipeline, name):
+                raise TypeError(f"Unknown pipeline option: {name}")
+            setattr(pipeline, name, value)
+        return pipeline
+
+    async def run_cycle(self, slots: Optional[List[Dict[str, Any]]] = None) -> CycleReport:
+        """Post the given slots, or the source's due slots."""
+        if slots is None:
+            with self.stage('fetch_due_slots'):
+                slots = await self.source()
+        report = CycleReport(total_ads=len(slots))
+        posted: Set[Tuple[str, Any]] = set()
+        pending: List[Assignment] = []
+
+        for index, slot in enumerate(slots):
+            if self.max_slots is not None and index >= self.max_slots:
+                logger.warning(f"Reached maximum slots per cycle ({self.max_slots})")
+                break
+            if self.stopped():
+                logger.info(f"Posting cycle stopped after {index} of {len(slots)} slots")
+                break
+            assignments = await self.plan_slot(slot)
+            if self.parallel:
+                pending.extend(assignments)
+                continue
+            await self.execute(assignments, report, posted)
+            if self.slot_delay and assignments and index < len(slots) - 1:
+                await self.pause(self.slot_delay())
+
+        if pending and not self.stopped():
+            await self.execute(pending, report, posted)
+        return report
+
+    def stopped(self) -> bool:
+        return self.should_stop is not None and self.should_stop()
+
+    async def pause(self, seconds: float, step: float = 1.0) -> None:
+        """Sleep between slots, waking up early when the cycle is stopped."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + seconds
+        while not self.stopped():
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(step, remaining))
+
+    async def plan_slot(self, slot: Dict[str, Any]) -> List[Assignment]:
+        """Destinations of a slot paired with workers; empty for paused slots."""
+        if slot.get('is_paused', False):
+            logger.info(f"Slot {slot.get('id')} is paused: {slot.get('pause_reason', 'unknown')}, skipping")
+            return []
+        with self.stage('load_destinations'):
+            destinations = await self.destinations(slot)
+        if not destinations:
+            logger.debug(f"No destinations for slot {slot.get('id')}, skipping")
+            return []
+        with self.stage('assign_workers'):
+            return await self.assign(slot, destinations)
+
+    async def execute(self, assignments: List[Assignment], report: CycleReport,
+                      posted: Optional[Set[Tuple[str, Any]]] = None) -> List[PostResult]:
+        """Post assignments and record their results in report."""
+        posted = set() if posted is None else posted
+        report.tasks += sum(1 for assignment in assignments if assignment.worker is not None)
+        with self.stage('execute_tasks'):
+            if self.parallel:
+                return list(await asyncio.gather(
+                    *(self._post(assignment, report, posted) for assignment in assignments)
+                ))
+            return [await self._post(assignment, report, posted) for assignment in assignments]
+
+    async def _post(self, assignment: Assignment, report: CycleReport, posted: Set[Tuple[str, Any]]) -> PostResult:
+        if assignment.worker is None:
+            result = assignment.result(False, 'No available worker', skipped=True)
+            report.errors.append(
+                f"No available workers for slot {assignment.slot.get('id')} "
+                f"destination {assignment.destination.get('destination_id')}"
+            )
+        else:
+            try:
+                result = await self.send(assignment)
+            except Exception as e:
+                logger.error(f"Error posting slot {assignment.slot.get('id')} to "
+                             f"{assignment.destination.get('destination_id')}: {e}")
+                result = assignment.result(False, str(e))
+        report.add(result)
+
+        slot_key = (assignment.slot.get('slot_type', 'user'), assignment.slot.get('id'))
+        if result.success and slot_key not in posted:
+            posted.add(slot_key)
+            report.slots_posted += 1
+            if self.mark_posted is not None:
+                with self.stage('mark_slot_posted'):
+                    try:
+                        await self.mark_posted(assignment.slot)
+                    except Exception as e:
+                        logger.error(f"Failed updating last_sent_at for slot {assignment.slot.get('id')}: {e}")
+
+        if self.telemetry is not None:
+            try:
+                await self.telemetry(result)
+            except Exception as e:
+                logger.warning(f"Posting telemetry failed: {e}")
+        return result
@@ -10,9 +10,11 @@ from .payment_processor import get_payment_processor
 class PostingService:
     """Background service for automated ad posting and subscription management."""
     
-    def __init__(self, db_manager: DatabaseManager, logger: logging.Logger):
+    def __init__(self, db_manager: DatabaseManager, logger: logging.Logger, media_loader=None):
         self.db = db_manager
         self.logger = logger
+        # Downloads Bot API file ids for media posts (see bot_file_loader)
+        self.media_loader = media_loader
         self.is_running = False
         self.service_task = None
         
@@ -20,6 +22,7 @@ class PostingService:
         self.worker_manager = None
         self.auto_poster = None
         self.payment_processor = None
+        self.pipeline = None
         
         # Service configuration
         self.posting_cycle_interval = 60  # minutes
@@ -50,12 +53,20 @@ class PostingService:
             self.logger.info("🚀 Initializing PostingService...")
             
             # Initialize worker manager
-            self.worker_manager = WorkerManager(self.db, self.logger)
+            self.worker_manager = WorkerManager(self.db, self.logger, media_loader=self.media_loader)
             await self.worker_manager.initialize_workers()
             
             # Initialize auto poster
             self.auto_poster = AutoPoster(self.db, self.worker_manager, self.logger)
             
+            # AutoPoster's pipeline limited to subscribed users, with anti-ban delays between slots
+            self.pipeline = self.auto_poster.pipeline.with_options(
+                source=self._subscribed_ads,
+                max_slots=self.max_posts_per_cycle,
+                slot_delay=self._calculate_anti_ban_delay,
+                should_stop=lambda: not self.is_running
+            )
+            
             # Initialize payment processor
             self.payment_processor = get_payment_processor()
             if self.payment_processor:
@@ -111,78 +122,48 @@ class PostingService:
         self.logger.info("📤 Starting posting cycle...")
         
         try:
-            # Get active ads that are due for posting
-            ads_to_post = await self.db.get_active_ads_to_send()
+            self.pipeline.max_slots = self.max_posts_per_cycle
+            report = await self.pipeline.run_cycle()
             
-            if not ads_to_post:
+            if not report.total_ads:
                 self.logger.debug("No ads ready to post in this cycle")
                 return
             
-            self.logger.info(f"📤 Found {len(ads_to_post)} ads ready to post")
-            
-            # Apply anti-ban rules and rate limiting
-            posts_this_cycle = 0
-            successful_posts = 0
-            failed_posts = 0
-            
-            for ad_slot in ads_to_post:
-                if not self.is_running:
-                    break
-                
-                if posts_this_cycle >= self.max_posts_per_cycle:
-                    self.logger.warning(f"Reached maximum posts per cycle ({self.max_posts_per_cycle})")
-                    break
-                
-                try:
-                    # Check if user subscription is still active
-                    user_id = ad_slot['user_id']
-                    subscription = await self.db.get_user_subscription(user_id)
-                    
-                    if not subscription or not subscription['is_active']:
-                        self.logger.warning(f"User {user_id} subscription expired, skipping ad slot {ad_slot['id']}")
-                        continue
-                    
-                    # Process the ad slot
-                    result = await self.auto_poster.process_ad_slot(ad_slot)
-                    
-                    if result['status'] == 'completed':
-                        successful_posts += 1
-                        self.total_posts_sent += 1
-                        self.logger.info(f"✅ Posted ad slot {ad_slot['id']} successfully")
-                    else:
-                        failed_posts += 1
-                        self.total_posts_failed += 1
-                        self.logger.warning(f"❌ Failed to post ad slot {ad_slot['id']}: {result.get('error', 'Unknown error')}")
-                    
-                    posts_this_cycle += 1
-                    
-                    # Anti-ban delay between posts
-                    delay = self._calculate_anti_ban_delay()
-                    if delay > 0:
-                        self.logger.debug(f"Anti-ban delay: {delay} seconds")
-                        await asyncio.sleep(delay)
-                    
-                except Exception as e:
-                    self.logger.error(f"Error processing ad slot {ad_slot['id']}: {e}")
-                    failed_posts += 1
-                    self.total_posts_failed += 1
+            self.total_posts_sent += report.successful_posts
+            self.total_posts_failed += report.failed_posts
             
             # Update cycle statistics
             cycle_duration = (datetime.now() - cycle_start).total_seconds()
             self.cycle_stats['total_cycles'] += 1
-            self.cycle_stats['successful_posts'] += successful_posts
-            self.cycle_stats['failed_posts'] += failed_posts
+            self.cycle_stats['successful_posts'] += report.successful_posts
+            self.cycle_stats['failed_posts'] += report.failed_posts
             self.cycle_stats['last_cycle_duration'] = cycle_duration
             self.last_posting_cycle = datetime.now()
             
             self.logger.info(
-                f"📊 Posting cycle completed: {successful_posts} successful, {failed_posts} failed "
+                f"📊 Posting cycle completed: {report.successful_posts} successful, {report.failed_posts} failed "
                 f"(Duration: {cycle_duration:.1f}s)"
             )
             
         except Exception as e:
             self.logger.error(f"Error in posting cycle: {e}")
     
+    async def _subscribed_ads(self) -> List[Dict[str, Any]]:
+        """Due ads whose owner still has an active subscription."""
+        ads_to_post = await self.db.get_active_ads_to_send()
+        if ads_to_post:
+            self.logger.info(f"📤 Found {len(ads_to_post)} ads ready to post")
+        
+        subscribed = []
+        for ad_slot in ads_to_post or []:
+            user_id = ad_slot['user_id']
+            subscription = await self.db.get_user_subscription(user_id)
+            if not subscription or not subscription['is_active']:
+                self.logger.warning(f"User {user_id} subscription expired, skipping ad slot {ad_slot['id']}")
+                continue
+            subscribed.append(ad_slot)
+        return subscribed
+    
     async def cleanup_expired_subscriptions(self):
         """Clean up expired subscriptions."""
         try:
@@ -193,32 +174,19 @@ class PostingService:
             
             self.logger.info("🧹 Starting subscription cleanup...")
             
-            # Get expiring subscriptions (within 7 days)
-            expiring_subscriptions = await self.db.get_expiring_subscriptions(7)
-            
-            cleaned_count = 0
-            for subscription in expiring_subscriptions:
-                try:
-                    user_id = subscription['user_id']
-                    
-                    # Check if subscription has actually expired
-                    subscription_info = await self.db.get_user_subscription(user_id)
-                    if not subscription_info or not subscription_info['is_active']:
-                        # Deactivate all user's ad slots
-                        user_slots = await self.db.get_user_slots(user_id)
-                        for slot in user_slots:
-                            await self.db.deactivate_slot(slot['id'])
-                        
-                        cleaned_count += 1
-                        self.logger.info(f"🧹 Deactivated slots for expired subscription: user {user_id}")
-                        
-                except Exception as e:
-                    self.logger.error(f"Error cleaning up subscription for user {subscription['user_id']}: {e}")
+            # One set-based sweep deactivates slots and clears expired subscriptions
+            sweep = await self.db.sweep_expired_subscriptions()
+            for error in sweep['errors']:
+                self.logger.error(f"Error cleaning up subscriptions: {error}")
+            cleaned_count = sweep['subscriptions_cleared']
             
             self.cycle_stats['expired_subscriptions_cleaned'] += cleaned_count
             self.last_cleanup = datetime.now()
             
-            self.logger.info(f"🧹 Cleanup completed: {cleaned_count} expired subscriptions cleaned")
+            self.logger.info(
+                f"🧹 Cleanup completed: {cleaned_count} expired subscriptions cleaned, "
+                f"{sweep['slots_deactivated']} slots deactivated"
+            )
             
         except Exception as e:
             self.logger.error(f"Error in subscription cleanup: {e}")
@@ -350,10 +318,10 @@ class PostingService:
 # Global PostingService instance
 posting_service = None
 
-def initialize_posting_service(db_manager: DatabaseManager, logger: logging.Logger):
+def initialize_posting_service(db_manager: DatabaseManager, logger: logging.Logger, media_loader=None):
     """Initialize the global PostingService instance."""
     global posting_service
-    posting_service = PostingService(db_manager, logger)
+    posting_service = PostingService(db_manager, logger, media_loader=media_loader)
     return posting_service
 
 def get_posting_service():
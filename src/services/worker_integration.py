@@ -6,10 +6,11 @@ from src.database.manager import DatabaseManager
 class WorkerIntegration:
     """Integration layer for WorkerManager with existing bot systems."""
     
-    def __init__(self, logger: logging.Logger, db_manager: DatabaseManager):
+    def __init__(self, logger: logging.Logger, db_manager: DatabaseManager, media_loader=None):
         self.logger = logger
         self.db = db_manager
-        self.worker_manager = WorkerManager(db_manager, logger)
+        # media_loader downloads the Bot API file ids of media posts (see bot_file_loader)
+        self.worker_manager = WorkerManager(db_manager, logger, media_loader=media_loader)
         
     async def initialize(self):
         """Initialize worker manager."""
@@ -103,10 +104,10 @@ class WorkerIntegration:
 # Global worker integration instance
 worker_integration = None
 
-def initialize_worker_integration(logger: logging.Logger, db_manager: DatabaseManager):
+def initialize_worker_integration(logger: logging.Logger, db_manager: DatabaseManager, media_loader=None):
     """Initialize the global worker integration."""
     global worker_integration
-    worker_integration = WorkerIntegration(logger, db_manager)
+    worker_integration = WorkerIntegration(logger, db_manager, media_loader=media_loader)
     return worker_integration
 
 def get_worker_integration():
@@ -2,17 +2,27 @@ from telethon import TelegramClient
 from telethon.errors import FloodWaitError, UserBannedInChannelError
 import asyncio
 import os
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import List, Optional, Dict, Any
 import logging
-import sqlite3
+
+from src.utils.media_cache import MediaCache, get_media_cache
+from src.utils.session_lock import acquire_session, release_session
+from src.services.worker_pool_client import WorkerPoolClient, WorkerPoolError, get_worker_pool_client
 
 class WorkerManager:
     """Manages Telegram worker accounts with rotation and cooldown tracking."""
     
-    def __init__(self, db_manager, logger: logging.Logger):
+    def __init__(self, db_manager, logger: logging.Logger, media_cache: MediaCache = None,
+                 media_loader=None, pool: WorkerPoolClient = None):
         self.db = db_manager
         self.logger = logger
+        # With a worker pool daemon, sessions stay in the daemon and workers map to None here
+        self.pool = pool or get_worker_pool_client()
+        # Uploaded media is reused per worker; media_loader downloads Bot API file ids
+        # (through a worker pool, file ids are forwarded and the pool downloads them)
+        self.media_cache = media_cache or get_media_cache()
+        self.media_loader = media_loader
         self.workers: Dict[int, TelegramClient] = {}
         self.worker_configs: Dict[int, Dict[str, Any]] = {}
         self.current_worker_index = 0
@@ -25,6 +35,10 @@ class WorkerManager:
         """Initialize all worker accounts."""
         self.logger.info("🚀 Initializing worker accounts...")
         
+        if self.pool is not None:
+            await self._attach_pool()
+            return
+        
         for worker_id in self.worker_ids:
             try:
                 # Get worker credentials from environment
@@ -40,31 +54,42 @@ class WorkerManager:
                 session_name = f"sessions/worker_{worker_id}"
                 os.makedirs('sessions', exist_ok=True)
                 
-                # Create Telethon client
-                client = TelegramClient(session_name, int(api_id), api_hash)
-                
-                # Start client
-                await client.start(phone=phone)
+                # Another process (e.g. the worker pool) may own the session
+                if not acquire_session(session_name):
+                    self.logger.warning(f"Worker {worker_id} session is in use by another process")
+                    continue
                 
-                # Test connection
-                me = await client.get_me()
-                if me:
-                    self.workers[worker_id] = client
-                    self.worker_configs[worker_id] = {
-                        'api_id': api_id,
-                        'api_hash': api_hash,
-                        'phone': phone,
-                        'username': me.username or f"worker_{worker_id}",
-                        'is_active': True,
-                        'last_used': None
-                    }
+                try:
+                    # Create Telethon client
+                    client = TelegramClient(session_name, int(api_id), api_hash)
                     
-                    # Initialize worker in database
-                    await self._init_worker_in_db(worker_id)
+                    # Start client
+                    await client.start(phone=phone)
                     
-                    self.logger.info(f"✅ Worker {worker_id} initialized: @{me.username}")
-                else:
-                    self.logger.error(f"❌ Worker {worker_id} failed to get user info")
+                    # Test connection
+                    me = await client.get_me()
+                    if me:
+                        self.workers[worker_id] = client
+                        self.worker_configs[worker_id] = {
+                            'api_id': api_id,
+                            'api_hash': api_hash,
+                            'phone': phone,
+                            'username': me.username or f"worker_{worker_id}",
+                            'is_active': True,
+                            'last_used': None
+                        }
+                        
+                        # Initialize worker in database
+                        await self._init_worker_in_db(worker_id)
+                        
+                        self.logger.info(f"✅ Worker {worker_id} initialized: @{me.username}")
+                    else:
+                        self.logger.error(f"❌ Worker {worker_id} failed to get user info")
+                        await client.disconnect()
+                finally:
+                    # A failed bootstrap must not keep the session locked
+                    if worker_id not in self.workers:
+                        release_session(session_name)
                     
             except Exception as e:
                 self.logger.error(f"❌ Failed to initialize worker {worker_id}: {e}")
@@ -75,15 +100,36 @@ class WorkerManager:
         
         self.logger.info(f"✅ {len(self.workers)} workers initialized successfully")
     
+    async def _attach_pool(self):
+        """Register the pool daemon's workers instead of opening sessions."""
+        try:
+            pool_workers = await self.pool.workers()
+        except Exception as e:
+            raise Exception(f"Worker pool at {self.pool.socket_path} is not reachable: {e}")
+        
+        for info in pool_workers:
+            worker_id = info['worker_id']
+            if worker_id not in self.worker_ids or info['state'] == 'failed':
+                continue
+            self.workers[worker_id] = None
+            self.worker_configs[worker_id] = {
+                'username': f"worker_{worker_id}",
+                'is_active': True,
+                'last_used': None
+            }
+            await self._init_worker_in_db(worker_id)
+        
+        if not self.workers:
+            raise Exception("No workers available in the worker pool")
+        
+        self.logger.info(f"✅ {len(self.workers)} workers attached from worker pool {self.pool.socket_path}")
+    
     async def _init_worker_in_db(self, worker_id: int):
         """Initialize worker in database."""
         try:
-            # Check if worker exists in cooldown table
-            existing = await self._get_worker_cooldown(worker_id)
-            if not existing:
-                # Create new worker record
-                await self._create_worker_cooldown(worker_id)
-                self.logger.info(f"Created worker {worker_id} record in database")
+            # Create the worker's usage record if it is new
+            if not await self.db.initialize_worker_limits(worker_id):
+                self.logger.warning(f"Could not initialize worker {worker_id} limits")
         except Exception as e:
             self.logger.error(f"Error initializing worker {worker_id} in database: {e}")
     
@@ -116,20 +162,8 @@ class WorkerManager:
     async def _is_worker_available(self, worker_id: int) -> bool:
         """Check if worker is available (not in cooldown)."""
         try:
-            # Check database cooldown
-            cooldown = await self._get_worker_cooldown(worker_id)
-            if not cooldown or not cooldown['is_active']:
-                return False
-            
-            # Check if worker is in cooldown period
-            if cooldown['last_used_at']:
-                last_used = datetime.fromisoformat(cooldown['last_used_at'])
-                time_since_last_use = datetime.now() - last_used
-                
-                if time_since_last_use.total_seconds() < (self.cooldown_minutes * 60):
-                    return False
-            
-            return True
+            # Check database cooldown (set after each post and on flood waits)
+            return await self._get_worker_cooldown(worker_id) == 0
             
         except Exception as e:
             self.logger.error(f"Error checking worker {worker_id} availability: {e}")
@@ -160,6 +194,13 @@ class WorkerManager:
             'worker_details': {}
         }
         
+        pool_status = {}
+        if self.pool is not None:
+            try:
+                pool_status = {info['worker_id']: info for info in await self.pool.workers()}
+            except Exception as e:
+                self.logger.error(f"Error getting worker pool status: {e}")
+        
         for worker_id in self.worker_ids:
             try:
                 if worker_id not in self.workers:
@@ -171,10 +212,15 @@ class WorkerManager:
                     continue
                 
                 # Test worker connection
-                client = self.workers[worker_id]
-                me = await client.get_me()
+                if self.pool is not None:
+                    connected = pool_status.get(worker_id, {}).get('is_connected', False)
+                    username = self.worker_configs[worker_id]['username']
+                else:
+                    me = await self.workers[worker_id].get_me()
+                    connected = bool(me)
+                    username = me.username if me else None
                 
-                if me:
+                if connected:
                     # Check availability
                     is_available = await self._is_worker_available(worker_id)
                     
@@ -187,7 +233,7 @@ class WorkerManager:
                     
                     health_report['worker_details'][worker_id] = {
                         'status': status,
-                        'username': me.username,
+                        'username': username,
                         'is_available': is_available
                     }
                 else:
@@ -217,9 +263,16 @@ class WorkerManager:
             client = self.workers[worker_id]
             
             # Post message
-            if file_id:
-                # Handle media message
-                await client.send_file(chat_id, file_id, caption=message_text)
+            if self.pool is not None:
+                await self._post_via_pool(worker_id, chat_id, message_text, file_id)
+            elif file_id:
+                # Handle media message (uploaded once per worker, then reused)
+                await self.media_cache.send(
+                    f"worker:{worker_id}", file_id,
+                    send=lambda media: client.send_file(chat_id, media, caption=message_text),
+                    reference_of=lambda message: message.media,
+                    loader=self.media_loader,
+                )
             else:
                 # Handle text message
                 await client.send_message(chat_id, message_text)
@@ -243,11 +296,31 @@ class WorkerManager:
             await self._handle_worker_banned(worker_id, chat_id)
             return False
             
+        except WorkerPoolError as e:
+            if e.error == 'FloodWaitError':
+                self.logger.warning(f"Worker {worker_id} hit flood wait: {e.seconds} seconds")
+                await self._handle_worker_flood_wait(worker_id, e.seconds)
+            elif e.error == 'UserBannedInChannelError':
+                self.logger.warning(f"Worker {worker_id} banned in channel {chat_id}")
+                await self._handle_worker_banned(worker_id, chat_id)
+            else:
+                self.logger.error(f"Error posting with worker {worker_id}: {e}")
+                await self._log_worker_activity(worker_id, str(chat_id), False, str(e))
+            return False
+            
         except Exception as e:
             self.logger.error(f"Error posting with worker {worker_id}: {e}")
             await self._log_worker_activity(worker_id, str(chat_id), False, str(e))
             return False
     
+    async def _post_via_pool(self, worker_id: int, chat_id: int, message_text: str, file_id: str = None):
+        """Post through the worker pool daemon, which owns the worker's session."""
+        if file_id:
+            # The pool downloads the file_id once and reuses its upload per worker
+            await self.pool.send_file(worker_id, chat_id, file_id, caption=message_text)
+        elif not await self.pool.send(worker_id, str(chat_id), message_text):
+            raise WorkerPoolError('SendFailed', f"Worker {worker_id} could not post to {chat_id}")
+    
     async def _handle_worker_flood_wait(self, worker_id: int, wait_seconds: int):
         """Handle flood wait for worker."""
         try:
@@ -266,102 +339,39 @@ class WorkerManager:
         except Exception as e:
             self.logger.error(f"Error handling worker ban: {e}")
     
-    # Database methods for worker cooldowns
-    async def _create_worker_cooldown(self, worker_id: int):
-        """Create worker cooldown record in database."""
-        async with self.db._lock:
-            try:
-                conn = sqlite3.connect(self.db.db_path)
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO worker_cooldowns (worker_id, last_used_at, is_active)
-                    VALUES (?, ?, ?)
-                ''', (worker_id, None, True))
-                conn.commit()
-                conn.close()
-            except Exception as e:
-                self.logger.error(f"Error creating worker cooldown: {e}")
-    
-    async def _get_worker_cooldown(self, worker_id: int) -> Optional[Dict[str, Any]]:
-        """Get worker cooldown from database."""
-        async with self.db._lock:
-            try:
-                conn = sqlite3.connect(self.db.db_path)
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM worker_cooldowns WHERE worker_id = ?
-                ''', (worker_id,))
-                row = cursor.fetchone()
-                conn.close()
-                return dict(row) if row else None
-            except Exception as e:
-                self.logger.error(f"Error getting worker cooldown: {e}")
-                return None
+    # Database methods for worker cooldowns (through the manager, so either backend works)
+    async def _get_worker_cooldown(self, worker_id: int) -> int:
+        """Seconds left in a worker's cooldown."""
+        return await self.db.get_worker_cooldown(worker_id)
     
     async def _update_worker_cooldown(self, worker_id: int, cooldown_seconds: int = None):
-        """Update worker cooldown in database."""
-        async with self.db._lock:
-            try:
-                conn = sqlite3.connect(self.db.db_path)
-                cursor = conn.cursor()
-                
-                if cooldown_seconds:
-                    # Extended cooldown for flood wait
-                    last_used = datetime.now() - timedelta(seconds=cooldown_seconds)
-                else:
-                    # Normal cooldown
-                    last_used = datetime.now()
-                
-                cursor.execute('''
-                    UPDATE worker_cooldowns 
-                    SET last_used_at = ?, updated_at = ?
-                    WHERE worker_id = ?
-                ''', (last_used, datetime.now(), worker_id))
-                conn.commit()
-                conn.close()
-            except Exception as e:
-                self.logger.error(f"Error updating worker cooldown: {e}")
+        """Put a worker in cooldown (the flood wait if given, else the normal cooldown)."""
+        if not await self.db.set_worker_cooldown(worker_id, cooldown_seconds or self.cooldown_minutes * 60):
+            self.logger.error(f"Error updating worker cooldown for {worker_id}")
     
     async def _log_worker_activity(self, worker_id: int, destination_id: str, success: bool, error: str = None):
         """Log worker activity to database."""
-        async with self.db._lock:
-            try:
-                conn = sqlite3.connect(self.db.db_path)
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO worker_activity_log (worker_id, destination_id, success, error, created_at)
-                    VALUES (?, ?, ?, ?, ?)
-                ''', (worker_id, chat_id, success, error, datetime.now()))
-                conn.commit()
-                conn.close()
-            except Exception as e:
-                self.logger.error(f"Error logging worker activity: {e}")
+        if not await self.db.record_posting_attempt(worker_id, destination_id, success, error):
+            self.logger.error(f"Error logging worker activity for {worker_id}")
     
-    async def _log_worker_ban(self, worker_id: int, chat_id: int):
+    async def _log_worker_ban(self, worker_id: int, chat_id: str):
         """Log worker ban to database."""
-        async with self.db._lock:
-            try:
-                conn = sqlite3.connect(self.db.db_path)
-                cursor = conn.cursor()
-                cursor.execute('''
-                    INSERT INTO worker_bans (worker_id, chat_id, banned_at)
-                    VALUES (?, ?, ?)
-                ''', (worker_id, chat_id, datetime.now()))
-                conn.commit()
-                conn.close()
-            except Exception as e:
-                self.logger.error(f"Error logging worker ban: {e}")
+        if not await self.db.record_worker_ban(worker_id, chat_id, 'channel_ban', 'Banned in channel'):
+            self.logger.error(f"Error logging worker ban for {worker_id}")
     
     async def close_workers(self):
         """Close all worker connections."""
         for worker_id, client in self.workers.items():
+            if client is None:
+                continue
             try:
                 await client.disconnect()
                 self.logger.info(f"Worker {worker_id} disconnected")
             except Exception as e:
                 self.logger.error(f"Error disconnecting worker {worker_id}: {e}")
-        
+            finally:
+                release_session(f"sessions/worker_{worker_id}")
+
         self.workers.clear()
         self.logger.info("All workers closed")
     
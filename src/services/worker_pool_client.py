@@ -0,0 +1,172 @@
+"""
+Worker pool client.
+
+Telethon sessions are owned by a single worker pool daemon
+(``python -m scheduler.workers.pool``). The bot process and the scheduler
+send it commands over a local Unix socket instead of opening the session
+files themselves. Each request is one JSON line:
+
+    {"id": 7, "op": "send", "worker_id": 3, "destination": "@group", "message": "..."}
+
+and the daemon answers with ``{"id": 7, "ok": true, "result": ...}`` or
+``{"id": 7, "ok": false, "error": "FloodWaitError", "message": "...", "seconds": 420}``.
+Requests on one connection may be pipelined; answers carry the request id.
+
+The pool is used when WORKER_POOL_SOCKET is set and the socket exists;
+otherwise get_worker_pool_client() returns None and callers open their own
+clients.
+"""
+
+import asyncio
+import base64
+import itertools
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = 'sessions/worker_pool.sock'
+
+# Stream buffer limit; media travels base64-encoded inside a request line
+STREAM_LIMIT = 64 * 1024 * 1024
+
+
+def encode(message: Dict[str, Any]) -> bytes:
+    return (json.dumps(message, default=str) + '\n').encode()
+
+
+def decode(line: bytes) -> Dict[str, Any]:
+    return json.loads(line)
+
+
+class WorkerPoolError(Exception):
+    """Error reported by the worker pool; error is the remote exception type."""
+
+    def __init__(self, error: str, message: str = '', seconds: Optional[int] = None):
+        super().__init__(f"{error}: {message}" if message else error)
+        self.error = error
+        self.seconds = seconds
+
+
+class WorkerPoolClient:
+    """Connection to the worker pool daemon, shared by all callers in a process."""
+
+    def __init__(self, socket_path: str = DEFAULT_SOCKET, timeout: float = 300.0):
+        """Initialize the client; the socket is opened on the first call.
+
+        Args:
+            socket_path: Unix socket the daemon listens on
+            timeout: Seconds to wait for an answer (queued commands included)
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._connect_lock = asyncio.Lock()
+
+    async def _ensure_connected(self) -> asyncio.StreamWriter:
+        async with self._connect_lock:
+            if self._writer is None or self._writer.is_closing():
+                reader, self._writer = await asyncio.open_unix_connection(self.socket_path, limit=STREAM_LIMIT)
+                self._reader_task = asyncio.create_task(self._read_responses(reader))
+            return self._writer
+
+    async def _read_responses(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while line := await reader.readline():
+                response = decode(line)
+                future = self._pending.pop(response.get('id'), None)
+                if future is not None and not future.done():
+                    future.set_result(response)
+        except Exception as e:
+            logger.warning(f"Worker pool connection lost: {e}")
+        finally:
+            self._writer = None
+            pending, self._pending = self._pending, {}
+            for future in pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError('Worker pool connection closed'))
+
+    async def call(self, op: str, **params: Any) -> Any:
+        """Run one command in the pool and return its result.
+
+        Raises:
+            WorkerPoolError: The command failed in the pool
+            OSError: The daemon is not reachable
+        """
+        writer = await self._ensure_connected()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            writer.write(encode({'id': request_id, 'op': op, **params}))
+            await writer.drain()
+            response = await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+        if not response.get('ok'):
+            raise WorkerPoolError(response.get('error', 'Error'), response.get('message', ''),
+                                  response.get('seconds'))
+        return response.get('result')
+
+    async def ping(self) -> bool:
+        try:
+            return await self.call('ping') == 'pong'
+        except (OSError, asyncio.TimeoutError, WorkerPoolError):
+            return False
+
+    async def workers(self) -> List[Dict[str, Any]]:
+        """Workers owned by the pool with their status and queue depth."""
+        return await self.call('workers')
+
+    async def send(self, worker_id: int, destination: str, message: str, check_bans: bool = False) -> bool:
+        """Send a text message (WorkerClient.send_message semantics)."""
+        return await self.call('send', worker_id=worker_id, destination=destination, message=message,
+                               check_bans=check_bans)
+
+    async def send_file(self, worker_id: int, destination: Any, media: Union[bytes, str], caption: str = None) -> None:
+        """Send media bytes or a Bot API file_id; the pool reuses its uploaded copy per worker."""
+        if isinstance(media, str):
+            await self.call('send_file', worker_id=worker_id, destination=destination, caption=caption,
+                            file_id=media)
+        else:
+            await self.call('send_file', worker_id=worker_id, destination=destination, caption=caption,
+                            media=base64.b64encode(media).decode())
+
+    async def join(self, worker_id: int, destination: str) -> Dict[str, Any]:
+        """Join with fallback strategies (WorkerClient.join_channel_with_fallback)."""
+        return await self.call('join', worker_id=worker_id, destination=destination)
+
+    async def is_member(self, worker_id: int, destination: str) -> bool:
+        return await self.call('is_member', worker_id=worker_id, destination=destination)
+
+    async def resolve(self, worker_id: int, destination: str) -> Dict[str, Any]:
+        """Channel info for a destination as seen by the worker."""
+        return await self.call('resolve', worker_id=worker_id, destination=destination)
+
+    async def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+# Process-wide client, created on first use when WORKER_POOL_SOCKET is set
+_client: Optional[WorkerPoolClient] = None
+
+
+def get_worker_pool_client() -> Optional[WorkerPoolClient]:
+    """Get the worker pool client, or None when no pool is configured or running."""
+    global _client
+    socket_path = os.getenv('WORKER_POOL_SOCKET')
+    if not socket_path:
+        return None
+    if not os.path.exists(socket_path):
+        logger.warning(f"Worker pool socket {socket_path} does not exist, opening worker sessions in-process")
+        return None
+    if _client is None or _client.socket_path != socket_path:
+        _client = WorkerPoolClient(socket_path)
+    return _client
@@ -3,6 +3,68 @@ from typing import List, Dict, Any, Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, constants
 from telegram.ext import ContextTypes
 from src.core_systems import safe_rate_limit, safe_error_handling
+from src.menu_registry import RenderedMenu, content_version, menu_registry
+
+# Static menus are built once at import and shared by every click
+menu_registry.register_static(
+    'ui.main',
+    "🚀 **Welcome to AutoFarming Bot!**\n\n"
+    "I help you automate your ad posting across multiple Telegram groups.\n\n"
+    "Choose an option below:",
+    [
+        [InlineKeyboardButton("💎 View Plans", callback_data="menu_subscribe")],
+        [InlineKeyboardButton("📊 My Status", callback_data="menu_status")],
+        [InlineKeyboardButton("🎯 My Slots", callback_data="menu_slots")],
+        [InlineKeyboardButton("⚙️ Settings", callback_data="menu_settings")],
+        [InlineKeyboardButton("❓ Help", callback_data="menu_help")]
+    ]
+)
+menu_registry.register_static(
+    'ui.subscribe',
+    "💎 **Subscription Plans**\n\n"
+    "**Basic Plan - $15/month**\n"
+    "• 1 ad slot with 10 destinations\n"
+    "• Hourly posting\n"
+    "• Basic analytics\n\n"
+    "**Pro Plan - $30/month**\n"
+    "• 3 ad slots with 10 destinations each\n"
+    "• Priority posting\n"
+    "• Advanced analytics\n\n"
+    "**Enterprise Plan - $50/month**\n"
+    "• 5 ad slots with 10 destinations each\n"
+    "• Premium support\n"
+    "• Custom features\n\n"
+    "Choose your plan:",
+    [
+        [InlineKeyboardButton("Basic - $15/month", callback_data="subscribe_basic")],
+        [InlineKeyboardButton("Pro - $30/month", callback_data="subscribe_pro")],
+        [InlineKeyboardButton("Enterprise - $50/month", callback_data="subscribe_enterprise")],
+        [InlineKeyboardButton("🔙 Back", callback_data="menu_main")]
+    ]
+)
+menu_registry.register_static(
+    'ui.settings',
+    "⚙️ **Settings**\n\n"
+    "Configure your bot preferences:",
+    [
+        [InlineKeyboardButton("🔔 Notifications", callback_data="settings_notifications")],
+        [InlineKeyboardButton("🌐 Language", callback_data="settings_language")],
+        [InlineKeyboardButton("🔒 Privacy", callback_data="settings_privacy")],
+        [InlineKeyboardButton("🔙 Back", callback_data="menu_main")]
+    ]
+)
+menu_registry.register_static(
+    'ui.help',
+    "❓ **Help & Support**\n\n"
+    "Need help? Choose an option below:",
+    [
+        [InlineKeyboardButton("📖 How It Works", callback_data="help_how_it_works")],
+        [InlineKeyboardButton("❓ FAQ", callback_data="help_faq")],
+        [InlineKeyboardButton("📞 Support", callback_data="help_support")],
+        [InlineKeyboardButton("🔙 Back", callback_data="menu_main")]
+    ]
+)
+
 
 class UIManager:
     """Production-ready UI manager for button-based menus."""
@@ -50,22 +112,8 @@ class UIManager:
         user_id = update.effective_user.id
         self._clear_user_data(user_id)  # Reset navigation
         
-        keyboard = [
-            [InlineKeyboardButton("💎 View Plans", callback_data="menu_subscribe")],
-            [InlineKeyboardButton("📊 My Status", callback_data="menu_status")],
-            [InlineKeyboardButton("🎯 My Slots", callback_data="menu_slots")],
-            [InlineKeyboardButton("⚙️ Settings", callback_data="menu_settings")],
-            [InlineKeyboardButton("❓ Help", callback_data="menu_help")]
-        ]
-        
-        text = (
-            "🚀 **Welcome to AutoFarming Bot!**\n\n"
-            "I help you automate your ad posting across multiple Telegram groups.\n\n"
-            "Choose an option below:"
-        )
-        
         self._push_menu(user_id, "main")
-        await self._send_menu_message(update, context, text, keyboard)
+        await self._send_menu_message(update, context, menu_registry.static('ui.main'))
     
     @safe_error_handling
     @safe_rate_limit("ui_navigation")
@@ -73,32 +121,8 @@ class UIManager:
         """Show subscription plans menu."""
         user_id = update.effective_user.id
         
-        keyboard = [
-            [InlineKeyboardButton("Basic - $15/month", callback_data="subscribe_basic")],
-            [InlineKeyboardButton("Pro - $30/month", callback_data="subscribe_pro")],
-            [InlineKeyboardButton("Enterprise - $50/month", callback_data="subscribe_enterprise")],
-            [InlineKeyboardButton("🔙 Back", callback_data="menu_main")]
-        ]
-        
-        text = (
-            "💎 **Subscription Plans**\n\n"
-            "**Basic Plan - $15/month**\n"
-            "• 1 ad slot with 10 destinations\n"
-            "• Hourly posting\n"
-            "• Basic analytics\n\n"
-            "**Pro Plan - $30/month**\n"
-            "• 3 ad slots with 10 destinations each\n"
-            "• Priority posting\n"
-            "• Advanced analytics\n\n"
-            "**Enterprise Plan - $50/month**\n"
-            "• 5 ad slots with 10 destinations each\n"
-            "• Premium support\n"
-            "• Custom features\n\n"
-            "Choose your plan:"
-        )
-        
         self._push_menu(user_id, "subscribe")
-        await self._send_menu_message(update, context, text, keyboard)
+        await self._send_menu_message(update, context, menu_registry.static('ui.subscribe'))
     
     @safe_error_handling
     @safe_rate_limit("ui_navigation")
@@ -109,29 +133,13 @@ class UIManager:
         # Get user status from database
         db = context.bot_data['db']
         subscription = await db.get_user_subscription(user_id)
-        
-        keyboard = []
-        if subscription and subscription['is_active']:
-            status_text = (
-                f"📊 **Your Status**\n\n"
-                f"✅ **Active Subscription**\n"
-                f"📅 Expires: {subscription['expires']}\n"
-                f"🎯 Plan: {subscription['tier'].title()}\n\n"
-                f"Your subscription is active and ready to use!"
-            )
-            keyboard.append([InlineKeyboardButton("🔄 Renew", callback_data="menu_subscribe")])
-        else:
-            status_text = (
-                "📊 **Your Status**\n\n"
-                "❌ **No Active Subscription**\n\n"
-                "You need a subscription to use the bot's features."
-            )
-            keyboard.append([InlineKeyboardButton("💎 Get Subscription", callback_data="menu_subscribe")])
-        
-        keyboard.append([InlineKeyboardButton("🔙 Back", callback_data="menu_main")])
+        menu = menu_registry.dynamic(
+            'ui.status', user_id, content_version(subscription),
+            lambda: self._render_status_menu(subscription)
+        )
         
         self._push_menu(user_id, "status")
-        await self._send_menu_message(update, context, status_text, keyboard)
+        await self._send_menu_message(update, context, menu)
     
     @safe_error_handling
     @safe_rate_limit("ui_navigation")
@@ -142,30 +150,13 @@ class UIManager:
         # Get user's slots from database
         db = context.bot_data['db']
         slots = await db.get_user_slots(user_id)
-        
-        keyboard = []
-        if slots:
-            text = "🎯 **Your Ad Slots**\n\n"
-            for i, slot in enumerate(slots, 1):
-                status = "✅ Active" if slot['is_active'] else "❌ Inactive"
-                destinations = len(slot.get('destinations', []))
-                text += f"**Slot {i}** ({status})\n"
-                text += f"• Destinations: {destinations}/10\n"
-                text += f"• Content: {'Set' if slot.get('content') else 'Not set'}\n\n"
-                
-                keyboard.append([InlineKeyboardButton(f"Manage Slot {i}", callback_data=f"manage_slot_{slot['id']}")])
-        else:
-            text = (
-                "🎯 **Your Ad Slots**\n\n"
-                "You don't have any ad slots yet.\n"
-                "Purchase a subscription to get started!"
-            )
-        
-        keyboard.append([InlineKeyboardButton("➕ Buy New Slot", callback_data="buy_slot")])
-        keyboard.append([InlineKeyboardButton("🔙 Back", callback_data="menu_main")])
+        menu = menu_registry.dynamic(
+            'ui.slots', user_id, content_version(slots),
+            lambda: self._render_slots_menu(slots)
+        )
         
         self._push_menu(user_id, "slots")
-        await self._send_menu_message(update, context, text, keyboard)
+        await self._send_menu_message(update, context, menu)
     
     @safe_error_handling
     @safe_rate_limit("ui_navigation")
@@ -173,20 +164,8 @@ class UIManager:
         """Show settings menu."""
         user_id = update.effective_user.id
         
-        keyboard = [
-            [InlineKeyboardButton("🔔 Notifications", callback_data="settings_notifications")],
-            [InlineKeyboardButton("🌐 Language", callback_data="settings_language")],
-            [InlineKeyboardButton("🔒 Privacy", callback_data="settings_privacy")],
-            [InlineKeyboardButton("🔙 Back", callback_data="menu_main")]
-        ]
-        
-        text = (
-            "⚙️ **Settings**\n\n"
-            "Configure your bot preferences:"
-        )
-        
         self._push_menu(user_id, "settings")
-        await self._send_menu_message(update, context, text, keyboard)
+        await self._send_menu_message(update, context, menu_registry.static('ui.settings'))
     
     @safe_error_handling
     @safe_rate_limit("ui_navigation")
@@ -194,20 +173,8 @@ class UIManager:
         """Show help menu."""
         user_id = update.effective_user.id
         
-        keyboard = [
-            [InlineKeyboardButton("📖 How It Works", callback_data="help_how_it_works")],
-            [InlineKeyboardButton("❓ FAQ", callback_data="help_faq")],
-            [InlineKeyboardButton("📞 Support", callback_data="help_support")],
-            [InlineKeyboardButton("🔙 Back", callback_data="menu_main")]
-        ]
-        
-        text = (
-            "❓ **Help & Support**\n\n"
-            "Need help? Choose an option below:"
-        )
-        
         self._push_menu(user_id, "help")
-        await self._send_menu_message(update, context, text, keyboard)
+        await self._send_menu_message(update, context, menu_registry.static('ui.help'))
     
     @safe_error_handling
     @safe_rate_limit("ui_navigation")
@@ -240,26 +207,68 @@ class UIManager:
         else:
             await self.show_main_menu(update, context)
     
+    def _render_status_menu(self, subscription: Optional[Dict[str, Any]]) -> RenderedMenu:
+        """Render the status menu for a subscription (or None)."""
+        keyboard = []
+        if subscription and subscription['is_active']:
+            status_text = (
+                f"📊 **Your Status**\n\n"
+                f"✅ **Active Subscription**\n"
+                f"📅 Expires: {subscription['expires']}\n"
+                f"🎯 Plan: {subscription['tier'].title()}\n\n"
+                f"Your subscription is active and ready to use!"
+            )
+            keyboard.append([InlineKeyboardButton("🔄 Renew", callback_data="menu_subscribe")])
+        else:
+            status_text = (
+                "📊 **Your Status**\n\n"
+                "❌ **No Active Subscription**\n\n"
+                "You need a subscription to use the bot's features."
+            )
+            keyboard.append([InlineKeyboardButton("💎 Get Subscription", callback_data="menu_subscribe")])
+        
+        keyboard.append([InlineKeyboardButton("🔙 Back", callback_data="menu_main")])
+        return menu_registry.render(status_text, keyboard)
+    
+    def _render_slots_menu(self, slots: List[Dict[str, Any]]) -> RenderedMenu:
+        """Render the slots menu for a user's slots."""
+        keyboard = []
+        if slots:
+            text = "🎯 **Your Ad Slots**\n\n"
+            for i, slot in enumerate(slots, 1):
+                status = "✅ Active" if slot['is_active'] else "❌ Inactive"
+                destinations = len(slot.get('destinations', []))
+                text += f"**Slot {i}** ({status})\n"
+                text += f"• Destinations: {destinations}/10\n"
+                text += f"• Content: {'Set' if slot.get('content') else 'Not set'}\n\n"
+                
+                keyboard.append([InlineKeyboardButton(f"Manage Slot {i}", callback_data=f"manage_slot_{slot['id']}")])
+        else:
+            text = (
+                "🎯 **Your Ad Slots**\n\n"
+                "You don't have any ad slots yet.\n"
+                "Purchase a subscription to get started!"
+            )
+        
+        keyboard.append([InlineKeyboardButton("➕ Buy New Slot", callback_data="buy_slot")])
+        keyboard.append([InlineKeyboardButton("🔙 Back", callback_data="menu_main")])
+        return menu_registry.render(text, keyboard)
+    
     async def _send_menu_message(self, update: Update, context: ContextTypes.DEFAULT_TYPE, 
-                                text: str, keyboard: List[List[InlineKeyboardButton]]):
-        """Send a menu message with proper error handling."""
+                                menu: RenderedMenu):
+        """Send a menu message with proper error handling.
+        
+        Callback edits are skipped when the message already shows the menu.
+        """
         try:
             if update.callback_query:
-                await update.callback_query.edit_message_text(
-                    text, 
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='Markdown'
-                )
+                await menu_registry.edit(update.callback_query, menu)
             else:
-                await update.message.reply_text(
-                    text,
-                    reply_markup=InlineKeyboardMarkup(keyboard),
-                    parse_mode='Markdown'
-                )
+                await menu_registry.reply(update.message, menu)
         except Exception as e:
             self.logger.error(f"Error sending menu message: {e}")
             # Fallback to simple text
-            fallback_text = text.replace('*', '').replace('_', '')
+            fallback_text = menu.text.replace('*', '').replace('_', '')
             if update.callback_query:
                 await update.callback_query.edit_message_text(fallback_text)
             else:
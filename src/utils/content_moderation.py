@@ -1,8 +1,8 @@
 #!/usr/bin/env python3
-import re
 import logging
 from typing import Dict, List, Tuple
 from src.database.manager import DatabaseManager
+from src.utils.moderation_engine import ContentFindings, ModerationEngine
 
 class ContentModerator:
     """Content moderation and spam prevention."""
@@ -32,6 +32,9 @@ class ContentModerator:
             r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+',
             r'www\.(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
         ]
+
+        # Keywords and patterns compiled once; findings cached by content hash
+        self.engine = ModerationEngine(self.spam_keywords, self.inappropriate_patterns, self.url_patterns)
     
     async def moderate_content(self, content: str, user_id: int) -> Dict:
         """Moderate content and return moderation result."""
@@ -39,20 +42,22 @@ class ContentModerator:
             issues = []
             severity = 'low'
             
+            findings = self.engine.scan(content)
+            
             # Check for spam keywords
-            spam_issues = self._check_spam_keywords(content)
+            spam_issues = self._check_spam_keywords(findings)
             if spam_issues:
                 issues.extend(spam_issues)
                 severity = 'medium'
             
             # Check for inappropriate content
-            inappropriate_issues = self._check_inappropriate_content(content)
+            inappropriate_issues = self._check_inappropriate_content(findings)
             if inappropriate_issues:
                 issues.extend(inappropriate_issues)
                 severity = 'high'
             
             # Check for excessive URLs
-            url_issues = self._check_url_spam(content)
+            url_issues = self._check_url_spam(findings)
             if url_issues:
                 issues.extend(url_issues)
                 severity = 'medium'
@@ -77,38 +82,20 @@ class ContentModerator:
             self.logger.error(f"Error moderating content: {e}")
             return {'is_blocked': False, 'severity': 'low', 'issues': [], 'suggestions': []}
     
-    def _check_spam_keywords(self, content: str) -> List[str]:
+    def _check_spam_keywords(self, findings: ContentFindings) -> List[str]:
         """Check for spam keywords in content."""
-        issues = []
-        content_lower = content.lower()
-        
-        for keyword in self.spam_keywords:
-            if keyword in content_lower:
-                issues.append(f"Contains spam keyword: '{keyword}'")
-        
-        return issues
+        return [f"Contains spam keyword: '{keyword}'" for keyword in findings.spam_keywords]
     
-    def _check_inappropriate_content(self, content: str) -> List[str]:
+    def _check_inappropriate_content(self, findings: ContentFindings) -> List[str]:
         """Check for inappropriate content patterns."""
-        issues = []
-        
-        for pattern in self.inappropriate_patterns:
-            if re.search(pattern, content, re.IGNORECASE):
-                issues.append(f"Contains inappropriate content pattern")
-        
-        return issues
+        return ["Contains inappropriate content pattern" for _ in findings.inappropriate_patterns]
     
-    def _check_url_spam(self, content: str) -> List[str]:
+    def _check_url_spam(self, findings: ContentFindings) -> List[str]:
         """Check for excessive URLs in content."""
         issues = []
         
-        url_count = 0
-        for pattern in self.url_patterns:
-            urls = re.findall(pattern, content)
-            url_count += len(urls)
-        
-        if url_count > 2:
-            issues.append(f"Too many URLs ({url_count} found)")
+        if findings.url_count > 2:
+            issues.append(f"Too many URLs ({findings.url_count} found)")
         
         return issues
     
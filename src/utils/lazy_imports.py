@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Deferred imports for heavy or rarely used modules.
+
+``lazy_module('aiohttp')`` returns a stand-in that imports the real module
+on first attribute access, so ``aiohttp.ClientSession()`` call sites stay
+unchanged while process startup skips the import. Unlike
+importlib.util.LazyLoader this also defers parent packages of dotted names
+(``telethon.errors`` does not import ``telethon`` until used).
+
+``LazyHandlers('commands.admin_commands')`` does the same for Telegram
+handler modules: ``admin.admin_menu`` is a coroutine function that imports
+the module and forwards to the real handler on its first call.
+"""
+
+import importlib
+import sys
+import types
+from typing import Any, Callable, Dict
+
+
+class LazyModule(types.ModuleType):
+    """Module proxy that imports its target on first attribute access."""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            # Later lookups hit the copied attributes directly, not __getattr__
+            self.__dict__.update(module.__dict__)
+            self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_module(name: str) -> types.ModuleType:
+    """Return the module if already imported, else a LazyModule proxy."""
+    return sys.modules.get(name) or LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    return name in sys.modules
+
+
+class LazyHandlers:
+    """Handler callables of a module, imported on first call.
+
+    Attribute lookups return stable async wrappers (the same object for the
+    same name), so they can be registered with CommandHandler, MessageHandler
+    or the CallbackRouter before the module is imported.
+    """
+
+    def __init__(self, module_name: str):
+        self._module_name = module_name
+        self._module = lazy_module(module_name)
+        self._wrappers: Dict[str, Callable] = {}
+
+    def __getattr__(self, attr: str) -> Callable:
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        wrapper = self._wrappers.get(attr)
+        if wrapper is None:
+            module = self._module
+
+            async def wrapper(*args, **kwargs):
+                return await getattr(module, attr)(*args, **kwargs)
+
+            wrapper.__name__ = attr
+            wrapper.__qualname__ = f"{self._module_name}.{attr}"
+            self._wrappers[attr] = wrapper
+        return wrapper
+
+    def __repr__(self) -> str:
+        return f"<lazy handlers {self._module_name!r}>"
@@ -0,0 +1,169 @@
+"""
+Uploaded-media cache for Telegram sends.
+
+Sending a photo or document from bytes uploads it again on every send.
+Telegram returns a reusable reference for the uploaded media (a Bot API
+``file_id`` for the bot, the message's ``media`` for a Telethon account), so
+MediaCache uploads once per client and sends the stored reference
+afterwards:
+
+    message = await media_cache.send(
+        f"worker:{worker_id}", data,
+        send=lambda media: client.send_file(chat_id, media, caption=text),
+        reference_of=lambda message: message.media,
+    )
+
+References are keyed by ``(client_key, content hash)``: the same bytes sent
+by another account are uploaded once for that account, since Telethon file
+references are only valid for the account that uploaded them. A reference
+Telegram rejects as expired or invalid is dropped and the bytes are
+uploaded again.
+
+Bot API file ids (the ``file_id`` stored with slot content) can also be
+given instead of bytes; with a loader (see bot_file_loader) they are
+downloaded once and then handled like bytes.
+"""
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple, Union
+
+Media = Union[bytes, bytearray, str]
+
+# Telegram errors meaning a cached reference can no longer be sent
+_STALE_REFERENCE_ERRORS = ('FILE_REFERENCE', 'MEDIA_EMPTY', 'FILE_ID_INVALID', 'WRONG FILE IDENTIFIER',
+                           'WRONG REMOTE FILE IDENTIFIER')
+
+
+def content_key(data: Union[bytes, bytearray]) -> str:
+    """SHA-256 hex digest identifying media content."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_stale_reference(error: Exception) -> bool:
+    text = f"{type(error).__name__} {error}".upper()
+    return any(marker in text for marker in _STALE_REFERENCE_ERRORS)
+
+
+def bot_file_loader(bot) -> Callable[[str], Awaitable[bytes]]:
+    """Loader that downloads a Bot API file_id with the given bot."""
+    async def load(file_id: str) -> bytes:
+        telegram_file = await bot.get_file(file_id)
+        return bytes(await telegram_file.download_as_bytearray())
+    return load
+
+
+class MediaCache:
+    """LRU cache of uploaded media references per client and content hash."""
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 12 * 3600):
+        """Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of references kept before LRU eviction
+            ttl_seconds: Seconds a reference is reused before uploading again
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._references: "OrderedDict[Tuple[Hashable, str], Tuple[float, Any]]" = OrderedDict()
+        # Bot API file_id -> content key of the bytes it downloaded to
+        self._file_keys: "OrderedDict[str, str]" = OrderedDict()
+        self.hits = 0
+        self.uploads = 0
+        self.stale = 0
+
+    def get(self, client_key: Hashable, key: str) -> Optional[Any]:
+        """Stored reference for (client, content), or None."""
+        entry = self._references.get((client_key, key))
+        if entry is None:
+            return None
+        expires_at, reference = entry
+        if expires_at <= time.monotonic():
+            del self._references[(client_key, key)]
+            return None
+        self._references.move_to_end((client_key, key))
+        return reference
+
+    def set(self, client_key: Hashable, key: str, reference: Any) -> None:
+        self._references[(client_key, key)] = (time.monotonic() + self.ttl_seconds, reference)
+        self._references.move_to_end((client_key, key))
+        while len(self._references) > self.max_entries:
+            self._references.popitem(last=False)
+
+    def invalidate(self, client_key: Hashable, key: str) -> None:
+        self._references.pop((client_key, key), None)
+
+    def _remember_file(self, file_id: str, key: str) -> None:
+        self._file_keys[file_id] = key
+        self._file_keys.move_to_end(file_id)
+        while len(self._file_keys) > self.max_entries:
+            self._file_keys.popitem(last=False)
+
+    async def send(self, client_key: Hashable, media: Media,
+                   send: Callable[[Any], Awaitable[Any]],
+                   reference_of: Callable[[Any], Any],
+                   loader: Optional[Callable[[str], Awaitable[bytes]]] = None) -> Any:
+        """Send media through send(), reusing this client's uploaded reference.
+
+        Args:
+            client_key: Identifies the uploading client, e.g. 'bot' or 'worker:3'
+            media: Content bytes, or a Bot API file_id
+            send: Sends the given bytes or reference; returns the sent message
+            reference_of: Extracts the reusable reference from send()'s result
+            loader: Downloads a file_id to bytes (without one, file ids are
+                sent as given)
+
+        Returns:
+            The result of send()
+        """
+        if isinstance(media, str):
+            key = self._file_keys.get(media, f"file_id:{media}")
+        else:
+            key = content_key(media)
+
+        reference = self.get(client_key, key)
+        if reference is not None:
+            try:
+                result = await send(reference)
+                self.hits += 1
+                return result
+            except Exception as e:
+                if not is_stale_reference(e):
+                    raise
+                self.stale += 1
+                self.invalidate(client_key, key)
+
+        data = media
+        if isinstance(media, str) and loader is not None:
+            data = await loader(media)
+            key = content_key(data)
+            self._remember_file(media, key)
+
+        result = await send(data)
+        self.uploads += 1
+        reference = reference_of(result)
+        if reference is not None:
+            self.set(client_key, key, reference)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return reuse counters and current size."""
+        sends = self.hits + self.uploads
+        return {
+            'size': len(self._references),
+            'max_entries': self.max_entries,
+            'hits': self.hits,
+            'uploads': self.uploads,
+            'stale': self.stale,
+            'hit_rate': round(self.hits / sends, 4) if sends else 0.0,
+        }
+
+
+# Process-wide cache shared by the bot and all worker clients
+media_cache = MediaCache()
+
+
+def get_media_cache() -> MediaCache:
+    """Get the global media cache instance."""
+    return media_cache
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Compiled single-pass matching for content moderation.
+
+Keyword lists are compiled into one Aho-Corasick automaton and regex lists
+into a single alternation with one named group per source pattern, so a
+text is scanned once per matcher instead of once per keyword/pattern.
+Verdicts for a given text are cached by content hash.
+"""
+
+import hashlib
+import re
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.database.cache import MISSING, LRUTTLCache
+
+
+class AhoCorasick:
+    """Aho-Corasick automaton reporting which keywords occur in a text.
+
+    Matching is case-insensitive and substring based (same semantics as
+    ``keyword in text.lower()``).
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        for keyword in keywords:
+            keyword = keyword.lower()
+            if not keyword or keyword in self.keywords:
+                continue
+            self._add(keyword, len(self.keywords))
+            self.keywords.append(keyword)
+        self._build_failure_links()
+
+    def _add(self, keyword: str, index: int) -> None:
+        state = 0
+        for char in keyword:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = self._output[state] + (index,)
+
+    def _build_failure_links(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find(self, text: str) -> List[str]:
+        """Return the keywords found in text, in registration order."""
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text.lower():
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return [self.keywords[index] for index in sorted(found)]
+
+
+class PatternSet:
+    """A list of regexes merged into one precompiled alternation.
+
+    Each source pattern becomes a named group, so a single ``finditer`` pass
+    reports which of the original patterns matched and how often.
+    """
+
+    def __init__(self, patterns: Sequence[str], flags: int = 0):
+        self.patterns: List[str] = list(dict.fromkeys(patterns))
+        self._regex = re.compile(
+            '|'.join(f"(?P<p{i}>{pattern})" for i, pattern in enumerate(self.patterns)),
+            flags
+        ) if self.patterns else None
+
+    def search(self, text: str) -> bool:
+        """True if any pattern matches."""
+        return bool(self._regex and self._regex.search(text))
+
+    def scan(self, text: str) -> Dict[int, int]:
+        """Return {pattern index: non-overlapping match count} in one pass."""
+        counts: Dict[int, int] = {}
+        if not self._regex:
+            return counts
+        for match in self._regex.finditer(text):
+            index = int(match.lastgroup[1:])
+            counts[index] = counts.get(index, 0) + 1
+        return counts
+
+
+@dataclass(frozen=True)
+class ContentFindings:
+    """Content-only moderation findings (independent of who posts it)."""
+    spam_keywords: Tuple[str, ...]
+    inappropriate_patterns: Tuple[int, ...]
+    url_count: int
+
+
+def content_hash(text: str) -> str:
+    """Stable hash used as the verdict cache key."""
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class ModerationEngine:
+    """Compiled matchers for ContentModerator with a verdict cache."""
+
+    def __init__(self, spam_keywords: Sequence[str], inappropriate_patterns: Sequence[str],
+                 url_patterns: Sequence[str], cache_size: int = 2048, cache_ttl_seconds: float = 3600.0):
+        self.spam = AhoCorasick(spam_keywords)
+        self.inappropriate = PatternSet(inappropriate_patterns, re.IGNORECASE)
+        self.urls = PatternSet(url_patterns)
+        self._cache = LRUTTLCache(max_entries=cache_size, ttl_seconds=cache_ttl_seconds)
+
+    def scan(self, content: str) -> ContentFindings:
+        """Return all content findings, served from cache for unchanged content."""
+        key = content_hash(content)
+        cached = self._cache.get(key)
+        if cached is not MISSING:
+            return cached
+
+        findings = ContentFindings(
+            spam_keywords=tuple(self.spam.find(content)),
+            inappropriate_patterns=tuple(sorted(self.inappropriate.scan(content))),
+            url_count=sum(self.urls.scan(content).values()),
+        )
+        self._cache.set(key, findings)
+        return findings
+
+    def cache_stats(self) -> Dict:
+        return self._cache.stats()
+
+
+class InputThreatScanner:
+    """SQL injection / XSS detection with merged, precompiled patterns."""
+
+    def __init__(self, sql_injection_patterns: Sequence[str], xss_patterns: Sequence[str]):
+        self.sql_injection = PatternSet(sql_injection_patterns, re.IGNORECASE)
+        self.xss = PatternSet(xss_patterns, re.IGNORECASE)
+
+    def detect(self, text: str) -> Optional[str]:
+        """Return 'sql_injection', 'xss' or None."""
+        if self.sql_injection.search(text):
+            return 'sql_injection'
+        if self.xss.search(text):
+            return 'xss'
+        return None
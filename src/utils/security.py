@@ -2,9 +2,11 @@ from datetime import datetime, timedelta
 from typing import Optional, Dict, List
 import secrets
 import logging
-import re
 import hashlib
 
+from src.rate_limiter import GCRALimiter
+from src.utils.moderation_engine import InputThreatScanner
+
 class SecurityManager:
     """Enhanced security management for the bot."""
     
@@ -12,7 +14,7 @@ class SecurityManager:
         self.config = config
         self.db = db
         self.logger = logger
-        self.rate_limiters = {}
+        self.rate_limiter = GCRALimiter()
         self.blocked_users = set()
         self.suspicious_activities = {}
         
@@ -60,22 +62,13 @@ class SecurityManager:
             r'<!\[CDATA\[.*?\]\]>',
             r'<!\[CDATA\[.*?\]\]>'
         ]
+
+        # Overlapping patterns merged into two precompiled alternations
+        self.threat_scanner = InputThreatScanner(self.sql_injection_patterns, self.xss_patterns)
     
     async def check_rate_limit(self, user_id: int, action: str, limit: int = 10, window: int = 60) -> bool:
         """Check if user has exceeded rate limit."""
-        key = f"{user_id}:{action}"
-        current_time = datetime.now()
-        
-        if key not in self.rate_limiters:
-            self.rate_limiters[key] = []
-        
-        # Clean old entries
-        self.rate_limiters[key] = [
-            timestamp for timestamp in self.rate_limiters[key]
-            if (current_time - timestamp).seconds < window
-        ]
-        
-        if len(self.rate_limiters[key]) >= limit:
+        if not self.rate_limiter.allow((user_id, action), limit, window):
             await self.log_security_event({
                 'type': 'rate_limit_exceeded',
                 'user_id': user_id,
@@ -84,8 +77,6 @@ class SecurityManager:
                 'window': window
             })
             return False
-            
-        self.rate_limiters[key].append(current_time)
         return True
     
     def sanitize_input(self, text: str, max_length: int = 500) -> str:
@@ -96,17 +87,14 @@ class SecurityManager:
         # Remove control characters
         text = ''.join(char for char in text if ord(char) >= 32 or char == '\n')
         
-        # Check for SQL injection patterns
-        for pattern in self.sql_injection_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                self.logger.warning(f"Potential SQL injection detected: {text[:100]}")
-                return ""
-        
-        # Check for XSS patterns
-        for pattern in self.xss_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                self.logger.warning(f"Potential XSS detected: {text[:100]}")
-                return ""
+        # Check for SQL injection / XSS patterns (single pass each)
+        threat = self.threat_scanner.detect(text)
+        if threat == 'sql_injection':
+            self.logger.warning(f"Potential SQL injection detected: {text[:100]}")
+            return ""
+        if threat == 'xss':
+            self.logger.warning(f"Potential XSS detected: {text[:100]}")
+            return ""
         
         # Limit length
         text = text[:max_length]
@@ -150,7 +138,7 @@ class SecurityManager:
         # Clean old activities (older than 24 hours)
         self.suspicious_activities[user_id] = [
             activity for activity in self.suspicious_activities[user_id]
-            if (current_time - activity['timestamp']).seconds < 86400
+            if (current_time - activity['timestamp']).total_seconds() < 86400
         ]
         
         # Count recent suspicious activities
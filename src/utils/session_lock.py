@@ -0,0 +1,61 @@
+"""
+Exclusive locks on Telethon session files.
+
+Two processes opening the same ``.session`` SQLite file end in "database is
+locked" errors and two connections for one account. Whoever connects a
+worker first takes an advisory lock next to its session file
+(``worker_1.session.lock``); anyone else is refused until the owner exits,
+since the lock is released with the process.
+"""
+
+import logging
+import os
+from typing import Dict, Optional, TextIO
+
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, sessions are not guarded
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+# Lock files held by this process, by lock path
+_held: Dict[str, TextIO] = {}
+
+
+def session_lock_path(session_file: str) -> str:
+    """Lock file for a session ('sessions/worker_1' and 'sessions/worker_1.session' share one)."""
+    path = os.path.abspath(session_file)
+    if not path.endswith('.session'):
+        path += '.session'
+    return path + '.lock'
+
+
+def acquire_session(session_file: str) -> bool:
+    """Take the session's lock; False if another process holds it."""
+    path = session_lock_path(session_file)
+    if path in _held:
+        return True
+    if fcntl is None:
+        return True
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    handle = open(path, 'a+')
+    try:
+        fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        handle.close()
+        logger.warning(f"Session {session_file} is in use by another process")
+        return False
+    handle.seek(0)
+    handle.truncate()
+    handle.write(str(os.getpid()))
+    handle.flush()
+    _held[path] = handle
+    return True
+
+
+def release_session(session_file: str) -> None:
+    handle: Optional[TextIO] = _held.pop(session_lock_path(session_file), None)
+    if handle is not None:
+        fcntl.flock(handle, fcntl.LOCK_UN)
+        handle.close()
@@ -0,0 +1,254 @@
+"""
+Webhook update delivery for the bot (alternative to run_polling).
+
+An aiohttp server listens on a local address (behind the HTTPS reverse
+proxy Telegram posts to), validates the ``X-Telegram-Bot-Api-Secret-Token``
+header and hands updates to the Application's update queue. The webhook is
+never deleted on shutdown, so Telegram keeps queuing updates while the bot
+restarts and delivers them once it is back, instead of dropping them the way
+``run_polling(drop_pending_updates=True)`` does.
+"""
+
+import asyncio
+import hmac
+import json
+import logging
+import signal
+import time
+from collections import OrderedDict, deque
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web
+from telegram import Update
+from telegram.ext import Application, ContextTypes, TypeHandler
+
+SECRET_HEADER = 'X-Telegram-Bot-Api-Secret-Token'
+
+# Handler group that runs after every real handler group for an update
+LATENCY_GROUP = 1_000_000
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+class WebhookServer:
+    """aiohttp endpoint that feeds Telegram webhook updates into an Application."""
+
+    def __init__(self, application: Application, config, logger: Optional[logging.Logger] = None,
+                 allowed_updates: Optional[List[str]] = None, max_tracked: int = 10000):
+        """Initialize the webhook server.
+
+        Args:
+            application: The python-telegram-bot Application to feed
+            config: BotConfig with the webhook_* settings
+            logger: Logger instance
+            allowed_updates: Update types to request from Telegram
+            max_tracked: Number of latency samples / in-flight updates kept
+        """
+        self.application = application
+        self.config = config
+        self.logger = logger or logging.getLogger(__name__)
+        self.allowed_updates = allowed_updates
+        self.path = config.webhook_path if config.webhook_path.startswith('/') else f"/{config.webhook_path}"
+        self.secret = config.webhook_secret
+        self._runner: Optional[web.AppRunner] = None
+        self._record_file = None
+        self._received: "OrderedDict[int, float]" = OrderedDict()
+        self._latencies: deque = deque(maxlen=max_tracked)
+        self.max_tracked = max_tracked
+        self.stats = {
+            'received': 0,
+            'processed': 0,
+            'rejected_secret': 0,
+            'rejected_invalid': 0,
+        }
+        self._started_at = time.monotonic()
+
+        # Runs after all handler groups to measure receive -> handled latency
+        application.add_handler(TypeHandler(Update, self._track_processed), group=LATENCY_GROUP)
+
+    # --- HTTP handlers ---
+
+    def _secret_ok(self, request: web.Request) -> bool:
+        supplied = request.headers.get(SECRET_HEADER, '')
+        return hmac.compare_digest(supplied.encode('utf-8'), self.secret.encode('utf-8'))
+
+    async def handle_update(self, request: web.Request) -> web.Response:
+        """Validate and enqueue one update posted by Telegram."""
+        if not self._secret_ok(request):
+            self.stats['rejected_secret'] += 1
+            return web.Response(status=403)
+
+        try:
+            payload = await request.json()
+            update = Update.de_json(payload, self.application.bot)
+        except Exception as e:
+            self.stats['rejected_invalid'] += 1
+            self.logger.warning(f"⚠️ Invalid webhook payload: {e}")
+            return web.Response(status=400)
+
+        if update is None:
+            self.stats['rejected_invalid'] += 1
+            return web.Response(status=400)
+
+        self.stats['received'] += 1
+        self._received[update.update_id] = time.monotonic()
+        while len(self._received) > self.max_tracked:
+            self._received.popitem(last=False)
+
+        if self._record_file is not None:
+            self._record_file.write(json.dumps(payload, separators=(',', ':')) + "\n")
+
+        await self.application.update_queue.put(update)
+        return web.Response()
+
+    async def handle_health(self, request: web.Request) -> web.Response:
+        """Liveness probe for the reverse proxy / process supervisor."""
+        return web.json_response({'status': 'ok', 'queue_size': self.application.update_queue.qsize()})
+
+    async def handle_stats(self, request: web.Request) -> web.Response:
+        """Throughput and latency counters (requires the secret header)."""
+        if not self._secret_ok(request):
+            return web.Response(status=403)
+        stats = self.get_stats()
+        if request.query.get('reset') == '1':
+            self.reset_stats()
+        return web.json_response(stats)
+
+    async def _track_processed(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        received_at = self._received.pop(update.update_id, None)
+        if received_at is not None:
+            self._latencies.append(time.monotonic() - received_at)
+            self.stats['processed'] += 1
+
+    # --- Stats ---
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Return counters plus processing latency percentiles in milliseconds."""
+        latencies = sorted(self._latencies)
+        stats: Dict[str, Any] = dict(self.stats)
+        stats.update({
+            'uptime_seconds': round(time.monotonic() - self._started_at, 1),
+            'queue_size': self.application.update_queue.qsize(),
+            'in_flight': len(self._received),
+            'latency_samples': len(latencies),
+            'latency_p50_ms': round(_percentile(latencies, 50) * 1000, 2),
+            'latency_p95_ms': round(_percentile(latencies, 95) * 1000, 2),
+            'latency_p99_ms': round(_percentile(latencies, 99) * 1000, 2),
+            'latency_max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+        })
+        return stats
+
+    def reset_stats(self) -> None:
+        """Reset counters and latency samples (used between load test runs)."""
+        for key in self.stats:
+            self.stats[key] = 0
+        self._latencies.clear()
+        self._started_at = time.monotonic()
+
+    # --- Lifecycle ---
+
+    def build_app(self) -> web.Application:
+        """Build the aiohttp application with the webhook, health and stats routes."""
+        app = web.Application(client_max_size=1024 * 1024)
+        app.router.add_post(self.path, self.handle_update)
+        app.router.add_get(f"{self.path.rstrip('/')}/stats", self.handle_stats)
+        app.router.add_get('/healthz', self.handle_health)
+        return app
+
+    async def set_webhook(self) -> None:
+        """Register the webhook with Telegram, keeping any updates queued meanwhile."""
+        await self.application.bot.set_webhook(
+            url=self.config.webhook_url,
+            secret_token=self.secret,
+            allowed_updates=self.allowed_updates,
+            max_connections=self.config.webhook_max_connections,
+            drop_pending_updates=False
+        )
+        self.logger.info(f"✅ Webhook set to {self.config.webhook_url}")
+
+    async def start(self) -> None:
+        """Start listening on the configured local address."""
+        if self.config.webhook_record_path:
+            self._record_file = open(self.config.webhook_record_path, 'a', encoding='utf-8', buffering=1)
+            self.logger.info(f"📼 Recording webhook updates to {self.config.webhook_record_path}")
+
+        self._runner = web.AppRunner(self.build_app(), access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.config.webhook_listen, self.config.webhook_port)
+        await site.start()
+        self.logger.info(
+            f"🌐 Webhook listening on {self.config.webhook_listen}:{self.config.webhook_port}{self.path}"
+        )
+
+    async def stop(self) -> None:
+        """Stop the listener. The webhook stays registered so Telegram queues updates."""
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+        if self._record_file is not None:
+            self._record_file.close()
+            self._record_file = None
+
+
+def _validate_config(config) -> None:
+    if not config.webhook_url:
+        raise ValueError("WEBHOOK_URL is required when BOT_MODE=webhook")
+    if not config.webhook_secret:
+        raise ValueError("WEBHOOK_SECRET is required when BOT_MODE=webhook")
+
+
+async def serve_webhook(application: Application, config, logger: Optional[logging.Logger] = None,
+                        allowed_updates: Optional[List[str]] = None,
+                        stop_event: Optional[asyncio.Event] = None) -> None:
+    """Run the application on webhook updates until stop_event is set."""
+    logger = logger or logging.getLogger(__name__)
+    _validate_config(config)
+    stop_event = stop_event or asyncio.Event()
+    server = WebhookServer(application, config, logger, allowed_updates)
+
+    # Same order as Application.run_polling: initialize, post_init, start ...
+    # stop, post_stop, shutdown, post_shutdown
+    await application.initialize()
+    try:
+        if application.post_init:
+            await application.post_init(application)
+        await server.set_webhook()
+        await application.start()
+        try:
+            await server.start()
+            await stop_event.wait()
+        finally:
+            logger.info("🛑 Stopping webhook server (webhook left registered, updates stay queued)")
+            await server.stop()
+            if application.running:
+                await application.stop()
+                if application.post_stop:
+                    await application.post_stop(application)
+    finally:
+        await application.shutdown()
+        if application.post_shutdown:
+            await application.post_shutdown(application)
+
+
+def run_webhook(application: Application, config, logger: Optional[logging.Logger] = None,
+                allowed_updates: Optional[List[str]] = None) -> None:
+    """Blocking entry point mirroring ``Application.run_polling``."""
+
+    async def _main():
+        stop_event = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                loop.add_signal_handler(sig, stop_event.set)
+            except (NotImplementedError, RuntimeError):
+                # Windows: fall back to KeyboardInterrupt
+                pass
+        await serve_webhook(application, config, logger, allowed_updates, stop_event)
+
+    asyncio.run(_main())
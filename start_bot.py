@@ -12,18 +12,22 @@ import os
 import argparse
 from pathlib import Path
 
-def check_health():
-    """Quick health check before starting services."""
+def check_health(use_cache=True):
+    """Startup deep health check, run in-process.
+
+    Results of file-dependent checks are cached in data/health_cache.json
+    and reused until the checked files change.
+    """
     print("🔍 Running health check...")
     try:
-        result = subprocess.run(['python3', 'health_check.py'], 
-                              capture_output=True, text=True, timeout=30)
-        if result.returncode == 0:
+        import asyncio
+        from src.monitoring.health_check import HealthChecker
+        report = asyncio.run(HealthChecker().run_comprehensive_check(use_cache=use_cache))
+        if report['overall_status'] == 'HEALTHY':
             print("✅ Health check passed")
-            return True
         else:
-            print("⚠️ Health check warnings (continuing anyway)")
-            return True
+            print(f"⚠️ Health check {report['overall_status']} (continuing anyway, see health_report.json)")
+        return True
     except Exception as e:
         print(f"⚠️ Health check failed: {e} (continuing anyway)")
         return True
@@ -206,6 +210,7 @@ def main():
     parser.add_argument('--scheduler-only', action='store_true', help='Start only scheduler')
     parser.add_argument('--bot-only', action='store_true', help='Start only bot')
     parser.add_argument('--no-health-check', action='store_true', help='Skip health check')
+    parser.add_argument('--full-health-check', action='store_true', help='Ignore cached health check results')
     
     args = parser.parse_args()
     
@@ -216,7 +221,7 @@ def main():
     
     # Health check
     if not args.no_health_check:
-        if not check_health():
+        if not check_health(use_cache=not args.full_health_check):
             print("❌ Health check failed. Use --no-health-check to skip.")
             return 1
     
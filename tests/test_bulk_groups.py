@@ -0,0 +1,44 @@
+import asyncio
+import logging
+import sqlite3
+
+from src.database.manager import DatabaseManager
+
+
+def test_bulk_upsert_counts_and_only_writes_changes(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'bot.db'), logging.getLogger(__name__))
+    rows = [{'group_id': f"@g{i}", 'group_name': f"G {i}", 'category': 'Crypto'} for i in range(1200)]
+    invalid = [{'group_id': ''}, {'group_id': 'has space', 'category': 'X'}, {'group_id': '@nocat'},
+               {'group_id': '@' + 'x' * 300, 'category': 'X'}]
+
+    async def run():
+        await db.initialize()
+        first = await db.bulk_upsert_managed_groups(rows + invalid + [dict(rows[0], group_name='Dup')])
+
+        conn = sqlite3.connect(db.db_path)
+        conn.execute("UPDATE managed_groups SET is_active = 0 WHERE group_id = '@g1'")
+        conn.commit()
+        conn.close()
+        second = await db.bulk_upsert_managed_groups(rows[:3] + [
+            dict(rows[2], group_name='Dup'),
+            dict(rows[3], category='Gaming'),
+            {'group_id': '@new', 'category': 'Gaming'},
+        ])
+        return first, second, await db.get_managed_groups()
+
+    first, second, groups = asyncio.run(run())
+    assert (first['added'], first['invalid'], first['duplicates'], first['skipped']) == (1200, 4, 1, 5)
+    assert first['errors'] == 0
+    # @g1 is reactivated, @g3 changes category, @new is added; @g0 and @g2 are untouched
+    assert (second['added'], second['updated'], second['unchanged'], second['duplicates']) == (1, 2, 2, 1)
+
+    by_id = {group['group_id']: group for group in groups}
+    assert len(by_id) == 1201
+    assert by_id['@g0']['group_name'] == 'G 0' and by_id['@g3']['category'] == 'Gaming'
+    assert by_id['@new']['group_name'] == '@new'
+
+
+def test_bulk_upsert_without_valid_rows_does_not_touch_the_database(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'missing' / 'bot.db'), logging.getLogger(__name__))
+    counts = asyncio.run(db.bulk_upsert_managed_groups([{'group_id': ''}]))
+    assert counts['invalid'] == 1 and counts['errors'] == 0
@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from src.callback_router import CallbackData, CallbackRouter
+
+
+def handler(name):
+    async def handle(update, context, data=None):
+        return name, data.args if data else None
+    handle.__qualname__ = name
+    return handle
+
+
+@pytest.fixture
+def router():
+    router = CallbackRouter()
+    router.exact('compare_plans', handler('exact'))
+    router.action('cmd', 'admin_menu', handler('action'))
+    router.namespace('cmd', handler('namespace'), with_data=True)
+    router.prefix('subscribe_', handler('subscribe'))
+    router.prefix('subscribe_p', handler('subscribe_p'))
+    router.prefix('sub', handler('sub'))
+    return router
+
+
+@pytest.mark.parametrize('data, expected', [
+    ('compare_plans', 'exact'),
+    ('cmd:admin_menu', 'action'),
+    ('cmd:admin_menu:1', 'action'),
+    ('cmd:other:1', 'namespace'),
+    ('subscribe_basic', 'subscribe'),
+    ('subscribe_pro', 'subscribe_p'),
+    ('subx', 'sub'),
+])
+def test_most_specific_route_wins(router, data, expected):
+    route, parsed = router.resolve(data)
+    assert route.name == expected
+    assert parsed == CallbackData.parse(data)
+
+
+@pytest.mark.parametrize('data', [None, '', 'cmd', 'su', 'unknown:thing'])
+def test_unrouted_data_is_left_alone(router, data):
+    assert router.resolve(data) == (None, None)
+    assert not router.matches(data)
+
+
+def test_dispatch_passes_parsed_data_and_counts(router):
+    def update(data):
+        return SimpleNamespace(callback_query=SimpleNamespace(data=data))
+
+    async def run():
+        return [await router.dispatch(update(data), None) for data in ('cmd:edit:7:x', 'cmd:admin_menu', 'nope')]
+
+    assert asyncio.run(run()) == [('namespace', ('7', 'x')), ('action', None), None]
+    stats = router.get_stats()
+    assert (stats['dispatched'], stats['unmatched'], stats['prefix_routes']) == (2, 1, 3)
+    with pytest.raises(ValueError):
+        router.prefix('', handler('empty'))
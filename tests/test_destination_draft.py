@@ -0,0 +1,57 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('telegram')
+
+from commands.admin_slot_commands import ADMIN_DESTINATION_DRAFT, _get_destination_draft
+from src.database.group_index import ManagedGroupIndex
+from src.database.manager import DatabaseManager
+
+GROUPS = [{'group_id': f"@g{i}", 'group_name': f"G {i}", 'category': 'Crypto' if i % 2 else 'Gaming'}
+          for i in range(4)]
+
+
+def test_index_bitsets_round_trip_and_remap():
+    index = ManagedGroupIndex(GROUPS)
+    mask = index.mask_for(['@g1', '@g3', '@unknown'])
+    assert index.keys_for(mask) == ['@g1', '@g3']
+    assert mask == index.category_mask('Crypto')
+
+    smaller = ManagedGroupIndex(GROUPS[1:])
+    assert smaller.keys_for(smaller.remap(mask, index)) == ['@g1', '@g3']
+    assert index.find('https://t.me/g2')['group_id'] == '@g2'
+    assert [group['group_id'] for group in index.search('g')] == ['@g0', '@g1', '@g2', '@g3']
+
+
+def test_picker_taps_change_only_the_draft(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'bot.db'), logging.getLogger(__name__))
+    context = SimpleNamespace(bot_data={'db': db}, user_data={})
+    saved = [{'destination_id': '@g0', 'destination_name': 'G 0', 'destination_type': 'group'},
+             {'destination_id': '@external', 'destination_name': 'External', 'destination_type': 'channel'}]
+
+    async def run():
+        await db.initialize()
+        await db.bulk_upsert_managed_groups(GROUPS)
+        await db.create_admin_ad_slots()
+        await db.update_admin_slot_destinations(1, saved)
+
+        draft = await _get_destination_draft(context, 1)
+        assert draft.index.keys_for(draft.saved) == ['@g0'] and not draft.dirty
+        draft.selected ^= 1 << draft.index.positions['@g1']
+        assert draft.dirty and draft.selected_count == 3
+        unsaved = [dest['destination_id'] for dest in await db.get_admin_slot_destinations(1)]
+
+        # A managed-group write rebuilds the index; the draft follows it by destination id
+        await db.bulk_upsert_managed_groups([{'group_id': '@a_first', 'category': 'Crypto'}])
+        assert await _get_destination_draft(context, 1) is draft
+        await db.update_admin_slot_destinations(1, draft.destinations())
+        return unsaved, sorted(dest['destination_id'] for dest in await db.get_admin_slot_destinations(1))
+
+    unsaved, after_save = asyncio.run(run())
+    assert sorted(unsaved) == ['@external', '@g0']
+    assert after_save == ['@external', '@g0', '@g1']
+    draft = context.user_data[ADMIN_DESTINATION_DRAFT]
+    assert sorted(draft.index.keys_for(draft.selected)) == ['@g0', '@g1']
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+
+from scheduler.workers import entity_cache
+from scheduler.workers.entity_cache import EntityCache, destination_key
+
+
+class UserNotParticipantError(Exception):
+    pass
+
+
+class ChannelPrivateError(Exception):
+    pass
+
+
+def test_destination_key_normalizes_usernames():
+    assert destination_key(' @MyGroup ') == destination_key('https://t.me/mygroup') == 'mygroup'
+    assert destination_key('-1001234') == '-1001234'
+
+
+def test_entries_persist_across_instances(tmp_path):
+    db_path = str(tmp_path / 'entity_cache.db')
+
+    async def write():
+        cache = EntityCache(1, db_path)
+        await cache.load()
+        cache.update('@Group', peer_type='channel', peer_id=42, access_hash=7, is_member=1)
+        cache.update('@other', is_member=1)
+        cache.invalidate('@other')
+        await cache.flush()
+
+    async def read(worker_id):
+        cache = EntityCache(worker_id, db_path)
+        await cache.load()
+        return cache
+
+    asyncio.run(write())
+    cache = asyncio.run(read(1))
+    assert cache.get('@group')['peer_id'] == 42
+    assert cache.get('@other') is None
+    # Access hashes are per account, so other workers do not see the entry
+    assert asyncio.run(read(2)).get('@group') is None
+
+
+def test_expired_entries_are_not_used(tmp_path):
+    cache = EntityCache(1, ttl_seconds=60)
+    entry = cache.update('@group', is_member=1)
+    assert cache.get('@group') is entry
+    entry['updated_at'] -= 120
+    assert cache.get('@group') is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_errors_drop_the_peer_or_the_membership():
+    cache = EntityCache(1)
+    cache.update('@a', peer_id=1, is_member=1)
+    cache.update('@b', peer_id=2, is_member=1)
+    cache.handle_error('@a', UserNotParticipantError())
+    cache.handle_error('@b', ChannelPrivateError())
+    assert cache.get('@a')['is_member'] == 0 and cache.get('@a')['peer_id'] == 1
+    assert cache.get('@b') is None
+
+
+def test_sqlite_runs_off_the_event_loop(tmp_path, monkeypatch):
+    threads = []
+    real_connect = EntityCache._connect
+
+    def connect(self):
+        threads.append(threading.get_ident())
+        return real_connect(self)
+
+    monkeypatch.setattr(EntityCache, '_connect', connect)
+
+    async def run():
+        cache = EntityCache(1, str(tmp_path / 'entity_cache.db'))
+        await cache.load()
+        cache.update('@group', is_member=1)
+        await cache.flush()
+        return threading.get_ident()
+
+    loop_thread = asyncio.run(run())
+    assert len(threads) == 2 and loop_thread not in threads
+    assert entity_cache._writer is not None
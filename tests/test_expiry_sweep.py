@@ -0,0 +1,35 @@
+import asyncio
+import logging
+
+from src.database.manager import DatabaseManager
+
+
+def test_sweep_expires_once_and_queues_one_notification(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'bot.db'), logging.getLogger(__name__))
+
+    async def run():
+        await db.initialize()
+        for user_id, tier in ((1, 'basic'), (2, 'pro')):
+            await db.create_user(user_id, f"user{user_id}", 'User')
+            await db.activate_subscription(user_id, tier, 30)
+            await db.get_or_create_ad_slots(user_id, tier)
+        await db.update_subscription(2, 'pro', -1)
+        # Cached before the sweep; the sweep must invalidate it
+        assert (await db.get_user_subscription(2))['is_active'] is False
+
+        first = await db.sweep_expired_subscriptions()
+        second = await db.sweep_expired_subscriptions()
+        pending = await db.get_pending_notifications('subscription_expired')
+        marked = await db.mark_notifications_sent([n['id'] for n in pending])
+        return (first, second, pending, marked, await db.get_user_subscription(1),
+                await db.get_user_subscription(2), await db.get_user_ad_slots(2),
+                await db.get_user_ad_slots(1), await db.get_pending_notifications())
+
+    first, second, pending, marked, active, expired, expired_slots, active_slots, left = asyncio.run(run())
+    assert first['expired_users'] == first['subscriptions_cleared'] == first['notifications_queued'] == 1
+    assert first['slots_deactivated'] == len(expired_slots) > 0 and not first['errors']
+    assert second['expired_users'] == second['notifications_queued'] == 0
+    assert [n['user_id'] for n in pending] == [2] and marked == 1 and left == []
+    assert active['tier'] == 'basic' and expired is None
+    assert not any(slot['is_active'] for slot in expired_slots)
+    assert all(slot['is_active'] for slot in active_slots)
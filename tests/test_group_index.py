@@ -0,0 +1,51 @@
+import asyncio
+import logging
+import sqlite3
+
+from src.database import group_index
+from src.database.group_index import normalize_username
+from src.database.manager import DatabaseManager
+
+
+def test_normalize_username():
+    assert normalize_username('@Crypto_Chat') == normalize_username('https://t.me/crypto_chat/12') == 'crypto_chat'
+    assert normalize_username('-100123') is None and normalize_username('two words') is None
+
+
+def test_triggers_bump_the_version_on_every_write():
+    cursor = sqlite3.connect(':memory:').cursor()
+    cursor.execute('CREATE TABLE managed_groups '
+                   '(group_id TEXT PRIMARY KEY, group_name TEXT, category TEXT, is_active INTEGER)')
+    group_index.ensure_version_tracking(cursor)
+    group_index.ensure_version_tracking(cursor)
+    assert group_index.read_version(cursor) == 0
+
+    cursor.execute("INSERT INTO managed_groups VALUES ('@a', 'A', 'x', 1)")
+    cursor.execute("UPDATE managed_groups SET category = 'y'")
+    cursor.execute("DELETE FROM managed_groups")
+    assert group_index.read_version(cursor) == 3
+
+
+def test_index_is_shared_and_rebuilt_after_any_write(tmp_path):
+    db_path = str(tmp_path / 'bot.db')
+    logger = logging.getLogger(__name__)
+    bot, scheduler = DatabaseManager(db_path, logger), DatabaseManager(db_path, logger)
+
+    async def run():
+        await bot.initialize()
+        await bot.bulk_upsert_managed_groups([{'group_id': '@a', 'category': 'Crypto'}])
+        first = await bot.get_managed_group_index()
+        shared = await scheduler.get_managed_group_index()
+
+        # A write from outside DatabaseManager (e.g. a maintenance script)
+        conn = sqlite3.connect(db_path)
+        conn.execute("INSERT INTO managed_groups (group_id, group_name, category, is_active) "
+                     "VALUES ('@b', 'B', 'Gaming', 1)")
+        conn.commit()
+        conn.close()
+        return first, shared, await scheduler.get_managed_group_index(), await bot.get_managed_group_categories()
+
+    first, shared, rebuilt, categories = asyncio.run(run())
+    assert shared is first and len(first) == 1
+    assert rebuilt is not first and rebuilt.version > first.version and len(rebuilt) == 2
+    assert sorted(categories) == ['Crypto', 'Gaming']
@@ -0,0 +1,93 @@
+import asyncio
+import json
+import os
+import sqlite3
+
+import pytest
+
+from src.monitoring.health_probe import HealthProbe, database_check, sqlite_check
+
+CHECKS = ['check_environment_variables', 'check_dependencies', 'check_imports', 'check_database_connection',
+          'check_bot_configuration', 'check_command_handlers', 'check_critical_user_flows',
+          'check_file_structure', 'check_syntax_errors']
+REPORT_KEYS = ['environment_variables', 'dependencies', 'imports', 'database', 'bot_configuration',
+               'command_handlers', 'critical_user_flows', 'file_structure', 'syntax_errors']
+
+
+def test_readiness_combines_checks_flags_and_startup_report(tmp_path):
+    db_path = str(tmp_path / 'bot.db')
+    sqlite3.connect(db_path).close()
+    report = tmp_path / 'health_report.json'
+    probe = HealthProbe(str(report))
+
+    probe.add_check('database', sqlite_check(db_path))
+    probe.set_ready('bot', False)
+    assert probe.readiness()[0] is False
+    probe.set_ready('bot', True)
+    ready, details = probe.readiness()
+    assert ready and details['checks']['startup_check'] == 'not run'
+
+    report.write_text(json.dumps({'overall_status': 'CRITICAL'}))
+    assert probe.readiness()[0] is False
+    report.write_text(json.dumps({'overall_status': 'WARNING'}))
+    os.utime(report, ns=(1, 10 ** 9))
+    assert probe.readiness()[0] is True
+
+    probe.add_check('broken', lambda: 1 / 0)
+    ready, details = probe.readiness()
+    assert not ready and details['checks']['broken'].startswith('error:')
+    assert probe.liveness()['status'] == 'ok'
+
+
+def test_database_check_for_both_backends(tmp_path):
+    class Sqlite:
+        db_path = str(tmp_path / 'missing.db')
+
+    class Pool:
+        def is_closing(self):
+            return False
+
+    class Postgres:
+        backend = 'postgres'
+        pool = Pool()
+
+    assert database_check(Sqlite())() is False
+    assert database_check(Postgres())() is True
+    Postgres.pool = None
+    assert database_check(Postgres())() is False
+
+
+def test_startup_check_reuses_passing_file_checks(tmp_path, monkeypatch):
+    pytest.importorskip('dotenv')
+    from src.monitoring import health_check
+
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / 'bot.py').write_text('print(1)\n')
+    calls = []
+
+    def fake(name, key, status='PASS'):
+        async def check(self):
+            calls.append(name)
+            self.health_report['checks'][key] = {'status': status, 'issues': [], 'fixes': []}
+        return check
+
+    for name, key in zip(CHECKS, REPORT_KEYS):
+        status = 'FAIL' if key == 'dependencies' else 'PASS'
+        monkeypatch.setattr(health_check.HealthChecker, name, fake(name, key, status))
+
+    def run():
+        calls.clear()
+        report = asyncio.run(health_check.HealthChecker('cache.json', 'report.json').run_comprehensive_check())
+        return set(calls), report
+
+    first, report = run()
+    assert first == set(CHECKS) and report['overall_status'] == 'WARNING'
+
+    # Only the checks without a cache key run again
+    always = {'check_dependencies', 'check_database_connection', 'check_critical_user_flows', 'check_file_structure'}
+    second, report = run()
+    assert second == always and report['checks']['imports']['cached'] is True
+
+    (tmp_path / 'bot.py').write_text('print(22)\n')
+    third, _ = run()
+    assert third == always | {'check_imports', 'check_command_handlers', 'check_syntax_errors'}
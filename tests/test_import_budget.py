@@ -0,0 +1,40 @@
+import importlib.util
+import os
+import re
+
+import pytest
+
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts', 'check_import_budget.py')
+spec = importlib.util.spec_from_file_location('check_import_budget', SCRIPT)
+budget = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(budget)
+
+PROJECT_PACKAGES = {'bot', 'scheduler', 'src', 'commands', 'config'}
+
+
+def measure(entry):
+    """Import rows for entry; skips when a third-party dependency is not installed."""
+    try:
+        return budget.measure(entry)
+    except RuntimeError as e:
+        missing = re.search(r"No module named '([^'.]+)", str(e))
+        if missing and missing.group(1) not in PROJECT_PACKAGES:
+            pytest.skip(str(e))
+        raise
+
+
+@pytest.mark.parametrize('entry', sorted(budget.LAZY_MODULES))
+def test_startup_does_not_import_lazy_modules(entry):
+    imported = {module for module, _, _, _ in measure(entry)}
+    for prefix in budget.LAZY_MODULES[entry]:
+        eager = sorted(m for m in imported if m == prefix or m.startswith(prefix + '.'))
+        assert not eager, f"{prefix} imported at startup of {entry}"
+
+
+@pytest.mark.parametrize('entry', sorted(budget.IMPORT_BUDGETS_MS))
+def test_startup_import_time_within_budget(entry):
+    # The budget depends on the machine; IMPORT_BUDGET_MS overrides it on slow hosts
+    limit_ms = float(os.getenv('IMPORT_BUDGET_MS') or budget.IMPORT_BUDGETS_MS[entry])
+    rows = measure(entry)
+    total_ms = sum(cumulative for _, _, cumulative, depth in rows if depth == 0) / 1000
+    assert total_ms <= limit_ms, f"import {entry} took {total_ms:.0f} ms, budget {limit_ms:.0f} ms"
@@ -0,0 +1,70 @@
+import json
+import logging
+import threading
+
+import pytest
+
+from src.monitoring import logging_setup
+from src.monitoring.logging_setup import DEFAULT_SAMPLE_RATES, SamplingFilter, parse_sample_rates
+
+
+def record(name, msg, level=logging.INFO, args=()):
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_parse_sample_rates():
+    assert parse_sample_rates(None) == parse_sample_rates(' ') == DEFAULT_SAMPLE_RATES
+    assert parse_sample_rates('none') == {}
+    assert parse_sample_rates('a=0.5, b=2, c=x, d') == {'a': 0.5, 'b': 1.0}
+
+
+def test_sampling_keeps_one_in_n_per_template():
+    sampler = SamplingFilter({'app': 0.25, 'app.quiet': 0, 'app.loud': 1})
+    kept = [sampler.filter(record('app.posting', 'Posted %s', args=(i,))) for i in range(8)]
+    assert kept == [True, False, False, False, True, False, False, False]
+
+    # Each template is counted separately, and its first record is kept
+    assert sampler.filter(record('app.posting', 'Other %s', args=(1,)))
+    assert not sampler.filter(record('app.quiet', 'Dropped'))
+    assert sampler.filter(record('app.loud', 'Kept'))
+    assert sampler.filter(record('app.quiet', 'Problem', logging.WARNING))
+    assert sampler.filter(record('other', 'Unsampled'))
+    assert sampler.dropped == 7
+
+
+class ThreadRecordingArg:
+    """Log argument remembering which thread formatted it."""
+
+    def __init__(self):
+        self.threads = []
+
+    def __str__(self):
+        self.threads.append(threading.get_ident())
+        return 'value'
+
+
+@pytest.fixture
+def restore_root_logger():
+    root = logging.getLogger()
+    handlers, level = root.handlers[:], root.level
+    yield
+    logging_setup.stop_logging()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    for handler in handlers:
+        root.addHandler(handler)
+    root.setLevel(level)
+
+
+def test_records_are_formatted_on_the_listener_thread(tmp_path, restore_root_logger):
+    log_file = tmp_path / 'logs' / 'bot.log'
+    logging_setup.setup_logging(str(log_file), level='INFO', json_format=True, sample_rates={}, console=False)
+    arg = ThreadRecordingArg()
+    logging.getLogger('tests.logging').info('Sent %s', arg, extra={'worker_id': 3})
+    logging.getLogger('tests.logging').debug('Below level')
+    logging_setup.stop_logging()
+
+    entries = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [(e['logger'], e['level'], e['msg'], e['worker_id']) for e in entries] == \
+        [('tests.logging', 'INFO', 'Sent value', 3)]
+    assert arg.threads and threading.get_ident() not in arg.threads
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+import sqlite3
+
+from src.database import cache as cache_module
+from src.database.cache import MISSING, LRUTTLCache, UserLookupCache
+from src.database.manager import DatabaseManager
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_lru_ttl_cache_copies_evicts_and_expires(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache_module.time, 'monotonic', clock)
+    removed = []
+    cache = LRUTTLCache(max_entries=2, ttl_seconds=10, on_remove=removed.append)
+
+    cache.set('a', {'n': 1})
+    cache.get('a')['n'] = 2
+    assert cache.get('a') == {'n': 1}
+    cache.set('b', None)
+    assert cache.get('b') is None and cache.get('missing') is MISSING
+
+    cache.get('a')
+    cache.set('c', 3)
+    assert removed == ['b'] and cache.get('b') is MISSING
+
+    clock.now += 11
+    assert cache.get('a') is MISSING
+    assert cache.stats()['evictions'] == 1
+
+
+def test_slot_writers_invalidate_the_owning_user():
+    cache = UserLookupCache()
+    cache.set(UserLookupCache.SLOTS, 1, [{'id': 10}, {'id': 11}])
+    cache.set(UserLookupCache.AD_SLOTS, 1, [{'id': 10}])
+    cache.set(UserLookupCache.SUBSCRIPTION, 1, {'tier': 'basic'})
+
+    cache.invalidate_slot(11)
+    assert cache.get(UserLookupCache.SLOTS, 1) is MISSING
+    assert cache.get(UserLookupCache.AD_SLOTS, 1) is MISSING
+    assert cache.get(UserLookupCache.SUBSCRIPTION, 1) == {'tier': 'basic'}
+    assert cache.stats()['indexed_slots'] == 0
+
+
+def test_manager_reads_are_cached_until_written(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'bot.db'), logging.getLogger(__name__))
+
+    async def run():
+        await db.initialize()
+        await db.create_user(1, 'alice', 'Alice')
+        await db.update_subscription(1, 'basic', 30)
+        assert (await db.get_user_subscription(1))['tier'] == 'basic'
+
+        # Writes made behind the manager's back are not seen until the TTL passes
+        conn = sqlite3.connect(db.db_path)
+        conn.execute("UPDATE users SET subscription_tier = 'other' WHERE user_id = 1")
+        conn.commit()
+        conn.close()
+        assert (await db.get_user_subscription(1))['tier'] == 'basic'
+
+        # Writes through the manager invalidate the user's entries
+        await db.update_subscription(1, 'pro', 30)
+        assert (await db.get_user_subscription(1))['tier'] == 'pro'
+
+        slot_id = await db.create_ad_slot(1, 1)
+        assert [slot['content'] for slot in await db.get_user_slots(1)] == [None]
+        await db.update_slot_content(slot_id, 'hello')
+        assert [slot['content'] for slot in await db.get_user_slots(1)] == ['hello']
+
+    asyncio.run(run())
+    assert db.get_cache_stats()['hits'] >= 1
@@ -0,0 +1,79 @@
+import asyncio
+import logging
+
+import pytest
+
+from src.utils.media_cache import MediaCache, bot_file_loader
+
+
+class FakeFile:
+    async def download_as_bytearray(self):
+        return bytearray(b'photo bytes')
+
+
+class FakeBot:
+    def __init__(self):
+        self.downloads = []
+
+    async def get_file(self, file_id):
+        self.downloads.append(file_id)
+        return FakeFile()
+
+
+class FileReferenceExpiredError(Exception):
+    pass
+
+
+def test_file_ids_are_uploaded_once_per_worker():
+    bot = FakeBot()
+    cache = MediaCache()
+    loader = bot_file_loader(bot)
+    sent = []
+
+    async def send(media):
+        if media == 'ref:stale':
+            raise FileReferenceExpiredError('FILE_REFERENCE_EXPIRED')
+        sent.append(media)
+        return {'media': f"ref:{len(sent)}"}
+
+    async def post(worker):
+        return await cache.send(f"worker:{worker}", 'bot-file-id', send,
+                                reference_of=lambda message: message['media'], loader=loader)
+
+    async def run():
+        await post(1)
+        await post(1)
+        await post(2)
+        # A rejected reference is dropped and the bytes uploaded again
+        cache.set('worker:1', cache._file_keys['bot-file-id'], 'ref:stale')
+        await post(1)
+
+    asyncio.run(run())
+    # The bytes are not kept: each upload downloads the file again
+    assert bot.downloads == ['bot-file-id'] * 3
+    assert sent == [b'photo bytes', 'ref:1', b'photo bytes', b'photo bytes']
+    assert cache.stats()['uploads'] == 3 and cache.stats()['stale'] == 1
+
+
+def test_worker_managers_receive_the_bot_file_loader(monkeypatch):
+    pytest.importorskip('telethon')
+    from src.services import posting_service, worker_integration
+
+    monkeypatch.delenv('WORKER_POOL_SOCKET', raising=False)
+    loader = bot_file_loader(FakeBot())
+    logger = logging.getLogger(__name__)
+
+    integration = worker_integration.initialize_worker_integration(logger, None, media_loader=loader)
+    assert integration.worker_manager.media_loader is loader
+
+    class RecordingManager:
+        def __init__(self, db, logger, media_loader=None):
+            self.media_loader = media_loader
+
+        async def initialize_workers(self):
+            raise RuntimeError('stop after construction')
+
+    monkeypatch.setattr(posting_service, 'WorkerManager', RecordingManager)
+    service = posting_service.initialize_posting_service(None, logger, media_loader=loader)
+    asyncio.run(service.initialize())
+    assert service.worker_manager.media_loader is loader
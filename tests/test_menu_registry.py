@@ -0,0 +1,67 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('telegram')
+
+from telegram import InlineKeyboardButton
+from telegram.error import BadRequest
+
+from src.menu_registry import MenuRegistry, content_version
+
+
+class FakeQuery:
+    def __init__(self, chat_id=1, message_id=10, error=None):
+        self.message = SimpleNamespace(chat_id=chat_id, message_id=message_id, reply_markup=None)
+        self.error = error
+        self.edits = []
+
+    async def edit_message_text(self, text, reply_markup=None, parse_mode=None):
+        if self.error:
+            raise self.error
+        self.edits.append(text)
+        self.message.reply_markup = reply_markup
+
+
+def test_dynamic_menus_rebuild_only_on_new_version():
+    registry = MenuRegistry(max_dynamic_entries=2)
+    builds = []
+
+    def builder(text):
+        def build():
+            builds.append(text)
+            return registry.render(text)
+        return build
+
+    first = registry.dynamic('slots', 1, content_version(1), builder('a'))
+    assert registry.dynamic('slots', 1, content_version(1), builder('b')) is first
+    assert registry.dynamic('slots', 1, content_version(2), builder('c')).text == 'c'
+    registry.dynamic('slots', 2, 'v', builder('d'))
+    registry.dynamic('slots', 3, 'v', builder('e'))
+    registry.dynamic('slots', 1, content_version(2), builder('f'))
+    assert builds == ['a', 'c', 'd', 'e', 'f']
+    registry.invalidate_user(3)
+    assert registry.get_stats()['dynamic_menus'] == 1
+
+
+def test_unchanged_edits_are_skipped():
+    registry = MenuRegistry()
+    menu = registry.render('Menu', [[InlineKeyboardButton('Back', callback_data='back')]])
+    query = FakeQuery()
+
+    async def run():
+        return [await registry.edit(query, menu), await registry.edit(query, menu),
+                await registry.edit(query, registry.render('Other'))]
+
+    assert asyncio.run(run()) == [True, False, True]
+    assert query.edits == ['Menu', 'Other']
+    assert registry.get_stats()['edits_skipped'] == 1
+
+
+def test_not_modified_is_treated_as_skipped_edit():
+    registry = MenuRegistry()
+    menu = registry.render('Menu')
+    assert asyncio.run(registry.edit(FakeQuery(error=BadRequest('Message is not modified')), menu)) is False
+    with pytest.raises(BadRequest):
+        asyncio.run(registry.edit(FakeQuery(message_id=11, error=BadRequest('Message to edit not found')), menu))
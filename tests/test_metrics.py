@@ -0,0 +1,99 @@
+import asyncio
+import random
+
+import pytest
+
+from src.monitoring.metrics import OVERFLOW_LABEL, MetricsRegistry, MetricsServer, metrics_port_from_env, timed
+
+
+def test_histogram_quantiles_within_bucket_error():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('latency_seconds', 'Latency')
+    rng = random.Random(1)
+    samples = sorted(rng.lognormvariate(-4, 1.5) for _ in range(5000))
+    for sample in samples:
+        histogram.observe(sample)
+
+    child = histogram._default()
+    for q in (0.5, 0.9, 0.99):
+        exact = samples[int(q * len(samples) + 0.5) - 1]
+        assert abs(child.quantile(q) - exact) <= exact * 0.0625 + 1e-6
+    assert child.count == 5000 and child.max == samples[-1]
+
+
+def test_label_sets_are_bounded():
+    registry = MetricsRegistry()
+    counter = registry.counter('requests_total', 'Requests', ['user'])
+    counter.max_label_sets = 3
+    for user in range(10):
+        counter.labels(user=user).inc()
+    # Label sets past the limit share one overflow series
+    assert len(counter._children) == 4
+    assert counter.labels(OVERFLOW_LABEL).value == 7
+    with pytest.raises(ValueError):
+        counter.inc()
+    with pytest.raises(ValueError):
+        registry.gauge('requests_total', 'Requests', ['user'])
+    assert registry.counter('requests_total', 'Requests', ['user']) is counter
+
+
+def test_timed_wraps_sync_and_async_functions():
+    registry = MetricsRegistry()
+    histogram = registry.histogram('db_seconds', 'DB time', ['method'])
+
+    @timed(histogram)
+    def query():
+        return 1
+
+    @timed(histogram)
+    async def fetch():
+        return 2
+
+    assert query() == 1 and asyncio.run(fetch()) == 2
+    snapshot = registry.snapshot()['db_seconds']
+    assert snapshot['method=query']['count'] == snapshot['method=fetch']['count'] == 1
+
+
+def test_metrics_port_resolution(monkeypatch):
+    for name in ('METRICS_PORT', 'BOT_METRICS_PORT', 'SCHEDULER_METRICS_PORT'):
+        monkeypatch.delenv(name, raising=False)
+    assert metrics_port_from_env('bot') is None
+    assert metrics_port_from_env('bot', 9000) == 9000
+    monkeypatch.setenv('METRICS_PORT', '9464')
+    assert (metrics_port_from_env('bot'), metrics_port_from_env('scheduler')) == (9464, 9465)
+    monkeypatch.setenv('SCHEDULER_METRICS_PORT', '9999')
+    assert metrics_port_from_env('scheduler') == 9999
+
+
+class Probe:
+    def liveness(self):
+        return {'alive': True}
+
+    def readiness(self):
+        return False, {'database': 'down'}
+
+
+def test_server_exposes_metrics_and_probes():
+    registry = MetricsRegistry()
+    registry.gauge('workers_connected', 'Connected workers').set(3)
+
+    async def get(port, path):
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: x\r\n\r\n".encode())
+        response = await reader.read()
+        writer.close()
+        return response.decode()
+
+    async def run():
+        server = MetricsServer(registry, port=0, probe=Probe())
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+        try:
+            return [await get(port, path) for path in ('/metrics', '/livez', '/readyz', '/other')]
+        finally:
+            await server.stop()
+
+    metrics_page, live, ready, missing = asyncio.run(run())
+    assert '# TYPE workers_connected gauge\nworkers_connected 3' in metrics_page
+    assert live.startswith('HTTP/1.1 200') and ready.startswith('HTTP/1.1 503')
+    assert missing.startswith('HTTP/1.1 404')
@@ -0,0 +1,62 @@
+import logging
+import random
+import re
+
+import pytest
+
+from src.utils.content_moderation import ContentModerator
+from src.utils.moderation_engine import AhoCorasick, ModerationEngine, PatternSet
+from src.utils.security import SecurityManager
+
+
+def test_aho_corasick_matches_substring_search():
+    keywords = ['he', 'she', 'his', 'hers', 'ushe', 'e', 'aaa', 'aa']
+    automaton = AhoCorasick(keywords + ['HE', ''])
+    assert automaton.find('uSHErs') == ['he', 'she', 'hers', 'ushe', 'e']
+
+    rng = random.Random(0)
+    for _ in range(500):
+        text = ''.join(rng.choice('ahesiur ') for _ in range(rng.randint(0, 20)))
+        assert automaton.find(text) == [k for k in keywords if k in text.lower()], text
+
+
+def test_pattern_set_reports_each_source_pattern():
+    patterns = [r'\bcat\b', r'\bdog\b', r'\bcat\b']
+    merged = PatternSet(patterns, re.IGNORECASE)
+    assert merged.patterns == [r'\bcat\b', r'\bdog\b']
+    assert merged.scan('Cat dog cat bird') == {0: 2, 1: 1}
+    assert merged.search('a DOG') and not merged.search('category')
+    assert not PatternSet([]).search('anything') and PatternSet([]).scan('x') == {}
+
+
+@pytest.mark.parametrize('text', [
+    'Buy now! Limited time crypto investment at http://a.example and www.b.example',
+    'Totally normal message about cats',
+    'This is a SCAM, call to kill the fake deal',
+    'buy nowhere fast',
+])
+def test_engine_agrees_with_per_keyword_scan(text):
+    moderator = ContentModerator(None, logging.getLogger(__name__))
+    findings = moderator.engine.scan(text)
+    assert list(findings.spam_keywords) == [k for k in moderator.spam_keywords if k in text.lower()]
+    assert list(findings.inappropriate_patterns) == [
+        i for i, pattern in enumerate(moderator.inappropriate_patterns) if re.search(pattern, text, re.IGNORECASE)
+    ]
+    assert findings.url_count == sum(len(re.findall(pattern, text)) for pattern in moderator.url_patterns)
+
+
+def test_verdicts_are_cached_by_content():
+    engine = ModerationEngine(['spam'], [], [])
+    first = engine.scan('some spam')
+    assert engine.scan('some spam') == first
+    assert engine.cache_stats()['hits'] == 1 and engine.cache_stats()['misses'] == 1
+
+
+@pytest.mark.parametrize('text, sanitized', [
+    ('hello <b>world</b>', 'hello &lt;b&gt;world&lt;/b&gt;'),
+    ("1 or 1=1", ''),
+    ('<!-- hidden -->', ''),
+])
+def test_sanitize_input_uses_merged_patterns(text, sanitized):
+    security = SecurityManager(None, None, logging.getLogger(__name__))
+    assert security.sanitize_input(text) == sanitized
@@ -0,0 +1,56 @@
+import asyncio
+import time
+
+from src.services.posting_pipeline import Assignment, PostingPipeline
+
+
+def make_pipeline(slots, sent, **options):
+    async def source():
+        return slots
+
+    async def destinations(slot):
+        return [{'destination_id': f"@dest{slot['id']}"}]
+
+    async def assign(slot, dests):
+        return [Assignment(slot, dest, worker=1) for dest in dests]
+
+    async def send(assignment):
+        sent.append(assignment.slot['id'])
+        return assignment.result(True)
+
+    return PostingPipeline(source, destinations, assign, send, parallel=False, **options)
+
+
+def test_sequential_cycle_posts_every_slot():
+    sent = []
+    report = asyncio.run(make_pipeline([{'id': i} for i in range(3)], sent).run_cycle())
+    assert sent == [0, 1, 2]
+    assert report.successful_posts == 3
+
+
+def test_stop_ends_cycle_during_slot_delay():
+    sent = []
+    running = {'value': True}
+
+    async def run():
+        pipeline = make_pipeline([{'id': i} for i in range(3)], sent, slot_delay=lambda: 30.0,
+                                 should_stop=lambda: not running['value'])
+        cycle = asyncio.create_task(pipeline.run_cycle())
+        await asyncio.sleep(0.05)
+        running['value'] = False
+        return await asyncio.wait_for(cycle, timeout=2)
+
+    started = time.monotonic()
+    report = asyncio.run(run())
+    assert time.monotonic() - started < 2
+    assert sent == [0]
+    assert report.successful_posts == 1
+
+
+def test_stopped_parallel_cycle_posts_nothing():
+    sent = []
+    pipeline = make_pipeline([{'id': i} for i in range(3)], sent, should_stop=lambda: True)
+    pipeline.parallel = True
+    report = asyncio.run(pipeline.run_cycle())
+    assert sent == []
+    assert report.total_ads == 3
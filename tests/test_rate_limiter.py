@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from src.rate_limiter import GCRALimiter
+
+
+class FixedClock:
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def burst(limiter, max_actions, window_seconds, key='user'):
+    allowed = 0
+    while limiter.allow(key, max_actions, window_seconds):
+        allowed += 1
+        if allowed > max_actions * 2:
+            break
+    return allowed
+
+
+@pytest.mark.parametrize('max_actions, window_seconds', [(7, 60), (3, 1), (50, 60), (20, 60), (1, 5), (10, 0.1)])
+def test_full_burst_is_allowed(max_actions, window_seconds):
+    limiter = GCRALimiter(clock=FixedClock())
+    assert burst(limiter, max_actions, window_seconds) == max_actions
+    assert limiter.usage('user') == max_actions
+    assert limiter.retry_after('user', max_actions, window_seconds) == pytest.approx(window_seconds / max_actions)
+
+
+def test_full_burst_with_randomized_clocks():
+    rng = random.Random(42)
+    for _ in range(200):
+        limiter = GCRALimiter(clock=FixedClock(rng.uniform(0, 1e6)))
+        assert burst(limiter, 50, 60) == 50
+
+
+def test_one_action_per_interval_after_burst():
+    clock = FixedClock()
+    limiter = GCRALimiter(clock=clock)
+    assert burst(limiter, 6, 60) == 6
+    clock.now += 10
+    assert limiter.allow('user', 6, 60)
+    assert not limiter.allow('user', 6, 60)
+
+
+def test_least_recently_used_key_is_evicted():
+    limiter = GCRALimiter(max_keys=2, clock=FixedClock())
+    for key in ('a', 'b', 'c'):
+        limiter.allow(key, 5, 60)
+    assert list(limiter.keys()) == ['b', 'c']
+    assert limiter.evictions == 1
@@ -0,0 +1,139 @@
+import asyncio
+import logging
+import sqlite3
+from datetime import datetime, timedelta
+
+from restart_recovery import RestartRecovery
+from src.database.manager import DatabaseManager
+
+
+class FakeDatabase:
+    """The backend methods restart recovery uses, without a database."""
+
+    def __init__(self, slots, last_posts):
+        self.slots = slots
+        self.last_posts = last_posts
+        self.timestamp_updates = None
+
+    async def get_active_ads_to_send(self):
+        return self.slots
+
+    async def get_last_successful_posts(self):
+        return self.last_posts
+
+    async def set_slot_last_sent_times(self, updates):
+        self.timestamp_updates = updates
+        return True
+
+    async def expire_worker_bans(self):
+        return [{'worker_id': 1, 'destination_id': '@a', 'ban_type': 'flood_wait', 'expired_at': '2020-01-01'}]
+
+    async def get_active_worker_bans(self):
+        return [{'worker_id': 2, 'destination_id': '@b', 'ban_type': 'permanent',
+                 'banned_at': '2024-01-01 00:00:00', 'estimated_unban_time': None}]
+
+    async def get_worker_posting_stats(self, hours):
+        return [{'worker_id': 1, 'total_posts': 4, 'successful_posts': 3, 'ban_detections': 1,
+                 'slot_count': 2, 'last_activity': '2024-01-01 00:00:00'}]
+
+    async def get_worker_health_snapshots(self):
+        return [{'worker_id': 1, 'health_score': 90, 'active_bans': 0, 'ban_types': None, 'error_rate': 0.1,
+                 'utilization': 0.2, 'last_error': None, 'status': 'healthy'}]
+
+    async def get_destination_health_overview(self, worst_limit):
+        return {'total_destinations': 1, 'average_success_rate': 20.0, 'critical_destinations': 1,
+                'warning_destinations': 0,
+                'worst_destinations': [{'destination_id': '@a', 'success_rate': 20.0, 'total_attempts': 5}]}
+
+    async def get_problematic_destinations(self, min_failures):
+        return []
+
+
+def test_full_recovery_uses_backend_methods():
+    now = datetime.now()
+    recent = (now - timedelta(minutes=10)).strftime('%Y-%m-%d %H:%M:%S')
+    stale = (now - timedelta(hours=5)).strftime('%Y-%m-%d %H:%M:%S')
+    db = FakeDatabase(
+        slots=[
+            {'id': 1, 'slot_type': 'user', 'interval_minutes': 60, 'last_sent_at': recent},
+            {'id': 2, 'slot_type': 'admin', 'interval_minutes': 60, 'last_sent_at': stale},
+            {'id': 3, 'slot_type': 'admin', 'interval_minutes': 60, 'last_sent_at': None},
+        ],
+        last_posts=[{'slot_id': 3, 'slot_type': 'admin', 'last_posted_at': recent}],
+    )
+
+    results = asyncio.run(RestartRecovery(db).perform_full_recovery())
+
+    # Slot 2 is due and keeps its timestamp; 1 and 3 are scheduled an interval after their last post
+    assert [slot_id for _, slot_id in db.timestamp_updates['user']] == [1]
+    assert [slot_id for _, slot_id in db.timestamp_updates['admin']] == [3]
+    assert results['timestamp_reconstruction']['skipped_slots'][0]['slot_id'] == 2
+    assert results['ban_status_recovery']['total_processed'] == 2
+    assert results['posting_history_analysis']['worker_stats'][1]['success_rate'] == 75.0
+    assert results['destination_health_validation']['destination_validation']['@a']['validation_status'] == 'critical'
+    assert len(results['recovery_summary']['components_recovered']) == 5
+
+
+POSTING_HISTORY = '''
+    CREATE TABLE IF NOT EXISTS posting_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        slot_id INTEGER,
+        slot_type TEXT DEFAULT 'user',
+        destination_id TEXT,
+        worker_id INTEGER,
+        success BOOLEAN,
+        posted_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        ban_detected BOOLEAN DEFAULT 0,
+        ban_type TEXT
+    )
+'''
+
+DESTINATION_HEALTH = '''
+    CREATE TABLE IF NOT EXISTS destination_health (
+        destination_id TEXT PRIMARY KEY,
+        total_attempts INTEGER DEFAULT 0,
+        success_rate REAL DEFAULT 100.0
+    )
+'''
+
+
+def test_sqlite_aggregates_for_recovery(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'bot.db'), logging.getLogger(__name__))
+
+    async def run():
+        await db.initialize()
+        conn = sqlite3.connect(db.db_path)
+        conn.execute(POSTING_HISTORY)
+        conn.execute(DESTINATION_HEALTH)
+        conn.executemany(
+            "INSERT INTO posting_history (slot_id, slot_type, worker_id, success, posted_at, ban_detected) "
+            "VALUES (?, ?, ?, ?, datetime('now', ?), ?)",
+            [(1, 'user', 7, 1, '-3 hours', 0), (1, 'user', 7, 1, '-1 hours', 0), (1, 'admin', 8, 1, '-2 hours', 0),
+             (2, 'user', 7, 0, '-1 hours', 1), (2, 'user', 8, 1, '-48 hours', 0)]
+        )
+        conn.executemany("INSERT INTO destination_health VALUES (?, ?, ?)",
+                         [('@a', 10, 20.0), ('@b', 10, 50.0), ('@c', 10, 90.0)])
+        conn.commit()
+        conn.close()
+
+        await db.create_user(1, 'alice', 'Alice')
+        slot_id = await db.create_ad_slot(1, 1)
+        await db.get_user_slots(1)
+        assert await db.set_slot_last_sent_times({'user': [('2024-01-01 00:00:00', slot_id)], 'admin': []})
+        return (await db.get_last_successful_posts(), await db.get_worker_posting_stats(24),
+                await db.get_destination_health_overview(2), await db.get_user_slots(1))
+
+    last_posts, worker_stats, overview, slots = asyncio.run(run())
+    last = {(row['slot_id'], row['slot_type']): row['last_posted_at'] for row in last_posts}
+    assert sorted(last) == [(1, 'admin'), (1, 'user'), (2, 'user')]
+    assert last[(1, 'user')] > last[(1, 'admin')]
+
+    stats = {row['worker_id']: row for row in worker_stats}
+    assert (stats[7]['total_posts'], stats[7]['successful_posts'], stats[7]['ban_detections']) == (3, 2, 1)
+    assert (stats[7]['slot_count'], stats[8]['total_posts']) == (2, 1)
+
+    assert overview['total_destinations'] == 3
+    assert (overview['critical_destinations'], overview['warning_destinations']) == (1, 1)
+    assert [row['destination_id'] for row in overview['worst_destinations']] == ['@a', '@b']
+    # The batch update invalidates the owner's cached slots
+    assert str(slots[0]['last_sent_at']).startswith('2024-01-01')
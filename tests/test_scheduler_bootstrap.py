@@ -0,0 +1,71 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('telethon')
+
+from scheduler.config.scheduler_config import SchedulerConfig
+from scheduler.config.worker_config import WorkerConfig
+from scheduler.core import scheduler as scheduler_module
+from scheduler.core.scheduler import AutomatedScheduler
+
+
+class FakeDatabase:
+    def __init__(self):
+        self.limit_calls = []
+
+    async def bulk_initialize_worker_limits(self, worker_ids):
+        self.limit_calls.append(list(worker_ids))
+        return True
+
+
+def start_scheduler(monkeypatch, worker_ids, connect_worker, concurrency=2):
+    monkeypatch.setattr(scheduler_module, 'get_worker_pool_client', lambda: None)
+    monkeypatch.setattr(scheduler_module, 'connect_worker', connect_worker)
+    monkeypatch.setattr(WorkerConfig, 'load_workers_from_env',
+                        lambda self: [SimpleNamespace(worker_id=worker_id) for worker_id in worker_ids])
+    return AutomatedScheduler(FakeDatabase(), SchedulerConfig(worker_connect_concurrency=concurrency))
+
+
+def test_workers_connect_concurrently_and_join_in_the_background(monkeypatch):
+    state = {'connecting': 0, 'peak': 0}
+
+    async def connect_worker(creds, timeout):
+        state['connecting'] += 1
+        state['peak'] = max(state['peak'], state['connecting'])
+        await asyncio.sleep(0.01 if creds.worker_id == 1 else 0.05)
+        state['connecting'] -= 1
+        return None if creds.worker_id == 3 else SimpleNamespace(worker_id=creds.worker_id)
+
+    scheduler = start_scheduler(monkeypatch, [1, 2, 3, 4, 5, 6], connect_worker)
+
+    async def run():
+        await scheduler._initialize_workers()
+        ready = [worker.worker_id for worker in scheduler.workers]
+        connecting = scheduler.get_status()['workers_connecting']
+        await scheduler._bootstrap_task
+        return ready, connecting
+
+    ready, connecting = asyncio.run(run())
+    assert ready == [1] and connecting
+    assert sorted(worker.worker_id for worker in scheduler.workers) == [1, 2, 4, 5, 6]
+    assert state['peak'] == 2
+    assert scheduler.database.limit_calls == [[1, 2, 3, 4, 5, 6]]
+
+
+def test_stop_cancels_the_background_connects(monkeypatch):
+    async def connect_worker(creds, timeout):
+        await asyncio.sleep(0 if creds.worker_id == 1 else 60)
+        return SimpleNamespace(worker_id=creds.worker_id)
+
+    scheduler = start_scheduler(monkeypatch, [1, 2], connect_worker)
+
+    async def run():
+        await scheduler._initialize_workers()
+        await scheduler.stop()
+        await asyncio.gather(scheduler._bootstrap_task, return_exceptions=True)
+        return scheduler._bootstrap_task.cancelled()
+
+    assert asyncio.run(asyncio.wait_for(run(), timeout=5))
+    assert [worker.worker_id for worker in scheduler.workers] == [1]
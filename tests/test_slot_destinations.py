@@ -0,0 +1,84 @@
+import asyncio
+import logging
+import sqlite3
+
+from src.database import slot_destinations
+from src.database.manager import DatabaseManager
+
+TABLE = '''
+    CREATE TABLE slot_destinations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        slot_id INTEGER,
+        destination_type TEXT,
+        destination_id TEXT,
+        destination_name TEXT,
+        alias TEXT,
+        is_active INTEGER DEFAULT 1,
+        created_at TEXT,
+        updated_at TEXT
+    )
+'''
+
+
+def dest(destination_id, name=None, alias=None):
+    return {'destination_type': 'group', 'destination_id': destination_id,
+            'destination_name': name or destination_id, 'alias': alias}
+
+
+def rows(cursor):
+    cursor.execute('SELECT destination_id, destination_name, alias, is_active FROM slot_destinations ORDER BY id')
+    return cursor.fetchall()
+
+
+def test_apply_diff_writes_only_the_differences():
+    cursor = sqlite3.connect(':memory:').cursor()
+    cursor.execute(TABLE)
+    slot_destinations.ensure_unique_index(cursor, slot_destinations.USER_TABLE)
+
+    first = slot_destinations.apply_diff(cursor, 'slot_destinations', 1,
+                                         [dest('@a', alias='x'), dest('@b'), dest('@a')])
+    assert first == {'added': 2, 'reactivated': 0, 'updated': 0, 'removed': 0, 'unchanged': 0}
+
+    second = slot_destinations.apply_diff(cursor, 'slot_destinations', 1, [dest('@a'), dest('@c', 'C')])
+    assert second == {'added': 1, 'reactivated': 0, 'updated': 0, 'removed': 1, 'unchanged': 1}
+
+    third = slot_destinations.apply_diff(cursor, 'slot_destinations', 1, [dest('@a', 'A'), dest('@b'), dest('@c', 'C')])
+    assert third == {'added': 0, 'reactivated': 1, 'updated': 1, 'removed': 0, 'unchanged': 1}
+
+    # One row per destination; a None alias keeps the stored one
+    assert rows(cursor) == [('@a', 'A', 'x', 1), ('@b', '@b', None, 1), ('@c', 'C', None, 1)]
+
+    slot_destinations.apply_diff(cursor, 'slot_destinations', 1, [dest('@c', 'C')], soft_delete=False)
+    assert rows(cursor) == [('@c', 'C', None, 1)]
+
+
+def test_compact_keeps_the_active_then_newest_row():
+    cursor = sqlite3.connect(':memory:').cursor()
+    cursor.execute(TABLE)
+    cursor.executemany(
+        'INSERT INTO slot_destinations (slot_id, destination_id, destination_name, is_active) VALUES (?, ?, ?, ?)',
+        [(1, '@a', 'old', 1), (1, '@a', 'dead', 0), (1, '@b', 'b1', 0), (1, '@b', 'b2', 0), (1, '', 'none', 1),
+         (2, '@a', 'other slot', 1)]
+    )
+    assert slot_destinations.ensure_unique_index(cursor, 'slot_destinations') == 3
+    assert slot_destinations.ensure_unique_index(cursor, 'slot_destinations') == 0
+    assert rows(cursor) == [('@a', 'old', None, 1), ('@b', 'b2', None, 0), ('@a', 'other slot', None, 1)]
+
+
+def test_repeated_saves_do_not_grow_the_table(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'bot.db'), logging.getLogger(__name__))
+
+    async def run():
+        await db.initialize()
+        await db.create_user(1, 'alice', 'Alice')
+        slot_id = await db.create_ad_slot(1, 1)
+        for _ in range(5):
+            await db.update_destinations_for_slot(slot_id, [dest('@a'), dest('@b')])
+            await db.update_destinations_for_slot(slot_id, [dest('@b')])
+        return slot_id, await db.get_destinations_for_slot(slot_id)
+
+    slot_id, active = asyncio.run(run())
+    assert [d['destination_id'] for d in active] == ['@b']
+    conn = sqlite3.connect(db.db_path)
+    assert conn.execute('SELECT COUNT(*) FROM slot_destinations WHERE slot_id = ?', (slot_id,)).fetchone() == (2,)
+    conn.close()
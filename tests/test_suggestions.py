@@ -0,0 +1,53 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+pytest.importorskip('telegram')
+
+from commands import suggestion_commands
+from commands.suggestion_commands import SuggestionManager, run_suggestion_query
+
+
+def test_cooldown_and_per_user_limit(tmp_path):
+    manager = SuggestionManager(str(tmp_path / 'bot.db'), legacy_json_path=None)
+    assert manager.add_suggestion(1, 'alice', 10, 'Please add dark mode')
+    with pytest.raises(ValueError, match='Please wait'):
+        manager.add_suggestion(1, 'alice', 10, 'And a light mode too')
+    with pytest.raises(ValueError, match='too short'):
+        manager.add_suggestion(2, 'bob', 20, 'short')
+    assert manager.add_suggestion(2, 'bob', 20, 'Support more currencies')
+    assert manager.get_suggestion_stats()['total_suggestions'] == 2
+    assert [s['user_id'] for s in manager.get_all_suggestions(limit=1)] == [2]
+
+
+def test_legacy_json_is_imported_once(tmp_path):
+    legacy = tmp_path / 'suggestions.json'
+    legacy.write_text(json.dumps({'suggestions': [
+        {'id': 1, 'user_id': 5, 'suggestion': 'Imported idea', 'timestamp': '2024-01-01T00:00:00'},
+    ]}))
+    db_path = str(tmp_path / 'bot.db')
+    assert len(SuggestionManager(db_path, str(legacy)).get_user_suggestions(5)) == 1
+
+    # Deleted suggestions do not come back on the next start
+    conn = SuggestionManager(db_path, None)._connect()
+    conn.execute('DELETE FROM suggestions')
+    conn.commit()
+    conn.close()
+    assert SuggestionManager(db_path, str(legacy)).get_user_suggestions(5) == []
+
+
+def test_queries_run_off_the_event_loop(tmp_path, monkeypatch):
+    monkeypatch.setattr(suggestion_commands, '_suggestion_manager',
+                        SuggestionManager(str(tmp_path / 'bot.db'), legacy_json_path=None))
+
+    async def run():
+        loop_thread = threading.get_ident()
+        query_thread = await run_suggestion_query(lambda manager: threading.get_ident())
+        stats = await run_suggestion_query(lambda manager: manager.get_suggestion_stats())
+        return loop_thread, query_thread, stats
+
+    loop_thread, query_thread, stats = asyncio.run(run())
+    assert query_thread != loop_thread
+    assert stats['total_suggestions'] == 0
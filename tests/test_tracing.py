@@ -0,0 +1,63 @@
+import asyncio
+import subprocess
+import sys
+
+from src.monitoring.tracing import Tracer, load_traces, summarize_trace
+
+
+def test_spans_nest_across_tasks():
+    tracer = Tracer()
+
+    async def send(i):
+        with tracer.span('send', destination=i):
+            await asyncio.sleep(0)
+
+    async def cycle():
+        with tracer.trace('posting_cycle'):
+            with tracer.span('load'):
+                pass
+            await asyncio.gather(*(send(i) for i in range(3)))
+
+    asyncio.run(cycle())
+    trace = tracer.get_traces('posting_cycle')[0]
+    root, load, *sends = trace['spans']
+    assert root['parent_id'] is None
+    assert load['parent_id'] == root['id']
+    assert [span['parent_id'] for span in sends] == [root['id']] * 3
+    rows = {row['name']: row for row in summarize_trace(trace)}
+    assert rows['send']['count'] == 3
+
+
+def test_span_outside_trace_is_noop():
+    tracer = Tracer()
+    with tracer.span('orphan') as span:
+        assert span is None
+    assert tracer.get_traces() == []
+
+
+EXPORTER = """
+import sys
+from src.monitoring.tracing import Tracer
+path, name = sys.argv[1], sys.argv[2]
+for i in range(200):
+    Tracer.append_export(path, {'name': name, 'trace_id': i, 'spans': []})
+    Tracer.compact_export(path, 10 ** 6)
+"""
+
+
+def test_concurrent_exports_and_compaction_keep_every_trace(tmp_path):
+    path = str(tmp_path / 'traces.jsonl')
+    writers = [subprocess.Popen([sys.executable, '-c', EXPORTER, path, name]) for name in ('bot', 'scheduler')]
+    assert [writer.wait() for writer in writers] == [0, 0]
+    traces = load_traces(path)
+    for name in ('bot', 'scheduler'):
+        assert [t['trace_id'] for t in traces if t['name'] == name] == list(range(200))
+
+
+def test_compaction_keeps_latest(tmp_path):
+    path = str(tmp_path / 'traces.jsonl')
+    for i in range(5):
+        Tracer.append_export(path, {'name': 'posting_cycle', 'trace_id': i, 'spans': []})
+    Tracer.compact_export(path, 2)
+    assert [t['trace_id'] for t in load_traces(path)] == [3, 4]
+    assert load_traces(str(tmp_path / 'missing.jsonl')) == []
@@ -0,0 +1,92 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('aiohttp')
+pytest.importorskip('telegram')
+
+from src import webhook_server
+from src.webhook_server import _percentile, serve_webhook
+
+CONFIG = SimpleNamespace(webhook_url='https://example.com/hook', webhook_secret='secret')
+
+
+class FakeApplication:
+    def __init__(self, calls):
+        self.calls = calls
+        self.running = False
+        for hook in ('post_init', 'post_stop', 'post_shutdown'):
+            setattr(self, hook, self._hook(hook))
+
+    def _hook(self, name):
+        async def hook(application):
+            self.calls.append(name)
+        return hook
+
+    async def initialize(self):
+        self.calls.append('initialize')
+
+    async def start(self):
+        self.running = True
+        self.calls.append('start')
+
+    async def stop(self):
+        self.running = False
+        self.calls.append('stop')
+
+    async def shutdown(self):
+        assert not self.running, 'shutdown while running'
+        self.calls.append('shutdown')
+
+
+class FakeServer:
+    fail_start = False
+
+    def __init__(self, application, config, logger, allowed_updates):
+        self.calls = application.calls
+
+    async def set_webhook(self):
+        self.calls.append('set_webhook')
+
+    async def start(self):
+        if self.fail_start:
+            raise OSError('address in use')
+        self.calls.append('server.start')
+
+    async def stop(self):
+        self.calls.append('server.stop')
+
+
+def serve(monkeypatch, fail_start=False):
+    monkeypatch.setattr(webhook_server, 'WebhookServer', FakeServer)
+    monkeypatch.setattr(FakeServer, 'fail_start', fail_start)
+    calls = []
+
+    async def run():
+        stop_event = asyncio.Event()
+        stop_event.set()
+        await serve_webhook(FakeApplication(calls), CONFIG, stop_event=stop_event)
+
+    return calls, run
+
+
+def test_teardown_follows_run_polling_order(monkeypatch):
+    calls, run = serve(monkeypatch)
+    asyncio.run(run())
+    assert calls == ['initialize', 'post_init', 'set_webhook', 'start', 'server.start',
+                     'server.stop', 'stop', 'post_stop', 'shutdown', 'post_shutdown']
+
+
+def test_failed_listener_still_stops_and_shuts_down(monkeypatch):
+    calls, run = serve(monkeypatch, fail_start=True)
+    with pytest.raises(OSError):
+        asyncio.run(run())
+    assert calls[-4:] == ['stop', 'post_stop', 'shutdown', 'post_shutdown']
+
+
+def test_percentile_uses_nearest_rank():
+    values = [float(i) for i in range(1, 101)]
+    assert _percentile(values, 50) == 50.0
+    assert _percentile(values, 99) == 99.0
+    assert _percentile([], 95) == 0.0
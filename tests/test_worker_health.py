@@ -0,0 +1,75 @@
+import asyncio
+import logging
+import sqlite3
+from datetime import datetime
+
+from src.database import worker_health
+from src.database.manager import DatabaseManager
+
+# As deployed databases have it (database_migration.py); initialize() does not create it
+WORKER_USAGE = '''
+    CREATE TABLE IF NOT EXISTS worker_usage (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        worker_id INTEGER,
+        date DATE,
+        messages_sent_today INTEGER DEFAULT 0,
+        messages_sent_this_hour INTEGER DEFAULT 0,
+        last_reset_hour INTEGER,
+        hourly_limit INTEGER DEFAULT 15,
+        daily_limit INTEGER DEFAULT 150,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+'''
+
+
+def test_snapshot_row_arithmetic():
+    now = datetime(2024, 1, 1, 10, 30)
+    row = worker_health.new_snapshot(1)
+    for _ in range(3):
+        worker_health.apply_attempt(row, False, 'FloodWait', now)
+    assert (row['total_failures'], row['consecutive_failures']) == (3, 3)
+    assert row['error_rate'] == 0.271 and row['last_error'] == 'FloodWait'
+    assert (row['health_score'], row['status']) == (56, 'warning')
+
+    worker_health.apply_attempt(row, True, None, now)
+    assert row['consecutive_failures'] == 0 and row['status'] == 'healthy'
+
+    for _ in range(13):
+        worker_health.apply_post(row, now)
+    assert row['utilization'] == round(13 / 15, 4) and row['health_score'] < 100
+
+    worker_health.apply_bans(row, 2, 'permission_denied,rate_limit', now)
+    assert row['status'] == 'critical'
+
+
+def test_buckets_roll_over_for_display():
+    row = worker_health.new_snapshot(1)
+    worker_health.apply_post(row, datetime(2024, 1, 1, 10, 59))
+    updated_at = row['updated_at']
+
+    shown = worker_health.for_display(dict(row), datetime(2024, 1, 1, 11, 0))
+    assert (shown['posts_this_hour'], shown['posts_today'], shown['updated_at']) == (0, 1, updated_at)
+    shown = worker_health.for_display(dict(row), datetime(2024, 1, 2, 0, 0))
+    assert (shown['posts_this_hour'], shown['posts_today']) == (0, 0)
+
+
+def test_manager_updates_snapshot_with_each_outcome(tmp_path):
+    db = DatabaseManager(str(tmp_path / 'bot.db'), logging.getLogger(__name__))
+
+    async def run():
+        await db.initialize()
+        conn = sqlite3.connect(db.db_path)
+        conn.execute(WORKER_USAGE)
+        conn.close()
+        await db.record_posting_attempt(7, '@a', True)
+        for _ in range(4):
+            await db.record_posting_attempt(7, '@b', False, 'FloodWait')
+        await db.record_worker_post(7, '@a')
+        return {row['worker_id']: row for row in await db.get_worker_health_snapshots()}
+
+    snapshots = asyncio.run(run())
+    row = snapshots[7]
+    assert (row['total_attempts'], row['total_failures'], row['consecutive_failures']) == (5, 4, 4)
+    assert row['posts_this_hour'] == row['posts_today'] == 1
+    assert row['last_error'] == 'FloodWait' and row['status'] in ('warning', 'critical')
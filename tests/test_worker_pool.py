@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import pytest
+
+from src.services import worker_pool_client
+from src.services.worker_pool_client import WorkerPoolClient, WorkerPoolError, get_worker_pool_client
+from src.utils import session_lock
+from src.utils.session_lock import acquire_session, release_session, session_lock_path
+
+
+class FloodWaitError(Exception):
+    def __init__(self, seconds):
+        super().__init__(f"A wait of {seconds} seconds is required")
+        self.seconds = seconds
+
+
+class FakeWorker:
+    def __init__(self, worker_id):
+        self.worker_id = worker_id
+        self.is_connected = True
+        self.is_banned = False
+        self.sent = []
+
+    async def send_message(self, chat_id, message, database_manager=None):
+        self.sent.append((chat_id, message))
+        return True
+
+    async def get_channel_info(self, channel_username):
+        raise FloodWaitError(420)
+
+    async def disconnect(self):
+        self.is_connected = False
+
+
+def test_pool_round_trip_over_socket(tmp_path, monkeypatch):
+    pytest.importorskip('telethon')
+    from scheduler.workers import pool as pool_module
+
+    workers = {1: FakeWorker(1)}
+
+    async def connect_worker(creds, timeout):
+        return workers.get(creds.worker_id)
+
+    monkeypatch.setattr(pool_module, 'connect_worker', connect_worker)
+
+    async def run():
+        pool = pool_module.WorkerPool(str(tmp_path / 'pool.sock'))
+        await pool.start([SimpleNamespace(worker_id=1), SimpleNamespace(worker_id=2)])
+        client = WorkerPoolClient(pool.socket_path, timeout=5)
+        try:
+            assert await client.ping()
+            assert await client.send(1, '@group', 'hello') is True
+            with pytest.raises(WorkerPoolError) as flood:
+                await client.resolve(1, '@group')
+            with pytest.raises(WorkerPoolError) as missing:
+                await client.send(2, '@group', 'hello')
+            with pytest.raises(WorkerPoolError) as unknown:
+                await client.send(9, '@group', 'hello')
+            status = {info['worker_id']: info for info in await client.workers()}
+        finally:
+            await client.close()
+            await pool.close()
+        return flood.value, missing.value, unknown.value, status
+
+    flood, missing, unknown, status = asyncio.run(run())
+    assert workers[1].sent == [('@group', 'hello')]
+    assert (flood.error, flood.seconds) == ('FloodWaitError', 420)
+    assert missing.error == unknown.error == 'WorkerNotConnectedError'
+    assert status[1]['state'] == 'connected' and status[1]['processed'] == 2
+    assert status[2]['state'] == 'failed'
+    assert not (tmp_path / 'pool.sock').exists()
+
+
+def test_missing_socket_falls_back_to_in_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(worker_pool_client, '_client', None)
+    monkeypatch.delenv('WORKER_POOL_SOCKET', raising=False)
+    assert get_worker_pool_client() is None
+
+    socket_path = str(tmp_path / 'pool.sock')
+    monkeypatch.setenv('WORKER_POOL_SOCKET', socket_path)
+    assert get_worker_pool_client() is None
+
+    client = WorkerPoolClient(socket_path, timeout=1)
+    assert asyncio.run(client.ping()) is False
+    with pytest.raises(OSError):
+        asyncio.run(client.call('workers'))
+
+
+def test_pool_client_is_used_when_socket_exists(tmp_path, monkeypatch):
+    monkeypatch.setattr(worker_pool_client, '_client', None)
+    socket_path = tmp_path / 'pool.sock'
+    socket_path.touch()
+    monkeypatch.setenv('WORKER_POOL_SOCKET', str(socket_path))
+    client = get_worker_pool_client()
+    assert client is not None and client.socket_path == str(socket_path)
+    assert get_worker_pool_client() is client
+
+
+HOLD_LOCK = """
+import sys
+from src.utils.session_lock import acquire_session
+print(acquire_session(sys.argv[1]), flush=True)
+sys.stdin.read()
+"""
+
+
+def test_session_lock_is_exclusive_between_processes(tmp_path):
+    session = str(tmp_path / 'worker_1')
+    holder = subprocess.Popen([sys.executable, '-c', HOLD_LOCK, session],
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == 'True'
+        assert acquire_session(session) is False
+        assert acquire_session(session + '.session') is False
+    finally:
+        holder.communicate('')
+    try:
+        assert acquire_session(session) is True
+        assert acquire_session(session) is True
+    finally:
+        release_session(session)
+
+
+def test_failed_bootstrap_releases_session_lock(tmp_path, monkeypatch):
+    pytest.importorskip('telethon')
+    from src.services import worker_manager
+
+    class FailingClient:
+        def __init__(self, session, api_id, api_hash):
+            pass
+
+        async def start(self, phone=None):
+            raise ConnectionError('network down')
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('WORKER_POOL_SOCKET', raising=False)
+    monkeypatch.setattr(worker_manager, 'TelegramClient', FailingClient)
+    for name, value in (('API_ID', '1'), ('API_HASH', 'hash'), ('PHONE', '+100')):
+        monkeypatch.setenv(f'WORKER_1_{name}', value)
+
+    manager = worker_manager.WorkerManager(None, logging.getLogger(__name__))
+    manager.worker_ids = [1]
+    with pytest.raises(Exception, match='No workers'):
+        asyncio.run(manager.initialize_workers())
+
+    assert session_lock_path('sessions/worker_1') not in session_lock._held
+    assert acquire_session('sessions/worker_1') is True
+    release_session('sessions/worker_1')
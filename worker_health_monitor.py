@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 import logging
 from typing import Dict, List, Optional
 from enhanced_worker_manager import EnhancedWorkerManager
+from src.database import worker_health
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -20,86 +21,46 @@ class WorkerHealthMonitor:
         self.manager = EnhancedWorkerManager(db_path)
         
     async def check_worker_health(self) -> Dict:
-        """Check health of all workers."""
+        """Check health of all workers from the precomputed health snapshot."""
         logger.info("🏥 Checking worker health...")
         
         try:
             conn = sqlite3.connect(self.db_path)
             cursor = conn.cursor()
             
-            # Get all workers
-            cursor.execute('''
-                SELECT w.worker_id, w.username, w.is_active, w.is_registered,
-                       wh.status, wh.error_count, wh.ban_count,
-                       wu.hourly_posts, wu.daily_posts, wu.hourly_limit, wu.daily_limit
-                FROM workers w
-                LEFT JOIN worker_health wh ON w.worker_id = wh.worker_id
-                LEFT JOIN worker_usage wu ON w.worker_id = wu.worker_id
-                WHERE w.is_active = 1
-                ORDER BY w.worker_id
-            ''')
-            
-            workers = cursor.fetchall()
+            # One row per worker, scored as posting outcomes arrive
+            snapshots = worker_health.read_all(cursor)
+            try:
+                cursor.execute('SELECT worker_id, username FROM workers')
+                usernames = dict(cursor.fetchall())
+            except sqlite3.OperationalError:
+                usernames = {}
             conn.close()
             
+            summary = worker_health.summarize(snapshots)
             health_summary = {
-                'total_workers': len(workers),
-                'healthy_workers': 0,
-                'unhealthy_workers': 0,
-                'banned_workers': 0,
-                'overloaded_workers': 0,
-                'worker_details': []
+                'total_workers': summary['total_workers'],
+                'healthy_workers': summary['healthy'],
+                'unhealthy_workers': summary['total_workers'] - summary['healthy'],
+                'banned_workers': summary['banned'],
+                'overloaded_workers': summary['overloaded'],
+                'worker_details': [
+                    {
+                        'worker_id': row['worker_id'],
+                        'username': usernames.get(row['worker_id']),
+                        'status': row['status'],
+                        'error_count': row['total_failures'],
+                        'error_rate': row['error_rate'],
+                        'last_error': row['last_error'],
+                        'ban_count': row['active_bans'],
+                        'hourly_usage': f"{row['posts_this_hour']}/{row['hourly_limit']}",
+                        'daily_usage': f"{row['posts_today']}/{row['daily_limit']}",
+                        'health_score': row['health_score']
+                    }
+                    for row in snapshots
+                ]
             }
             
-            for worker_data in workers:
-                worker_id, username, is_active, is_registered, status, error_count, ban_count, hourly_posts, daily_posts, hourly_limit, daily_limit = worker_data
-                
-                worker_detail = {
-                    'worker_id': worker_id,
-                    'username': username,
-                    'status': status or 'unknown',
-                    'error_count': error_count or 0,
-                    'ban_count': ban_count or 0,
-                    'hourly_usage': f"{hourly_posts or 0}/{hourly_limit or 15}",
-                    'daily_usage': f"{daily_posts or 0}/{daily_limit or 100}",
-                    'health_score': 100
-                }
-                
-                # Calculate health score
-                health_score = 100
-                
-                # Deduct points for errors
-                if error_count and error_count > 0:
-                    health_score -= min(error_count * 10, 50)
-                
-                # Deduct points for bans
-                if ban_count and ban_count > 0:
-                    health_score -= min(ban_count * 20, 50)
-                
-                # Deduct points for overload
-                if hourly_posts and hourly_limit and hourly_posts > hourly_limit * 0.8:
-                    health_score -= 20
-                
-                if daily_posts and daily_limit and daily_posts > daily_limit * 0.8:
-                    health_score -= 20
-                
-                worker_detail['health_score'] = max(health_score, 0)
-                
-                # Categorize worker
-                if worker_detail['health_score'] >= 80:
-                    health_summary['healthy_workers'] += 1
-                else:
-                    health_summary['unhealthy_workers'] += 1
-                
-                if ban_count and ban_count > 0:
-                    health_summary['banned_workers'] += 1
-                
-                if (hourly_posts and hourly_limit and hourly_posts > hourly_limit * 0.9) or \
-                   (daily_posts and daily_limit and daily_posts > daily_limit * 0.9):
-                    health_summary['overloaded_workers'] += 1
-                
-                health_summary['worker_details'].append(worker_detail)
-            
             logger.info(f"📊 Health Summary: {health_summary['healthy_workers']} healthy, {health_summary['unhealthy_workers']} unhealthy")
             return health_summary
             
@@ -254,7 +215,7 @@ class WorkerHealthMonitor:
             report.append("")
         
         # Unhealthy Workers
-        unhealthy_workers = [w for w in health.get('worker_details', []) if w['health_score'] < 80]
+        unhealthy_workers = [w for w in health.get('worker_details', []) if w['status'] != 'healthy']
         if unhealthy_workers:
             report.append("⚠️ UNHEALTHY WORKERS:")
             for worker in unhealthy_workers[:10]:  # Show top 10